@@ -234,9 +234,19 @@ class HeavisideAssembias(object):
             return compute_conditional_percentiles(
                 table=table,
                 prim_haloprop_key=self.prim_haloprop_key,
-                sec_haloprop_key=self.sec_haloprop_key
+                sec_haloprop_key=self.sec_haloprop_key,
+                use_cache=True
                 )
 
+        # Percentiles depend only on these parameters, so mock factories
+        # may persist them in the derived column store of the halo catalog
+        def derived_column_params():
+            return {'function': 'compute_conditional_percentiles',
+                'prim_haloprop_key': self.prim_haloprop_key,
+                'sec_haloprop_key': self.sec_haloprop_key,
+                'input_keys': (self.prim_haloprop_key, self.sec_haloprop_key)}
+        assembias_percentile_calculator.derived_column_params = derived_column_params
+
         key = self.sec_haloprop_key + '_percentile'
         try:
             self.new_haloprop_func_dict[key] = assembias_percentile_calculator
@@ -484,7 +494,8 @@ class HeavisideAssembias(object):
 
                     percentiles = compute_conditional_percentiles(
                         prim_haloprop=prim_haloprop,
-                        sec_haloprop=sec_haloprop
+                        sec_haloprop=sec_haloprop,
+                        use_cache=True
                         )
                     no_edge_percentiles = percentiles[no_edge_mask]
                     type1_mask = no_edge_percentiles > no_edge_split
@@ -496,7 +507,8 @@ class HeavisideAssembias(object):
                 except KeyError:
                     percentiles = compute_conditional_percentiles(
                         prim_haloprop=prim_haloprop,
-                        sec_haloprop=sec_haloprop
+                        sec_haloprop=sec_haloprop,
+                        use_cache=True
                         )
                 no_edge_percentiles = percentiles[no_edge_mask]
                 type1_mask = no_edge_percentiles > no_edge_split
@@ -7,12 +7,12 @@ from __future__ import division, print_function, absolute_import
 import numpy as np
 from astropy.extern import six
 from abc import ABCMeta
-from astropy.utils.misc import NumpyRNGContext
 
 from .. import model_defaults
 from .. import model_helpers
 
 from ...utils.array_utils import custom_len
+from ...utils.random_streams import mc_bernoulli
 from ...custom_exceptions import HalotoolsError
 
 __all__ = ('BinaryGalpropModel', 'BinaryGalpropInterpolModel')
@@ -114,9 +114,8 @@ class BinaryGalpropModel(object):
 
         mean_func = getattr(self, 'mean_'+self.galprop_name+'_fraction')
         mean_galprop_fraction = mean_func(**kwargs)
-        with NumpyRNGContext(seed):
-            mc_generator = np.random.random(custom_len(mean_galprop_fraction))
-        result = np.where(mc_generator < mean_galprop_fraction, True, False)
+        result = mc_bernoulli(mean_galprop_fraction, seed=seed,
+            stream_keys=(getattr(self, 'gal_type', ''), self.galprop_name))
         if 'table' in kwargs:
             kwargs['table'][self.galprop_name][:] = result
         return result
@@ -17,6 +17,7 @@ from . import LogNormalScatterModel
 from .. import model_defaults
 
 from ...sim_manager import sim_defaults
+from ...utils.random_streams import rng_stream
 
 
 __all__ = ('PrimGalpropModel', )
@@ -140,6 +141,10 @@ class PrimGalpropModel(object):
         for key in list(self.scatter_model.param_dict.keys()):
             self.scatter_model.param_dict[key] = self.param_dict[key]
 
+        # Give each gal_type its own scatter stream for a given seed
+        kwargs['seed'] = rng_stream(kwargs.get('seed', None),
+            getattr(self, 'gal_type', ''), self.galprop_name, 'scatter')
+
         return self.scatter_model.scatter_realization(**kwargs)
 
     def _build_param_dict(self, **kwargs):
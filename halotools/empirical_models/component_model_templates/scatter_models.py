@@ -5,12 +5,12 @@ used to model stochasticity in the mapping between stellar mass and halo propert
 from __future__ import division, print_function, absolute_import, unicode_literals
 
 import numpy as np
-from astropy.utils.misc import NumpyRNGContext
 
 from .. import model_defaults
 from .. import model_helpers as model_helpers
 
 from ...utils.array_utils import custom_len
+from ...utils.random_streams import rng_stream
 
 
 __all__ = ('LogNormalScatterModel', )
@@ -122,7 +122,7 @@ class LogNormalScatterModel(object):
             Data table storing halo catalog.
             If ``table`` is not passed, then ``prim_haloprop`` keyword argument must be passed.
 
-        seed : int, optional
+        seed : int or `numpy.random.Generator`, optional
             Random number seed. Default is None.
 
         Returns
@@ -139,8 +139,8 @@ class LogNormalScatterModel(object):
 
         # only draw from a normal distribution for non-zero values of scatter
         mask = (scatter_scale > 0.0)
-        with NumpyRNGContext(seed):
-            result[mask] = np.random.normal(loc=0, scale=scatter_scale[mask])
+        rng = rng_stream(seed, 'scatter')
+        result[mask] = rng.normal(loc=0, scale=scatter_scale[mask])
 
         return result
 
@@ -157,7 +157,15 @@ class LogNormalScatterModel(object):
 
         self.ordinates = [self.param_dict[self._get_param_key(i)] for i in range(len(self.abscissa))]
 
-        self.spline_function = model_helpers.custom_spline(
+        self.spline_function = self._scatter_spline()
+
+    @model_helpers.param_dict_memoization_decorator_factory(
+        param_keys=lambda model: [model._get_param_key(i) for i in range(len(model.abscissa))])
+    def _scatter_spline(self):
+        """ Private method returning the spline through the ordinates stored in
+        ``self.param_dict``, which is only computed again once these values change.
+        """
+        return model_helpers.custom_spline(
             self.abscissa, self.ordinates, k=self.spline_degree)
 
     def _initialize_param_dict(self):
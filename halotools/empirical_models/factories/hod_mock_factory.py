@@ -10,15 +10,17 @@ and Halotools models.
 
 import numpy as np
 from copy import copy
-from astropy.table import Table
+from astropy.table import Table, vstack
 from astropy.utils.misc import NumpyRNGContext
 
 from .mock_factory_template import MockFactory
 
 from .. import model_helpers
+from ..occupation_models import OccupationComponent
 
 from ...sim_manager import sim_defaults
 from ...utils.table_utils import SampleSelector
+from ...utils.random_streams import spawn_integer_seeds
 from ...custom_exceptions import HalotoolsError
 
 
@@ -33,6 +35,10 @@ missing_halo_upid_msg = ("All HOD-style models populate host halos with mock gal
     "with halo_upid = -1 for host halos and !=-1 for subhalos.\n"
     "The halo catalog you passed to the HodMockFactory does not have the ``halo_upid`` column.\n")
 
+# Attributes of component models storing the name of a halo catalog column they may read
+component_haloprop_key_attrs = ('prim_haloprop_key', 'sec_haloprop_key',
+    'concentration_key', 'halo_boundary_key')
+
 
 class HodMockFactory(MockFactory):
     """ Class responsible for populating a simulation with a
@@ -114,14 +120,19 @@ class HodMockFactory(MockFactory):
             Default is set in `~halotools.empirical_models.model_defaults`.
 
         """
+        self._preprocess_halo_catalog(halocat, load_all_columns=False)
+
+    def _preprocess_halo_catalog(self, halocat, load_all_columns):
+        input_additional_haloprops = list(self.additional_haloprops)
+        halo_table = self._retrieve_halo_table_columns(halocat, load_all_columns)
         try:
-            assert 'halo_upid' in list(halocat.halo_table.keys())
+            assert 'halo_upid' in list(halo_table.keys())
         except AssertionError:
             raise HalotoolsError(missing_halo_upid_msg)
 
         # Make cuts on halo catalog #
         # Select host halos only, since this is an HOD-style model
-        halo_table = SampleSelector.host_halo_selection(table=halocat.halo_table)
+        halo_table = SampleSelector.host_halo_selection(table=halo_table)
 
         # make a (possibly trivial) completeness cut
         cutoff_mvir = self.Num_ptcl_requirement*self.particle_mass
@@ -149,10 +160,22 @@ class HodMockFactory(MockFactory):
         ############################################################
 
         # Create new columns of the halo catalog, if applicable
+        row_selection = {'host_halos': True,
+            'halo_mass_column_key': self.halo_mass_column_key, 'min_halo_mass': cutoff_mvir}
         try:
             d = self.model.new_haloprop_func_dict
             for new_haloprop_key, new_haloprop_func in d.items():
-                halo_table[new_haloprop_key] = new_haloprop_func(table=halo_table)
+                try:
+                    halo_table[new_haloprop_key] = self._compute_new_haloprop(halocat,
+                        new_haloprop_key, new_haloprop_func, halo_table, row_selection)
+                except (KeyError, HalotoolsError):
+                    if (load_all_columns is False) and hasattr(halocat, 'load_halo_table_columns'):
+                        # The function may require a column that the model did not declare,
+                        # so start over with the full halo catalog
+                        self.additional_haloprops = input_additional_haloprops
+                        return self._preprocess_halo_catalog(halocat, load_all_columns=True)
+                    else:
+                        raise
                 self.additional_haloprops.append(new_haloprop_key)
         except AttributeError:
             pass
@@ -166,6 +189,41 @@ class HodMockFactory(MockFactory):
 
         self.model.build_lookup_tables()
 
+    def _model_halo_columns(self):
+        """ Names of the halo catalog columns that the model may need, i.e.,
+        the ``additional_haloprops``, ``halo_upid``, the ``halo_mass_column_key``,
+        and every halo property, concentration, halo boundary and profile parameter key
+        of the component models.
+        """
+        keys = set(self.additional_haloprops)
+        keys.update(('halo_upid', self.halo_mass_column_key))
+        keys.update(getattr(self.model, 'prof_param_keys', []))
+
+        model_dictionary = getattr(self.model, 'model_dictionary', {})
+        for component_model in model_dictionary.values():
+            for attr in component_haloprop_key_attrs:
+                key = getattr(component_model, attr, None)
+                if key is not None:
+                    keys.add(key)
+            keys.update(getattr(component_model, 'list_of_haloprops_needed', []))
+            keys.update(getattr(component_model, 'prof_param_keys', []))
+        return keys
+
+    def _retrieve_halo_table_columns(self, halocat, load_all_columns=False):
+        """ Retrieve the halo table used to pre-process the halo catalog.
+
+        If the ``halocat`` supports column-selective loading, as does
+        `~halotools.sim_manager.CachedHaloCatalog`, only the columns returned by
+        `_model_halo_columns` are loaded from disk. Otherwise, or if ``load_all_columns``
+        is True, the full ``halo_table`` of the ``halocat`` is returned.
+        """
+        if (load_all_columns is True) or (not hasattr(halocat, 'load_halo_table_columns')):
+            return halocat.halo_table
+
+        available_keys = halocat.lazy_halo_table.colnames + ['halo_hostid', 'halo_mvir_host_halo']
+        keys = [key for key in self._model_halo_columns() if key in available_keys]
+        return halocat.load_halo_table_columns(keys)
+
     def populate(self, seed=None, **kwargs):
         """
         Method populating host halos with mock galaxies.
@@ -262,7 +320,11 @@ class HodMockFactory(MockFactory):
         except:
             self.halo_table = self._orig_halo_table
 
-        self.allocate_memory(seed=seed)
+        # The _mean_occupations keyword is used by populate_batch_generator
+        # to pass in mean occupations that were computed for many models at once
+        mean_occupations = kwargs.get('_mean_occupations', {})
+
+        self.allocate_memory(seed=seed, _mean_occupations=mean_occupations)
 
         # Loop over all gal_types in the model
         for gal_type in self.gal_types:
@@ -322,7 +384,7 @@ class HodMockFactory(MockFactory):
             mask = self.model.galaxy_selection_func(self.galaxy_table)
             self.galaxy_table = self.galaxy_table[mask]
 
-    def allocate_memory(self, seed=None):
+    def allocate_memory(self, seed=None, **kwargs):
         """ Method allocates the memory for all the numpy arrays
         that will store the information about the mock.
         These arrays are bound directly to the mock object.
@@ -331,6 +393,7 @@ class HodMockFactory(MockFactory):
         ``_occupation`` and ``_gal_type_indices``.
 
         """
+        mean_occupations = kwargs.get('_mean_occupations', {})
 
         self.galaxy_table = Table()
 
@@ -374,7 +437,11 @@ class HodMockFactory(MockFactory):
             occupation_func = getattr(self.model, occupation_func_name)
             # Call the component model to get a Monte Carlo
             # realization of the abundance of gal_type galaxies
-            self._occupation[gal_type] = occupation_func(table=self.halo_table, seed=seed)
+            if gal_type in mean_occupations:
+                self._occupation[gal_type] = self._mc_occupation_from_mean(
+                    gal_type, mean_occupations[gal_type], seed=seed)
+            else:
+                self._occupation[gal_type] = occupation_func(table=self.halo_table, seed=seed)
 
             # Now use the above result to set up the indexing scheme
             self._total_abundance[gal_type] = (
@@ -440,3 +507,265 @@ class HodMockFactory(MockFactory):
             ngals = ngals + np.sum(occupation_func(table=halo_table, seed=seed))
 
         return ngals
+
+    def populate_batch_generator(self, param_names, param_array, seed=None,
+            batch_size=None, batch_memory_size=100, **kwargs):
+        """ Generator populating the halo catalog with one mock for
+        each row of ``param_array``, e.g., to train an emulator.
+
+        Halo-side calculations are shared by all models: whenever the
+        ``mean_occupation`` method of an occupation component broadcasts
+        across parameter arrays, the mean occupations of a batch of models
+        are evaluated in a single vectorized call over the halo table.
+        Components that do not broadcast are evaluated one model at a time,
+        exactly as in the `populate` method.
+
+        Parameters
+        ----------
+        param_names : sequence of strings
+            Length-Nparams sequence of keys of the model ``param_dict``.
+
+        param_array : array_like
+            Array of shape (Nmodels, Nparams). Each row stores the parameter values
+            of one model, in the same order as ``param_names``.
+            Parameters not appearing in ``param_names`` keep their current values.
+
+        seed : int, optional
+            Random number seed. Each model is populated with its own seed
+            derived from ``seed`` with `~halotools.utils.spawn_integer_seeds`.
+            Default is None, which will produce stochastic results.
+
+        batch_size : int, optional
+            Maximum number of models whose mean occupations are held
+            in memory at once. Default is None, in which case ``batch_size`` is
+            the largest number of models whose mean occupations of all gal_types
+            fit in ``batch_memory_size``.
+
+        batch_memory_size : float, optional
+            Memory in Megabytes available to store the mean occupations of a batch
+            of models, used to set ``batch_size`` if it is not passed.
+            Each model requires 8 bytes per halo per gal_type. Default is 100.
+
+        **kwargs : optional
+            All remaining keyword arguments are passed to `populate`,
+            e.g., ``masking_function`` or ``enforce_PBC``.
+
+        Yields
+        ------
+        model_index : int
+            Row of ``param_array`` used to populate the mock.
+
+        galaxy_table : `~astropy.table.Table`
+            Galaxy catalog of the model.
+
+        Examples
+        --------
+        >>> from halotools.empirical_models import PrebuiltHodModelFactory
+        >>> from halotools.sim_manager import FakeSim
+        >>> model_instance = PrebuiltHodModelFactory('zheng07')
+        >>> model_instance.populate_mock(FakeSim())
+
+        >>> param_names = ('logMmin', 'sigma_logM')
+        >>> param_array = np.array([[11.9, 0.2], [12.0, 0.25], [12.1, 0.3]])
+        >>> gen = model_instance.mock.populate_batch_generator(param_names, param_array, seed=43)
+        >>> for model_index, galaxy_table in gen:
+        ...     ngals = len(galaxy_table)
+
+        The original values of the ``param_dict`` are restored once the generator is exhausted.
+
+        See also
+        --------
+        populate_batch
+        """
+        param_names = list(param_names)
+        param_array = np.atleast_2d(np.asarray(param_array, dtype='f8'))
+        if param_array.ndim != 2 or param_array.shape[1] != len(param_names):
+            msg = ("\nThe ``param_array`` argument of ``populate_batch_generator`` must have shape\n"
+                "(Nmodels, Nparams) with Nparams = len(param_names) = %i.\n"
+                "The input ``param_array`` has shape %s.\n")
+            raise HalotoolsError(msg % (len(param_names), str(param_array.shape)))
+        if param_array.shape[0] == 0:
+            msg = ("\nThe ``param_array`` argument of ``populate_batch_generator`` must have\n"
+                "at least one row of parameters.\n")
+            raise HalotoolsError(msg)
+        for name in param_names:
+            if name not in self.model.param_dict:
+                msg = ("\nThe ``%s`` parameter passed to ``populate_batch_generator``\n"
+                    "does not appear in the ``param_dict`` of the model.\n")
+                raise HalotoolsError(msg % name)
+
+        num_models = param_array.shape[0]
+        seed_list = spawn_integer_seeds(seed, num_models)
+
+        try:
+            masking_function = kwargs['masking_function']
+            halo_table = self._orig_halo_table[masking_function(self._orig_halo_table)]
+        except KeyError:
+            halo_table = self._orig_halo_table
+
+        if batch_size is None:
+            model_nbytes = 8*max(len(halo_table), 1)*max(len(self.gal_types), 1)
+            batch_size = int(batch_memory_size*1e6) // model_nbytes
+        batch_size = max(int(batch_size), 1)
+
+        orig_param_dict = copy(self.model.param_dict)
+        vectorizable_gal_types = None
+        try:
+            for first in range(0, num_models, batch_size):
+                param_block = param_array[first:first+batch_size]
+                if vectorizable_gal_types is None:
+                    vectorizable_gal_types = self._vectorizable_occupation_gal_types(
+                        param_names, param_block, halo_table)
+                mean_occupations = self._batch_mean_occupations(
+                    vectorizable_gal_types, param_names, param_block, halo_table)
+
+                for i, params in enumerate(param_block):
+                    self.model.param_dict.update(zip(param_names, params))
+                    mean_occupations_i = dict(
+                        (gal_type, mean[i]) for gal_type, mean in mean_occupations.items())
+                    model_index = first + i
+                    self.populate(seed=seed_list[model_index],
+                        _mean_occupations=mean_occupations_i, **kwargs)
+                    yield model_index, self.galaxy_table
+        finally:
+            self.model.param_dict.update(orig_param_dict)
+            self._sync_component_param_dicts()
+
+    def populate_batch(self, param_names, param_array, seed=None,
+            batch_size=None, batch_memory_size=100, **kwargs):
+        """ Populate the halo catalog with one mock for each row of ``param_array``
+        and return all the galaxies in a single table.
+
+        See `populate_batch_generator` for a description of the arguments.
+        When the galaxy catalogs of all models do not fit in memory at once,
+        use `populate_batch_generator` instead.
+
+        Returns
+        -------
+        galaxy_table : `~astropy.table.Table`
+            Concatenated galaxy catalogs of all models. The ``model_index`` column
+            stores the row of ``param_array`` used to populate each galaxy.
+
+        Examples
+        --------
+        >>> from halotools.empirical_models import PrebuiltHodModelFactory
+        >>> from halotools.sim_manager import FakeSim
+        >>> model_instance = PrebuiltHodModelFactory('zheng07')
+        >>> model_instance.populate_mock(FakeSim())
+        >>> param_array = np.array([[11.9], [12.0], [12.1]])
+        >>> galaxies = model_instance.mock.populate_batch(['logMmin'], param_array, seed=43)
+        >>> galaxies_model1 = galaxies[galaxies['model_index'] == 1]
+        """
+        table_list = []
+        gen = self.populate_batch_generator(param_names, param_array,
+            seed=seed, batch_size=batch_size, batch_memory_size=batch_memory_size, **kwargs)
+        for model_index, galaxy_table in gen:
+            # Add the column to a new table sharing the data of the galaxy_table
+            # so that the galaxy_table bound to the mock is left untouched
+            galaxy_table = galaxy_table.copy(copy_data=False)
+            galaxy_table['model_index'] = np.zeros(len(galaxy_table), dtype='i8') + model_index
+            table_list.append(galaxy_table)
+        return vstack(table_list, join_type='exact')
+
+    def _occupation_component(self, gal_type):
+        """ Return the component model of ``gal_type`` galaxies
+        that defines the ``mc_occupation`` method.
+        """
+        for component_model in self.model.model_dictionary.values():
+            if ((getattr(component_model, 'gal_type', None) == gal_type) and
+                    ('mc_occupation' in getattr(component_model, '_methods_to_inherit', []))):
+                return component_model
+        return None
+
+    def _mc_occupation_from_mean(self, gal_type, first_occupation_moment, seed=None):
+        """ Monte Carlo realization of the occupations of ``gal_type`` galaxies
+        drawn from a pre-computed first occupation moment.
+        The random draws are identical to those of the ``mc_occupation`` method
+        of the component model for the same seed.
+        """
+        component_model = self._occupation_component(gal_type)
+        if component_model._upper_occupation_bound == 1:
+            return component_model._nearest_integer_distribution(
+                first_occupation_moment, seed=seed, table=self.halo_table)
+        else:
+            return component_model._poisson_distribution(
+                first_occupation_moment, seed=seed, table=self.halo_table)
+
+    def _sync_component_param_dicts(self):
+        """ Propagate the values stored in the composite model ``param_dict``
+        to every component model.
+        """
+        for component_model in self.model.model_dictionary.values():
+            if hasattr(component_model, 'param_dict'):
+                for key in component_model.param_dict:
+                    if key in self.model.param_dict:
+                        component_model.param_dict[key] = self.model.param_dict[key]
+
+    def _batch_mean_occupations(self, gal_types, param_names, param_block, halo_table):
+        """ Evaluate the mean occupations of every model in ``param_block``
+        with a single call to the ``mean_occupation`` method of each gal_type.
+
+        Each parameter is bound to the ``param_dict`` as an array of shape (Nmodels, 1),
+        so that the returned arrays have shape (Nmodels, Nhalos).
+        """
+        mean_occupations = {}
+        if len(gal_types) == 0:
+            return mean_occupations
+
+        orig_params = [self.model.param_dict[name] for name in param_names]
+        for j, name in enumerate(param_names):
+            self.model.param_dict[name] = param_block[:, j:j+1]
+        try:
+            for gal_type in gal_types:
+                mean_func = getattr(self.model, 'mean_occupation_'+gal_type)
+                mean = np.asarray(mean_func(table=halo_table), dtype='f8')
+                mean_occupations[gal_type] = np.broadcast_to(
+                    mean, (param_block.shape[0], len(halo_table)))
+        finally:
+            self.model.param_dict.update(zip(param_names, orig_params))
+        return mean_occupations
+
+    def _vectorizable_occupation_gal_types(self, param_names, param_block, halo_table):
+        """ Determine which gal_types support vectorized evaluation of the mean occupation.
+
+        The mean occupation of a gal_type is only evaluated in batch if the
+        component model uses the ``mc_occupation`` method of
+        `~halotools.empirical_models.OccupationComponent`, no method of the model modifies
+        the halo table before the occupations are drawn, and the batch result
+        agrees with evaluating the first and last models of ``param_block`` one at a time.
+        """
+        calling_sequence = self.model._mock_generation_calling_sequence
+        if (len(calling_sequence) == 0) or ('mc_occupation' not in calling_sequence[0]):
+            return []
+
+        vectorizable_gal_types = []
+        for gal_type in self.gal_types:
+            component_model = self._occupation_component(gal_type)
+            if component_model is None:
+                continue
+            if type(component_model).mc_occupation != OccupationComponent.mc_occupation:
+                continue
+            if component_model._upper_occupation_bound not in (1, float("inf")):
+                continue
+
+            try:
+                batch_mean = self._batch_mean_occupations(
+                    [gal_type], param_names, param_block, halo_table)[gal_type]
+            except (ValueError, TypeError):
+                # Raised by Numpy when the mean occupation
+                # does not broadcast across arrays of parameters
+                continue
+
+            mean_func = getattr(self.model, 'mean_occupation_'+gal_type)
+            orig_params = [self.model.param_dict[name] for name in param_names]
+            batch_agrees = True
+            try:
+                for i in (0, -1):
+                    self.model.param_dict.update(zip(param_names, param_block[i]))
+                    mean = np.asarray(mean_func(table=halo_table), dtype='f8')
+                    batch_agrees &= np.allclose(batch_mean[i], mean, rtol=1e-10, atol=0)
+            finally:
+                self.model.param_dict.update(zip(param_names, orig_params))
+            if batch_agrees:
+                vectorizable_gal_types.append(gal_type)
+        return vectorizable_gal_types
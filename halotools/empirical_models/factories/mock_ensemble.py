@@ -0,0 +1,229 @@
+"""
+Module storing the machinery used to generate an ensemble of Monte Carlo
+realizations of a mock and to summarize the statistics measured on each realization.
+The halo catalog is pre-processed only once; each realization then only
+calls the ``populate`` method of the mock with its own seed,
+optionally in a pool of worker processes.
+"""
+from __future__ import absolute_import, division, print_function
+
+import numpy as np
+import multiprocessing
+
+from ...utils.random_streams import spawn_integer_seeds
+from ...custom_exceptions import HalotoolsError
+
+__all__ = ('MockEnsembleStatistics', 'mock_ensemble_generator')
+__author__ = ['Andrew Hearin']
+
+
+class MockEnsembleStatistics(object):
+    """ Running accumulator of a statistic measured on an ensemble of mocks,
+    e.g., the galaxy correlation function :math:`\\xi(r)`.
+
+    Realizations are added one at a time with the `update` method,
+    so the ensemble never needs to be held in memory at once.
+    The mean and covariance are accumulated with Welford's algorithm,
+    which is numerically stable even for very many realizations.
+
+    Examples
+    --------
+    >>> stats = MockEnsembleStatistics()
+    >>> for i in range(10):
+    ...     stats.update(np.random.normal(size=5))
+    >>> mean, cov = stats.mean, stats.covariance
+    >>> median = stats.median
+    """
+
+    def __init__(self, store_realizations=True):
+        """
+        Parameters
+        ----------
+        store_realizations : bool, optional
+            If True, each realization is also stored so that the `median`
+            can be computed. Default is True. Set to False to keep the memory
+            footprint independent of the number of realizations.
+        """
+        self.store_realizations = store_realizations
+        self.num_realizations = 0
+        self._realizations = []
+
+    def update(self, statistic):
+        """ Add a single realization of the statistic to the ensemble.
+
+        Parameters
+        ----------
+        statistic : array_like
+            Array storing the statistic measured on one realization.
+            Every realization must have the same shape.
+        """
+        statistic = np.array(statistic, dtype='f8')
+
+        if self.num_realizations == 0:
+            self._shape = statistic.shape
+            self._mean = np.zeros(statistic.size)
+            self._comoment = np.zeros((statistic.size, statistic.size))
+        elif statistic.shape != self._shape:
+            msg = ("\nEach realization passed to MockEnsembleStatistics must have the same shape.\n"
+                "The first realization had shape %s, but the input realization has shape %s.\n")
+            raise HalotoolsError(msg % (str(self._shape), str(statistic.shape)))
+
+        x = statistic.flatten()
+        self.num_realizations += 1
+        delta = x - self._mean
+        self._mean += delta/self.num_realizations
+        self._comoment += np.outer(delta, x - self._mean)
+
+        if self.store_realizations is True:
+            self._realizations.append(statistic)
+
+    def _verify_nonempty(self):
+        if self.num_realizations == 0:
+            raise HalotoolsError("\nNo realizations have been added to the MockEnsembleStatistics.\n")
+
+    @property
+    def mean(self):
+        """ Mean of the statistic across the ensemble, with the same shape as each realization.
+        """
+        self._verify_nonempty()
+        return self._mean.reshape(self._shape)
+
+    @property
+    def covariance(self):
+        """ Sample covariance matrix of the flattened statistic across the ensemble.
+        For a length-Nbins statistic the result has shape (Nbins, Nbins);
+        multi-dimensional statistics are flattened in C-order.
+        """
+        self._verify_nonempty()
+        if self.num_realizations < 2:
+            return np.zeros_like(self._comoment) + np.nan
+        return self._comoment/(self.num_realizations - 1.)
+
+    @property
+    def std(self):
+        """ Standard deviation of the statistic across the ensemble.
+        """
+        return np.sqrt(np.diag(self.covariance)).reshape(self._shape)
+
+    @property
+    def median(self):
+        """ Median of the statistic across the ensemble.
+        Only available if ``store_realizations`` is True.
+        """
+        self._verify_nonempty()
+        if self.store_realizations is False:
+            msg = ("\nThe median of the ensemble requires instantiating "
+                "MockEnsembleStatistics with ``store_realizations`` set to True.\n")
+            raise HalotoolsError(msg)
+        return np.median(np.array(self._realizations), axis=0)
+
+    @property
+    def realizations(self):
+        """ Array of shape (num_realizations, ) + shape of each realization.
+        Only available if ``store_realizations`` is True.
+        """
+        if self.store_realizations is False:
+            msg = ("\nThe realizations are only stored when instantiating "
+                "MockEnsembleStatistics with ``store_realizations`` set to True.\n")
+            raise HalotoolsError(msg)
+        return np.array(self._realizations)
+
+
+# State of each worker process, bound once per process by _init_ensemble_worker
+# so that the mock is never pickled
+_worker_state = {}
+
+
+def _init_ensemble_worker(mock, method_name, method_kwargs, pass_seed_to_method):
+    _worker_state['mock'] = mock
+    _worker_state['method_name'] = method_name
+    _worker_state['method_kwargs'] = method_kwargs
+    _worker_state['pass_seed_to_method'] = pass_seed_to_method
+
+
+def _populate_and_measure(mock, method_name, method_kwargs, pass_seed_to_method, seed):
+    """ Generate a single realization of the mock and return the result of
+    calling the ``method_name`` method of the mock.
+    """
+    mock.populate(seed=seed)
+    method = getattr(mock, method_name)
+    if pass_seed_to_method is True:
+        return method(seed=seed, **method_kwargs)
+    else:
+        return method(**method_kwargs)
+
+
+def _ensemble_worker(seed):
+    return _populate_and_measure(_worker_state['mock'], _worker_state['method_name'],
+        _worker_state['method_kwargs'], _worker_state['pass_seed_to_method'], seed)
+
+
+def mock_ensemble_generator(mock, method_name, num_realizations,
+        seed=None, num_processes=1, pass_seed_to_method=False, **kwargs):
+    """ Generator yielding the result of calling ``mock.method_name(**kwargs)``
+    on each of ``num_realizations`` independent Monte Carlo realizations of the ``mock``.
+
+    Parameters
+    ----------
+    mock : object
+        Instance of `~halotools.empirical_models.MockFactory` whose halo catalog
+        has already been pre-processed, e.g., ``model.mock`` after calling
+        ``model.populate_mock``.
+
+    method_name : string
+        Name of the method of the mock that measures the statistic,
+        e.g., ``compute_galaxy_clustering``.
+
+    num_realizations : int
+        Number of Monte Carlo realizations.
+
+    seed : int, optional
+        Random number seed. Each realization is populated with its own seed
+        derived from ``seed`` with `~halotools.utils.spawn_integer_seeds`,
+        so the ensemble is reproducible regardless of ``num_processes``.
+        Default is None, which will produce stochastic results.
+
+    num_processes : int, optional
+        Number of worker processes. Default is 1, in which case the realizations
+        are generated serially in the calling process.
+        Worker processes are forked, so that the pre-processed mock
+        is shared with the workers rather than copied; on platforms that do not
+        support forking the realizations are generated serially.
+
+    pass_seed_to_method : bool, optional
+        If True, the seed of each realization is also passed to
+        the ``method_name`` method. Default is False.
+
+    **kwargs : optional
+        All remaining keyword arguments are passed to the ``method_name`` method.
+
+    Yields
+    ------
+    result : object
+        Return value of ``method_name`` for one realization.
+        Results are yielded in the order of the realizations for any ``num_processes``,
+        so a fixed ``seed`` reproduces the exact sequence of results.
+    """
+    seed_list = spawn_integer_seeds(seed, num_realizations)
+
+    pool_context = None
+    if num_processes > 1:
+        try:
+            pool_context = multiprocessing.get_context('fork')
+        except (AttributeError, ValueError):
+            pool_context = None
+
+    if pool_context is None:
+        for realization_seed in seed_list:
+            yield _populate_and_measure(mock, method_name, kwargs,
+                pass_seed_to_method, realization_seed)
+    else:
+        initargs = (mock, method_name, kwargs, pass_seed_to_method)
+        pool = pool_context.Pool(processes=num_processes,
+            initializer=_init_ensemble_worker, initargs=initargs)
+        try:
+            for result in pool.imap(_ensemble_worker, seed_list):
+                yield result
+        finally:
+            pool.terminate()
+            pool.join()
@@ -86,6 +86,60 @@ class MockFactory(object):
 
         self.galaxy_table = Table()
 
+    def _compute_new_haloprop(self, halocat, new_haloprop_key, new_haloprop_func,
+            halo_table, row_selection):
+        """ Compute the ``new_haloprop_key`` column of the pre-processed ``halo_table``
+        by calling the corresponding function of the ``new_haloprop_func_dict``.
+
+        If the function declares the parameters that determine its output via
+        a ``derived_column_params`` attribute, a callable returning a dictionary
+        whose ``input_keys`` entry lists the columns of ``halo_table`` read by the function,
+        and the ``halocat`` has a `~halotools.sim_manager.DerivedColumnStore`,
+        the column is retrieved from the store if it was previously computed
+        with the same parameters, the same ``row_selection`` and the same contents
+        of the input columns, and saved to the store otherwise.
+
+        Parameters
+        ----------
+        halocat : object
+            Halo catalog being pre-processed.
+
+        new_haloprop_key : string
+            Name of the new column.
+
+        new_haloprop_func : function
+            Function of the ``new_haloprop_func_dict``.
+
+        halo_table : `~astropy.table.Table`
+            Pre-processed table of halos.
+
+        row_selection : dict
+            Dictionary of the parameters of the cuts used to select the rows of ``halo_table``
+            from the rows of the halo catalog.
+
+        Returns
+        -------
+        column : array
+        """
+        params_func = getattr(new_haloprop_func, 'derived_column_params', None)
+        store = getattr(halocat, 'derived_column_store', None)
+        if (params_func is None) or (store is None):
+            return new_haloprop_func(table=halo_table)
+
+        params = dict(params_func())
+        try:
+            input_keys = params.pop('input_keys')
+        except KeyError:
+            return new_haloprop_func(table=halo_table)
+        params['row_selection'] = row_selection
+        params['input_hashes'] = {key: store.column_hash(halo_table[key])
+            for key in input_keys}
+        column = store.retrieve(new_haloprop_key, params, num_rows=len(halo_table))
+        if column is None:
+            column = new_haloprop_func(table=halo_table)
+            store.save(new_haloprop_key, params, column)
+        return column
+
     @abstractmethod
     def populate(self, **kwargs):
         """
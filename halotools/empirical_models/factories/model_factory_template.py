@@ -9,7 +9,7 @@ from astropy.extern import six
 from abc import ABCMeta
 
 
-from .. import model_defaults
+from .mock_ensemble import MockEnsembleStatistics, mock_ensemble_generator
 
 from ...sim_manager import CachedHaloCatalog, FakeSim
 from ...sim_manager import sim_defaults
@@ -293,6 +293,15 @@ class ModelFactory(object):
             collection of Monte Carlo realizations. Options are ``median`` and ``mean``.
             Default is ``median``.
 
+        num_processes : int, optional
+            Number of worker processes used to generate the realizations concurrently.
+            The halo catalog is pre-processed only once regardless of ``num_processes``.
+            Default is 1.
+
+        seed : int, optional
+            Random number seed. Each realization is populated with an independent seed
+            derived from ``seed``. Default is None, which will produce stochastic results.
+
         simname : string, optional
             Nickname of the simulation into which mock galaxies will be populated.
             Currently supported simulations are
@@ -412,11 +421,89 @@ class ModelFactory(object):
         `~halotools.mock_observables.tpcf` after placing a cut on the
         ``galaxy_table``, as demonstrated in :ref:`galaxy_catalog_analysis_tutorial2`.
         """
+        halocat = self._ensemble_halocat(**kwargs)
+        rbin_centers, stats = self.compute_galaxy_clustering_ensemble(
+            halocat=halocat, num_iterations=num_iterations,
+            store_realizations=(summary_statistic != 'mean'), **kwargs)
+
         if summary_statistic == 'mean':
-            summary_func = np.mean
+            summary = stats.mean
         else:
-            summary_func = np.median
+            summary = stats.median
+
+        if kwargs.get('include_crosscorr', False) is True:
+            return rbin_centers, summary[0], summary[1], summary[2]
+        else:
+            return rbin_centers, summary[0]
+
+    def compute_galaxy_clustering_ensemble(self, halocat=None, num_iterations=5,
+            num_processes=1, seed=None, store_realizations=True, **kwargs):
+        """
+        Method populates a simulation with ``num_iterations`` independent
+        Monte Carlo realizations of the model, and accumulates the clustering signal
+        of each realization into a `~halotools.empirical_models.MockEnsembleStatistics`
+        from which the mean, median and covariance of the ensemble can be computed.
+
+        The halo catalog is pre-processed only once, and the realizations
+        can be generated concurrently in a pool of ``num_processes`` worker processes.
+        Each realization receives its own seed derived from ``seed``, so the result
+        is reproducible regardless of ``num_processes``.
 
+        Parameters
+        ----------
+        halocat : object, optional
+            Either an instance of `~halotools.sim_manager.CachedHaloCatalog`
+            or `~halotools.sim_manager.UserSuppliedHaloCatalog`.
+            Default is None, in which case the ``simname``, ``halo_finder``
+            and ``redshift`` keyword arguments determine the catalog,
+            as in `compute_average_galaxy_clustering`.
+
+        num_iterations : int, optional
+            Number of Monte Carlo realizations. Default is 5.
+
+        num_processes : int, optional
+            Number of worker processes used to generate the realizations.
+            Default is 1. When ``num_processes`` > 1, each worker computes
+            its correlation function with ``num_threads=1`` unless
+            ``num_threads`` is passed explicitly.
+
+        seed : int, optional
+            Random number seed. Default is None, which will produce stochastic results.
+
+        store_realizations : bool, optional
+            If True, every realization is stored so that the median can be computed.
+            Default is True.
+
+        **kwargs : optional
+            All remaining keyword arguments are passed to
+            `~halotools.empirical_models.MockFactory.compute_galaxy_clustering`,
+            e.g., ``rbins``, ``include_crosscorr`` or a ``variable_galaxy_mask``.
+
+        Returns
+        --------
+        rbin_centers : array
+            Midpoint of the bins used in the correlation function calculation
+
+        stats : object
+            Instance of `~halotools.empirical_models.MockEnsembleStatistics`.
+            Each realization has shape (1, Nbins), or (3, Nbins) when
+            ``include_crosscorr`` is True, so that ``stats.mean[0]`` is the
+            mean auto-correlation of the selected sample.
+
+        Examples
+        ---------
+        >>> model = PrebuiltHodModelFactory('zheng07') # doctest: +SKIP
+        >>> r, stats = model.compute_galaxy_clustering_ensemble(simname='fake', num_iterations=100, num_processes=4) # doctest: +SKIP
+        >>> xi_mean, xi_cov = stats.mean[0], stats.covariance # doctest: +SKIP
+        """
+        return self._compute_mock_ensemble('compute_galaxy_clustering',
+            halocat, num_iterations, num_processes, seed, store_realizations,
+            pass_seed_to_method=False, **kwargs)
+
+    def _ensemble_halocat(self, num_ptcl=None, **kwargs):
+        """ Load the halo catalog used by the `compute_average_galaxy_clustering`
+        family of convenience functions.
+        """
         halocat_kwargs = {}
         if 'simname' in kwargs:
             halocat_kwargs['simname'] = kwargs['simname']
@@ -434,44 +521,34 @@ class ModelFactory(object):
             use_fake_sim = False
 
         if use_fake_sim is True:
-            halocat = FakeSim(**halocat_kwargs)
+            if num_ptcl is not None:
+                halocat_kwargs['num_ptcl'] = num_ptcl
+            return FakeSim(**halocat_kwargs)
         else:
-            halocat = CachedHaloCatalog(preload_halo_table=True, **halocat_kwargs)
+            return CachedHaloCatalog(preload_halo_table=True, **halocat_kwargs)
 
-        if 'rbins' in kwargs:
-            rbins = kwargs['rbins']
-        else:
-            rbins = model_defaults.default_rbins
+    def _compute_mock_ensemble(self, method_name, halocat, num_iterations,
+            num_processes, seed, store_realizations, pass_seed_to_method, **kwargs):
+        """ Pre-process the halo catalog once, then accumulate the result of calling
+        the ``method_name`` method of the mock on each Monte Carlo realization.
+        """
+        if halocat is None:
+            halocat = self._ensemble_halocat(**kwargs)
 
-        if 'include_crosscorr' in list(kwargs.keys()):
-            include_crosscorr = kwargs['include_crosscorr']
-        else:
-            include_crosscorr = False
-
-        if include_crosscorr is True:
-
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations*3).reshape(3, num_iterations, len(rbins)-1)
-
-            for i in range(num_iterations):
-                self.populate_mock(halocat=halocat)
-                rbin_centers, xi_coll[0, i, :], xi_coll[1, i, :], xi_coll[2, i, :] = (
-                    self.mock.compute_galaxy_clustering(**kwargs)
-                    )
-            xi_11 = summary_func(xi_coll[0, :], axis=0)
-            xi_12 = summary_func(xi_coll[1, :], axis=0)
-            xi_22 = summary_func(xi_coll[2, :], axis=0)
-            return rbin_centers, xi_11, xi_12, xi_22
-        else:
+        self.populate_mock(halocat=halocat)
+
+        if (num_processes > 1) & ('num_threads' not in kwargs):
+            kwargs['num_threads'] = 1
 
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations).reshape(num_iterations, len(rbins)-1)
+        stats = MockEnsembleStatistics(store_realizations=store_realizations)
+        ensemble = mock_ensemble_generator(self.mock, method_name, num_iterations,
+            seed=seed, num_processes=num_processes,
+            pass_seed_to_method=pass_seed_to_method, **kwargs)
+        for result in ensemble:
+            rbin_centers = result[0]
+            stats.update(np.array(result[1:]))
 
-            for i in range(num_iterations):
-                self.populate_mock(halocat=halocat)
-                rbin_centers, xi_coll[i, :] = self.mock.compute_galaxy_clustering(**kwargs)
-            xi = summary_func(xi_coll, axis=0)
-            return rbin_centers, xi
+        return rbin_centers, stats
 
     def compute_average_galaxy_matter_cross_clustering(self, num_iterations=5,
             summary_statistic='median', **kwargs):
@@ -503,6 +580,15 @@ class ModelFactory(object):
             collection of Monte Carlo realizations. Options are ``median`` and ``mean``.
             Default is ``median``.
 
+        num_processes : int, optional
+            Number of worker processes used to generate the realizations concurrently.
+            The halo catalog is pre-processed only once regardless of ``num_processes``.
+            Default is 1.
+
+        seed : int, optional
+            Random number seed. Each realization is populated with an independent seed
+            derived from ``seed``. Default is None, which will produce stochastic results.
+
         simname : string, optional
             Nickname of the simulation into which mock galaxies will be populated.
             Currently supported simulations are
@@ -626,62 +712,46 @@ class ModelFactory(object):
         rather than calling the `~halotools.mock_observables.delta_sigma` function.
 
         """
-        if summary_statistic == 'mean':
-            summary_func = np.mean
-        else:
-            summary_func = np.median
-
-        halocat_kwargs = {}
-        if 'simname' in kwargs:
-            halocat_kwargs['simname'] = kwargs['simname']
-        if 'redshift' in kwargs:
-            halocat_kwargs['redshift'] = kwargs['redshift']
-        elif hasattr(self, 'redshift'):
-            halocat_kwargs['redshift'] = self.redshift
-        if 'halo_finder' in kwargs:
-            halocat_kwargs['halo_finder'] = kwargs['halo_finder']
+        halocat = self._ensemble_halocat(num_ptcl=int(1e5), **kwargs)
+        rbin_centers, stats = self.compute_galaxy_matter_cross_clustering_ensemble(
+            halocat=halocat, num_iterations=num_iterations,
+            store_realizations=(summary_statistic != 'mean'), **kwargs)
 
-        try:
-            assert kwargs['simname'] == 'fake'
-            use_fake_sim = True
-        except (AssertionError, KeyError):
-            use_fake_sim = False
-
-        if use_fake_sim is True:
-            halocat = FakeSim(num_ptcl=int(1e5), **halocat_kwargs)
-        else:
-            halocat = CachedHaloCatalog(preload_halo_table=True, **halocat_kwargs)
-
-        if 'rbins' in kwargs:
-            rbins = kwargs['rbins']
+        if summary_statistic == 'mean':
+            summary = stats.mean
         else:
-            rbins = model_defaults.default_rbins
+            summary = stats.median
 
-        if 'include_complement' in list(kwargs.keys()):
-            include_complement = kwargs['include_complement']
+        if kwargs.get('include_complement', False) is True:
+            return rbin_centers, summary[0], summary[1]
         else:
-            include_complement = False
+            return rbin_centers, summary[0]
 
-        if include_complement is True:
-
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations*2).reshape(2, num_iterations, len(rbins)-1)
+    def compute_galaxy_matter_cross_clustering_ensemble(self, halocat=None, num_iterations=5,
+            num_processes=1, seed=None, store_realizations=True, **kwargs):
+        """
+        Method populates a simulation with ``num_iterations`` independent
+        Monte Carlo realizations of the model, and accumulates the galaxy-matter
+        cross-correlation of each realization into a
+        `~halotools.empirical_models.MockEnsembleStatistics`.
 
-            for i in range(num_iterations):
-                self.populate_mock(halocat=halocat)
-                rbin_centers, xi_coll[0, i, :], xi_coll[1, i, :] = (
-                    self.mock.compute_galaxy_matter_cross_clustering(**kwargs)
-                    )
-            xi_11 = summary_func(xi_coll[0, :], axis=0)
-            xi_22 = summary_func(xi_coll[1, :], axis=0)
-            return rbin_centers, xi_11, xi_22
-        else:
+        See `compute_galaxy_clustering_ensemble` for a description of the arguments.
+        All remaining keyword arguments are passed to
+        `~halotools.empirical_models.MockFactory.compute_galaxy_matter_cross_clustering`.
+        Each realization also uses its own seed to downsample the particles.
 
-            xi_coll = np.zeros(
-                (len(rbins)-1)*num_iterations).reshape(num_iterations, len(rbins)-1)
+        Returns
+        --------
+        rbin_centers : array
+            Midpoint of the bins used in the correlation function calculation
 
-            for i in range(num_iterations):
-                self.populate_mock(halocat=halocat)
-                rbin_centers, xi_coll[i, :] = self.mock.compute_galaxy_matter_cross_clustering(**kwargs)
-            xi = summary_func(xi_coll, axis=0)
-            return rbin_centers, xi
+        stats : object
+            Instance of `~halotools.empirical_models.MockEnsembleStatistics`.
+            Each realization has shape (1, Nbins), or (2, Nbins) when
+            ``include_complement`` is True.
+        """
+        if halocat is None:
+            halocat = self._ensemble_halocat(num_ptcl=int(1e5), **kwargs)
+        return self._compute_mock_ensemble('compute_galaxy_matter_cross_clustering',
+            halocat, num_iterations, num_processes, seed, store_realizations,
+            pass_seed_to_method=True, **kwargs)
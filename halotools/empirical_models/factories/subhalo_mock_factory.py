@@ -91,7 +91,8 @@ class SubhaloMockFactory(MockFactory):
         try:
             d = self.model.new_haloprop_func_dict
             for new_haloprop_key, new_haloprop_func in d.items():
-                halo_table[new_haloprop_key] = new_haloprop_func(table=halo_table)
+                halo_table[new_haloprop_key] = self._compute_new_haloprop(halocat,
+                    new_haloprop_key, new_haloprop_func, halo_table, {})
                 self.additional_haloprops.append(new_haloprop_key)
         except AttributeError:
             pass
@@ -3,6 +3,8 @@
 from __future__ import (absolute_import, division, print_function)
 
 from unittest import TestCase
+import os
+import shutil
 from astropy.tests.helper import pytest
 from astropy.config.paths import _find_home
 
@@ -11,11 +13,19 @@ from copy import deepcopy
 
 from ....mock_observables import return_xyz_formatted_array, tpcf_one_two_halo_decomp
 
-from ....sim_manager import FakeSim, CachedHaloCatalog
+from ....sim_manager import FakeSim, CachedHaloCatalog, HaloTableCache
+from ....sim_manager.tests.helper_functions import dummy_cache_baseloc
 from ....sim_manager.fake_sim import FakeSimHalosNearBoundaries
 from ..prebuilt_model_factory import PrebuiltHodModelFactory
+from ....utils.random_streams import spawn_integer_seeds
 from ....custom_exceptions import HalotoolsError
 
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
 aph_home = '/Users/aphearin'
 detected_home = _find_home()
 if aph_home == detected_home:
@@ -54,6 +64,112 @@ def test_estimate_ngals2():
     assert np.allclose(estimated_ngals, actual_ngals, rtol=0.01)
 
 
+def test_populate_batch_agrees_with_populate():
+    model = PrebuiltHodModelFactory('zheng07')
+    halocat = FakeSim(seed=fixed_seed)
+    model.populate_mock(halocat, seed=fixed_seed)
+    orig_param_dict = deepcopy(model.param_dict)
+
+    param_names = ('logMmin', 'sigma_logM', 'logM1', 'alpha')
+    param_array = np.array([[11.9, 0.2, 13.1, 1.0],
+        [12.0, 0.25, 13.3, 1.05], [12.2, 0.3, 13.5, 0.95]])
+    mock = model.mock
+
+    vectorized_gal_types = mock._vectorizable_occupation_gal_types(
+        param_names, param_array, mock._orig_halo_table)
+    assert set(vectorized_gal_types) == set(('centrals', 'satellites'))
+
+    batch = list((i, t.copy()) for i, t in mock.populate_batch_generator(
+        param_names, param_array, seed=fixed_seed, batch_size=2))
+    assert [i for i, t in batch] == [0, 1, 2]
+    assert model.param_dict == orig_param_dict
+
+    seed_list = spawn_integer_seeds(fixed_seed, len(param_array))
+    for (model_index, galaxy_table), params, seed in zip(batch, param_array, seed_list):
+        model.param_dict.update(zip(param_names, params))
+        mock.populate(seed=seed)
+        assert len(galaxy_table) == len(mock.galaxy_table)
+        assert np.all(galaxy_table['halo_id'] == mock.galaxy_table['halo_id'])
+        assert np.allclose(galaxy_table['x'], mock.galaxy_table['x'])
+    model.param_dict.update(orig_param_dict)
+
+    galaxies = mock.populate_batch(param_names, param_array, seed=fixed_seed)
+    assert 'model_index' not in mock.galaxy_table.keys()
+    for model_index, galaxy_table in batch:
+        mask = galaxies['model_index'] == model_index
+        assert np.all(galaxies['halo_id'][mask] == galaxy_table['halo_id'])
+
+    # The batch size derived from the memory budget must not change the result
+    galaxies2 = mock.populate_batch(param_names, param_array, seed=fixed_seed,
+        batch_memory_size=1e-6)
+    assert np.all(galaxies['halo_id'] == galaxies2['halo_id'])
+
+
+def test_populate_batch_bad_params():
+    model = PrebuiltHodModelFactory('zheng07')
+    halocat = FakeSim(seed=fixed_seed)
+    model.populate_mock(halocat, seed=fixed_seed)
+
+    with pytest.raises(HalotoolsError):
+        __ = model.mock.populate_batch(['logMmin', 'alpha'], np.ones((3, 3)))
+    with pytest.raises(HalotoolsError):
+        __ = model.mock.populate_batch(['not_a_param'], np.ones((3, 1)))
+    with pytest.raises(HalotoolsError) as err:
+        __ = model.mock.populate_batch(['logMmin'], np.zeros((0, 1)))
+    substr = "must have\nat least one row of parameters"
+    assert substr in err.value.args[0]
+
+
+def test_populate_batch_fallback():
+    """ The mean occupation of Tinker13 models is not evaluated in batch,
+    but populate_batch should still produce one mock per model.
+    """
+    model = PrebuiltHodModelFactory('tinker13')
+    halocat = FakeSim(seed=fixed_seed)
+    model.populate_mock(halocat, seed=fixed_seed)
+
+    param_names = ('smhm_m1_0_active', )
+    param_array = np.array([[12.5], [12.6]])
+    galaxies = model.mock.populate_batch(param_names, param_array, seed=fixed_seed)
+    assert set(galaxies['model_index']) == set((0, 1))
+
+
+@pytest.mark.skipif('not HAS_H5PY')
+def test_populate_cached_catalog_selected_columns():
+    """ Models with NFW satellites populate a cached catalog from the columns
+    they declare, without loading the full halo table, and agree with
+    populating the same halos held in memory.
+    """
+    halocat = FakeSim(seed=fixed_seed)
+    try:
+        os.makedirs(dummy_cache_baseloc)
+    except OSError:
+        pass
+    fname = os.path.join(dummy_cache_baseloc, 'selected_columns_halos.hdf5')
+    halocat.add_halocat_to_cache(fname, 'fake_simname', 'fake_halo_finder',
+        'fake_version_name', 'Halos used to test column-selective loading', overwrite=True)
+    entry = HaloTableCache().determine_log_entry_from_fname(fname)
+
+    try:
+        for model_name in ('zheng07', 'leauthaud11'):
+            cached_halocat = CachedHaloCatalog(fname=fname)
+            model = PrebuiltHodModelFactory(model_name)
+            model.populate_mock(cached_halocat, seed=fixed_seed)
+            assert not hasattr(cached_halocat, '_halo_table')
+            assert 'conc_NFWmodel' in model.mock.halo_table.keys()
+
+            model2 = PrebuiltHodModelFactory(model_name)
+            model2.populate_mock(halocat, seed=fixed_seed)
+            assert len(model.mock.galaxy_table) == len(model2.mock.galaxy_table)
+            for key in ('x', 'y', 'z', 'vx', 'halo_mvir'):
+                assert np.allclose(model.mock.galaxy_table[key], model2.mock.galaxy_table[key])
+    finally:
+        HaloTableCache().remove_entry_from_cache_log(entry.simname, entry.halo_finder,
+            entry.version_name, entry.redshift, entry.fname,
+            raise_non_existence_exception=False, delete_corresponding_halo_catalog=True)
+        shutil.rmtree(dummy_cache_baseloc)
+
+
 def test_convenience_functions():
     model = PrebuiltHodModelFactory('zheng07')
     halocat = FakeSim(seed=fixed_seed)
@@ -0,0 +1,60 @@
+"""
+"""
+from __future__ import (absolute_import, division, print_function)
+
+import numpy as np
+from astropy.tests.helper import pytest
+from astropy.utils.misc import NumpyRNGContext
+
+from ..mock_ensemble import MockEnsembleStatistics
+
+from ....custom_exceptions import HalotoolsError
+
+__all__ = ('test_mock_ensemble_statistics1', )
+
+fixed_seed = 43
+
+
+def test_mock_ensemble_statistics1():
+    with NumpyRNGContext(fixed_seed):
+        realizations = np.random.normal(loc=2, size=(50, 7))
+
+    stats = MockEnsembleStatistics()
+    for x in realizations:
+        stats.update(x)
+
+    assert stats.num_realizations == 50
+    assert np.allclose(stats.mean, np.mean(realizations, axis=0))
+    assert np.allclose(stats.median, np.median(realizations, axis=0))
+    assert np.allclose(stats.covariance, np.cov(realizations, rowvar=False))
+    assert np.allclose(stats.std, np.std(realizations, axis=0, ddof=1))
+
+
+def test_mock_ensemble_statistics2():
+    """ Multi-dimensional realizations are flattened for the covariance.
+    """
+    with NumpyRNGContext(fixed_seed):
+        realizations = np.random.normal(size=(20, 3, 4))
+
+    stats = MockEnsembleStatistics(store_realizations=False)
+    for x in realizations:
+        stats.update(x)
+
+    assert stats.mean.shape == (3, 4)
+    assert np.allclose(stats.mean, np.mean(realizations, axis=0))
+    assert stats.covariance.shape == (12, 12)
+    assert np.allclose(stats.covariance, np.cov(realizations.reshape(20, 12), rowvar=False))
+
+    with pytest.raises(HalotoolsError):
+        __ = stats.median
+
+
+def test_mock_ensemble_statistics_shape_mismatch():
+    stats = MockEnsembleStatistics()
+    stats.update(np.zeros(5))
+    with pytest.raises(HalotoolsError):
+        stats.update(np.zeros(6))
+
+    empty_stats = MockEnsembleStatistics()
+    with pytest.raises(HalotoolsError):
+        __ = empty_stats.mean
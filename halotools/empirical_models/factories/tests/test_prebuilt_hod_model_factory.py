@@ -36,3 +36,20 @@ class TestPrebuiltHodModelFactory(TestCase):
             num_iterations=1, simname='fake', summary_statistic='mean',
             gal_type='centrals', include_crosscorr=True, rbins=np.array((0.1, 0.2, 0.3)),
             redshift=0, halo_finder='rockstar')
+
+    @pytest.mark.slow
+    def test_clustering_ensemble_reproducibility(self):
+        """ The ensemble must not depend on the number of worker processes.
+        """
+        model = PrebuiltHodModelFactory('zheng07')
+        halocat = FakeSim()
+        rbins = np.logspace(-1, 1, 5)
+        r1, stats1 = model.compute_galaxy_clustering_ensemble(halocat=halocat,
+            num_iterations=4, seed=43, rbins=rbins)
+        r2, stats2 = model.compute_galaxy_clustering_ensemble(halocat=halocat,
+            num_iterations=4, seed=43, rbins=rbins, num_processes=2)
+        assert stats1.num_realizations == stats2.num_realizations == 4
+        assert np.all(stats1.mean == stats2.mean)
+        assert np.all(stats1.median == stats2.median)
+        assert np.all(stats1.covariance == stats2.covariance)
+        assert stats1.covariance.shape == (len(rbins)-1, len(rbins)-1)
@@ -19,6 +19,11 @@ default_stellar_mass_threshold = 10.5
 default_tiny_poisson_fluctuation = 1.e-20
 
 default_smhm_scatter = 0.2
+
+# Maximum number of intermediate results, e.g., spline tables, that a component model
+# stores for different values of its parameters.
+# See `~halotools.empirical_models.model_helpers.param_dict_memoization_decorator_factory`
+default_param_dict_cache_maxsize = 8
 default_smhm_haloprop = 'halo_mpeak'
 default_binary_galprop_haloprop = default_smhm_haloprop
 
@@ -4,10 +4,13 @@ used by many of the Halotools models.
 """
 
 import numpy as np
+from collections import OrderedDict
+from functools import wraps
 from scipy.interpolate import InterpolatedUnivariateSpline as spline
 from scipy.special import gammaincc, gamma, expi
 from warnings import warn
 
+from . import model_defaults
 from ..utils.array_utils import custom_len
 from ..custom_exceptions import HalotoolsError
 
@@ -15,7 +18,8 @@ from ..custom_exceptions import HalotoolsError
 __all__ = ('solve_for_polynomial_coefficients', 'polynomial_from_table',
      'enforce_periodicity_of_box', 'custom_spline', 'create_composite_dtype',
      'bind_default_kwarg_mixin_safe',
-     'custom_incomplete_gamma', 'bounds_enforcing_decorator_factory')
+     'custom_incomplete_gamma', 'bounds_enforcing_decorator_factory',
+     'ParamDictCache', 'param_dict_fingerprint', 'param_dict_memoization_decorator_factory')
 
 __author__ = ['Andrew Hearin', 'Surhud More']
 
@@ -488,3 +492,195 @@ def bounds_enforcing_decorator_factory(lower_bound, upper_bound, warning=True):
         return output_func
 
     return decorator
+
+
+class ParamDictCache(object):
+    """ Bounded cache of the intermediate objects computed by the methods of a model,
+    evicting the least recently used entry when full.
+
+    Entries are keyed on the fingerprint returned by `param_dict_fingerprint`, so that
+    a change of any of the parameters an entry depends upon results in a new key,
+    and the entries computed with the previous values are eventually evicted.
+
+    Examples
+    --------
+    >>> cache = ParamDictCache(maxsize=2)
+    >>> cache['a'] = 1
+    >>> cache['b'] = 2
+    >>> cache['c'] = 3
+    >>> assert 'a' not in cache
+    >>> assert cache['c'] == 3
+    """
+
+    def __init__(self, maxsize=model_defaults.default_param_dict_cache_maxsize):
+        """
+        Parameters
+        -----------
+        maxsize : int, optional
+            Maximum number of entries stored in the cache.
+            Default is set in the `~halotools.empirical_models.model_defaults` module.
+        """
+        try:
+            assert int(maxsize) == maxsize
+            assert maxsize > 0
+        except (AssertionError, TypeError, ValueError):
+            raise HalotoolsError("Input ``maxsize`` of ParamDictCache must be a positive integer")
+        self.maxsize = int(maxsize)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __getitem__(self, key):
+        # move the entry to the most recently used position
+        value = self._entries.pop(key)
+        self._entries[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """ Remove all entries from the cache.
+        """
+        self._entries.clear()
+
+
+def _hashable_value(value):
+    """ Return a hashable representation of a parameter value or argument,
+    which may be a scalar or an array.
+    """
+    if np.ndim(value) == 0:
+        return np.asarray(value).item()
+    else:
+        value = np.ascontiguousarray(value)
+        return (value.dtype.str, value.shape, value.tobytes())
+
+
+def param_dict_fingerprint(param_dict, param_keys=None, *args):
+    """ Hashable fingerprint of the values of the ``param_dict`` entries
+    stored in ``param_keys``, and of any additional arguments such as the redshift.
+
+    Parameters
+    -----------
+    param_dict : dict
+        Dictionary of model parameters.
+
+    param_keys : sequence, optional
+        Keys of the parameters entering the fingerprint.
+        Default is None, in which case all parameters are used.
+
+    *args : scalars or arrays, optional
+        Additional values entering the fingerprint.
+
+    Returns
+    --------
+    fingerprint : tuple
+
+    Examples
+    --------
+    >>> param_dict = {'a': 1., 'b': 2.}
+    >>> fingerprint = param_dict_fingerprint(param_dict, ['a'], 0.5)
+    >>> param_dict['b'] = 3.
+    >>> assert param_dict_fingerprint(param_dict, ['a'], 0.5) == fingerprint
+    >>> param_dict['a'] = 3.
+    >>> assert param_dict_fingerprint(param_dict, ['a'], 0.5) != fingerprint
+    """
+    if param_keys is None:
+        param_keys = sorted(param_dict.keys())
+    else:
+        param_keys = tuple(param_keys)
+    values = tuple(_hashable_value(param_dict[key]) for key in param_keys)
+    return (tuple(param_keys), values) + tuple(_hashable_value(arg) for arg in args)
+
+
+def param_dict_memoization_decorator_factory(param_keys=None,
+        maxsize=model_defaults.default_param_dict_cache_maxsize):
+    """
+    Function returns a decorator that can be applied to a method of a model
+    computing an intermediate object, e.g., a spline table,
+    from the values in ``self.param_dict`` and from scalar positional arguments
+    such as the redshift.
+
+    The results of the decorated method are stored in a `ParamDictCache` bound to
+    the instance, keyed on the `param_dict_fingerprint` of ``self.param_dict``
+    and of the arguments, so that the method is only evaluated again
+    once a parameter it depends upon has changed,
+    and the results for several sets of parameters can be kept at once.
+    Calls with array arguments are never cached.
+
+    Parameters
+    -----------
+    param_keys : sequence or function, optional
+        Keys of the parameters the result of the method depends upon, or a function
+        returning these keys when called with the instance.
+        Default is None, in which case all the entries of ``self.param_dict`` are used.
+
+    maxsize : int, optional
+        Maximum number of results stored for each instance.
+        Default is set in the `~halotools.empirical_models.model_defaults` module.
+
+    Returns
+    --------
+    decorator : object
+        Python decorator used to memoize methods of a model.
+
+    Examples
+    --------
+    >>> class Model(object):
+    ...     def __init__(self):
+    ...         self.param_dict = {'a': 1., 'b': 2.}
+    ...         self.num_calls = 0
+    ...     @param_dict_memoization_decorator_factory(param_keys=['a'])
+    ...     def table(self, redshift):
+    ...         self.num_calls += 1
+    ...         return self.param_dict['a']*np.arange(5)/(1. + redshift)
+    >>> model = Model()
+    >>> table = model.table(0.)
+    >>> table = model.table(0.)
+    >>> assert model.num_calls == 1
+    >>> model.param_dict['a'] = 2.
+    >>> table = model.table(0.)
+    >>> assert model.num_calls == 2
+    """
+
+    def decorator(input_func):
+        cache_name = '_param_dict_cache_' + input_func.__name__
+
+        @wraps(input_func)
+        def output_func(self, *args):
+            if any(np.ndim(arg) > 0 for arg in args):
+                return input_func(self, *args)
+
+            if callable(param_keys):
+                keys = param_keys(self)
+            else:
+                keys = param_keys
+            fingerprint = param_dict_fingerprint(self.param_dict, keys, *args)
+
+            try:
+                cache = self.__dict__[cache_name]
+            except KeyError:
+                cache = ParamDictCache(maxsize=maxsize)
+                setattr(self, cache_name, cache)
+
+            if fingerprint in cache:
+                cache.hits += 1
+                return cache[fingerprint]
+            else:
+                cache.misses += 1
+                result = input_func(self, *args)
+                cache[fingerprint] = result
+                return result
+
+        return output_func
+
+    return decorator
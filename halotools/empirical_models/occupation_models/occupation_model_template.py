@@ -5,14 +5,12 @@ in all HOD-style models of the galaxy-halo connection.
 """
 
 import numpy as np
-from scipy.stats import poisson
 from astropy.extern import six
 from abc import ABCMeta
-from astropy.utils.misc import NumpyRNGContext
 
-from .. import model_defaults, model_helpers
+from .. import model_helpers
 
-from ...utils.array_utils import custom_len
+from ...utils.random_streams import mc_bernoulli, mc_poisson
 from ...custom_exceptions import HalotoolsError
 
 __all__ = ('OccupationComponent', )
@@ -117,7 +115,9 @@ class OccupationComponent(object):
 
         seed : int, optional
             Random number seed used to generate the Monte Carlo realization.
-            Default is None.
+            Default is None. Draws for different ``gal_type`` populations
+            come from independent streams of the same seed,
+            see `~halotools.utils.rng_stream`.
 
         Returns
         -------
@@ -154,10 +154,8 @@ class OccupationComponent(object):
         mc_abundance : array
             Integer array giving the number of galaxies in each of the input table.
         """
-        with NumpyRNGContext(seed):
-            mc_generator = np.random.random(custom_len(first_occupation_moment))
-
-        result = np.where(mc_generator < first_occupation_moment, 1, 0)
+        result = np.where(mc_bernoulli(first_occupation_moment, seed=seed,
+            stream_keys=(self.gal_type, 'occupation')), 1, 0)
         if 'table' in kwargs:
             kwargs['table']['halo_num_'+self.gal_type] = result
         return result
@@ -180,13 +178,8 @@ class OccupationComponent(object):
         mc_abundance : array
             Integer array giving the number of galaxies in each of the input table.
         """
-        # The scipy built-in Poisson number generator raises an exception
-        # if its input is zero, so here we impose a simple workaround
-        first_occupation_moment = np.where(first_occupation_moment <= 0,
-            model_defaults.default_tiny_poisson_fluctuation, first_occupation_moment)
-
-        with NumpyRNGContext(seed):
-            result = poisson.rvs(first_occupation_moment)
+        result = mc_poisson(first_occupation_moment, seed=seed,
+            stream_keys=(self.gal_type, 'occupation'))
         if 'table' in kwargs:
             kwargs['table']['halo_num_'+self.gal_type] = result
         return result
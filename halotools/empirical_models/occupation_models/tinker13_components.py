@@ -5,7 +5,6 @@ This module contains occupation components used by the Tinker13 composite model.
 import numpy as np
 import math
 from scipy.special import erf
-from astropy.utils.misc import NumpyRNGContext
 
 from .occupation_model_template import OccupationComponent
 
@@ -15,6 +14,7 @@ from ..assembias_models import HeavisideAssembias
 from ..model_helpers import bounds_enforcing_decorator_factory
 
 from ...utils.array_utils import custom_len
+from ...utils.random_streams import mc_bernoulli
 from ... import sim_manager
 from ...custom_exceptions import HalotoolsError
 
@@ -143,9 +143,7 @@ class Tinker13Cens(OccupationComponent):
     def mean_quiescent_fraction(self, **kwargs):
         """
         """
-        model_ordinates = [self.param_dict[ordinate_key] for ordinate_key in self._ordinates_keys]
-        spline_function = model_helpers.custom_spline(
-            np.log10(self._quiescent_fraction_abscissa), model_ordinates)
+        spline_function = self._quiescent_fraction_spline()
 
         if 'prim_haloprop' in kwargs:
             prim_haloprop = kwargs['prim_haloprop']
@@ -162,15 +160,24 @@ class Tinker13Cens(OccupationComponent):
 
         return fraction
 
+    @model_helpers.param_dict_memoization_decorator_factory(
+        param_keys=lambda model: model._ordinates_keys)
+    def _quiescent_fraction_spline(self):
+        """ Private method returning the spline used to evaluate the quiescent fraction,
+        which is only computed again once the ordinates stored in ``self.param_dict`` change.
+        """
+        model_ordinates = [self.param_dict[ordinate_key] for ordinate_key in self._ordinates_keys]
+        return model_helpers.custom_spline(
+            np.log10(self._quiescent_fraction_abscissa), model_ordinates)
+
     def mc_sfr_designation(self, seed=None, **kwargs):
         """
         """
         quiescent_fraction = self.mean_quiescent_fraction(**kwargs)
 
-        with NumpyRNGContext(seed):
-            mc_generator = np.random.random(custom_len(quiescent_fraction))
-
-        result = np.where(mc_generator < quiescent_fraction, 'quiescent', 'active')
+        is_quiescent = mc_bernoulli(quiescent_fraction, seed=seed,
+            stream_keys=(self.gal_type, 'sfr_designation'))
+        result = np.where(is_quiescent, 'quiescent', 'active')
         if 'table' in kwargs:
             kwargs['table'][self.sfr_designation_key] = result
             kwargs['table']['sfr_designation'] = result
@@ -413,13 +413,13 @@ class Zheng07Sats(OccupationComponent):
         # there are entries of input logM for which mean_nsat = 0
         # Evaluating mean_nsat using the catch_warnings context manager
         # suppresses this warning
-        mean_nsat = np.zeros_like(mass)
-
-        idx_nonzero = np.where(mass - M0 > 0)[0]
+        # The masking is done with np.where rather than index assignment so that
+        # parameters stored as (Nmodels, 1) arrays broadcast against the halos
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", RuntimeWarning)
 
-            mean_nsat[idx_nonzero] = ((mass[idx_nonzero] - M0)/M1)**self.param_dict['alpha']
+            mean_nsat = np.where(mass - M0 > 0,
+                ((mass - M0)/M1)**self.param_dict['alpha'], 0.)
 
         # If a central occupation model was passed to the constructor,
         # multiply mean_nsat by an overall factor of mean_ncen
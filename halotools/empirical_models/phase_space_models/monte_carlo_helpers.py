@@ -13,11 +13,11 @@ import numpy as np
 
 from itertools import product
 from time import time
-from astropy.utils.misc import NumpyRNGContext
 
 from ..model_helpers import custom_spline, call_func_table
 from .. import model_defaults
 
+from ...utils.random_streams import rng_stream
 from ...custom_exceptions import HalotoolsError
 
 
@@ -209,8 +209,8 @@ class MonteCarloGalProf(object):
             seed = kwargs['seed']
         except KeyError:
             seed = None
-        with NumpyRNGContext(seed):
-            rho = np.random.random(len(profile_params[0]))
+        rng = rng_stream(seed, getattr(self, 'gal_type', ''), 'radial_distance')
+        rho = rng.random(len(profile_params[0]))
 
         # Discretize each profile parameter for every galaxy
         # Store the collection of arrays in digitized_param_list
@@ -274,9 +274,9 @@ class MonteCarloGalProf(object):
             seed = kwargs['seed']
         except KeyError:
             seed = None
-        with NumpyRNGContext(seed):
-            cos_t = np.random.uniform(-1., 1., Npts)
-            phi = np.random.uniform(0, 2*np.pi, Npts)
+        rng = rng_stream(seed, getattr(self, 'gal_type', ''), 'unit_sphere')
+        cos_t = rng.uniform(-1., 1., Npts)
+        phi = rng.uniform(0, 2*np.pi, Npts)
         sin_t = np.sqrt((1.-cos_t*cos_t))
 
         x = sin_t * np.cos(phi)
@@ -600,7 +600,7 @@ class MonteCarloGalProf(object):
             every parameter in the profile model, each item a length-Ngals array.
             The sequence must have the same order as ``self.prof_param_keys``.
 
-        seed : int, optional
+        seed : int or `numpy.random.Generator`, optional
             Random number seed used in the Monte Carlo realization.
             Default is None, which will produce stochastic results.
 
@@ -621,8 +621,8 @@ class MonteCarloGalProf(object):
             seed = kwargs['seed']
         except KeyError:
             seed = None
-        with NumpyRNGContext(seed):
-            radial_velocities = np.random.normal(scale=radial_dispersions)
+        rng = rng_stream(seed, getattr(self, 'gal_type', ''), 'radial_velocity')
+        radial_velocities = rng.normal(scale=radial_dispersions)
 
         return radial_velocities
 
@@ -674,9 +674,15 @@ class MonteCarloGalProf(object):
 
         total_mass = table[self.prim_haloprop_key]
 
-        vx = self.mc_radial_velocity(scaled_radius, total_mass, *profile_params, seed=seed)
-        vy = self.mc_radial_velocity(scaled_radius, total_mass, *profile_params, seed=seed)
-        vz = self.mc_radial_velocity(scaled_radius, total_mass, *profile_params, seed=seed)
+        # Each velocity component is drawn from its own stream
+        # so that vx, vy and vz are uncorrelated for a fixed seed
+        gal_type = getattr(self, 'gal_type', '')
+        vx = self.mc_radial_velocity(scaled_radius, total_mass, *profile_params,
+            seed=rng_stream(seed, gal_type, 'mc_vel', 'vx'))
+        vy = self.mc_radial_velocity(scaled_radius, total_mass, *profile_params,
+            seed=rng_stream(seed, gal_type, 'mc_vel', 'vy'))
+        vz = self.mc_radial_velocity(scaled_radius, total_mass, *profile_params,
+            seed=rng_stream(seed, gal_type, 'mc_vel', 'vz'))
 
         if overwrite_table_velocities is True:
             table['vx'][:] += vx
@@ -12,7 +12,6 @@ from __future__ import (
     division, print_function, absolute_import, unicode_literals)
 
 import numpy as np
-from astropy.utils.misc import NumpyRNGContext
 
 from .conc_mass_models import ConcMass
 from .profile_model_template import AnalyticDensityProf
@@ -21,6 +20,7 @@ from ... import model_defaults
 from ...model_helpers import custom_spline
 
 from ....custom_exceptions import HalotoolsError
+from ....utils.random_streams import rng_stream
 from ....sim_manager import sim_defaults
 
 
@@ -635,8 +635,8 @@ class NFWProfile(AnalyticDensityProf, ConcMass):
 
         # Use method of Inverse Transform Sampling to generate a Monte Carlo realization
         # of the radial positions
-        with NumpyRNGContext(seed):
-            randoms = np.random.uniform(0, 1, num_pts)
+        rng = rng_stream(seed, 'nfw_radial_positions')
+        randoms = rng.uniform(0, 1, num_pts)
         log_randoms = np.log10(randoms)
         log_scaled_radial_positions = funcobj(log_randoms)
         scaled_radial_positions = 10.**log_scaled_radial_positions
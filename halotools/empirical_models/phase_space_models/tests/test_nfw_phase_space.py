@@ -333,6 +333,20 @@ class TestNFWPhaseSpace(TestCase):
         self.nfw.mc_vel(self._dummy_halo_table, seed=fixed_seed)
         assert np.any(self._dummy_halo_table['vx'] != self._dummy_halo_table['halo_vx'])
 
+    def test_mc_vel_independent_components(self):
+        """ Method verifies that a fixed seed does not produce
+        identical ``vx``, ``vy`` and ``vz`` realizations.
+        """
+        t = self._dummy_halo_table
+        vx, vy, vz = self.nfw.mc_vel(t, seed=fixed_seed,
+            overwrite_table_velocities=False, return_velocities=True)
+        assert not np.allclose(vx, vy)
+        assert not np.allclose(vx, vz)
+
+        vx2, vy2, vz2 = self.nfw.mc_vel(t, seed=fixed_seed,
+            overwrite_table_velocities=False, return_velocities=True)
+        assert np.all(vx == vx2)
+
     # OLD TESTS OF THE NFW PROFILE MODEL
     # THESE ARE STILL RELEVANT BUT NEED TO BE REVAMPED TO THE NEW SYNTAX
     # # Check that the lookup table attributes are correct
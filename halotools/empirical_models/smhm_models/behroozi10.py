@@ -218,13 +218,23 @@ class Behroozi10SmHm(PrimGalpropModel):
             raise KeyError("Must pass one of the following keyword arguments to mean_occupation:\n"
                 "``table`` or ``prim_haloprop``")
 
-        log_stellar_mass_table = np.linspace(8.5, 12.5, 100)
-        log_halo_mass_table = self.mean_log_halo_mass(log_stellar_mass_table, redshift=redshift)
-
-        interpol_func = model_helpers.custom_spline(log_halo_mass_table, log_stellar_mass_table)
+        interpol_func = self._log_stellar_mass_spline(redshift)
 
         log_stellar_mass = interpol_func(np.log10(halo_mass))
 
         stellar_mass = 10.**log_stellar_mass
 
         return stellar_mass
+
+    @model_helpers.param_dict_memoization_decorator_factory(
+        param_keys=lambda model: sorted(model.retrieve_default_param_dict().keys()))
+    def _log_stellar_mass_spline(self, redshift):
+        """ Private method returning the spline used to evaluate the base-10 logarithm
+        of stellar mass as a function of the base-10 logarithm of halo mass,
+        obtained by inverting `mean_log_halo_mass` on a grid of stellar masses.
+        The spline is only computed again once the SMHM parameters or the redshift change.
+        """
+        log_stellar_mass_table = np.linspace(8.5, 12.5, 100)
+        log_halo_mass_table = self.mean_log_halo_mass(log_stellar_mass_table, redshift=redshift)
+
+        return model_helpers.custom_spline(log_halo_mass_table, log_stellar_mass_table)
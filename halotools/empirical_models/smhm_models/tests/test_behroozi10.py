@@ -7,7 +7,7 @@ import numpy as np
 from ...smhm_models import Behroozi10SmHm
 
 __all__ = ('test_behroozi10_smhm_z01', 'test_behroozi10_smhm_z05',
-    'test_behroozi10_smhm_z1')
+    'test_behroozi10_smhm_z1', 'test_behroozi10_spline_cache')
 
 
 def test_behroozi10_smhm_z01():
@@ -121,3 +121,24 @@ def test_behroozi10_smhm_z1():
     z1_ratio = z1_sm / halo_mass_z1
     z1_result = np.log10(z1_ratio)
     assert np.allclose(z1_result, logmratio_z1, rtol=0.02)
+
+
+def test_behroozi10_spline_cache():
+    """ Enforce that the cached interpolation table is recomputed
+    after a change of the parameters, giving the same results as a new instance.
+    """
+    model = Behroozi10SmHm()
+    halo_mass = np.logspace(11, 15, 20)
+    sm1 = model.mean_stellar_mass(prim_haloprop=halo_mass, redshift=0.5)
+    assert np.all(model.mean_stellar_mass(prim_haloprop=halo_mass, redshift=0.5) == sm1)
+
+    model.param_dict['smhm_m1_0'] += 0.2
+    sm2 = model.mean_stellar_mass(prim_haloprop=halo_mass, redshift=0.5)
+    assert not np.allclose(sm1, sm2)
+
+    model2 = Behroozi10SmHm()
+    model2.param_dict['smhm_m1_0'] += 0.2
+    assert np.allclose(sm2, model2.mean_stellar_mass(prim_haloprop=halo_mass, redshift=0.5))
+
+    model.param_dict['smhm_m1_0'] -= 0.2
+    assert np.allclose(sm1, model.mean_stellar_mass(prim_haloprop=halo_mass, redshift=0.5))
@@ -137,3 +137,68 @@ class TestModelHelpers(TestCase):
         inbox = ((x >= 0) & (x <= box_length))
         assert np.all(newvel[inbox] == 1.0)
         assert np.all(newvel[~inbox] == -1.0)
+
+
+def test_param_dict_cache_lru():
+    """
+    """
+    cache = occuhelp.ParamDictCache(maxsize=2)
+    cache['a'] = 1
+    cache['b'] = 2
+    __ = cache['a']
+    cache['c'] = 3
+    assert len(cache) == 2
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+
+    with pytest.raises(HalotoolsError) as err:
+        __ = occuhelp.ParamDictCache(maxsize=0)
+    substr = "Input ``maxsize`` of ParamDictCache must be a positive integer"
+    assert substr in err.value.args[0]
+
+
+def test_param_dict_memoization_decorator_factory():
+    """
+    """
+    class DummyModel(object):
+        def __init__(self):
+            self.param_dict = {'a': 1., 'b': 2.}
+            self.num_calls = 0
+
+        @occuhelp.param_dict_memoization_decorator_factory(param_keys=['a'], maxsize=2)
+        def table(self, redshift):
+            self.num_calls += 1
+            return self.param_dict['a']*np.arange(5)/(1. + redshift)
+
+    model = DummyModel()
+    result = model.table(0.)
+    assert np.all(model.table(0.) == result)
+    assert model.num_calls == 1
+
+    # parameters that the method does not depend upon do not invalidate the cache
+    model.param_dict['b'] = 3.
+    __ = model.table(0.)
+    assert model.num_calls == 1
+
+    model.param_dict['a'] = 2.
+    assert np.all(model.table(0.) == 2*result)
+    assert model.num_calls == 2
+
+    # the results of the previous parameter values are still stored
+    model.param_dict['a'] = 1.
+    assert np.all(model.table(0.) == result)
+    assert model.num_calls == 2
+
+    __ = model.table(1.)
+    assert model.num_calls == 3
+
+    # array arguments bypass the cache
+    __ = model.table(np.zeros(5))
+    __ = model.table(np.zeros(5))
+    assert model.num_calls == 5
+
+    # the caches are bound to each instance
+    model2 = DummyModel()
+    __ = model2.table(0.)
+    assert model2.num_calls == 1
@@ -7,12 +7,14 @@ from __future__ import absolute_import
 
 from .group_identification import *
 from .mock_survey import *
+from .lightcone import *
 from .pairwise_velocities import *
 from .isolation_functions import *
 from .void_statistics import *
 from .catalog_analysis_helpers import *
 from .pair_counters import (npairs_3d, npairs_projected, npairs_xy_z,
-    marked_npairs_3d, marked_npairs_xy_z)
+    marked_npairs_3d, marked_npairs_xy_z, nearest_neighbors_3d, nearest_neighbors_xy_z,
+    npairs_same_group_3d, npairs_angular)
 from .radial_profiles import *
 from .two_point_clustering import *
 from .large_scale_density import *
@@ -0,0 +1,330 @@
+""" Module containing the `~halotools.mock_observables.counts_in_cells_pdf` function
+used to calculate the counts-in-cells probability distribution.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from .engines import counts_in_cells_pdf_engine
+
+from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
+    enforce_sample_respects_pbcs, get_num_threads, get_period)
+from ..pair_counters.rectangular_mesh import RectangularMesh, digitized_position
+from ..pair_counters.mesh_helpers import _enclose_in_box, _enforce_maximum_search_length
+
+from ...utils.array_utils import unsorting_indices
+from ...utils.random_streams import rng_stream
+from ...custom_exceptions import HalotoolsError
+
+__all__ = ('counts_in_cells_pdf', )
+
+# Maximum number of cells per dimension of the mesh built from the points
+max_cells_per_dimension = 128
+
+
+def counts_in_cells_pdf(sample, radii, cylinder_half_lengths=None, centers='grid',
+        num_centers=None, period=None, seed=None, num_moments=2, return_counts=False,
+        num_threads=1, approx_cell_size=None):
+    """
+    Calculate the counts-in-cells probability distribution :math:`P(N)`,
+    the probability that a sphere or cylinder contains exactly *N* points of ``sample``,
+    for each of the sphere radii or cylinder sizes defined by the input ``radii``
+    and ``cylinder_half_lengths``.
+
+    The spheres or cylinders are placed either on the nodes of a regular grid
+    or at random positions inside the periodic box, or on user-supplied centers.
+    All sizes are computed together in a single pass over the neighbors of each center,
+    and the counts of each center are only stored if ``return_counts`` is True,
+    so that :math:`P(N)` can be computed for very large numbers of centers.
+
+    Parameters
+    ----------
+    sample : array_like
+        Npts x 3 numpy array containing 3-D positions of points.
+        See the :ref:`mock_obs_pos_formatting` documentation page, or the
+        Examples section below, for instructions on how to transform
+        your coordinate position arrays into the
+        format accepted by the ``sample`` argument.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    radii : array_like
+        Monotonically increasing array of length *Nr* storing the radii of the spheres,
+        or the radii of the cylinders in the xy-plane if ``cylinder_half_lengths`` is passed.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    cylinder_half_lengths : array_like, optional
+        Half-lengths of the cylinders in the z-dimension, either a single float
+        or a monotonically non-decreasing array of length *Nr*.
+        Default is None, in which case points are counted inside spheres.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    centers : string or array_like, optional
+        Either 'grid', in which case the spheres or cylinders are centered on the
+        nodes of a regular grid spanning the periodic box, or 'random', in which case
+        they are centered on random positions inside the box. Alternatively,
+        an Ncenters x 3 numpy array storing the positions of the centers may be passed,
+        which is required if ``period`` is None. Default is 'grid'.
+
+    num_centers : int, optional
+        Number of centers placed on a grid or at random. Must be passed unless
+        ``centers`` is an array. For a grid, the number of nodes in each dimension
+        is chosen so that the nodes are nearly equally spaced in all dimensions,
+        so that the actual number of centers is only approximately ``num_centers``.
+
+    period : array_like, optional
+        Length-3 array defining the periodic boundary conditions.
+        If only one number is specified, the enclosing volume is assumed to
+        be a periodic cube (by far the most common case).
+        If period is set to None, the default option,
+        PBCs are set to infinity, and the positions of the ``centers`` must be passed.
+
+    seed : int, optional
+        Random number seed used to randomly lay down the centers, if applicable.
+        Default is None, in which case results will be stochastic.
+
+    num_moments : int, optional
+        Number of moments of :math:`P(N)` to return. Default is 2,
+        in which case the mean and variance are returned.
+
+    return_counts : bool, optional
+        If True, the number of points inside each sphere or cylinder is also returned.
+        Default is False.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the calculation should use all available cores on the machine.
+
+    approx_cell_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        Default choice is to use one third of the size of the largest sphere
+        or cylinder in each dimension.
+
+    Returns
+    -------
+    pdf : numpy.array
+        Array of shape (Nr, Nmax+1) whose entry (i, N) stores the fraction of
+        spheres or cylinders of the i-th size containing exactly *N* points,
+        where *Nmax* is the largest number of points found in any sphere or cylinder.
+
+    moments : numpy.array
+        Array of shape (Nr, num_moments) storing the mean of :math:`P(N)` in the
+        first column, and the *k*-th central moment of :math:`P(N)` in column *k-1*,
+        e.g., the variance in the second column.
+
+    counts : numpy.array
+        Integer array of shape (Ncenters, Nr) storing the number of points inside
+        each sphere or cylinder. Only returned if ``return_counts`` is True.
+
+    Examples
+    --------
+    For demonstration purposes we create a randomly distributed set of points within a
+    periodic cube of side length 250 Mpc/h.
+
+    >>> Npts, Lbox = 10000, 250.
+    >>> x = np.random.uniform(0, Lbox, Npts)
+    >>> y = np.random.uniform(0, Lbox, Npts)
+    >>> z = np.random.uniform(0, Lbox, Npts)
+
+    We transform our *x, y, z* points into the array shape used by the pair-counter by
+    taking the transpose of the result of `numpy.vstack`. This boilerplate transformation
+    is used throughout the `~halotools.mock_observables` sub-package:
+
+    >>> sample = np.vstack((x, y, z)).T
+
+    >>> radii = np.linspace(5, 25, 50)
+    >>> pdf, moments = counts_in_cells_pdf(sample, radii, num_centers=10000, period=Lbox)
+    >>> mean, variance = moments[:, 0], moments[:, 1]
+
+    For cylinders of radius ``radii`` and half-length 20 Mpc/h centered on random positions:
+
+    >>> pdf, moments = counts_in_cells_pdf(sample, radii, cylinder_half_lengths=20., centers='random', num_centers=10000, period=Lbox, seed=43)
+    """
+    result = _counts_in_cells_pdf_process_args(sample, radii, cylinder_half_lengths,
+        centers, num_centers, period, seed, num_moments, num_threads, approx_cell_size)
+    x2, y2, z2, centers, grid_shape, ncenters = result[0:6]
+    radii, cylinder_half_lengths, period, PBCs, num_moments, num_threads, approx_cell_size = result[6:]
+    xperiod, yperiod, zperiod = period
+
+    mesh = RectangularMesh(x2, y2, z2, xperiod, yperiod, zperiod,
+        approx_cell_size[0], approx_cell_size[1], approx_cell_size[2])
+
+    # Neighboring centers share their neighbors, so they are processed in the order of the mesh
+    if centers is not None:
+        ix = digitized_position(centers[0], mesh.xcell_size, mesh.num_xdivs)
+        iy = digitized_position(centers[1], mesh.ycell_size, mesh.num_ydivs)
+        iz = digitized_position(centers[2], mesh.zcell_size, mesh.num_zdivs)
+        idx_sorted = np.argsort(mesh.cell_id_from_cell_tuple(ix, iy, iz), kind='mergesort')
+        centers = tuple(np.ascontiguousarray(c[idx_sorted]) for c in centers)
+
+    # Create a function object that has a single argument, for parallelization purposes
+    engine = partial(counts_in_cells_pdf_engine, mesh, x2, y2, z2, PBCs,
+        centers, grid_shape, radii, cylinder_half_lengths, return_counts)
+
+    num_threads = max(1, min(num_threads, ncenters))
+    boundaries = np.linspace(0, ncenters, num_threads+1).astype(int)
+    center_tuples = [(boundaries[i], boundaries[i+1]) for i in range(num_threads)]
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, center_tuples)
+        pool.close()
+    else:
+        result = [engine(center_tuples[0])]
+
+    width = max(r[0].shape[1] for r in result)
+    histogram = np.zeros((len(radii), width), dtype=np.int64)
+    for r in result:
+        histogram[:, :r[0].shape[1]] += r[0]
+    # Trim the columns beyond the largest count
+    nonzero_columns = np.flatnonzero(np.any(histogram > 0, axis=0))
+    histogram = histogram[:, :nonzero_columns[-1]+1]
+
+    pdf = histogram/float(ncenters)
+    moments = _pdf_moments(pdf, num_moments)
+
+    if return_counts:
+        counts = np.vstack([r[1] for r in result])
+        if centers is not None:
+            counts = counts[unsorting_indices(idx_sorted)]
+        return pdf, moments, counts
+    else:
+        return pdf, moments
+
+
+def _pdf_moments(pdf, num_moments):
+    """ Mean and central moments of each row of ``pdf``.
+    """
+    N = np.arange(pdf.shape[1])
+    mean = np.sum(pdf*N, axis=1)
+    moments = np.zeros((pdf.shape[0], num_moments))
+    moments[:, 0] = mean
+    for k in range(2, num_moments+1):
+        moments[:, k-1] = np.sum(pdf*(N - mean[:, np.newaxis])**k, axis=1)
+    return moments
+
+
+def _counts_in_cells_pdf_process_args(sample, radii, cylinder_half_lengths,
+        centers, num_centers, period, seed, num_moments, num_threads, approx_cell_size):
+    """ Private function to process the arguments for the
+    `~halotools.mock_observables.counts_in_cells_pdf` function.
+    """
+    num_threads = get_num_threads(num_threads)
+
+    sample = enforce_sample_has_correct_shape(sample)
+
+    radii = np.atleast_1d(radii).astype(float)
+    try:
+        assert radii.ndim == 1
+        assert np.all(radii > 0)
+        assert np.all(np.diff(radii) > 0)
+    except AssertionError:
+        msg = "Input ``radii`` must be a monotonically increasing 1D array of positive numbers"
+        raise ValueError(msg)
+    rmax = radii[-1]
+
+    if cylinder_half_lengths is None:
+        zmax = rmax
+    else:
+        cylinder_half_lengths = np.atleast_1d(cylinder_half_lengths).astype(float)
+        if len(cylinder_half_lengths) == 1:
+            cylinder_half_lengths = np.zeros_like(radii) + cylinder_half_lengths[0]
+        try:
+            assert cylinder_half_lengths.shape == radii.shape
+            assert np.all(cylinder_half_lengths > 0)
+            assert np.all(np.diff(cylinder_half_lengths) >= 0)
+        except AssertionError:
+            msg = ("Input ``cylinder_half_lengths`` must be a positive number or "
+                "a monotonically non-decreasing array with the same length as ``radii``")
+            raise ValueError(msg)
+        zmax = cylinder_half_lengths[-1]
+
+    try:
+        assert int(num_moments) == num_moments
+        num_moments = int(num_moments)
+        assert num_moments > 0
+    except (TypeError, ValueError, AssertionError):
+        msg = "Input ``num_moments`` must be a positive integer"
+        raise ValueError(msg)
+
+    # Strings are the only scalar values accepted for ``centers``
+    centers_on_grid_or_random = (np.ndim(centers) == 0)
+    if centers_on_grid_or_random:
+        if centers not in ('grid', 'random'):
+            msg = "Input ``centers`` must be 'grid', 'random' or an Ncenters x 3 array"
+            raise ValueError(msg)
+        if num_centers is None:
+            msg = ("If ``centers`` is '{0}', you must pass in ``num_centers``".format(centers))
+            raise HalotoolsError(msg)
+        if period is None:
+            msg = ("If ``period`` is None, you must pass in an array of ``centers``")
+            raise HalotoolsError(msg)
+    else:
+        if num_centers is not None:
+            msg = ("If passing in an array of ``centers``, do not also pass in ``num_centers``")
+            raise HalotoolsError(msg)
+        centers = enforce_sample_has_correct_shape(centers)
+
+    x2, y2, z2 = sample[:, 0], sample[:, 1], sample[:, 2]
+
+    period, PBCs = get_period(period)
+    # At this point, period may still be set to None,
+    # in which case we must remap our points inside the smallest enclosing cube
+    # and set ``period`` equal to this cube size.
+    if period is None:
+        x1, y1, z1, x2, y2, z2, period = (
+            _enclose_in_box(centers[:, 0], centers[:, 1], centers[:, 2], x2, y2, z2,
+                min_size=[rmax*3.0, rmax*3.0, zmax*3.0]))
+        centers = (x1, y1, z1)
+
+    _enforce_maximum_search_length(rmax, period[0])
+    _enforce_maximum_search_length(rmax, period[1])
+    _enforce_maximum_search_length(zmax, period[2])
+
+    enforce_sample_respects_pbcs(x2, y2, z2, period)
+
+    grid_shape = (1, 1, 1)
+    if centers_on_grid_or_random:
+        num_centers = int(num_centers)
+        if num_centers < 1:
+            msg = "Input ``num_centers`` must be a positive integer"
+            raise ValueError(msg)
+        if centers == 'grid':
+            spacing = (np.prod(period)/float(num_centers))**(1./3)
+            grid_shape = tuple(int(n) for n in np.maximum(1, np.round(period/spacing)))
+            centers = None
+            ncenters = int(np.prod(grid_shape))
+        else:
+            rng = rng_stream(seed, 'counts_in_cells', 'centers')
+            random_centers = rng.random((num_centers, 3))*period
+            centers = tuple(random_centers[:, i] for i in range(3))
+            ncenters = num_centers
+    else:
+        if PBCs:
+            centers = tuple(centers[:, i] for i in range(3))
+            enforce_sample_respects_pbcs(centers[0], centers[1], centers[2], period)
+        ncenters = len(centers[0])
+        if ncenters == 0:
+            msg = "Input ``centers`` must contain at least one center"
+            raise ValueError(msg)
+
+    if approx_cell_size is None:
+        approx_cell_size = np.array([rmax, rmax, zmax])/3.
+    approx_cell_size = np.atleast_1d(approx_cell_size).astype(float)
+    if len(approx_cell_size) == 1:
+        approx_cell_size = np.zeros(3) + approx_cell_size[0]
+    try:
+        assert approx_cell_size.shape == (3, )
+        assert np.all(approx_cell_size > 0)
+    except AssertionError:
+        msg = "Input ``approx_cell_size`` must be a positive scalar or length-3 sequence"
+        raise ValueError(msg)
+    approx_cell_size = np.maximum(approx_cell_size, period/float(max_cells_per_dimension))
+
+    return (x2, y2, z2, centers, grid_shape, ncenters,
+        radii, cylinder_half_lengths, period, PBCs, num_moments, num_threads, approx_cell_size)
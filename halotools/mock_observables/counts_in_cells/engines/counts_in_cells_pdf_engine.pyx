@@ -0,0 +1,297 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.math cimport floor
+
+__all__ = ('counts_in_cells_pdf_engine', )
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+def counts_in_cells_pdf_engine(mesh, x2in, y2in, z2in, PBCs, centers, grid_shape,
+        radii, half_lengths, return_counts, center_tuple):
+    """ Cython engine for computing the distribution of the number of points
+    inside spheres or cylinders of several sizes placed on a set of centers.
+
+    For each center, the cells of ``mesh`` overlapping the largest sphere or cylinder
+    are visited once, and each point in these cells is assigned to the smallest
+    sphere or cylinder containing it. The histogram of the counts is accumulated
+    on the fly, so that the counts of each center are only stored
+    if ``return_counts`` is True.
+
+    Parameters
+    ------------
+    mesh : object
+        Instance of `~halotools.mock_observables.pair_counters.rectangular_mesh.RectangularMesh`
+        built from the positions of the points.
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing Cartesian coordinates of the points
+
+    PBCs : bool
+        If True, periodic boundary conditions are applied with the periods of ``mesh``.
+
+    centers : tuple or None
+        Tuple of three arrays storing the Cartesian coordinates of the centers,
+        or None if the centers are placed on a regular grid.
+
+    grid_shape : tuple
+        Number of grid nodes in each dimension. The node (i, j, k) is the center
+        of the grid cell ((i + 0.5)*xperiod/nx, (j + 0.5)*yperiod/ny, (k + 0.5)*zperiod/nz).
+        Ignored unless ``centers`` is None.
+
+    radii : array
+        Array of length *Nr* storing the monotonically increasing radii
+        of the spheres or cylinders.
+
+    half_lengths : array or None
+        Array of length *Nr* storing the monotonically non-decreasing half-lengths
+        of the cylinders, or None to count points inside spheres.
+
+    return_counts : bool
+        If True, the number of points inside each sphere or cylinder is also returned.
+
+    center_tuple : tuple
+        Two-element tuple defining the first and last centers that will be looped over.
+        Intended for use with python multiprocessing.
+
+    Returns
+    --------
+    histogram : array
+        Integer array of shape (Nr, Nmax+1) storing the number of centers
+        whose sphere or cylinder of each size contains exactly *N* points.
+
+    counts : array
+        Integer array of shape (Ncenters, Nr) storing the counts of each center
+        in the range defined by ``center_tuple``. If ``return_counts`` is False,
+        an array of shape (0, Nr) is returned instead.
+    """
+    cdef cnp.float64_t[:] rsq_bins = np.ascontiguousarray(radii, dtype=np.float64)**2
+    cdef int num_bins = len(radii)
+    cdef bint cylinders = half_lengths is not None
+    cdef cnp.float64_t[:] z_bins
+    if cylinders:
+        z_bins = np.ascontiguousarray(half_lengths, dtype=np.float64)
+    else:
+        z_bins = np.zeros(num_bins, dtype=np.float64)
+    cdef cnp.float64_t rmax = radii[num_bins-1]
+    cdef cnp.float64_t rmax_squared = rmax*rmax
+    cdef cnp.float64_t zmax = z_bins[num_bins-1] if cylinders else rmax
+
+    cdef cnp.float64_t xperiod = mesh.xperiod
+    cdef cnp.float64_t yperiod = mesh.yperiod
+    cdef cnp.float64_t zperiod = mesh.zperiod
+    cdef cnp.float64_t half_xperiod = xperiod/2.
+    cdef cnp.float64_t half_yperiod = yperiod/2.
+    cdef cnp.float64_t half_zperiod = zperiod/2.
+    cdef int apply_PBCs = PBCs
+
+    cdef cnp.int64_t[:] cell_indices = np.ascontiguousarray(mesh.cell_id_indices, dtype=np.int64)
+    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[mesh.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[mesh.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[mesh.idx_sorted], dtype=np.float64)
+
+    cdef int num_xdivs = mesh.num_xdivs
+    cdef int num_ydivs = mesh.num_ydivs
+    cdef int num_zdivs = mesh.num_zdivs
+    cdef cnp.float64_t xcell_size = mesh.xcell_size
+    cdef cnp.float64_t ycell_size = mesh.ycell_size
+    cdef cnp.float64_t zcell_size = mesh.zcell_size
+
+    cdef cnp.int64_t first_center = center_tuple[0]
+    cdef cnp.int64_t last_center = center_tuple[1]
+    cdef cnp.int64_t num_centers = last_center - first_center
+
+    cdef bint use_grid = centers is None
+    cdef cnp.float64_t[:] x1, y1, z1
+    cdef cnp.int64_t num_ygrid = grid_shape[1]
+    cdef cnp.int64_t num_zgrid = grid_shape[2]
+    cdef cnp.float64_t xgrid_size = xperiod/grid_shape[0]
+    cdef cnp.float64_t ygrid_size = yperiod/grid_shape[1]
+    cdef cnp.float64_t zgrid_size = zperiod/grid_shape[2]
+    if not use_grid:
+        x1 = np.ascontiguousarray(centers[0][first_center:last_center], dtype=np.float64)
+        y1 = np.ascontiguousarray(centers[1][first_center:last_center], dtype=np.float64)
+        z1 = np.ascontiguousarray(centers[2][first_center:last_center], dtype=np.float64)
+
+    cdef bint store_counts = return_counts
+    cdef cnp.int64_t[:, :] counts
+    if store_counts:
+        counts = np.zeros((num_centers, num_bins), dtype=np.int64)
+    else:
+        counts = np.zeros((0, num_bins), dtype=np.int64)
+
+    # The histogram is enlarged whenever a count exceeds its current size
+    histogram_array = np.zeros((num_bins, 64), dtype=np.int64)
+    cdef cnp.int64_t[:, :] histogram = histogram_array
+    cdef cnp.int64_t histogram_size = 64
+
+    cdef cnp.int64_t[:] bin_counts = np.zeros(num_bins, dtype=np.int64)
+
+    cdef cnp.int64_t n, icenter, j, ifirst, ilast, icell, ntot
+    cdef int ibin, xlo, xhi, ylo, yhi, zlo, zhi, nx, ny, nz, ix, iy, iz
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp, dx, dy, dz, dxy_sq, dsq
+    cdef cnp.float64_t gx, gy, gz, gxy_sq
+    cdef bint xsaturated, ysaturated, zsaturated
+
+    for n in range(num_centers):
+        if use_grid:
+            icenter = first_center + n
+            x1tmp = (icenter // (num_ygrid*num_zgrid) + 0.5)*xgrid_size
+            y1tmp = ((icenter // num_zgrid) % num_ygrid + 0.5)*ygrid_size
+            z1tmp = (icenter % num_zgrid + 0.5)*zgrid_size
+        else:
+            x1tmp = x1[n]
+            y1tmp = y1[n]
+            z1tmp = z1[n]
+
+        xlo, xhi = _cell_range(x1tmp, rmax, xcell_size, num_xdivs, apply_PBCs)
+        ylo, yhi = _cell_range(y1tmp, rmax, ycell_size, num_ydivs, apply_PBCs)
+        zlo, zhi = _cell_range(z1tmp, zmax, zcell_size, num_zdivs, apply_PBCs)
+        # if all cells of a periodic dimension are visited, the cells are not
+        # all at their nearest periodic image, so they cannot be skipped
+        xsaturated = apply_PBCs & (xhi - xlo + 1 == num_xdivs)
+        ysaturated = apply_PBCs & (yhi - ylo + 1 == num_ydivs)
+        zsaturated = apply_PBCs & (zhi - zlo + 1 == num_zdivs)
+
+        for nx in range(xlo, xhi+1):
+            gx = 0. if xsaturated else _gap_to_cell(x1tmp, nx, xcell_size)
+            ix = (nx + num_xdivs) % num_xdivs
+            for ny in range(ylo, yhi+1):
+                gy = 0. if ysaturated else _gap_to_cell(y1tmp, ny, ycell_size)
+                gxy_sq = gx*gx + gy*gy
+                if gxy_sq > rmax_squared:
+                    continue
+                iy = (ny + num_ydivs) % num_ydivs
+                for nz in range(zlo, zhi+1):
+                    gz = 0. if zsaturated else _gap_to_cell(z1tmp, nz, zcell_size)
+                    # skip the cells lying entirely outside the largest sphere
+                    if (not cylinders) & (gxy_sq + gz*gz > rmax_squared):
+                        continue
+                    iz = (nz + num_zdivs) % num_zdivs
+
+                    icell = ix*(num_ydivs*num_zdivs) + iy*num_zdivs + iz
+                    ifirst = cell_indices[icell]
+                    ilast = cell_indices[icell+1]
+
+                    for j in range(ifirst, ilast):
+                        dx = x1tmp - x2[j]
+                        dy = y1tmp - y2[j]
+                        dz = z1tmp - z2[j]
+                        if apply_PBCs:
+                            if dx > half_xperiod:
+                                dx = dx - xperiod
+                            elif dx < -half_xperiod:
+                                dx = dx + xperiod
+                            if dy > half_yperiod:
+                                dy = dy - yperiod
+                            elif dy < -half_yperiod:
+                                dy = dy + yperiod
+                            if dz > half_zperiod:
+                                dz = dz - zperiod
+                            elif dz < -half_zperiod:
+                                dz = dz + zperiod
+                        dxy_sq = dx*dx + dy*dy
+
+                        if cylinders:
+                            dz = abs(dz)
+                            if (dxy_sq >= rmax_squared) | (dz >= zmax):
+                                continue
+                            # smallest cylinder strictly containing the point
+                            ibin = max(_first_bin_above(rsq_bins, num_bins, dxy_sq),
+                                _first_bin_above(z_bins, num_bins, dz))
+                        else:
+                            dsq = dxy_sq + dz*dz
+                            if dsq > rmax_squared:
+                                continue
+                            # smallest sphere containing the point
+                            ibin = _first_bin_not_below(rsq_bins, num_bins, dsq)
+                        bin_counts[ibin] += 1
+
+        # accumulate the counts of the nested spheres or cylinders
+        ntot = 0
+        for ibin in range(num_bins):
+            ntot = ntot + bin_counts[ibin]
+            bin_counts[ibin] = 0
+            if store_counts:
+                counts[n, ibin] = ntot
+            if ntot >= histogram_size:
+                histogram_size = max(2*histogram_size, ntot+1)
+                histogram_array = np.concatenate((histogram_array,
+                    np.zeros((num_bins, histogram_size - histogram_array.shape[1]), dtype=np.int64)),
+                    axis=1)
+                histogram = histogram_array
+            histogram[ibin, ntot] += 1
+
+    return histogram_array, np.asarray(counts)
+
+
+@cython.cdivision(True)
+cdef (int, int) _cell_range(cnp.float64_t x, cnp.float64_t length,
+        cnp.float64_t cell_size, int num_divs, int PBCs):
+    """ Range of cells overlapping the interval [x - length, x + length].
+    With periodic boundaries, indices may lie outside [0, num_divs), and
+    the range is truncated to ``num_divs`` distinct cells;
+    without, it is truncated to the cells of the mesh.
+    """
+    cdef int lo = <int>floor((x - length)/cell_size)
+    cdef int hi = <int>floor((x + length)/cell_size)
+    if PBCs:
+        if hi - lo + 1 > num_divs:
+            lo, hi = 0, num_divs - 1
+    else:
+        lo = max(lo, 0)
+        hi = min(hi, num_divs - 1)
+    return lo, hi
+
+
+cdef inline cnp.float64_t _gap_to_cell(cnp.float64_t x, int icell, cnp.float64_t cell_size):
+    """ Distance along one dimension between ``x`` and the cell ``icell``,
+    or zero if ``x`` lies inside the cell.
+    """
+    cdef cnp.float64_t left = icell*cell_size
+    if x < left:
+        return left - x
+    elif x > left + cell_size:
+        return x - left - cell_size
+    else:
+        return 0.
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int _first_bin_not_below(cnp.float64_t[:] bins, int num_bins, cnp.float64_t x):
+    """ Index of the first entry of the increasing array ``bins`` that is >= x.
+    """
+    cdef int lo = 0
+    cdef int hi = num_bins
+    cdef int mid
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if bins[mid] < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int _first_bin_above(cnp.float64_t[:] bins, int num_bins, cnp.float64_t x):
+    """ Index of the first entry of the non-decreasing array ``bins`` that is > x.
+    """
+    cdef int lo = 0
+    cdef int hi = num_bins
+    cdef int mid
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if bins[mid] <= x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
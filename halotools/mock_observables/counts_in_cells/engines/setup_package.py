@@ -2,7 +2,7 @@ from distutils.extension import Extension
 import os
 
 PATH_TO_PKG = os.path.relpath(os.path.dirname(__file__))
-SOURCES = ("counts_in_cylinders_engine.pyx", )
+SOURCES = ("counts_in_cylinders_engine.pyx", "counts_in_cells_pdf_engine.pyx")
 THIS_PKG_NAME = '.'.join(__name__.split('.')[:-1])
 
 
@@ -0,0 +1,136 @@
+""" Module providing testing for the `~halotools.mock_observables.counts_in_cells_pdf` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+from ..counts_in_cells_pdf import counts_in_cells_pdf
+from ..counts_in_cylinders import counts_in_cylinders
+
+from ...pair_counters import npairs_per_object_3d
+
+from ....custom_exceptions import HalotoolsError
+
+__all__ = ('test_counts_in_cells_pdf_spheres', 'test_counts_in_cells_pdf_cylinders',
+    'test_counts_in_cells_pdf_grid', 'test_counts_in_cells_pdf_random')
+
+fixed_seed = 43
+
+
+def histogram_of_counts(counts):
+    """ Fraction of centers with each number of points, for each column of ``counts``.
+    """
+    nmax = np.max(counts)
+    return np.array([np.bincount(c, minlength=nmax+1) for c in counts.T])/float(len(counts))
+
+
+def test_counts_in_cells_pdf_spheres():
+    """ Compare the counts in spheres around random centers to
+    `~halotools.mock_observables.pair_counters.npairs_per_object_3d`.
+    """
+    period = np.array([1., 1., 1.])
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((1000, 3))
+        centers = np.random.random((500, 3))
+    radii = np.linspace(0.02, 0.2, 10)
+
+    pdf, moments, counts = counts_in_cells_pdf(sample, radii, centers=centers,
+        period=period, num_moments=3, return_counts=True)
+
+    correct_counts = npairs_per_object_3d(centers, sample, radii, period=period)
+    assert np.all(counts == correct_counts)
+    assert np.allclose(pdf, histogram_of_counts(correct_counts))
+    assert np.allclose(moments[:, 0], np.mean(correct_counts, axis=0))
+    assert np.allclose(moments[:, 1], np.var(correct_counts, axis=0))
+    mean = np.mean(correct_counts, axis=0)
+    assert np.allclose(moments[:, 2], np.mean((correct_counts - mean)**3, axis=0))
+
+
+def test_counts_in_cells_pdf_cylinders():
+    """ Compare the counts in cylinders around random centers to
+    `~halotools.mock_observables.counts_in_cylinders`, with and without periodic boundaries.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((1000, 3))
+        centers = np.random.random((500, 3))
+    radii = np.array([0.05, 0.1, 0.2])
+    half_lengths = np.array([0.1, 0.1, 0.15])
+
+    for period in (1, None):
+        pdf, moments, counts = counts_in_cells_pdf(sample, radii,
+            cylinder_half_lengths=half_lengths, centers=centers, period=period,
+            return_counts=True)
+        for i in range(len(radii)):
+            correct_counts = counts_in_cylinders(centers, sample,
+                radii[i], half_lengths[i], period=period)
+            assert np.all(counts[:, i] == correct_counts)
+        assert np.allclose(pdf, histogram_of_counts(counts))
+
+
+def test_counts_in_cells_pdf_grid():
+    """ Verify that centers placed on a grid give the same P(N) as
+    the explicit positions of the grid nodes, using multiple threads.
+    """
+    period = np.array([1., 1.5, 2.])
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((2000, 3))*period
+    radii = np.linspace(0.05, 0.25, 5)
+
+    pdf, moments = counts_in_cells_pdf(sample, radii, centers='grid',
+        num_centers=3000, period=period, num_threads=2)
+
+    # nodes are spaced by 0.1 in all dimensions
+    x, y, z = (np.arange(n)*0.1 + 0.05 for n in (10, 15, 20))
+    grid = np.vstack([a.flatten() for a in np.meshgrid(x, y, z, indexing='ij')]).T
+    pdf2, moments2 = counts_in_cells_pdf(sample, radii, centers=grid, period=period)
+    assert np.allclose(pdf, pdf2)
+    assert np.allclose(moments, moments2)
+    assert np.allclose(np.sum(pdf, axis=1), 1)
+
+
+def test_counts_in_cells_pdf_random():
+    """ Verify that random centers are reproducible with a fixed seed
+    and that the mean counts agree with the density of the sample.
+    """
+    period = 1.
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((5000, 3))
+    radii = np.array([0.05, 0.1])
+
+    pdf, moments = counts_in_cells_pdf(sample, radii, centers='random',
+        num_centers=2000, period=period, seed=fixed_seed+1)
+    pdf2, moments2 = counts_in_cells_pdf(sample, radii, centers='random',
+        num_centers=2000, period=period, seed=fixed_seed+1)
+    assert np.all(pdf == pdf2)
+
+    expected_mean = len(sample)*4*np.pi*radii**3/3.
+    assert np.allclose(moments[:, 0], expected_mean, rtol=0.1)
+
+
+def test_counts_in_cells_pdf_bad_args():
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((100, 3))
+    radii = np.array([0.05, 0.1])
+
+    with pytest.raises(HalotoolsError) as err:
+        counts_in_cells_pdf(sample, radii, centers='random', period=1)
+    substr = "If ``centers`` is 'random', you must pass in ``num_centers``"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(HalotoolsError) as err:
+        counts_in_cells_pdf(sample, radii, centers='grid', num_centers=10)
+    substr = "If ``period`` is None, you must pass in an array of ``centers``"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        counts_in_cells_pdf(sample, radii[::-1], num_centers=10, period=1)
+    substr = "Input ``radii`` must be a monotonically increasing 1D array of positive numbers"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        counts_in_cells_pdf(sample, radii, cylinder_half_lengths=[0.2, 0.1],
+            num_centers=10, period=1)
+    substr = "Input ``cylinder_half_lengths`` must be a positive number"
+    assert substr in err.value.args[0]
@@ -0,0 +1,403 @@
+"""
+Module containing the `~halotools.mock_observables.lightcone` and
+`~halotools.mock_observables.lightcone_shells` functions used to build a lightcone
+from one or more replicated periodic boxes, and the
+`~halotools.mock_observables.comoving_distance_to_redshift` function used to convert
+comoving distances into cosmological redshifts.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.constants import c  # the speed of light
+
+from .mock_observables_helpers import enforce_sample_has_correct_shape, get_period
+from ..sim_manager.sim_defaults import default_cosmology
+
+__all__ = ('lightcone', 'lightcone_shells', 'comoving_distance_to_redshift')
+__author__ = ['Duncan Campbell', 'Andrew Hearin']
+
+# tables of comoving distance vs. redshift, one for each cosmology
+_distance_redshift_tables = {}
+
+# the tables are tabulated in ln(1+z) up to this redshift, with this spacing
+_table_zmax = 1000.
+_table_dlog1pz = 1e-5
+
+
+def _distance_redshift_table(cosmo):
+    """ Return the arrays of redshift and of comoving distance in Mpc/h
+    used to interpolate the redshift at a given comoving distance.
+
+    The table is computed once for each cosmology by integrating
+    the inverse of the dimensionless Hubble parameter of ``cosmo``
+    on a grid in :math:`\\ln(1+z)`, and is cached for later calls.
+    """
+    key = repr(cosmo)
+    try:
+        return _distance_redshift_tables[key]
+    except KeyError:
+        pass
+
+    log1pz = np.arange(0, np.log1p(_table_zmax) + _table_dlog1pz, _table_dlog1pz)
+    z = np.expm1(log1pz)
+    # dD/dln(1+z) = (c/H0)*(1+z)/E(z), with c/H0 = c/100 Mpc/h
+    integrand = (1. + z)*cosmo.inv_efunc(z)
+    hubble_distance = c.to('km/s').value/100.
+    distance = np.zeros(len(z))
+    distance[1:] = np.cumsum(0.5*(integrand[1:] + integrand[:-1])*np.diff(log1pz))
+    distance *= hubble_distance
+
+    _distance_redshift_tables[key] = (z, distance)
+    return z, distance
+
+
+def comoving_distance_to_redshift(distance, cosmo=None):
+    """
+    Calculate the cosmological redshift at which an object is located at the input
+    line-of-sight comoving distance.
+
+    The redshift is interpolated from a high-resolution table of comoving distance
+    vs. redshift, which is computed only once for each cosmology.
+
+    Parameters
+    ----------
+    distance : array_like
+        Comoving distances in Mpc/h.
+
+    cosmo : object, optional
+        Instance of an Astropy `~astropy.cosmology` object.  The default is
+        `halotools.sim_manager.sim_defaults.default_cosmology`.
+
+    Returns
+    -------
+    redshift : np.array
+        Cosmological redshifts.
+
+    Examples
+    --------
+    >>> from astropy.cosmology import WMAP9 as cosmo
+    >>> distance = np.linspace(0, 1000, 10)
+    >>> redshift = comoving_distance_to_redshift(distance, cosmo=cosmo)
+    """
+    if cosmo is None:
+        cosmo = default_cosmology
+
+    z_table, distance_table = _distance_redshift_table(cosmo)
+
+    distance = np.atleast_1d(distance).astype(float)
+    if (np.min(distance) < 0) | (np.max(distance) > distance_table[-1]):
+        msg = ("Input ``distance`` must be between 0 and the comoving distance "
+            "to z = {0}, {1:.1f} Mpc/h".format(_table_zmax, distance_table[-1]))
+        raise ValueError(msg)
+
+    return np.interp(distance, distance_table, z_table)
+
+
+def lightcone_shells(sample, period, distance_bins, velocities=None, cosmo=None,
+        observer=None, footprint=None, chunk_size=1000000):
+    """
+    Generator building a lightcone from periodic boxes, one shell of comoving distance
+    at a time, by placing an observer in the box and replicating the box as many times
+    as necessary to fill each shell.
+
+    For each shell, the generator yields the angular coordinates,
+    the observed redshifts, and the indices of the points in the lightcone.
+    The points of the box are processed in chunks of ``chunk_size``, so that the memory
+    used does not exceed the size of a chunk and of the lightcone points in the shell.
+    Only the replicas of the box that intersect the shell are considered.
+
+    Parameters
+    ----------
+    sample : array_like
+        Npts x 3 numpy array containing 3-D positions of points in Mpc/h,
+        between 0 and ``period``.
+        Alternatively, a list of such arrays with one entry per shell,
+        e.g., the snapshots of a simulation closest to the redshift of each shell.
+        See the :ref:`mock_obs_pos_formatting` documentation page for
+        instructions on how to transform your coordinate position arrays into the
+        format accepted by the ``sample`` argument.
+
+    period : array_like
+        Length-3 sequence defining the size of the periodic box
+        in each dimension. If you instead provide a single scalar, Lbox,
+        period is assumed to be the same in all Cartesian directions.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    distance_bins : array_like
+        Array of length *Nshells+1* storing the increasing boundaries of the shells
+        of comoving distance to the observer in Mpc/h.
+
+    velocities : array_like, optional
+        Npts x 3 numpy array containing 3-D peculiar velocities in km/s,
+        or a list of such arrays with one entry per shell if ``sample`` is a list.
+        If velocities are provided, the observed redshifts include the
+        contribution of the peculiar velocities along the line-of-sight.
+        Default is None, in which case the cosmological redshifts are returned.
+
+    cosmo : object, optional
+        Instance of an Astropy `~astropy.cosmology` object.  The default is
+        `halotools.sim_manager.sim_defaults.default_cosmology`.
+
+    observer : array_like, optional
+        Length-3 array storing the position of the observer in Mpc/h.
+        Default is (0, 0, 0).
+
+    footprint : function, optional
+        Function called as ``footprint(ra, dec)`` with arrays of
+        right ascensions and declinations in degrees, returning a boolean array
+        which is True for points within the footprint of the survey.
+        Default is None, in which case the lightcone covers the full sky.
+
+    chunk_size : int, optional
+        Number of points of the box processed at once. Default is 1e6.
+
+    Returns
+    -------
+    shells : generator
+        Generator yielding, for each shell, a tuple of four arrays storing
+        the right ascension in degrees between 0 and 360,
+        the declination in degrees between -90 and 90,
+        the observed redshift, and the index in ``sample`` of each lightcone point.
+        A point of the box can appear several times in the lightcone,
+        at the positions of different replicas of the box.
+
+    Examples
+    --------
+    For demonstration purposes we create a randomly distributed set of points within a
+    periodic box of 250 Mpc/h, and build a full-sky lightcone out to 500 Mpc/h
+    with an observer placed at the center of the box.
+
+    >>> Npts, Lbox = 1000, 250.
+    >>> sample = np.random.uniform(0, Lbox, Npts*3).reshape((Npts, 3))
+    >>> velocities = np.random.normal(0, 300, Npts*3).reshape((Npts, 3))
+    >>> distance_bins = np.array((0., 250., 500.))
+    >>> observer = (Lbox/2., Lbox/2., Lbox/2.)
+
+    >>> for ra, dec, redshift, idx in lightcone_shells(sample, Lbox, distance_bins, velocities=velocities, observer=observer):
+    ...     pass
+
+    The positions and velocities of a mock galaxy population, e.g., ``mock.galaxy_table``,
+    can be transformed into the expected form using
+    `~halotools.mock_observables.return_xyz_formatted_array`.
+
+    See also
+    --------
+    `~halotools.mock_observables.lightcone`
+    """
+    distance_bins = _process_distance_bins(distance_bins)
+    num_shells = len(distance_bins) - 1
+    samples = _process_shell_samples(sample, num_shells, 'sample')
+    if velocities is None:
+        velocities = [None]*num_shells
+    else:
+        velocities = _process_shell_samples(velocities, num_shells, 'velocities')
+        for x, v in zip(samples, velocities):
+            if len(x) != len(v):
+                msg = "Input ``velocities`` must have the same length as ``sample``"
+                raise ValueError(msg)
+
+    period, PBCs = get_period(period)
+    if PBCs is False:
+        msg = "Input ``period`` must be provided to build a lightcone"
+        raise ValueError(msg)
+
+    if observer is None:
+        observer = np.zeros(3)
+    else:
+        observer = np.atleast_1d(observer).astype(float)
+        if observer.shape != (3, ):
+            msg = "Input ``observer`` must be a 3-element sequence"
+            raise ValueError(msg)
+
+    if cosmo is None:
+        cosmo = default_cosmology
+    # compute the distance-redshift table before streaming the shells
+    z_table, distance_table = _distance_redshift_table(cosmo)
+    if distance_bins[-1] > distance_table[-1]:
+        msg = ("Input ``distance_bins`` must not exceed the comoving distance "
+            "to z = {0}, {1:.1f} Mpc/h".format(_table_zmax, distance_table[-1]))
+        raise ValueError(msg)
+
+    c_km_s = c.to('km/s').value
+    chunk_size = int(chunk_size)
+
+    for ishell in range(num_shells):
+        dmin, dmax = distance_bins[ishell], distance_bins[ishell+1]
+        x, v = samples[ishell], velocities[ishell]
+        offsets = _replica_offsets(period, observer, dmin, dmax)
+
+        ra, dec, redshift, idx = [], [], [], []
+        for first in range(0, len(x), chunk_size):
+            xchunk = x[first:first+chunk_size] - observer
+            for offset in offsets:
+                pos = xchunk + offset
+                d_sq = np.sum(pos*pos, axis=1)
+                in_shell = (d_sq >= dmin*dmin) & (d_sq < dmax*dmax)
+                if not np.any(in_shell):
+                    continue
+                chunk_idx = np.flatnonzero(in_shell)
+                pos = pos[chunk_idx]
+                d = np.sqrt(d_sq[chunk_idx])
+                # the observer itself is placed at dec = 0
+                safe_d = np.where(d > 0, d, 1.)
+
+                chunk_ra = np.degrees(np.arctan2(pos[:, 1], pos[:, 0])) % 360.
+                chunk_dec = np.degrees(np.arcsin(pos[:, 2]/safe_d))
+
+                if footprint is not None:
+                    in_footprint = np.asarray(footprint(chunk_ra, chunk_dec), dtype=bool)
+                    chunk_idx, pos, d, safe_d = (chunk_idx[in_footprint], pos[in_footprint],
+                        d[in_footprint], safe_d[in_footprint])
+                    chunk_ra, chunk_dec = chunk_ra[in_footprint], chunk_dec[in_footprint]
+
+                z_cos = np.interp(d, distance_table, z_table)
+                if v is not None:
+                    vr = np.sum(v[first+chunk_idx]*pos, axis=1)/safe_d
+                    z_cos = z_cos + (vr/c_km_s)*(1.0 + z_cos)
+
+                ra.append(chunk_ra)
+                dec.append(chunk_dec)
+                redshift.append(z_cos)
+                idx.append(first + chunk_idx)
+
+        if len(idx) == 0:
+            yield np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0, dtype=int)
+        else:
+            yield (np.concatenate(ra), np.concatenate(dec),
+                np.concatenate(redshift), np.concatenate(idx))
+
+
+def lightcone(sample, period, distance_bins, velocities=None, cosmo=None,
+        observer=None, footprint=None, chunk_size=1000000):
+    """
+    Build a lightcone from a periodic box by placing an observer in the box
+    and replicating the box as many times as necessary.
+
+    This function concatenates the shells of comoving distance returned by
+    `~halotools.mock_observables.lightcone_shells`. See that function for a
+    description of the arguments; use it instead to process the lightcone
+    one shell at a time, or to know which box each point comes from if
+    ``sample`` is a list of boxes.
+
+    Parameters
+    ----------
+    sample : array_like
+        Npts x 3 numpy array containing 3-D positions of points in Mpc/h,
+        or a list of such arrays with one entry per shell.
+
+    period : array_like
+        Length-3 sequence defining the size of the periodic box
+        in each dimension. If you instead provide a single scalar, Lbox,
+        period is assumed to be the same in all Cartesian directions.
+
+    distance_bins : array_like
+        Array of length *Nshells+1* storing the increasing boundaries of the shells
+        of comoving distance to the observer in Mpc/h.
+
+    velocities : array_like, optional
+        Npts x 3 numpy array containing 3-D peculiar velocities in km/s,
+        or a list of such arrays with one entry per shell.
+
+    cosmo : object, optional
+        Instance of an Astropy `~astropy.cosmology` object.  The default is
+        `halotools.sim_manager.sim_defaults.default_cosmology`.
+
+    observer : array_like, optional
+        Length-3 array storing the position of the observer in Mpc/h.
+        Default is (0, 0, 0).
+
+    footprint : function, optional
+        Function called as ``footprint(ra, dec)`` with arrays of
+        right ascensions and declinations in degrees, returning a boolean array
+        which is True for points within the footprint of the survey.
+
+    chunk_size : int, optional
+        Number of points of the box processed at once. Default is 1e6.
+
+    Returns
+    -------
+    ra : np.array
+        right ascension in degrees, between 0 and 360
+
+    dec : np.array
+        declination in degrees, between -90 and 90
+
+    redshift : np.array
+        "observed" redshift
+
+    idx : np.array
+        index in ``sample`` of each lightcone point
+
+    Examples
+    --------
+    For demonstration purposes we create a randomly distributed set of points within a
+    periodic box of 250 Mpc/h, and build a lightcone out to 500 Mpc/h
+    in the northern hemisphere.
+
+    >>> Npts, Lbox = 1000, 250.
+    >>> sample = np.random.uniform(0, Lbox, Npts*3).reshape((Npts, 3))
+    >>> distance_bins = np.linspace(0, 500, 5)
+    >>> north = lambda ra, dec: dec > 0
+    >>> ra, dec, redshift, idx = lightcone(sample, Lbox, distance_bins, footprint=north)
+    """
+    result = list(lightcone_shells(sample, period, distance_bins,
+        velocities=velocities, cosmo=cosmo, observer=observer,
+        footprint=footprint, chunk_size=chunk_size))
+    ra, dec, redshift, idx = zip(*result)
+    return (np.concatenate(ra), np.concatenate(dec),
+        np.concatenate(redshift), np.concatenate(idx))
+
+
+def _replica_offsets(period, observer, dmin, dmax):
+    """ Return the offsets of the replicas of the box ``[0, period]``
+    intersecting the shell of comoving distances between ``dmin`` and ``dmax``
+    around the observer.
+    """
+    imin = np.floor((observer - dmax)/period).astype(int)
+    imax = np.floor((observer + dmax)/period).astype(int)
+    i, j, k = np.meshgrid(*[np.arange(lo, hi+1) for lo, hi in zip(imin, imax)],
+        indexing='ij')
+    offsets = np.vstack((i.flatten(), j.flatten(), k.flatten())).T*period
+
+    # corners of the replicas relative to the observer
+    lower = offsets - observer
+    upper = lower + period
+    nearest = np.clip(0., lower, upper)
+    farthest = np.maximum(np.abs(lower), np.abs(upper))
+    dist_nearest = np.sqrt(np.sum(nearest**2, axis=1))
+    dist_farthest = np.sqrt(np.sum(farthest**2, axis=1))
+
+    intersects = (dist_nearest < dmax) & (dist_farthest >= dmin)
+    return offsets[intersects]
+
+
+def _process_distance_bins(distance_bins):
+    """ Enforce that ``distance_bins`` is a 1d array of at least two
+    non-negative, increasing values.
+    """
+    distance_bins = np.atleast_1d(distance_bins).astype(float)
+    try:
+        assert distance_bins.ndim == 1
+        assert len(distance_bins) > 1
+        assert np.all(np.diff(distance_bins) > 0)
+        assert distance_bins[0] >= 0
+    except AssertionError:
+        msg = ("Input ``distance_bins`` must be a 1d array of at least two "
+            "non-negative, monotonically increasing values")
+        raise ValueError(msg)
+    return distance_bins
+
+
+def _process_shell_samples(sample, num_shells, name):
+    """ Return a list of one (Npts, 3) array for each shell from the input ``sample``,
+    which is either a single array or a list of one array for each shell.
+    """
+    if not (isinstance(sample, (list, tuple)) and np.ndim(sample[0]) == 2):
+        sample = enforce_sample_has_correct_shape(sample)
+        return [sample]*num_shells
+
+    if len(sample) != num_shells:
+        msg = ("If ``{0}`` is a list of arrays, it must have one entry for each shell "
+            "defined by ``distance_bins``".format(name))
+        raise ValueError(msg)
+    return [enforce_sample_has_correct_shape(s) for s in sample]
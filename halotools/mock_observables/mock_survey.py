@@ -5,10 +5,11 @@ create a mock redshift survey given a mock with galaxy positions and velocities.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import numpy as np
-from scipy.interpolate import interp1d
 from astropy import cosmology
 from astropy.constants import c  # the speed of light
 
+from .lightcone import comoving_distance_to_redshift
+
 
 __all__ = ('ra_dec_z', )
 __author__ = ['Duncan Campbell']
@@ -88,10 +89,7 @@ def ra_dec_z(x, v, cosmo=None):
     vr = v[:, 0]*st*cp + v[:, 1]*st*sp + v[:, 2]*ct
 
     # compute cosmological redshift and add contribution from perculiar velocity
-    yy = np.arange(0, 1.0, 0.001)
-    xx = cosmo.comoving_distance(yy).value
-    f = interp1d(xx, yy, kind='cubic')
-    z_cos = f(r)
+    z_cos = comoving_distance_to_redshift(r*cosmo.h, cosmo=cosmo)
     redshift = z_cos+(vr/c_km_s)*(1.0+z_cos)
 
     # calculate spherical coordinates
@@ -11,5 +11,9 @@ from .marked_npairs_xy_z import marked_npairs_xy_z
 from .npairs_jackknife_3d import npairs_jackknife_3d
 from .npairs_s_mu import npairs_s_mu
 from .npairs_per_object_3d import npairs_per_object_3d
+from .npairs_same_group_3d import npairs_same_group_3d
+from .npairs_angular import npairs_angular
 from .pairwise_distance_3d import pairwise_distance_3d
 from .pairwise_distance_xy_z import pairwise_distance_xy_z
+from .nearest_neighbors_3d import nearest_neighbors_3d
+from .nearest_neighbors_xy_z import nearest_neighbors_xy_z
@@ -9,5 +9,9 @@ from .npairs_xy_z_engine import npairs_xy_z_engine
 from .npairs_jackknife_3d_engine import npairs_jackknife_3d_engine
 from .npairs_s_mu_engine import npairs_s_mu_engine
 from .npairs_per_object_3d_engine import npairs_per_object_3d_engine
+from .npairs_same_group_3d_engine import npairs_same_group_3d_engine
+from .npairs_angular_engine import npairs_angular_engine
 from .pairwise_distance_3d_engine import pairwise_distance_3d_engine
 from .pairwise_distance_xy_z_engine import pairwise_distance_xy_z_engine
+from .nearest_neighbors_3d_engine import nearest_neighbors_3d_engine
+from .nearest_neighbors_xy_z_engine import nearest_neighbors_xy_z_engine
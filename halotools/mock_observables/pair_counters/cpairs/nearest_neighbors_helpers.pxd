@@ -0,0 +1,43 @@
+""" Inline helpers shared by the nearest_neighbors_3d and nearest_neighbors_xy_z engines,
+which search the cells of a mesh in shells of increasing size.
+"""
+cimport cython
+cimport numpy as cnp
+from libc.math cimport INFINITY
+
+
+@cython.cdivision(True)
+cdef inline (int, int) offset_range(int ishell, int icell, int num_divs, int PBCs):
+    """ Range of cell offsets from ``icell`` covered by a shell of size ``ishell``.
+    With periodic boundaries, the range is truncated to ``num_divs`` distinct cells;
+    without, it is truncated to the cells of the mesh.
+    """
+    cdef int lo, hi
+    if PBCs:
+        if 2*ishell + 1 > num_divs:
+            lo = -((num_divs-1) // 2)
+            hi = lo + num_divs - 1
+        else:
+            lo, hi = -ishell, ishell
+    else:
+        lo = max(-ishell, -icell)
+        hi = min(ishell, num_divs - 1 - icell)
+    return lo, hi
+
+
+cdef inline cnp.float64_t gap_to_unsearched_cells(cnp.float64_t x, int ishell,
+        int icell, int num_divs, cnp.float64_t cell_size, int PBCs):
+    """ Distance along one dimension from ``x`` to the nearest cell not yet searched
+    by a shell of size ``ishell``, or infinity if all cells have been searched.
+    """
+    cdef cnp.float64_t gap = INFINITY
+    if PBCs:
+        if 2*ishell + 1 < num_divs:
+            gap = min(x - (icell - ishell)*cell_size, (icell + ishell + 1)*cell_size - x)
+    else:
+        if icell - ishell > 0:
+            gap = x - (icell - ishell)*cell_size
+        if icell + ishell < num_divs - 1:
+            gap = min(gap, (icell + ishell + 1)*cell_size - x)
+    # points on the upper edge of the mesh are assigned to the last cell
+    return max(gap, 0.)
@@ -0,0 +1,216 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.math cimport INFINITY, floor
+
+from .nearest_neighbors_helpers cimport offset_range, gap_to_unsearched_cells
+
+__all__ = ('nearest_neighbors_xy_z_engine', )
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+@cython.cdivision(True)
+def nearest_neighbors_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        num_neighbors, rp_max, pi_max, return_indices, cell1_tuple):
+    """ Cython engine for finding the ``num_neighbors`` points in sample 2
+    with the smallest separation in the xy-plane from each point in sample 1,
+    considering only points whose separation in the z-dimension is at most ``pi_max``.
+
+    For each point in sample 1, the columns of cells of ``double_mesh.mesh2``
+    within ``pi_max`` in the z-dimension are searched in square shells of increasing size
+    in the xy-plane centered on the cell containing the point.
+    The search terminates as soon as the ``num_neighbors`` nearest points found so far
+    are all closer than the nearest edge of the searched region, or as soon as
+    all remaining cells lie beyond the ``rp_max`` of the point.
+
+    Parameters
+    ------------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 1
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 2
+
+    num_neighbors : int
+        Number of nearest neighbors to find for each point in sample 1.
+
+    rp_max : array
+        Array of length *Npts1* storing the maximum separation in the xy-plane between
+        each point in sample 1 and its neighbors.
+
+    pi_max : array
+        Array of length *Npts1* storing the maximum separation in the z-dimension between
+        each point in sample 1 and its neighbors.
+
+    return_indices : bool
+        If False, the indices of the neighbors are not stored.
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over. Intended for use with
+        python multiprocessing.
+
+    Returns
+    --------
+    distances : array
+        Array of shape (Npts, num_neighbors) storing the xy-plane separations between
+        the *Npts* points of sample 1 in the cells defined by ``cell1_tuple``
+        and their nearest neighbors, in increasing order.
+        Rows are ordered as the points in ``double_mesh.mesh1.idx_sorted``.
+        If fewer than ``num_neighbors`` points lie within the cylinder defined by
+        ``rp_max`` and ``pi_max``, the missing entries are np.inf.
+
+    indices : array
+        Integer array of shape (Npts, num_neighbors) storing the index in sample 2
+        of each neighbor, or -1 for missing neighbors.
+        If ``return_indices`` is False, an array of shape (0, num_neighbors) is returned instead.
+    """
+    cdef int k = num_neighbors
+    cdef bint store_indices = return_indices
+    cdef cnp.float64_t xperiod = double_mesh.xperiod
+    cdef cnp.float64_t yperiod = double_mesh.yperiod
+    cdef cnp.float64_t zperiod = double_mesh.zperiod
+    cdef cnp.float64_t half_xperiod = xperiod/2.
+    cdef cnp.float64_t half_yperiod = yperiod/2.
+    cdef cnp.float64_t half_zperiod = zperiod/2.
+    cdef int PBCs = double_mesh._PBCs
+
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t ifirst1 = cell1_indices[cell1_tuple[0]]
+    cdef cnp.int64_t ilast1 = cell1_indices[cell1_tuple[1]]
+    cdef cnp.int64_t Npts = ilast1 - ifirst1
+
+    idx1_sorted = double_mesh.mesh1.idx_sorted[ifirst1:ilast1]
+    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[idx1_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[idx1_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[idx1_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] rp_max_squared = np.ascontiguousarray(
+        np.asarray(rp_max, dtype=np.float64)[idx1_sorted]**2)
+    cdef cnp.float64_t[:] pi_max1 = np.ascontiguousarray(
+        np.asarray(pi_max, dtype=np.float64)[idx1_sorted])
+    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.int64_t[:] idx2_sorted = np.ascontiguousarray(double_mesh.mesh2.idx_sorted, dtype=np.int64)
+
+    cdef cnp.float64_t[:, :] dsq_neighbors = np.zeros((Npts, k), dtype=np.float64) + np.inf
+    cdef cnp.int64_t[:, :] idx_neighbors
+    if store_indices:
+        idx_neighbors = np.zeros((Npts, k), dtype=np.int64) - 1
+    else:
+        idx_neighbors = np.zeros((0, k), dtype=np.int64)
+
+    cdef int num_x2divs = double_mesh.mesh2.num_xdivs
+    cdef int num_y2divs = double_mesh.mesh2.num_ydivs
+    cdef int num_z2divs = double_mesh.mesh2.num_zdivs
+    cdef cnp.float64_t xcell2_size = double_mesh.mesh2.xcell_size
+    cdef cnp.float64_t ycell2_size = double_mesh.mesh2.ycell_size
+    cdef cnp.float64_t zcell2_size = double_mesh.mesh2.zcell_size
+
+    cdef cnp.int64_t i, j, ifirst2, ilast2, icell2
+    cdef int m, ishell, ix2c, iy2c, ix2, iy2, iz2, ox, oy, oz
+    cdef int xlo, xhi, ylo, yhi, zlo, zhi
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp, rp_max_squared_tmp, pi_max_tmp
+    cdef cnp.float64_t dx, dy, dz, dsq, bound, gap
+
+    for i in range(Npts):
+        x1tmp = x1[i]
+        y1tmp = y1[i]
+        z1tmp = z1[i]
+        rp_max_squared_tmp = rp_max_squared[i]
+        pi_max_tmp = pi_max1[i]
+
+        # cell of mesh2 containing the point in the xy-plane
+        ix2c = min(max(<int>(x1tmp/xcell2_size), 0), num_x2divs-1)
+        iy2c = min(max(<int>(y1tmp/ycell2_size), 0), num_y2divs-1)
+
+        # range of cells of mesh2 within pi_max in the z-dimension
+        zlo = <int>floor((z1tmp - pi_max_tmp)/zcell2_size)
+        zhi = <int>floor((z1tmp + pi_max_tmp)/zcell2_size)
+        if PBCs:
+            if zhi - zlo + 1 > num_z2divs:
+                zlo, zhi = 0, num_z2divs - 1
+        else:
+            zlo = max(zlo, 0)
+            zhi = min(zhi, num_z2divs - 1)
+
+        ishell = 0
+        while True:
+            # range of cell offsets searched so far in each dimension,
+            # never visiting the same cell twice
+            xlo, xhi = offset_range(ishell, ix2c, num_x2divs, PBCs)
+            ylo, yhi = offset_range(ishell, iy2c, num_y2divs, PBCs)
+
+            for ox in range(xlo, xhi+1):
+                ix2 = (ix2c + ox + num_x2divs) % num_x2divs
+                for oy in range(ylo, yhi+1):
+                    # only the columns on the surface of the shell are new
+                    if max(abs(ox), abs(oy)) != ishell:
+                        continue
+                    iy2 = (iy2c + oy + num_y2divs) % num_y2divs
+
+                    for oz in range(zlo, zhi+1):
+                        iz2 = (oz + num_z2divs) % num_z2divs
+
+                        icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                        ifirst2 = cell2_indices[icell2]
+                        ilast2 = cell2_indices[icell2+1]
+
+                        for j in range(ifirst2, ilast2):
+                            dx = x1tmp - x2[j]
+                            dy = y1tmp - y2[j]
+                            dz = z1tmp - z2[j]
+                            if PBCs:
+                                if dx > half_xperiod:
+                                    dx = dx - xperiod
+                                elif dx < -half_xperiod:
+                                    dx = dx + xperiod
+                                if dy > half_yperiod:
+                                    dy = dy - yperiod
+                                elif dy < -half_yperiod:
+                                    dy = dy + yperiod
+                                if dz > half_zperiod:
+                                    dz = dz - zperiod
+                                elif dz < -half_zperiod:
+                                    dz = dz + zperiod
+                            if abs(dz) > pi_max_tmp:
+                                continue
+                            dsq = dx*dx + dy*dy
+
+                            if (dsq <= rp_max_squared_tmp) & (dsq < dsq_neighbors[i, k-1]):
+                                # insertion into the sorted list of neighbors
+                                m = k-1
+                                while m > 0:
+                                    if dsq_neighbors[i, m-1] <= dsq:
+                                        break
+                                    dsq_neighbors[i, m] = dsq_neighbors[i, m-1]
+                                    if store_indices:
+                                        idx_neighbors[i, m] = idx_neighbors[i, m-1]
+                                    m = m-1
+                                dsq_neighbors[i, m] = dsq
+                                if store_indices:
+                                    idx_neighbors[i, m] = idx2_sorted[j]
+
+            # lower bound on the xy-separation of any point in the columns not yet searched
+            bound = INFINITY
+            gap = gap_to_unsearched_cells(x1tmp, ishell, ix2c, num_x2divs, xcell2_size, PBCs)
+            bound = min(bound, gap)
+            gap = gap_to_unsearched_cells(y1tmp, ishell, iy2c, num_y2divs, ycell2_size, PBCs)
+            bound = min(bound, gap)
+
+            if bound*bound > rp_max_squared_tmp:
+                break
+            elif dsq_neighbors[i, k-1] <= bound*bound:
+                break
+            ishell = ishell + 1
+
+    return np.sqrt(np.asarray(dsq_neighbors)), np.asarray(idx_neighbors)
@@ -0,0 +1,161 @@
+"""
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.math cimport floor
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+__all__ = ('npairs_angular_engine', )
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def npairs_angular_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, chord_bins, cell1_tuple):
+    """ Cython engine for counting pairs of points on the sky as a function of
+    angular separation.
+
+    Parameters
+    ------------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.pair_counters.spherical_mesh.SphericalDoubleMesh`
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing Cartesian coordinates on the unit sphere of points in sample 1
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing Cartesian coordinates on the unit sphere of points in sample 2
+
+    chord_bins : array
+        Boundaries defining the bins in which pairs are counted, given as
+        the lengths of the chords between points on the unit sphere.
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over. Intended for use with
+        python multiprocessing.
+
+    Returns
+    --------
+    counts : array
+        Integer array of length len(chord_bins) giving the number of pairs
+        separated by a chord less than the corresponding entry of ``chord_bins``.
+
+    """
+    cdef cnp.float64_t[:] chord_bins_squared = chord_bins*chord_bins
+    cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
+    cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
+
+    cdef int num_chord_bins = len(chord_bins)
+    cdef cnp.int64_t[:] counts = np.zeros(num_chord_bins, dtype=np.int64)
+
+    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+
+    cdef cnp.int64_t icell1, icell2
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
+
+    cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2
+
+    cdef int num_dec_divs = double_mesh.num_dec_divs
+    cdef cnp.int64_t[:] num_ra_divs = np.ascontiguousarray(double_mesh.num_ra_divs, dtype=np.int64)
+    cdef cnp.int64_t[:] first_cell_in_stripe = np.ascontiguousarray(
+        double_mesh.first_cell_in_stripe, dtype=np.int64)
+    cdef cnp.float64_t[:] ra_search_length = np.ascontiguousarray(
+        double_mesh.ra_search_length, dtype=np.float64)
+
+    cdef int idec1, idec2, ira1, ira2, nonwrapped_ira2
+    cdef int num_ra2_divs, leftmost_ira2, rightmost_ira2
+    cdef cnp.float64_t ra1_cell_size, ra2_cell_size, dra, ra_min, ra_max
+
+    cdef cnp.float64_t dx, dy, dz, dsq
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp
+    cdef int Ni, Nj, i, j, k
+
+    cdef cnp.float64_t[:] x_icell1, x_icell2
+    cdef cnp.float64_t[:] y_icell1, y_icell2
+    cdef cnp.float64_t[:] z_icell1, z_icell2
+
+    # find the stripe of declination of the first cell
+    idec1 = 0
+    while (idec1 < num_dec_divs-1) & (first_cell_in_stripe[idec1+1] <= first_cell1_element):
+        idec1 += 1
+
+    for icell1 in range(first_cell1_element, last_cell1_element):
+        while first_cell_in_stripe[idec1+1] <= icell1:
+            idec1 += 1
+
+        ifirst1 = cell1_indices[icell1]
+        ilast1 = cell1_indices[icell1+1]
+        x_icell1 = x1[ifirst1:ilast1]
+        y_icell1 = y1[ifirst1:ilast1]
+        z_icell1 = z1[ifirst1:ilast1]
+
+        Ni = ilast1 - ifirst1
+        if Ni > 0:
+
+            ira1 = icell1 - first_cell_in_stripe[idec1]
+            ra1_cell_size = 360./num_ra_divs[idec1]
+            dra = ra_search_length[idec1]
+            ra_min = ira1*ra1_cell_size - dra
+            ra_max = (ira1+1)*ra1_cell_size + dra
+
+            # the stripes are at least as high as the search angle
+            for idec2 in range(max(idec1-1, 0), min(idec1+2, num_dec_divs)):
+                num_ra2_divs = num_ra_divs[idec2]
+                ra2_cell_size = 360./num_ra2_divs
+
+                if dra < 0:
+                    # the search region contains a pole
+                    leftmost_ira2 = 0
+                    rightmost_ira2 = num_ra2_divs
+                else:
+                    leftmost_ira2 = <int>floor(ra_min/ra2_cell_size)
+                    rightmost_ira2 = <int>floor(ra_max/ra2_cell_size) + 1
+                    if rightmost_ira2 - leftmost_ira2 >= num_ra2_divs:
+                        leftmost_ira2 = 0
+                        rightmost_ira2 = num_ra2_divs
+
+                for nonwrapped_ira2 in range(leftmost_ira2, rightmost_ira2):
+                    # wrap around in right ascension
+                    ira2 = nonwrapped_ira2 % num_ra2_divs
+                    if ira2 < 0:
+                        ira2 = ira2 + num_ra2_divs
+
+                    icell2 = first_cell_in_stripe[idec2] + ira2
+                    ifirst2 = cell2_indices[icell2]
+                    ilast2 = cell2_indices[icell2+1]
+
+                    x_icell2 = x2[ifirst2:ilast2]
+                    y_icell2 = y2[ifirst2:ilast2]
+                    z_icell2 = z2[ifirst2:ilast2]
+
+                    Nj = ilast2 - ifirst2
+                    #loop over points in cell1 points
+                    if Nj > 0:
+                        for i in range(0,Ni):
+                            x1tmp = x_icell1[i]
+                            y1tmp = y_icell1[i]
+                            z1tmp = z_icell1[i]
+                            #loop over points in cell2 points
+                            for j in range(0,Nj):
+                                #calculate the square chord
+                                dx = x1tmp - x_icell2[j]
+                                dy = y1tmp - y_icell2[j]
+                                dz = z1tmp - z_icell2[j]
+                                dsq = dx*dx + dy*dy + dz*dz
+
+                                k = num_chord_bins-1
+                                while dsq <= chord_bins_squared[k]:
+                                    counts[k] += 1
+                                    k=k-1
+                                    if k<0: break
+
+    return np.array(counts)
@@ -5,7 +5,9 @@ PATH_TO_PKG = os.path.relpath(os.path.dirname(__file__))
 SOURCES = ("distances.pyx", "pairwise_distances.pyx",
     "npairs_3d_engine.pyx", "npairs_projected_engine.pyx",
     "npairs_xy_z_engine.pyx", "npairs_jackknife_3d_engine.pyx", "npairs_s_mu_engine.pyx",
-    "pairwise_distance_3d_engine.pyx", "pairwise_distance_xy_z_engine.pyx")
+    "pairwise_distance_3d_engine.pyx", "pairwise_distance_xy_z_engine.pyx",
+    "nearest_neighbors_3d_engine.pyx", "nearest_neighbors_xy_z_engine.pyx",
+    "npairs_same_group_3d_engine.pyx", "npairs_angular_engine.pyx")
 THIS_PKG_NAME = '.'.join(__name__.split('.')[:-1])
 
 
@@ -38,8 +38,12 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
         weighting function integer ID. 
 
     weights1in : array 
+        Numpy array of shape (Npts1, num_mark_sets, num_weights) 
+        storing the weights for points in sample 1
 
     weights2in : array 
+        Numpy array of shape (Npts2, num_mark_sets, num_weights) 
+        storing the weights for points in sample 2
 
     rp_bins : array_like
         numpy array of boundaries defining the bins of separation in the xy-plane 
@@ -56,8 +60,10 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     Returns 
     --------
     counts : array 
-        Integer array of length len(rp_bins) giving the number of pairs 
-        separated by a distance less than the corresponding entry of ``rp_bins``. 
+        Array of shape (num_mark_sets, len(rp_bins), len(pi_bins)) giving, 
+        for each set of weights, the weighted number of pairs separated by distances 
+        less than the corresponding entries of ``rp_bins`` and ``pi_bins``. 
+        All sets of weights are evaluated in the same pass over the pairs. 
 
     """
     cdef int weight_func_id = weight_func_idin
@@ -77,7 +83,8 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef int Ncell1 = double_mesh.mesh1.ncells
     cdef int num_rp_bins = len(rp_bins)
     cdef int num_pi_bins = len(pi_bins)
-    cdef cnp.float64_t[:,:] counts = np.zeros((num_rp_bins, num_pi_bins), dtype=np.float64)
+    cdef int num_mark_sets = weights1in.shape[1]
+    cdef cnp.float64_t[:,:,:] counts = np.zeros((num_mark_sets, num_rp_bins, num_pi_bins), dtype=np.float64)
 
     cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
@@ -85,8 +92,8 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:, :] weights1 = np.ascontiguousarray(weights1in[double_mesh.mesh1.idx_sorted,:], dtype=np.float64)
-    cdef cnp.float64_t[:, :] weights2 = np.ascontiguousarray(weights2in[double_mesh.mesh2.idx_sorted,:], dtype=np.float64)
+    cdef cnp.float64_t[:, :, :] weights1 = np.ascontiguousarray(weights1in[double_mesh.mesh1.idx_sorted,:,:], dtype=np.float64)
+    cdef cnp.float64_t[:, :, :] weights2 = np.ascontiguousarray(weights2in[double_mesh.mesh2.idx_sorted,:,:], dtype=np.float64)
 
     cdef cnp.int64_t icell1, icell2
     cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
@@ -125,7 +132,7 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef cnp.float64_t[:] x_icell1, x_icell2
     cdef cnp.float64_t[:] y_icell1, y_icell2
     cdef cnp.float64_t[:] z_icell1, z_icell2
-    cdef cnp.float64_t[:,:] w_icell1, w_icell2
+    cdef cnp.float64_t[:,:,:] w_icell1, w_icell2
 
     for icell1 in range(first_cell1_element, last_cell1_element):
 
@@ -138,7 +145,7 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
         z_icell1 = z1[ifirst1:ilast1]
 
         #extract the weights in cell1
-        w_icell1 = weights1[ifirst1:ilast1,:]
+        w_icell1 = weights1[ifirst1:ilast1,:,:]
 
         Ni = ilast1 - ifirst1
         if Ni > 0:
@@ -195,7 +202,7 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                         z_icell2 = z2[ifirst2:ilast2]
 
                         #extract the weights in cell2
-                        w_icell2 = weights2[ifirst2:ilast2,:]
+                        w_icell2 = weights2[ifirst2:ilast2,:,:]
 
                         Nj = ilast2 - ifirst2
                         #loop over points in cell1 points
@@ -213,18 +220,26 @@ def marked_npairs_xy_z_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                                     dxy_sq = dx*dx + dy*dy
                                     dz_sq = dz*dz
 
-                                    weight = wfunc(&w_icell1[i,0], &w_icell2[j,0])
+                                    #find the smallest bins enclosing the pair
                                     k = num_rp_bins-1
                                     while dxy_sq<=rp_bins_squared[k]:
-                                        g = num_pi_bins-1
-                                        while dz_sq<=pi_bins_squared[g]:
-                                            counts[k,g] += weight
-                                            g=g-1
-                                            if g<0: break
                                         k=k-1
                                         if k<0: break
-                                        
-    return np.array(counts)
+                                    k = k+1
+                                    g = num_pi_bins-1
+                                    while dz_sq<=pi_bins_squared[g]:
+                                        g=g-1
+                                        if g<0: break
+                                    g = g+1
+
+                                    #weight the pair by every set of marks
+                                    if (k < num_rp_bins) & (g < num_pi_bins):
+                                        for l in range(num_mark_sets):
+                                            weight = wfunc(&w_icell1[i,l,0], &w_icell2[j,l,0])
+                                            counts[l,k,g] += weight
+
+    #each pair was only counted in the smallest enclosing bins
+    return np.cumsum(np.cumsum(np.asarray(counts), axis=1), axis=2)
 
 
 cdef f_type return_weighting_function(weight_func_id):
@@ -59,11 +59,15 @@ def marked_npairs_3d(sample1, sample2, rbins,
         Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
         None, the weights are set to np.ones(*(N1,N_weights)*).
+        Alternatively, a 3-D array of shape *N1* x *N_mark_sets* x *N_weights*
+        storing *N_mark_sets* different sets of weights, all of which are
+        evaluated in a single pass over the pairs. See Notes.
 
     weights2 : array_like, optional
-        Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
+        Either a 1-D array of length *N2*, or a 2-D array of length *N2* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
-        None, the weights are set to np.ones(*(N1,N_weights)*).
+        None, the weights are set to np.ones(*(N2,N_weights)*).
+        Alternatively, a 3-D array of shape *N2* x *N_mark_sets* x *N_weights*.
 
     weight_func_id : int, optional
         weighting function integer ID. Each weighting function requires a specific
@@ -97,7 +101,18 @@ def marked_npairs_3d(sample1, sample2, rbins,
     Returns
     -------
     wN_pairs : numpy.array
-        array of length *Nrbins* containing the weighted number counts of pairs
+        array of length *Nrbins* containing the weighted number counts of pairs.
+        If either ``weights1`` or ``weights2`` is 3-D, the returned array has shape
+        *N_mark_sets* x *Nrbins*, storing the weighted counts of each set of weights.
+
+    Notes
+    -----
+    Passing 3-D weights is much faster than calling `marked_npairs_3d` once
+    for each set of weights, since the positions of the points are shared by
+    all sets of weights and the pairs are only found once, e.g., when computing
+    the randomized normalization of `~halotools.mock_observables.marked_tpcf`.
+    If only one of ``weights1`` and ``weights2`` is 3-D, the other
+    is used for every set of weights.
 
     Examples
     --------
@@ -126,6 +141,13 @@ def marked_npairs_3d(sample1, sample2, rbins,
 
     >>> result = marked_npairs_3d(sample1, sample2, rbins, period = period, weights1 = weights1, weights2 = weights2, weight_func_id=1)
 
+    To count the pairs weighted by five random shuffles of ``weights2`` in one pass:
+
+    >>> shuffled_weights2 = np.array([np.random.permutation(weights2) for i in range(5)]).T
+    >>> shuffled_weights2 = shuffled_weights2.reshape((Npts2, 5, 1))
+    >>> result = marked_npairs_3d(sample1, sample2, rbins, period = period, weights1 = weights1, weights2 = shuffled_weights2, weight_func_id=1)
+    >>> assert result.shape == (5, len(rbins))
+
     """
 
     result = _npairs_3d_process_args(sample1, sample2, rbins, period,
@@ -140,6 +162,8 @@ def marked_npairs_3d(sample1, sample2, rbins,
     # Process the input weights and with the helper function
     weights1, weights2 = _marked_npairs_process_weights(sample1, sample2,
             weights1, weights2, weight_func_id)
+    weights1, weights2, _multiple_mark_sets = _marked_npairs_stack_mark_sets(
+        weights1, weights2)
 
     # Compute the estimates for the cell sizes
     approx_cell1_size, approx_cell2_size = (
@@ -171,7 +195,10 @@ def marked_npairs_3d(sample1, sample2, rbins,
     else:
         counts = engine(cell1_tuples[0])
 
-    return np.array(counts)
+    if _multiple_mark_sets is True:
+        return np.array(counts)
+    else:
+        return np.array(counts[0])
 
 
 def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_func_id):
@@ -196,20 +223,20 @@ def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_
             _converted_to_2d_from_1d = True
             npts1 = len(weights1)
             weights1 = weights1.reshape((npts1, 1))
-        elif weights1.ndim == 2:
+        elif weights1.ndim in (2, 3):
             pass
         else:
             ndim1 = weights1.ndim
-            msg = ("\n You must either pass in a 1-D or 2-D array \n"
+            msg = ("\n You must either pass in a 1-D, 2-D or 3-D array \n"
                    "for the input `weights1`. Instead, an array of \n"
                    "dimension %i was received.")
             raise HalotoolsError(msg % ndim1)
 
     npts_weights1 = np.shape(weights1)[0]
-    num_weights1 = np.shape(weights1)[1]
-    # At this point, weights1 is guaranteed to be a 2-d ndarray
+    num_weights1 = np.shape(weights1)[-1]
+    # At this point, weights1 is guaranteed to be a 2-d or 3-d ndarray
     # now we check its shape
-    if np.shape(weights1) != correct_shape1:
+    if (npts_weights1, num_weights1) != correct_shape1:
         if _converted_to_2d_from_1d is True:
             msg = ("\n You passed in a 1-D array for `weights1` that \n"
                    "does not have the correct length. The number of \n"
@@ -217,13 +244,14 @@ def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_
                    "in your input 1-D `weights1` array = %i")
             raise HalotoolsError(msg % (npts_sample1, npts_weights1))
         else:
-            msg = ("\n You passed in a 2-D array for `weights1` that \n"
+            msg = ("\n You passed in a %i-D array for `weights1` that \n"
                    "does not have a consistent shape with `sample1`. \n"
                    "`sample1` has length %i. The input value of `weight_func_id` = %i \n"
                    "For this value of `weight_func_id`, there should be %i weights \n"
-                   "per point. The shape of your input `weights1` is (%i, %i)\n")
+                   "per point. The shape of your input `weights1` is %s\n")
             raise HalotoolsError(msg %
-                (npts_sample1, weight_func_id, correct_num_weights, npts_weights1, num_weights1))
+                (weights1.ndim, npts_sample1, weight_func_id, correct_num_weights,
+                str(np.shape(weights1))))
 
     # Process the input weights2
     _converted_to_2d_from_1d = False
@@ -237,20 +265,20 @@ def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_
             _converted_to_2d_from_1d = True
             npts2 = len(weights2)
             weights2 = weights2.reshape((npts2, 1))
-        elif weights2.ndim == 2:
+        elif weights2.ndim in (2, 3):
             pass
         else:
             ndim2 = weights2.ndim
-            msg = ("\n You must either pass in a 1-D or 2-D array \n"
+            msg = ("\n You must either pass in a 1-D, 2-D or 3-D array \n"
                    "for the input `weights2`. Instead, an array of \n"
                    "dimension %i was received.")
             raise HalotoolsError(msg % ndim2)
 
     npts_weights2 = np.shape(weights2)[0]
-    num_weights2 = np.shape(weights2)[1]
-    # At this point, weights2 is guaranteed to be a 2-d ndarray
+    num_weights2 = np.shape(weights2)[-1]
+    # At this point, weights2 is guaranteed to be a 2-d or 3-d ndarray
     # now we check its shape
-    if np.shape(weights2) != correct_shape2:
+    if (npts_weights2, num_weights2) != correct_shape2:
         if _converted_to_2d_from_1d is True:
             msg = ("\n You passed in a 1-D array for `weights2` that \n"
                    "does not have the correct length. The number of \n"
@@ -258,17 +286,48 @@ def _marked_npairs_process_weights(sample1, sample2, weights1, weights2, weight_
                    "in your input 1-D `weights2` array = %i")
             raise HalotoolsError(msg % (npts_sample2, npts_weights2))
         else:
-            msg = ("\n You passed in a 2-D array for `weights2` that \n"
+            msg = ("\n You passed in a %i-D array for `weights2` that \n"
                    "does not have a consistent shape with `sample2`. \n"
                    "`sample2` has length %i. The input value of `weight_func_id` = %i \n"
                    "For this value of `weight_func_id`, there should be %i weights \n"
-                   "per point. The shape of your input `weights2` is (%i, %i)\n")
+                   "per point. The shape of your input `weights2` is %s\n")
             raise HalotoolsError(msg %
-                (npts_sample2, weight_func_id, correct_num_weights, npts_weights2, num_weights2))
+                (weights2.ndim, npts_sample2, weight_func_id, correct_num_weights,
+                str(np.shape(weights2))))
 
     return weights1, weights2
 
 
+def _marked_npairs_stack_mark_sets(weights1, weights2):
+    """
+    Reshape the processed weights into the 3-D arrays of shape
+    (Npts, N_mark_sets, N_weights) expected by the marked pair counting engines.
+    Also return a boolean indicating whether either input was 3-D,
+    in which case the counts of each set of weights are returned separately.
+    """
+    _multiple_mark_sets = (weights1.ndim == 3) or (weights2.ndim == 3)
+
+    if weights1.ndim == 2:
+        weights1 = weights1[:, np.newaxis, :]
+    if weights2.ndim == 2:
+        weights2 = weights2[:, np.newaxis, :]
+
+    num_mark_sets1, num_mark_sets2 = weights1.shape[1], weights2.shape[1]
+    if (num_mark_sets1 != num_mark_sets2) and (1 not in (num_mark_sets1, num_mark_sets2)):
+        msg = ("\n The 3-D arrays `weights1` and `weights2` must store \n"
+               "the same number of sets of weights. \n"
+               "`weights1` stores %i sets, while `weights2` stores %i sets.\n")
+        raise HalotoolsError(msg % (num_mark_sets1, num_mark_sets2))
+    num_mark_sets = max(num_mark_sets1, num_mark_sets2)
+
+    weights1 = np.broadcast_to(weights1,
+        (weights1.shape[0], num_mark_sets, weights1.shape[2]))
+    weights2 = np.broadcast_to(weights2,
+        (weights2.shape[0], num_mark_sets, weights2.shape[2]))
+
+    return weights1, weights2, _multiple_mark_sets
+
+
 def _func_signature_int_from_wfunc(weight_func_id):
     """
     Return the function signature available weighting functions.
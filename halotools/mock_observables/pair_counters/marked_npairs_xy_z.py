@@ -6,7 +6,7 @@ import numpy as np
 import multiprocessing
 from functools import partial
 
-from .marked_npairs_3d import _marked_npairs_process_weights
+from .marked_npairs_3d import _marked_npairs_process_weights, _marked_npairs_stack_mark_sets
 from .npairs_xy_z import _npairs_xy_z_process_args
 from .mesh_helpers import _set_approximate_cell_sizes, _cell1_parallelization_indices
 from .rectangular_mesh import RectangularDoubleMesh
@@ -65,11 +65,16 @@ def marked_npairs_xy_z(sample1, sample2, rp_bins, pi_bins,
         Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
         None, the weights are set to np.ones(*(N1,N_weights)*).
+        Alternatively, a 3-D array of shape *N1* x *N_mark_sets* x *N_weights*
+        storing *N_mark_sets* different sets of weights, all of which are
+        evaluated in a single pass over the pairs.
+        See `~halotools.mock_observables.marked_npairs_3d`.
 
     weights2 : array_like, optional
-        Either a 1-D array of length *N1*, or a 2-D array of length *N1* x *N_weights*,
+        Either a 1-D array of length *N2*, or a 2-D array of length *N2* x *N_weights*,
         containing the weights used for the weighted pair counts. If this parameter is
-        None, the weights are set to np.ones(*(N1,N_weights)*).
+        None, the weights are set to np.ones(*(N2,N_weights)*).
+        Alternatively, a 3-D array of shape *N2* x *N_mark_sets* x *N_weights*.
 
     wfunc : int, optional
         weighting function integer ID. Each weighting function requires a specific
@@ -104,7 +109,8 @@ def marked_npairs_xy_z(sample1, sample2, rp_bins, pi_bins,
     -------
     wN_pairs : numpy.ndarray
         2-D array of shape *(Nrp_bins,Npi_bins)* containing the weighted number
-        counts of pairs
+        counts of pairs. If either ``weights1`` or ``weights2`` is 3-D,
+        the returned array has shape *(N_mark_sets,Nrp_bins,Npi_bins)*.
     """
 
     # Process the inputs with the helper function
@@ -121,6 +127,8 @@ def marked_npairs_xy_z(sample1, sample2, rp_bins, pi_bins,
     # Process the input weights and with the helper function
     weights1, weights2 = _marked_npairs_process_weights(sample1, sample2,
             weights1, weights2, weight_func_id)
+    weights1, weights2, _multiple_mark_sets = _marked_npairs_stack_mark_sets(
+        weights1, weights2)
 
     # Compute the estimates for the cell sizes
     approx_cell1_size, approx_cell2_size = (
@@ -152,4 +160,7 @@ def marked_npairs_xy_z(sample1, sample2, rp_bins, pi_bins,
     else:
         counts = engine(cell1_tuples[0])
 
-    return np.array(counts)
+    if _multiple_mark_sets is True:
+        return np.array(counts)
+    else:
+        return np.array(counts[0])
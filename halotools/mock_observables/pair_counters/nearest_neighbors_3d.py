@@ -0,0 +1,294 @@
+""" Module containing the `~halotools.mock_observables.nearest_neighbors_3d` function
+used to find the nearest neighbors of a set of points.
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from .rectangular_mesh import RectangularDoubleMesh, default_max_cells_per_dimension_cell2
+from .mesh_helpers import _enclose_in_box, _cell1_parallelization_indices, _enforce_maximum_search_length
+from .cpairs import nearest_neighbors_3d_engine
+from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
+    enforce_sample_respects_pbcs, get_num_threads, get_period)
+from ...utils.array_utils import unsorting_indices
+
+
+__all__ = ('nearest_neighbors_3d', )
+
+
+def nearest_neighbors_3d(sample1, sample2, r_max, num_neighbors=1, period=None,
+        num_threads=1, approx_cell1_size=None, approx_cell2_size=None,
+        return_indices=True):
+    """
+    Function finds the ``num_neighbors`` points in ``sample2`` that are nearest
+    to each point in ``sample1``, considering only neighbors closer than ``r_max``.
+
+    Each point of ``sample1`` only searches the cells of the mesh surrounding it
+    until its ``num_neighbors`` nearest points have been found, so that the cost
+    of the calculation is nearly independent of ``r_max``.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+        See the :ref:`mock_obs_pos_formatting` documentation page, or the
+        Examples section below, for instructions on how to transform
+        your coordinate position arrays into the
+        format accepted by the ``sample1`` and ``sample2`` arguments.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    sample2 : array_like
+        Npts2 x 3 array containing 3-D positions of points.
+
+    r_max : array_like
+        Maximum distance between a point in ``sample1`` and its neighbors.
+        If a single float is given, ``r_max`` is assumed to be the same for each point in
+        ``sample1``. You may optionally pass in an array of length *Npts1*, in which case
+        each point in ``sample1`` will have its own maximum search radius.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    num_neighbors : int, optional
+        Number of nearest neighbors to find for each point in ``sample1``. Default is 1.
+
+    period : array_like, optional
+        Length-3 array defining the periodic boundary conditions.
+        If only one number is specified, the enclosing volume is assumed to
+        be a periodic cube (by far the most common case).
+        If period is set to None, the default option,
+        PBCs are set to infinity.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the calculation should use all available cores on the machine.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        Default choice is to use the largest value of ``r_max`` in each dimension.
+
+    approx_cell2_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for sample2.
+        Default choice is the side length of the cube containing ``num_neighbors``
+        points of ``sample2`` on average, which will return reasonable
+        performance for most use-cases.
+
+    return_indices : bool, optional
+        If False, only the distances are computed and returned. Default is True.
+
+    Returns
+    -------
+    distances : array_like
+        Numpy array of shape (Npts1, num_neighbors) storing the distances between
+        each point in ``sample1`` and its nearest neighbors in ``sample2``,
+        in increasing order. If fewer than ``num_neighbors`` points of ``sample2``
+        lie within ``r_max`` of a point, the missing entries are set to np.inf.
+
+    indices : array_like
+        Integer array of shape (Npts1, num_neighbors) storing the indices
+        of the nearest neighbors in ``sample2``, or -1 for missing neighbors.
+        Only returned if ``return_indices`` is True.
+
+    Notes
+    -----
+    If a point in ``sample1`` is also a member of ``sample2``, e.g., when passing in
+    the same sample twice, the point is its own nearest neighbor at zero distance.
+    In this case, use ``num_neighbors + 1`` and discard the first column of the result.
+
+    Examples
+    --------
+    For illustration purposes, we'll create some fake data and find the
+    three nearest neighbors of each point:
+
+    >>> Npts1, Npts2, Lbox = 1000, 1000, 250.
+    >>> period = [Lbox, Lbox, Lbox]
+
+    >>> x1 = np.random.uniform(0, Lbox, Npts1)
+    >>> y1 = np.random.uniform(0, Lbox, Npts1)
+    >>> z1 = np.random.uniform(0, Lbox, Npts1)
+    >>> x2 = np.random.uniform(0, Lbox, Npts2)
+    >>> y2 = np.random.uniform(0, Lbox, Npts2)
+    >>> z2 = np.random.uniform(0, Lbox, Npts2)
+
+    We transform our *x, y, z* points into the array shape used by the pair-counter by
+    taking the transpose of the result of `numpy.vstack`. This boilerplate transformation
+    is used throughout the `~halotools.mock_observables` sub-package:
+
+    >>> sample1 = np.vstack([x1, y1, z1]).T
+    >>> sample2 = np.vstack([x2, y2, z2]).T
+
+    >>> distances, indices = nearest_neighbors_3d(sample1, sample2, 50., num_neighbors=3, period=period)
+
+    The distance to the third-nearest neighbor of each point is ``distances[:, 2]``,
+    and the position of that neighbor is ``sample2[indices[:, 2]]``.
+    """
+    # Process the inputs with the helper function
+    result = _nearest_neighbors_3d_process_args(sample1, sample2, r_max, num_neighbors,
+            period, num_threads, approx_cell1_size, approx_cell2_size)
+    x1in, y1in, z1in, x2in, y2in, z2in = result[0:6]
+    r_max, max_r_max, num_neighbors, period, num_threads, PBCs = result[6:12]
+    approx_cell1_size, approx_cell2_size, max_cells_per_dimension_cell2 = result[12:]
+    xperiod, yperiod, zperiod = period
+
+    search_xlength, search_ylength, search_zlength = max_r_max, max_r_max, max_r_max
+
+    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
+
+    # Build the rectangular mesh
+    double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
+        approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+        approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs,
+        max_cells_per_dimension_cell2=max_cells_per_dimension_cell2)
+
+    # Create a function object that has a single argument, for parallelization purposes
+    engine = partial(nearest_neighbors_3d_engine,
+        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        num_neighbors, r_max, return_indices)
+
+    # Calculate the cell1 indices that will be looped over by the engine
+    num_threads, cell1_tuples = _cell1_parallelization_indices(
+        double_mesh.mesh1.ncells, num_threads)
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, cell1_tuples)
+        pool.close()
+    else:
+        result = [engine(cell1_tuples[0])]
+
+    return _unsort_neighbors(result, double_mesh, return_indices)
+
+
+def _unsort_neighbors(result, double_mesh, return_indices):
+    """ Stack the neighbors returned by each call to a nearest neighbor engine,
+    undoing the sorting of the points of sample1 by the mesh.
+    """
+    idx_unsorted = unsorting_indices(double_mesh.mesh1.idx_sorted)
+    distances = np.vstack([r[0] for r in result])[idx_unsorted, :]
+    if return_indices:
+        indices = np.vstack([r[1] for r in result])[idx_unsorted, :]
+        return distances, indices
+    else:
+        return distances
+
+
+def _get_search_radius(npts1, search_radius, name):
+    """ Process the maximum search radius of a nearest neighbor calculation,
+    returning an array of length ``npts1`` after verifying that all entries
+    are bounded positive numbers.
+    """
+    search_radius = np.atleast_1d(search_radius).astype(float)
+
+    if len(search_radius) == 1:
+        search_radius = np.zeros(npts1) + search_radius[0]
+    else:
+        try:
+            assert search_radius.shape == (npts1, )
+        except AssertionError:
+            msg = "Input ``{0}`` must be the same length as ``sample1``.".format(name)
+            raise ValueError(msg)
+
+    try:
+        assert np.all(search_radius < np.inf)
+        assert np.all(search_radius > 0)
+    except AssertionError:
+        msg = "Input ``{0}`` must be an array of bounded positive numbers.".format(name)
+        raise ValueError(msg)
+
+    return search_radius
+
+
+def _get_num_neighbors(num_neighbors):
+    """ Verify that the input ``num_neighbors`` is a positive integer.
+    """
+    try:
+        assert int(num_neighbors) == num_neighbors
+        num_neighbors = int(num_neighbors)
+        assert num_neighbors > 0
+    except (TypeError, ValueError, AssertionError):
+        msg = "Input ``num_neighbors`` must be a positive integer"
+        raise ValueError(msg)
+    return num_neighbors
+
+
+def _get_approx_cell_size(approx_cell_size, default):
+    """ Process the input approximate size of the cells of a mesh,
+    returning a length-3 array.
+    """
+    if approx_cell_size is None:
+        approx_cell_size = default
+    approx_cell_size = np.atleast_1d(approx_cell_size).astype(float)
+    if len(approx_cell_size) == 1:
+        approx_cell_size = np.zeros(3) + approx_cell_size[0]
+
+    try:
+        assert approx_cell_size.shape == (3, )
+        assert np.all(approx_cell_size > 0)
+    except AssertionError:
+        msg = ("Input approximate cell sizes must be a positive scalar or length-3 sequence.\n")
+        raise ValueError(msg)
+    return approx_cell_size
+
+
+def _max_cells_per_dimension_cell2(period, approx_cell2_size):
+    """ Maximum number of cells of mesh2 per dimension.
+
+    The cost of a nearest neighbor search scales with the number of points per cell,
+    so mesh2 is allowed to be finer than in the pair counters
+    whenever ``approx_cell2_size`` requires it.
+    """
+    ndivs = int(np.max(np.floor(period/approx_cell2_size)))
+    return max(default_max_cells_per_dimension_cell2, ndivs)
+
+
+def _nearest_neighbors_3d_process_args(sample1, sample2, r_max, num_neighbors,
+        period, num_threads, approx_cell1_size, approx_cell2_size):
+    """ Private function to process the arguments for the
+    `~halotools.mock_observables.nearest_neighbors_3d` function.
+    """
+    num_threads = get_num_threads(num_threads)
+
+    sample1 = enforce_sample_has_correct_shape(sample1)
+    sample2 = enforce_sample_has_correct_shape(sample2)
+
+    r_max = _get_search_radius(len(sample1), r_max, 'r_max')
+    max_r_max = np.amax(r_max)
+    num_neighbors = _get_num_neighbors(num_neighbors)
+
+    period, PBCs = get_period(period)
+    # At this point, period may still be set to None,
+    # in which case we must remap our points inside the smallest enclosing cube
+    # and set ``period`` equal to this cube size.
+    if period is None:
+        x1, y1, z1, x2, y2, z2, period = (
+            _enclose_in_box(
+                sample1[:, 0], sample1[:, 1], sample1[:, 2],
+                sample2[:, 0], sample2[:, 1], sample2[:, 2],
+                min_size=[max_r_max*3.0, max_r_max*3.0, max_r_max*3.0]))
+    else:
+        x1 = sample1[:, 0]
+        y1 = sample1[:, 1]
+        z1 = sample1[:, 2]
+        x2 = sample2[:, 0]
+        y2 = sample2[:, 1]
+        z2 = sample2[:, 2]
+
+    _enforce_maximum_search_length(max_r_max, period)
+
+    enforce_sample_respects_pbcs(x1, y1, z1, period)
+    enforce_sample_respects_pbcs(x2, y2, z2, period)
+
+    approx_cell1_size = _get_approx_cell_size(approx_cell1_size, max_r_max)
+    # cells containing num_neighbors points of sample2 on average
+    cell2_volume = np.prod(period)*num_neighbors/float(max(len(x2), 1))
+    approx_cell2_size = _get_approx_cell_size(approx_cell2_size, cell2_volume**(1./3))
+    max_cells_per_dimension_cell2 = _max_cells_per_dimension_cell2(period, approx_cell2_size)
+
+    return (x1, y1, z1, x2, y2, z2,
+        r_max, max_r_max, num_neighbors, period, num_threads, PBCs,
+        approx_cell1_size, approx_cell2_size, max_cells_per_dimension_cell2)
@@ -0,0 +1,220 @@
+""" Module containing the `~halotools.mock_observables.nearest_neighbors_xy_z` function
+used to find the nearest neighbors of a set of points in projection.
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from .rectangular_mesh import RectangularDoubleMesh
+from .mesh_helpers import _enclose_in_box, _cell1_parallelization_indices, _enforce_maximum_search_length
+from .cpairs import nearest_neighbors_xy_z_engine
+from .nearest_neighbors_3d import (_unsort_neighbors, _get_search_radius,
+    _get_num_neighbors, _get_approx_cell_size, _max_cells_per_dimension_cell2)
+from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
+    enforce_sample_respects_pbcs, get_num_threads, get_period)
+
+
+__all__ = ('nearest_neighbors_xy_z', )
+
+
+def nearest_neighbors_xy_z(sample1, sample2, rp_max, pi_max, num_neighbors=1, period=None,
+        num_threads=1, approx_cell1_size=None, approx_cell2_size=None,
+        return_indices=True):
+    """
+    Function finds the ``num_neighbors`` points in ``sample2`` with the smallest
+    separation in the xy-plane from each point in ``sample1``, considering only
+    neighbors inside the cylinder of radius ``rp_max`` and half-length ``pi_max``
+    centered on the point, with the z-dimension as the line-of-sight.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+        See the :ref:`mock_obs_pos_formatting` documentation page, or the
+        Examples section below, for instructions on how to transform
+        your coordinate position arrays into the
+        format accepted by the ``sample1`` and ``sample2`` arguments.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    sample2 : array_like
+        Npts2 x 3 array containing 3-D positions of points.
+
+    rp_max : array_like
+        Maximum separation in the xy-plane between a point in ``sample1``
+        and its neighbors.
+        If a single float is given, ``rp_max`` is assumed to be the same for each point in
+        ``sample1``. You may optionally pass in an array of length *Npts1*, in which case
+        each point in ``sample1`` will have its own maximum search radius.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    pi_max : array_like
+        Maximum separation in the z-dimension between a point in ``sample1``
+        and its neighbors.
+        If a single float is given, ``pi_max`` is assumed to be the same for each point in
+        ``sample1``. You may optionally pass in an array of length *Npts1*, in which case
+        each point in ``sample1`` will have its own maximum search length.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    num_neighbors : int, optional
+        Number of nearest neighbors to find for each point in ``sample1``. Default is 1.
+
+    period : array_like, optional
+        Length-3 array defining the periodic boundary conditions.
+        If only one number is specified, the enclosing volume is assumed to
+        be a periodic cube (by far the most common case).
+        If period is set to None, the default option,
+        PBCs are set to infinity.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the calculation should use all available cores on the machine.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        Default choice is to use the largest values of
+        ``rp_max``, ``rp_max`` and ``pi_max`` in the three dimensions.
+
+    approx_cell2_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for sample2.
+        Default choice is the size of the cells in the xy-plane for which a column
+        of length 2 ``pi_max`` contains ``num_neighbors`` points of ``sample2``
+        on average, and ``pi_max`` in the z-dimension.
+
+    return_indices : bool, optional
+        If False, only the distances are computed and returned. Default is True.
+
+    Returns
+    -------
+    distances : array_like
+        Numpy array of shape (Npts1, num_neighbors) storing the separations in the
+        xy-plane between each point in ``sample1`` and its nearest neighbors
+        in ``sample2``, in increasing order. If fewer than ``num_neighbors`` points
+        of ``sample2`` lie inside the cylinder of a point,
+        the missing entries are set to np.inf.
+
+    indices : array_like
+        Integer array of shape (Npts1, num_neighbors) storing the indices
+        of the nearest neighbors in ``sample2``, or -1 for missing neighbors.
+        Only returned if ``return_indices`` is True.
+
+    Examples
+    --------
+    For illustration purposes, we'll create some fake data and find the
+    nearest neighbor of each point in projection:
+
+    >>> Npts1, Npts2, Lbox = 1000, 1000, 250.
+    >>> period = [Lbox, Lbox, Lbox]
+
+    >>> x1 = np.random.uniform(0, Lbox, Npts1)
+    >>> y1 = np.random.uniform(0, Lbox, Npts1)
+    >>> z1 = np.random.uniform(0, Lbox, Npts1)
+    >>> x2 = np.random.uniform(0, Lbox, Npts2)
+    >>> y2 = np.random.uniform(0, Lbox, Npts2)
+    >>> z2 = np.random.uniform(0, Lbox, Npts2)
+
+    We transform our *x, y, z* points into the array shape used by the pair-counter by
+    taking the transpose of the result of `numpy.vstack`. This boilerplate transformation
+    is used throughout the `~halotools.mock_observables` sub-package:
+
+    >>> sample1 = np.vstack([x1, y1, z1]).T
+    >>> sample2 = np.vstack([x2, y2, z2]).T
+
+    >>> rp_distances, indices = nearest_neighbors_xy_z(sample1, sample2, 50., 20., period=period)
+    """
+    # Process the inputs with the helper function
+    result = _nearest_neighbors_xy_z_process_args(sample1, sample2, rp_max, pi_max,
+            num_neighbors, period, num_threads, approx_cell1_size, approx_cell2_size)
+    x1in, y1in, z1in, x2in, y2in, z2in = result[0:6]
+    rp_max, max_rp_max, pi_max, max_pi_max, num_neighbors, period, num_threads, PBCs = result[6:14]
+    approx_cell1_size, approx_cell2_size, max_cells_per_dimension_cell2 = result[14:]
+    xperiod, yperiod, zperiod = period
+
+    search_xlength, search_ylength, search_zlength = max_rp_max, max_rp_max, max_pi_max
+
+    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
+
+    # Build the rectangular mesh
+    double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
+        approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+        approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs,
+        max_cells_per_dimension_cell2=max_cells_per_dimension_cell2)
+
+    # Create a function object that has a single argument, for parallelization purposes
+    engine = partial(nearest_neighbors_xy_z_engine,
+        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        num_neighbors, rp_max, pi_max, return_indices)
+
+    # Calculate the cell1 indices that will be looped over by the engine
+    num_threads, cell1_tuples = _cell1_parallelization_indices(
+        double_mesh.mesh1.ncells, num_threads)
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, cell1_tuples)
+        pool.close()
+    else:
+        result = [engine(cell1_tuples[0])]
+
+    return _unsort_neighbors(result, double_mesh, return_indices)
+
+
+def _nearest_neighbors_xy_z_process_args(sample1, sample2, rp_max, pi_max, num_neighbors,
+        period, num_threads, approx_cell1_size, approx_cell2_size):
+    """ Private function to process the arguments for the
+    `~halotools.mock_observables.nearest_neighbors_xy_z` function.
+    """
+    num_threads = get_num_threads(num_threads)
+
+    sample1 = enforce_sample_has_correct_shape(sample1)
+    sample2 = enforce_sample_has_correct_shape(sample2)
+
+    rp_max = _get_search_radius(len(sample1), rp_max, 'rp_max')
+    pi_max = _get_search_radius(len(sample1), pi_max, 'pi_max')
+    max_rp_max = np.amax(rp_max)
+    max_pi_max = np.amax(pi_max)
+    num_neighbors = _get_num_neighbors(num_neighbors)
+
+    period, PBCs = get_period(period)
+    # At this point, period may still be set to None,
+    # in which case we must remap our points inside the smallest enclosing cube
+    # and set ``period`` equal to this cube size.
+    if period is None:
+        x1, y1, z1, x2, y2, z2, period = (
+            _enclose_in_box(
+                sample1[:, 0], sample1[:, 1], sample1[:, 2],
+                sample2[:, 0], sample2[:, 1], sample2[:, 2],
+                min_size=[max_rp_max*3.0, max_rp_max*3.0, max_pi_max*3.0]))
+    else:
+        x1 = sample1[:, 0]
+        y1 = sample1[:, 1]
+        z1 = sample1[:, 2]
+        x2 = sample2[:, 0]
+        y2 = sample2[:, 1]
+        z2 = sample2[:, 2]
+
+    _enforce_maximum_search_length(max_rp_max, period[0])
+    _enforce_maximum_search_length(max_rp_max, period[1])
+    _enforce_maximum_search_length(max_pi_max, period[2])
+
+    enforce_sample_respects_pbcs(x1, y1, z1, period)
+    enforce_sample_respects_pbcs(x2, y2, z2, period)
+
+    approx_cell1_size = _get_approx_cell_size(approx_cell1_size,
+        [max_rp_max, max_rp_max, max_pi_max])
+    # columns of length 2*pi_max containing num_neighbors points of sample2 on average
+    column_area = (np.prod(period)*num_neighbors/float(max(len(x2), 1))/
+        min(2*max_pi_max, period[2]))
+    approx_cell2_size = _get_approx_cell_size(approx_cell2_size,
+        [np.sqrt(column_area), np.sqrt(column_area), max_pi_max])
+    max_cells_per_dimension_cell2 = _max_cells_per_dimension_cell2(period, approx_cell2_size)
+
+    return (x1, y1, z1, x2, y2, z2,
+        rp_max, max_rp_max, pi_max, max_pi_max, num_neighbors, period, num_threads, PBCs,
+        approx_cell1_size, approx_cell2_size, max_cells_per_dimension_cell2)
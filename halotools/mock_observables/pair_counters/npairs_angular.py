@@ -0,0 +1,159 @@
+""" Module containing the `~halotools.mock_observables.npairs_angular` function
+used to count pairs of points on the sky as a function of angular separation.
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from .spherical_mesh import SphericalDoubleMesh
+from .mesh_helpers import _cell1_parallelization_indices
+from .cpairs import npairs_angular_engine
+
+from ..mock_observables_helpers import enforce_sample_has_correct_shape, get_num_threads
+from ...utils.array_utils import array_is_monotonic
+from ...utils.spherical_geometry import spherical_to_cartesian, chord_to_cartesian
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+
+__all__ = ('npairs_angular', )
+
+# area of the sky in square degrees
+_full_sky_area = 4*np.pi*(180./np.pi)**2
+
+
+def npairs_angular(sample1, sample2, theta_bins, verbose=False, num_threads=1,
+        approx_cell_size=None):
+    """
+    Function counts the number of pairs of points on the sky separated by
+    an angle smaller than the input ``theta_bins``.
+
+    The points are placed in cells of a mesh on the sky, made of stripes of declination
+    divided into cells of right ascension, and only the cells
+    that can contain points within the largest angle of ``theta_bins`` are compared.
+    The cost of the calculation thus scales with the number of pairs
+    of points closer than this angle, with no restriction on its value.
+
+    Note that if sample1 == sample2 that the
+    `~halotools.mock_observables.npairs_angular` function double-counts pairs.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 2 numpy array containing the right ascension and declination
+        of the points in degrees.
+
+    sample2 : array_like
+        Npts2 x 2 numpy array containing the right ascension and declination
+        of the points in degrees.
+
+    theta_bins : array_like
+        Boundaries in degrees defining the bins in which pairs are counted.
+
+    verbose : Boolean, optional
+        If True, print out information and progress.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the pair counters should use all available cores on the machine.
+
+    approx_cell_size : float, optional
+        Approximate size in degrees of the cells into which the sky will be divided.
+        The cells are never smaller than the largest angle of ``theta_bins``.
+        Default choice is to use cells containing about 10 points of sample2
+        for uniformly distributed points.
+        Performance can vary sensitively with this parameter, so it is highly
+        recommended that you experiment with this parameter when carrying out
+        performance-critical calculations.
+
+    Returns
+    -------
+    num_pairs : array_like
+        Numpy array of length len(theta_bins) storing the numbers of pairs
+        separated by an angle smaller than the input ``theta_bins``.
+
+    Examples
+    --------
+    For demonstration purposes we create randomly distributed sets of points on the sky.
+
+    >>> from halotools.utils import sample_spherical_surface
+    >>> sample1 = sample_spherical_surface(1000)
+    >>> sample2 = sample_spherical_surface(1000)
+    >>> theta_bins = np.logspace(-1, 1, 10)
+
+    >>> result = npairs_angular(sample1, sample2, theta_bins)
+    """
+    result = _npairs_angular_process_args(sample1, sample2, theta_bins,
+        verbose, num_threads, approx_cell_size)
+    ra1, dec1, ra2, dec2, theta_bins, num_threads, approx_cell_size = result
+    theta_max = np.max(theta_bins)
+
+    x1, y1, z1 = spherical_to_cartesian(ra1, dec1)
+    x2, y2, z2 = spherical_to_cartesian(ra2, dec2)
+    chord_bins = chord_to_cartesian(theta_bins, radians=False)
+
+    # Build the mesh on the sky
+    double_mesh = SphericalDoubleMesh(ra1, dec1, ra2, dec2, theta_max, approx_cell_size)
+
+    # Create a function object that has a single argument, for parallelization purposes
+    engine = partial(npairs_angular_engine,
+        double_mesh, x1, y1, z1, x2, y2, z2, chord_bins)
+
+    # Calculate the cell1 indices that will be looped over by the engine
+    num_threads, cell1_tuples = _cell1_parallelization_indices(
+        double_mesh.mesh1.ncells, num_threads)
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, cell1_tuples)
+        counts = np.sum(np.array(result), axis=0)
+        pool.close()
+    else:
+        counts = engine(cell1_tuples[0])
+
+    return np.array(counts)
+
+
+def _npairs_angular_process_args(sample1, sample2, theta_bins,
+        verbose, num_threads, approx_cell_size):
+    """
+    """
+    num_threads = get_num_threads(num_threads)
+
+    sample1 = enforce_sample_has_correct_shape(sample1, ndim=2)
+    sample2 = enforce_sample_has_correct_shape(sample2, ndim=2)
+    ra1, dec1 = sample1[:, 0].astype(float), sample1[:, 1].astype(float)
+    ra2, dec2 = sample2[:, 0].astype(float), sample2[:, 1].astype(float)
+
+    try:
+        assert np.all(np.abs(dec1) <= 90.)
+        assert np.all(np.abs(dec2) <= 90.)
+    except AssertionError:
+        msg = "The declinations of the input samples must be between -90 and 90 degrees"
+        raise ValueError(msg)
+
+    theta_bins = np.atleast_1d(theta_bins).astype('f8')
+    try:
+        assert theta_bins.ndim == 1
+        assert len(theta_bins) > 1
+        if len(theta_bins) > 2:
+            assert array_is_monotonic(theta_bins, strict=True) == 1
+        assert np.min(theta_bins) >= 0
+        assert np.max(theta_bins) <= 180.
+    except AssertionError:
+        msg = ("Input ``theta_bins`` must be a monotonically increasing 1D array "
+            "with at least two entries between 0 and 180 degrees")
+        raise ValueError(msg)
+
+    if approx_cell_size is None:
+        approx_cell_size = np.sqrt(10*_full_sky_area/max(len(ra2), 1))
+
+    if verbose is True:
+        print("Counting pairs of {0} and {1} points on the sky "
+            "separated by less than {2} degrees".format(len(ra1), len(ra2), np.max(theta_bins)))
+
+    return ra1, dec1, ra2, dec2, theta_bins, num_threads, approx_cell_size
@@ -21,7 +21,7 @@ def npairs_s_mu(sample1, sample2, s_bins, mu_bins, period=None,
         verbose=False, num_threads=1, approx_cell1_size=None, approx_cell2_size=None):
     """
     Function counts the number of pairs of points separated by less than
-    radial separation, *s,* and :math:`\\mu\\equiv\\sin(\\theta_{\\rm los})`,
+    radial separation, *s,* and :math:`\\mu\\equiv\\cos(\\theta_{\\rm los})`,
     where :math:`\\theta_{\\rm los}` is the line-of-sight angle
     between points and :math:`s^2 = r_{\\rm parallel}^2 + r_{\\rm perp}^2`.
 
@@ -58,9 +58,6 @@ def npairs_s_mu(sample1, sample2, s_bins, mu_bins, period=None,
         numpy array of :math:`\\cos(\\theta_{\\rm LOS})` boundaries defining the bins in
         which pairs are counted, and must be between [0,1].
 
-        Note that using the sine is not common convention for
-        calculating the two point correlation function (see notes).
-
     period : array_like, optional
         Length-3 sequence defining the periodic boundary conditions
         in each dimension. If you instead provide a single scalar, Lbox,
@@ -98,11 +95,8 @@ def npairs_s_mu(sample1, sample2, s_bins, mu_bins, period=None,
 
     Notes
     ------
-    The quantity :math:`\\mu` is defined as the :math:`\\sin(\\theta_{\\rm los})`
-    and not the conventional :math:`\\cos(\\theta_{\\rm los})`. This is
-    because the pair counter has been optimized under the assumption that its
-    separation variable (in this case, :math:`\\mu`) *increases*
-    as :math:`\\theta_{\\rm los})` increases.
+    The quantity :math:`\\mu` is defined as :math:`\\cos(\\theta_{\\rm los})
+    = r_{\\parallel}/s`, so that pairs along the line-of-sight have :math:`\\mu = 1`.
 
     One final point of clarification concerning double-counting may be in order.
     Suppose sample1==sample2 and rbins[0]==0. Then the returned value for this bin
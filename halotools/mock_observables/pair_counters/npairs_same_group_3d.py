@@ -0,0 +1,179 @@
+""" Module containing the `~halotools.mock_observables.npairs_same_group_3d` function
+used to count pairs as a function of separation, separately for pairs of points
+belonging to the same group and to different groups.
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from .rectangular_mesh import RectangularDoubleMesh
+from .mesh_helpers import _set_approximate_cell_sizes, _cell1_parallelization_indices
+from .cpairs import npairs_same_group_3d_engine
+from .npairs_3d import _npairs_3d_process_args
+
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+
+__all__ = ('npairs_same_group_3d', )
+
+
+def npairs_same_group_3d(sample1, sample2, rbins, group_ids1, group_ids2, period=None,
+        verbose=False, num_threads=1,
+        approx_cell1_size=None, approx_cell2_size=None):
+    """
+    Function counts the number of pairs of points separated by
+    a three-dimensional distance smaller than the input ``rbins``,
+    separately for pairs of points with equal and with different group IDs.
+
+    The group ID of a point can be the ID of its host halo, in which case
+    the two returned arrays count the one-halo and two-halo pairs,
+    or e.g., the ID of the friends-of-friends group it belongs to.
+    Both sets of pairs are counted in a single pass,
+    and the group IDs are compared as integers, so that the result is exact
+    for any 64-bit ID.
+
+    As in `~halotools.mock_observables.npairs_3d`, pairs are double-counted
+    if sample1 == sample2, and the counts are cumulative.
+    The sum of the two returned arrays is equal to the result of
+    `~halotools.mock_observables.npairs_3d`.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+        See the :ref:`mock_obs_pos_formatting` documentation page, or the
+        Examples section below, for instructions on how to transform
+        your coordinate position arrays into the
+        format accepted by the ``sample1`` and ``sample2`` arguments.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    sample2 : array_like
+        Npts2 x 3 array containing 3-D positions of points.
+
+    rbins : array_like
+        Boundaries defining the bins in which pairs are counted.
+
+    group_ids1 : array_like
+        Integer array of length Npts1 storing the group ID of each point in ``sample1``.
+
+    group_ids2 : array_like
+        Integer array of length Npts2 storing the group ID of each point in ``sample2``.
+
+    period : array_like, optional
+        Length-3 sequence defining the periodic boundary conditions
+        in each dimension. If you instead provide a single scalar, Lbox,
+        period is assumed to be the same in all Cartesian directions.
+
+    verbose : Boolean, optional
+        If True, print out information and progress.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the pair counters should use all available cores on the machine.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        The optimum choice unavoidably depends on the specs of your machine.
+        Default choice is to use Lbox/10 in each dimension,
+        which will return reasonable result performance for most use-cases.
+        Performance can vary sensitively with this parameter, so it is highly
+        recommended that you experiment with this parameter when carrying out
+        performance-critical calculations.
+
+    approx_cell2_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for sample2.  See comments for
+        ``approx_cell1_size`` for details.
+
+    Returns
+    -------
+    same_group_pairs : array_like
+        Numpy array of length len(rbins) storing the numbers of pairs of points
+        with equal group IDs in the input bins.
+
+    different_group_pairs : array_like
+        Numpy array of length len(rbins) storing the numbers of pairs of points
+        with different group IDs in the input bins.
+
+    Examples
+    --------
+    For demonstration purposes we create randomly distributed sets of points within a
+    periodic cube, and randomly assign them to one of 100 groups.
+
+    >>> Npts1, Npts2, Lbox = 1000, 1000, 250.
+    >>> period = [Lbox, Lbox, Lbox]
+    >>> rbins = np.logspace(-1, 1.5, 15)
+
+    >>> sample1 = np.random.uniform(0, Lbox, Npts1*3).reshape((Npts1, 3))
+    >>> sample2 = np.random.uniform(0, Lbox, Npts2*3).reshape((Npts2, 3))
+    >>> group_ids1 = np.random.randint(0, 100, Npts1)
+    >>> group_ids2 = np.random.randint(0, 100, Npts2)
+
+    >>> same_group_pairs, different_group_pairs = npairs_same_group_3d(sample1, sample2, rbins, group_ids1, group_ids2, period=period)
+    """
+
+    # Process the inputs with the helper function
+    result = _npairs_3d_process_args(sample1, sample2, rbins, period,
+            verbose, num_threads, approx_cell1_size, approx_cell2_size)
+    x1in, y1in, z1in, x2in, y2in, z2in = result[0:6]
+    rbins, period, num_threads, PBCs, approx_cell1_size, approx_cell2_size = result[6:]
+    xperiod, yperiod, zperiod = period
+
+    group_ids1 = _process_group_ids(group_ids1, len(x1in), 'group_ids1', 'sample1')
+    group_ids2 = _process_group_ids(group_ids2, len(x2in), 'group_ids2', 'sample2')
+
+    rmax = np.max(rbins)
+    search_xlength, search_ylength, search_zlength = rmax, rmax, rmax
+
+    # Compute the estimates for the cell sizes
+    approx_cell1_size, approx_cell2_size = (
+        _set_approximate_cell_sizes(approx_cell1_size, approx_cell2_size, period)
+        )
+    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
+
+    # Build the rectangular mesh
+    double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
+        approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+        approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
+
+    # Create a function object that has a single argument, for parallelization purposes
+    engine = partial(npairs_same_group_3d_engine,
+        double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, group_ids1, group_ids2, rbins)
+
+    # Calculate the cell1 indices that will be looped over by the engine
+    num_threads, cell1_tuples = _cell1_parallelization_indices(
+        double_mesh.mesh1.ncells, num_threads)
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, cell1_tuples)
+        counts = np.sum(np.array(result), axis=0)
+        pool.close()
+    else:
+        counts = engine(cell1_tuples[0])
+
+    same_group_pairs, different_group_pairs = np.array(counts)
+    return same_group_pairs, different_group_pairs
+
+
+def _process_group_ids(group_ids, npts, name, sample_name):
+    """ Enforce that the input group IDs are a 1d array of integers
+    with one entry per point of the sample.
+    """
+    group_ids = np.atleast_1d(group_ids)
+
+    if group_ids.shape != (npts, ):
+        msg = ("Input ``%s`` must be a 1d array with the same length as ``%s``")
+        raise ValueError(msg % (name, sample_name))
+
+    if not np.issubdtype(group_ids.dtype, np.integer):
+        msg = ("Input ``%s`` must be an array of integers")
+        raise ValueError(msg % name)
+
+    return group_ids.astype(np.int64)
@@ -0,0 +1,139 @@
+""" Module containing `~halotools.mock_observables.pair_counters.spherical_mesh.SphericalDoubleMesh`,
+the data structure used to optimize pairwise calculations between points on the sky.
+"""
+import numpy as np
+
+__all__ = ('SphericalDoubleMesh', )
+__author__ = ('Andrew Hearin', 'Duncan Campbell')
+
+default_max_dec_divs = 1800
+
+
+class SphericalMesh(object):
+    """ Underlying mesh structure used to place points on the sky into cells.
+
+    The sky is divided into *num_dec_divs* stripes of constant declination,
+    and each stripe is divided into cells of constant right ascension.
+    The number of cells in a stripe decreases towards the poles, so that all cells
+    have a similar area. Cells are identified by a unique integer ID increasing
+    with right ascension within each stripe, and from the south to the north pole
+    across stripes:
+
+        * (stripe 0, ra cell 0) <--> 0
+
+        * (stripe 0, ra cell 1) <--> 1
+
+        * ...
+
+        * (stripe 1, ra cell 0) <--> num_ra_divs[0]
+
+        * ...,
+
+    and so forth.
+    """
+
+    def __init__(self, ra, dec, dec_cell_size, num_ra_divs, first_cell_in_stripe):
+        """
+        Parameters
+        ----------
+        ra, dec : arrays
+            Length-*Npts* arrays containing the right ascension and declination
+            of the *Npts* points in degrees.
+
+        dec_cell_size : float
+            Height in degrees of the stripes of declination.
+
+        num_ra_divs : array
+            Number of cells of right ascension in each stripe.
+
+        first_cell_in_stripe : array
+            ID of the first cell in each stripe, with a final entry storing
+            the total number of cells.
+        """
+        self.npts = ra.shape[0]
+        self.ncells = first_cell_in_stripe[-1]
+
+        num_dec_divs = len(num_ra_divs)
+        idec = np.floor((dec + 90.)/dec_cell_size).astype(int)
+        idec = np.clip(idec, 0, num_dec_divs-1)
+
+        ra_cell_size = 360./num_ra_divs[idec]
+        ira = np.floor(np.mod(ra, 360.)/ra_cell_size).astype(int)
+        ira = np.minimum(ira, num_ra_divs[idec]-1)
+
+        cell_ids = first_cell_in_stripe[idec] + ira
+        self.idx_sorted = np.ascontiguousarray(np.argsort(cell_ids, kind='mergesort'))
+
+        cell_id_indices = np.searchsorted(cell_ids, np.arange(self.ncells),
+            sorter=self.idx_sorted)
+        cell_id_indices = np.append(cell_id_indices, self.npts)
+        self.cell_id_indices = np.ascontiguousarray(cell_id_indices, dtype=np.int64)
+
+
+class SphericalDoubleMesh(object):
+    """ Fundamental data structure of the `~halotools.mock_observables` sub-package
+    used to count pairs of points on the sky.
+    `~halotools.mock_observables.pair_counters.spherical_mesh.SphericalDoubleMesh`
+    is built from two instances of
+    `~halotools.mock_observables.pair_counters.spherical_mesh.SphericalMesh`
+    sharing the same cells.
+
+    The stripes of declination are at least as high as the search angle, so that
+    the points within the search angle of a point are found in the stripe
+    of the point and its two neighbouring stripes. Within each of these stripes,
+    only the cells within the range of right ascension that can be reached from
+    the cell of the point are searched, this range growing towards the poles.
+    """
+
+    def __init__(self, ra1, dec1, ra2, dec2, search_angle, approx_cell_size,
+            max_dec_divs=default_max_dec_divs):
+        """
+        Parameters
+        ----------
+        ra1, dec1 : arrays
+            Length-*Npts1* arrays containing the right ascension and declination
+            of the points in sample 1 in degrees.
+
+        ra2, dec2 : arrays
+            Length-*Npts2* arrays containing the right ascension and declination
+            of the points in sample 2 in degrees.
+
+        search_angle : float
+            Maximum angular separation in degrees between the pairs of points.
+
+        approx_cell_size : float
+            Approximate size of the cells in degrees. The height of the stripes
+            of declination is never smaller than ``search_angle``.
+
+        max_dec_divs : int, optional
+            Maximum number of stripes of declination.
+        """
+        self.search_angle = search_angle
+
+        num_dec_divs = int(np.floor(180./max(search_angle, approx_cell_size)))
+        self.num_dec_divs = min(max(num_dec_divs, 1), max_dec_divs)
+        self.dec_cell_size = 180./self.num_dec_divs
+
+        dec_edges = np.linspace(-90., 90., self.num_dec_divs+1)
+        max_abs_dec = np.maximum(np.abs(dec_edges[:-1]), np.abs(dec_edges[1:]))
+        cos_max_abs_dec = np.cos(np.radians(max_abs_dec))
+        num_ra_divs = np.floor(360.*cos_max_abs_dec/self.dec_cell_size).astype(np.int64)
+        self.num_ra_divs = np.ascontiguousarray(np.maximum(num_ra_divs, 1))
+        self.ra_cell_size = 360./self.num_ra_divs
+        self.first_cell_in_stripe = np.ascontiguousarray(
+            np.append(0, np.cumsum(self.num_ra_divs)), dtype=np.int64)
+
+        # half-width in right ascension of the region within search_angle
+        # of the points of each stripe, or -1 if this region contains a pole
+        sin_ratio = np.sin(np.radians(search_angle))/np.maximum(cos_max_abs_dec, 1e-300)
+        contains_pole = (max_abs_dec + search_angle >= 90.) | (sin_ratio >= 1.)
+        ra_search_length = np.degrees(np.arcsin(np.minimum(sin_ratio, 1.)))
+        # pad the search length to protect against roundoff
+        ra_search_length = ra_search_length*(1. + 1e-8) + 1e-8
+        self.ra_search_length = np.ascontiguousarray(
+            np.where(contains_pole, -1., ra_search_length))
+
+        self.mesh1 = SphericalMesh(ra1, dec1, self.dec_cell_size,
+            self.num_ra_divs, self.first_cell_in_stripe)
+        self.mesh2 = SphericalMesh(ra2, dec2, self.dec_cell_size,
+            self.num_ra_divs, self.first_cell_in_stripe)
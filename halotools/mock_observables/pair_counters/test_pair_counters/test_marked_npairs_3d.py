@@ -91,6 +91,49 @@ def test_marked_npairs_parallelization():
     assert np.allclose(serial_result, parallel_result7, rtol=1e-09), "pair counts are incorrect"
 
 
+def test_marked_npairs_3d_multiple_mark_sets():
+    """
+    Function tests that 3-D weights give the same counts as
+    calling marked_npairs_3d once for each set of weights.
+    """
+    Npts, num_mark_sets = 500, 4
+    with NumpyRNGContext(fixed_seed):
+        random_sample = np.random.random((Npts, 3))
+        ran_weights = np.random.random((Npts, num_mark_sets, 2))
+
+    period = np.array([1.0, 1.0, 1.0])
+    rbins = np.array([0.0, 0.1, 0.2, 0.3])
+
+    result = marked_npairs_3d(random_sample, random_sample,
+        rbins, period=period, weights1=ran_weights, weights2=ran_weights, weight_func_id=3,
+        num_threads=2)
+    assert result.shape == (num_mark_sets, len(rbins))
+
+    # 2-D weights1 are used for every set of weights2
+    broadcast_result = marked_npairs_3d(random_sample, random_sample,
+        rbins, period=period, weights1=ran_weights[:, 0, :], weights2=ran_weights,
+        weight_func_id=3)
+    assert broadcast_result.shape == (num_mark_sets, len(rbins))
+
+    for i in range(num_mark_sets):
+        single_result = marked_npairs_3d(random_sample, random_sample,
+            rbins, period=period, weights1=ran_weights[:, i, :], weights2=ran_weights[:, i, :],
+            weight_func_id=3)
+        assert np.allclose(result[i], single_result, rtol=1e-09), "pair counts are incorrect"
+
+        single_result = marked_npairs_3d(random_sample, random_sample,
+            rbins, period=period, weights1=ran_weights[:, 0, :], weights2=ran_weights[:, i, :],
+            weight_func_id=3)
+        assert np.allclose(broadcast_result[i], single_result, rtol=1e-09), "pair counts are incorrect"
+
+    with pytest.raises(HalotoolsError) as err:
+        __ = marked_npairs_3d(random_sample, random_sample,
+            rbins, period=period, weights1=ran_weights, weights2=ran_weights[:, :2, :],
+            weight_func_id=3)
+    substr = "must store \nthe same number of sets of weights"
+    assert substr in err.value.args[0]
+
+
 def test_marked_npairs_nonperiodic():
     """
     Function tests marked_npairs with without periodic boundary conditions.
@@ -119,6 +119,32 @@ def test_marked_npairs_parallelization():
     assert np.allclose(serial_result, parallel_result7, rtol=1e-09), "pair counts are incorrect"
 
 
+def test_marked_npairs_xy_z_multiple_mark_sets():
+    """
+    Function tests that 3-D weights give the same counts as
+    calling marked_npairs_xy_z once for each set of weights.
+    """
+    Npts, num_mark_sets = 500, 3
+    with NumpyRNGContext(fixed_seed):
+        random_sample = np.random.random((Npts, 3))
+        ran_weights = np.random.random((Npts, num_mark_sets, 1))
+
+    period = np.array([1.0, 1.0, 1.0])
+    rp_bins = np.array([0.0, 0.1, 0.2, 0.3])
+    pi_bins = np.array([0, 0.1, 0.15])
+
+    result = marked_npairs_xy_z(random_sample, random_sample,
+        rp_bins, pi_bins, period=period, weights1=ran_weights, weights2=ran_weights,
+        weight_func_id=1)
+    assert result.shape == (num_mark_sets, len(rp_bins), len(pi_bins))
+
+    for i in range(num_mark_sets):
+        single_result = marked_npairs_xy_z(random_sample, random_sample,
+            rp_bins, pi_bins, period=period, weights1=ran_weights[:, i, :],
+            weights2=ran_weights[:, i, :], weight_func_id=1)
+        assert np.allclose(result[i], single_result, rtol=1e-09), "pair counts are incorrect"
+
+
 @slow
 def test_marked_npairs_3d_wfuncs_signatures():
     """
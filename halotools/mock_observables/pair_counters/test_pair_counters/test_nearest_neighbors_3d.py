@@ -0,0 +1,131 @@
+""" Module providing testing for the
+`~halotools.mock_observables.pair_counters.nearest_neighbors_3d` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+from ..nearest_neighbors_3d import nearest_neighbors_3d
+
+__all__ = ('test_nearest_neighbors_3d_periodic', 'test_nearest_neighbors_3d_nonperiodic',
+    'test_nearest_neighbors_3d_per_point_r_max')
+
+fixed_seed = 43
+
+
+def brute_force_distances(sample1, sample2, period=None):
+    """ Matrix of distances between all pairs of points, using the minimum image convention.
+    """
+    d = np.abs(sample1[:, np.newaxis, :] - sample2[np.newaxis, :, :])
+    if period is not None:
+        period = np.zeros(3) + period
+        d = np.minimum(d, period - d)
+    return np.sqrt(np.sum(d*d, axis=-1))
+
+
+def test_nearest_neighbors_3d_periodic():
+    """ Compare the neighbors to a brute force calculation in a non-cubic periodic box.
+    """
+    period = np.array([1., 1.5, 2.])
+    npts1, npts2, k = 200, 2000, 5
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))*period
+        sample2 = np.random.random((npts2, 3))*period
+
+    distances, indices = nearest_neighbors_3d(sample1, sample2, 0.3,
+        num_neighbors=k, period=period)
+    assert distances.shape == (npts1, k)
+    assert indices.shape == (npts1, k)
+
+    dmatrix = brute_force_distances(sample1, sample2, period)
+    expected_indices = np.argsort(dmatrix, axis=1)[:, :k]
+    expected_distances = np.sort(dmatrix, axis=1)[:, :k]
+    assert np.allclose(distances, expected_distances)
+    assert np.all(indices == expected_indices)
+
+
+def test_nearest_neighbors_3d_nonperiodic():
+    """ Compare the neighbors to a brute force calculation without periodic boundaries,
+    using multiple threads.
+    """
+    npts1, npts2, k = 200, 2000, 3
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+
+    distances, indices = nearest_neighbors_3d(sample1, sample2, 0.25,
+        num_neighbors=k, num_threads=2)
+
+    dmatrix = brute_force_distances(sample1, sample2)
+    assert np.allclose(distances, np.sort(dmatrix, axis=1)[:, :k])
+    assert np.all(indices == np.argsort(dmatrix, axis=1)[:, :k])
+
+
+def test_nearest_neighbors_3d_rmax():
+    """ Verify that neighbors beyond ``rmax`` are reported as missing.
+    """
+    npts1, npts2, k, rmax = 100, 50, 4, 0.1
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+
+    distances, indices = nearest_neighbors_3d(sample1, sample2, rmax,
+        num_neighbors=k, period=1)
+
+    dmatrix = brute_force_distances(sample1, sample2, 1.)
+    expected_distances = np.sort(dmatrix, axis=1)[:, :k]
+    missing = expected_distances > rmax
+    assert np.any(missing)
+    assert np.all(distances[missing] == np.inf)
+    assert np.all(indices[missing] == -1)
+    assert np.allclose(distances[~missing], expected_distances[~missing])
+
+    distances2 = nearest_neighbors_3d(sample1, sample2, rmax,
+        num_neighbors=k, period=1, return_indices=False)
+    assert np.all(distances2 == distances)
+
+
+def test_nearest_neighbors_3d_per_point_r_max():
+    """ Verify that each point only has neighbors within its own ``r_max``.
+    """
+    npts1, npts2, k = 100, 500, 3
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+        r_max = np.random.uniform(0.05, 0.3, npts1)
+
+    distances, indices = nearest_neighbors_3d(sample1, sample2, r_max,
+        num_neighbors=k, period=1, num_threads=2)
+
+    dmatrix = brute_force_distances(sample1, sample2, 1.)
+    expected_distances = np.sort(dmatrix, axis=1)[:, :k]
+    expected_indices = np.argsort(dmatrix, axis=1)[:, :k]
+    missing = expected_distances > r_max[:, np.newaxis]
+    assert np.any(missing) & np.any(~missing)
+    assert np.all(distances[missing] == np.inf)
+    assert np.all(indices[missing] == -1)
+    assert np.allclose(distances[~missing], expected_distances[~missing])
+    assert np.all(indices[~missing] == expected_indices[~missing])
+
+
+def test_nearest_neighbors_3d_bad_args():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((10, 3))
+        sample2 = np.random.random((10, 3))
+
+    with pytest.raises(ValueError) as err:
+        nearest_neighbors_3d(sample1, sample2, 0.1, num_neighbors=0, period=1)
+    substr = "Input ``num_neighbors`` must be a positive integer"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        nearest_neighbors_3d(sample1, sample2, -0.1, period=1)
+    substr = "Input ``r_max`` must be an array of bounded positive numbers."
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        nearest_neighbors_3d(sample1, sample2, np.zeros(3) + 0.1, period=1)
+    substr = "Input ``r_max`` must be the same length as ``sample1``."
+    assert substr in err.value.args[0]
@@ -0,0 +1,103 @@
+""" Module providing testing for the
+`~halotools.mock_observables.nearest_neighbors_xy_z` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+from ..nearest_neighbors_xy_z import nearest_neighbors_xy_z
+
+__all__ = ('test_nearest_neighbors_xy_z_periodic', 'test_nearest_neighbors_xy_z_nonperiodic')
+
+fixed_seed = 43
+
+
+def brute_force_separations(sample1, sample2, period=None):
+    """ Matrices of the xy-plane and z-dimension separations between all pairs of points,
+    using the minimum image convention.
+    """
+    d = np.abs(sample1[:, np.newaxis, :] - sample2[np.newaxis, :, :])
+    if period is not None:
+        period = np.zeros(3) + period
+        d = np.minimum(d, period - d)
+    return np.sqrt(d[:, :, 0]**2 + d[:, :, 1]**2), d[:, :, 2]
+
+
+def brute_force_neighbors(sample1, sample2, rp_max, pi_max, k, period=None):
+    """ Brute force calculation of the k nearest neighbors in projection.
+    """
+    rp, pi = brute_force_separations(sample1, sample2, period)
+    rp_max = np.zeros(len(sample1)) + rp_max
+    pi_max = np.zeros(len(sample1)) + pi_max
+    outside = (pi > pi_max[:, np.newaxis]) | (rp > rp_max[:, np.newaxis])
+    rp[outside] = np.inf
+    indices = np.argsort(rp, axis=1, kind='mergesort')[:, :k]
+    distances = np.sort(rp, axis=1)[:, :k]
+    indices[distances == np.inf] = -1
+    return distances, indices
+
+
+def test_nearest_neighbors_xy_z_periodic():
+    """ Compare the neighbors to a brute force calculation in a non-cubic periodic box.
+    """
+    period = np.array([1., 1.5, 2.])
+    npts1, npts2, k = 200, 2000, 4
+    rp_max, pi_max = 0.3, 0.2
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))*period
+        sample2 = np.random.random((npts2, 3))*period
+
+    distances, indices = nearest_neighbors_xy_z(sample1, sample2, rp_max, pi_max,
+        num_neighbors=k, period=period)
+    assert distances.shape == (npts1, k)
+
+    expected_distances, expected_indices = brute_force_neighbors(
+        sample1, sample2, rp_max, pi_max, k, period)
+    assert np.all(np.isfinite(expected_distances))
+    assert np.allclose(distances, expected_distances)
+    assert np.all(indices == expected_indices)
+
+
+def test_nearest_neighbors_xy_z_nonperiodic():
+    """ Compare the neighbors to a brute force calculation without periodic boundaries,
+    with a different search cylinder for each point and multiple threads.
+    """
+    npts1, npts2, k = 200, 1000, 3
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+        rp_max = np.random.uniform(0.02, 0.2, npts1)
+        pi_max = np.random.uniform(0.02, 0.2, npts1)
+
+    distances, indices = nearest_neighbors_xy_z(sample1, sample2, rp_max, pi_max,
+        num_neighbors=k, num_threads=2)
+
+    expected_distances, expected_indices = brute_force_neighbors(
+        sample1, sample2, rp_max, pi_max, k)
+    missing = expected_distances == np.inf
+    assert np.any(missing) & np.any(~missing)
+    assert np.all(distances[missing] == np.inf)
+    assert np.allclose(distances[~missing], expected_distances[~missing])
+    assert np.all(indices == expected_indices)
+
+    distances2 = nearest_neighbors_xy_z(sample1, sample2, rp_max, pi_max,
+        num_neighbors=k, num_threads=2, return_indices=False)
+    assert np.all(distances2 == distances)
+
+
+def test_nearest_neighbors_xy_z_bad_args():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((10, 3))
+        sample2 = np.random.random((10, 3))
+
+    with pytest.raises(ValueError) as err:
+        nearest_neighbors_xy_z(sample1, sample2, 0.1, np.zeros(3) + 0.1, period=1)
+    substr = "Input ``pi_max`` must be the same length as ``sample1``."
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        nearest_neighbors_xy_z(sample1, sample2, 0.1, 0.1, num_neighbors=1.5, period=1)
+    substr = "Input ``num_neighbors`` must be a positive integer"
+    assert substr in err.value.args[0]
@@ -0,0 +1,83 @@
+""" Module providing unit-testing for the
+`~halotools.mock_observables.npairs_angular` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.tests.helper import pytest
+from astropy.utils.misc import NumpyRNGContext
+
+from ..npairs_angular import npairs_angular
+from ..pairs import npairs as pure_python_brute_force_npairs_3d
+
+from ....utils.spherical_geometry import (sample_spherical_surface,
+    spherical_to_cartesian, chord_to_cartesian)
+
+__all__ = ('test_npairs_angular_brute_force', 'test_npairs_angular_poles_and_wrapping',
+    'test_npairs_angular_bad_args')
+
+fixed_seed = 43
+
+
+def _brute_force_npairs_angular(sample1, sample2, theta_bins):
+    """ Count the pairs from the chord lengths between the points on the unit sphere.
+    """
+    x1 = np.vstack(spherical_to_cartesian(sample1[:, 0], sample1[:, 1])).T
+    x2 = np.vstack(spherical_to_cartesian(sample2[:, 0], sample2[:, 1])).T
+    chord_bins = chord_to_cartesian(theta_bins, radians=False)
+    return pure_python_brute_force_npairs_3d(x1, x2, chord_bins)
+
+
+def test_npairs_angular_brute_force():
+    """ Compare the pair counts to a brute force calculation for small and large angles,
+    cell sizes and numbers of threads.
+    """
+    sample1 = np.array(sample_spherical_surface(300, seed=fixed_seed))
+    sample2 = np.array(sample_spherical_surface(400, seed=fixed_seed+1))
+
+    for theta_bins in (np.array((1., 5., 10.)), np.array((0., 30., 100., 180.))):
+        correct_result = _brute_force_npairs_angular(sample1, sample2, theta_bins)
+        for approx_cell_size in (None, 1., 60.):
+            result = npairs_angular(sample1, sample2, theta_bins,
+                approx_cell_size=approx_cell_size)
+            assert np.all(result == correct_result)
+
+        result = npairs_angular(sample1, sample2, theta_bins, num_threads=2)
+        assert np.all(result == correct_result)
+
+
+def test_npairs_angular_poles_and_wrapping():
+    """ Verify that pairs across the poles and across ra = 0 are counted,
+    with right ascensions outside of [0, 360).
+    """
+    npts = 400
+    with NumpyRNGContext(fixed_seed):
+        ra = np.random.uniform(-20, 20, npts)
+        dec = np.concatenate((np.random.uniform(85, 90, npts//2),
+            np.random.uniform(-5, 5, npts//2)))
+    sample = np.vstack((ra, dec)).T
+    theta_bins = np.array((0.5, 2., 4., 8.))
+
+    correct_result = _brute_force_npairs_angular(sample, sample, theta_bins)
+    result = npairs_angular(sample, sample, theta_bins, approx_cell_size=0.1)
+    assert np.all(result == correct_result)
+
+    sample[:, 1] *= -1
+    result = npairs_angular(sample, sample, theta_bins, approx_cell_size=0.1)
+    assert np.all(result == correct_result)
+
+
+def test_npairs_angular_bad_args():
+    sample = np.array(sample_spherical_surface(10, seed=fixed_seed))
+
+    with pytest.raises(ValueError) as err:
+        npairs_angular(sample, sample, np.array((1., 200.)))
+    substr = "Input ``theta_bins`` must be a monotonically increasing 1D array"
+    assert substr in err.value.args[0]
+
+    bad_sample = np.copy(sample)
+    bad_sample[0, 1] = 91.
+    with pytest.raises(ValueError) as err:
+        npairs_angular(sample, bad_sample, np.array((1., 2.)))
+    substr = "The declinations of the input samples must be between -90 and 90 degrees"
+    assert substr in err.value.args[0]
@@ -0,0 +1,84 @@
+""" Module providing unit-testing for the
+`~halotools.mock_observables.npairs_same_group_3d` function.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.tests.helper import pytest
+from astropy.utils.misc import NumpyRNGContext
+
+from ..npairs_same_group_3d import npairs_same_group_3d
+from ..npairs_3d import npairs_3d
+from ..pairs import npairs as pure_python_brute_force_npairs_3d
+
+__all__ = ('test_npairs_same_group_3d_brute_force', 'test_npairs_same_group_3d_large_ids',
+    'test_npairs_same_group_3d_bad_args')
+
+fixed_seed = 43
+
+
+def test_npairs_same_group_3d_brute_force():
+    """ Compare the same-group pairs to a brute force calculation summing the pairs within
+    each group, and verify that the same- and different-group pairs add up to
+    the result of `~halotools.mock_observables.npairs_3d`, with and without PBCs.
+    """
+    npts1, npts2 = 200, 300
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((npts1, 3))
+        sample2 = np.random.random((npts2, 3))
+        group_ids1 = np.random.randint(0, 5, npts1)
+        group_ids2 = np.random.randint(0, 5, npts2)
+    rbins = np.array((0.05, 0.1, 0.2, 0.3))
+
+    for period in (1, None):
+        same, different = npairs_same_group_3d(sample1, sample2, rbins,
+            group_ids1, group_ids2, period=period, num_threads=2)
+
+        correct_same = np.zeros(len(rbins), dtype=int)
+        for group_id in range(5):
+            correct_same += pure_python_brute_force_npairs_3d(
+                sample1[group_ids1 == group_id], sample2[group_ids2 == group_id],
+                rbins, period=period)
+        assert np.all(same == correct_same)
+
+        total = npairs_3d(sample1, sample2, rbins, period=period)
+        assert np.all(same + different == total)
+
+
+def test_npairs_same_group_3d_large_ids():
+    """ Verify that group IDs which are different but equal after conversion to
+    double precision are counted as different groups.
+    """
+    npts = 200
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((npts, 3))
+        small_ids = np.random.randint(0, 2, npts)
+    large_ids = small_ids + 2**60
+    assert np.all(large_ids.astype(float) == 2.**60)
+    rbins = np.array((0.05, 0.1, 0.2))
+
+    same, different = npairs_same_group_3d(sample, sample, rbins,
+        large_ids, large_ids, period=1)
+    same2, different2 = npairs_same_group_3d(sample, sample, rbins,
+        small_ids, small_ids, period=1)
+    assert np.all(same == same2)
+    assert np.all(different == different2)
+    assert np.all(different > 0)
+
+
+def test_npairs_same_group_3d_bad_args():
+    npts = 10
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((npts, 3))
+    rbins = np.array((0.05, 0.1, 0.2))
+    group_ids = np.arange(npts)
+
+    with pytest.raises(ValueError) as err:
+        npairs_same_group_3d(sample, sample, rbins, group_ids[:-1], group_ids, period=1)
+    substr = "Input ``group_ids1`` must be a 1d array with the same length as ``sample1``"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        npairs_same_group_3d(sample, sample, rbins, group_ids, group_ids.astype(float), period=1)
+    substr = "Input ``group_ids2`` must be an array of integers"
+    assert substr in err.value.args[0]
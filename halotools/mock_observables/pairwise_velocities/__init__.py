@@ -9,6 +9,7 @@ from .mean_los_velocity_vs_rp import mean_los_velocity_vs_rp
 from .los_pvd_vs_rp import los_pvd_vs_rp
 from .velocity_marked_npairs_3d import velocity_marked_npairs_3d
 from .velocity_marked_npairs_xy_z import velocity_marked_npairs_xy_z
+from .velocity_moments import velocity_moments_3d, velocity_moments_xy_z
 
 __all__ = ('mean_radial_velocity_vs_r', 'radial_pvd_vs_r',
-    'mean_los_velocity_vs_rp', 'los_pvd_vs_rp')
+    'mean_los_velocity_vs_rp', 'los_pvd_vs_rp', 'velocity_moments_3d', 'velocity_moments_xy_z')
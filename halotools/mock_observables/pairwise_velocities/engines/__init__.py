@@ -1,2 +1,3 @@
 from .velocity_marked_npairs_3d_engine import velocity_marked_npairs_3d_engine
 from .velocity_marked_npairs_xy_z_engine import velocity_marked_npairs_xy_z_engine
+from .velocity_moments_engine import velocity_moments_engine
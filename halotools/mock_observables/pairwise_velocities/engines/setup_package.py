@@ -4,7 +4,8 @@ import os
 PATH_TO_PKG = os.path.relpath(os.path.dirname(__file__))
 SOURCES = ("velocity_marked_npairs_3d_engine.pyx",
     "velocity_marking_functions.pyx",
-    "velocity_marked_npairs_xy_z_engine.pyx")
+    "velocity_marked_npairs_xy_z_engine.pyx",
+    "velocity_moments_engine.pyx")
 
 THIS_PKG_NAME = '.'.join(__name__.split('.')[:-1])
 
@@ -0,0 +1,285 @@
+"""
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.math cimport sqrt, fabs
+
+__all__ = ('velocity_moments_engine', )
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.nonecheck(False)
+def velocity_moments_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+        velocities1in, velocities2in, rbins, pi_max, int num_moments, velocity_bins,
+        cell1_tuple):
+    """ Cython engine accumulating the moments of the pairwise velocities
+    of the pairs between sample 1 and sample 2 as a function of separation.
+
+    Each pair is assigned to a single separation bin, and the number of pairs,
+    mean velocity and central moments of each bin are updated with the
+    numerically stable one-pass recurrences of Welford (1962) and Pebay (2008).
+    The results of different calls can be merged with
+    `~halotools.mock_observables.pairwise_velocities.velocity_moments._combine_velocity_moments`.
+
+    Parameters
+    ------------
+    double_mesh : object
+        Instance of `~halotools.mock_observables.RectangularDoubleMesh`
+
+    x1in, y1in, z1in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 1
+
+    x2in, y2in, z2in : arrays
+        Numpy arrays storing Cartesian coordinates of points in sample 2
+
+    velocities1in, velocities2in : arrays
+        Arrays of shape (Npts, 3) storing the velocities of the points in sample 1 and 2
+
+    rbins : array
+        Boundaries defining the bins in which pairs are counted.
+        A pair is counted in bin *k* if rbins[k] < r <= rbins[k+1].
+
+    pi_max : float or None
+        If None, ``rbins`` bins the 3-D separation and the radial component of the
+        velocity difference is used. Otherwise, ``rbins`` bins the separation in the
+        xy-plane, only pairs with a z-separation smaller than or equal to ``pi_max``
+        are counted, and the line-of-sight (z) component of the velocity difference is used.
+
+    num_moments : int
+        Number of moments to accumulate, between 1 (mean only) and 4.
+
+    velocity_bins : array or None
+        Boundaries defining the bins in which the pairwise velocities are histogrammed,
+        or None to skip the histogram.
+
+    cell1_tuple : tuple
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over. Intended for use with
+        python multiprocessing.
+
+    Returns
+    --------
+    counts : array
+        Integer array of length len(rbins)-1 storing the number of pairs
+
+    moments : array
+        Array of shape (len(rbins)-1, 4) storing the mean velocity
+        and the sums of the 2nd, 3rd and 4th powers of the deviations from the mean.
+        Moments above ``num_moments`` are left to zero.
+
+    velocity_histogram : array
+        Integer array of shape (len(rbins)-1, len(velocity_bins)-1)
+        storing the number of pairs in each velocity bin.
+        If ``velocity_bins`` is None, the last dimension has length 0.
+    """
+    cdef cnp.float64_t[:] rbins_squared = np.ascontiguousarray(rbins, dtype=np.float64)**2
+    cdef int num_rbins = len(rbins)
+    cdef cnp.float64_t rmin_squared = rbins_squared[0]
+    cdef cnp.float64_t rmax_squared = rbins_squared[num_rbins-1]
+    cdef bint los = pi_max is not None
+    cdef cnp.float64_t pi_max_squared = pi_max*pi_max if los else 0.
+
+    cdef bint do_histogram = velocity_bins is not None
+    cdef cnp.float64_t[:] vbins
+    if do_histogram:
+        vbins = np.ascontiguousarray(velocity_bins, dtype=np.float64)
+    else:
+        vbins = np.zeros(1, dtype=np.float64)
+    cdef int num_vbins = len(vbins)
+    cdef cnp.float64_t vmin = vbins[0]
+    cdef cnp.float64_t vmax = vbins[num_vbins-1]
+
+    cdef cnp.int64_t[:] counts = np.zeros(num_rbins-1, dtype=np.int64)
+    cdef cnp.float64_t[:, :] moments = np.zeros((num_rbins-1, 4), dtype=np.float64)
+    cdef cnp.int64_t[:, :] velocity_histogram = np.zeros(
+        (num_rbins-1, num_vbins-1), dtype=np.int64)
+
+    cdef cnp.float64_t xperiod = double_mesh.xperiod
+    cdef cnp.float64_t yperiod = double_mesh.yperiod
+    cdef cnp.float64_t zperiod = double_mesh.zperiod
+    cdef cnp.int64_t first_cell1_element = cell1_tuple[0]
+    cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
+    cdef int PBCs = double_mesh._PBCs
+
+    cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z1 = np.ascontiguousarray(z1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] x2 = np.ascontiguousarray(x2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] y2 = np.ascontiguousarray(y2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:, :] v1 = np.ascontiguousarray(
+        velocities1in[double_mesh.mesh1.idx_sorted, :], dtype=np.float64)
+    cdef cnp.float64_t[:, :] v2 = np.ascontiguousarray(
+        velocities2in[double_mesh.mesh2.idx_sorted, :], dtype=np.float64)
+
+    cdef cnp.int64_t icell1, icell2
+    cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
+    cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
+
+    cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2
+
+    cdef int ix2, iy2, iz2, ix1, iy1, iz1
+    cdef int nonPBC_ix2, nonPBC_iy2, nonPBC_iz2
+
+    cdef int num_x2_covering_steps = int(np.ceil(
+        double_mesh.search_xlength / double_mesh.mesh2.xcell_size))
+    cdef int num_y2_covering_steps = int(np.ceil(
+        double_mesh.search_ylength / double_mesh.mesh2.ycell_size))
+    cdef int num_z2_covering_steps = int(np.ceil(
+        double_mesh.search_zlength / double_mesh.mesh2.zcell_size))
+
+    cdef int leftmost_ix2, rightmost_ix2
+    cdef int leftmost_iy2, rightmost_iy2
+    cdef int leftmost_iz2, rightmost_iz2
+
+    cdef int num_x1divs = double_mesh.mesh1.num_xdivs
+    cdef int num_y1divs = double_mesh.mesh1.num_ydivs
+    cdef int num_z1divs = double_mesh.mesh1.num_zdivs
+    cdef int num_x2divs = double_mesh.mesh2.num_xdivs
+    cdef int num_y2divs = double_mesh.mesh2.num_ydivs
+    cdef int num_z2divs = double_mesh.mesh2.num_zdivs
+    cdef int num_x2_per_x1 = num_x2divs // num_x1divs
+    cdef int num_y2_per_y1 = num_y2divs // num_y1divs
+    cdef int num_z2_per_z1 = num_z2divs // num_z1divs
+
+    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq
+    cdef cnp.float64_t x1tmp, y1tmp, z1tmp, vx1, vy1, vz1, v
+    cdef cnp.float64_t n, delta, delta_n, delta_n_sq, term
+    cdef cnp.int64_t i, j, k, b
+    cdef int low, high, mid
+
+    for icell1 in range(first_cell1_element, last_cell1_element):
+
+        ifirst1 = cell1_indices[icell1]
+        ilast1 = cell1_indices[icell1+1]
+
+        if ilast1 > ifirst1:
+
+            ix1 = icell1 // (num_y1divs*num_z1divs)
+            iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
+            iz1 = icell1 - (ix1*num_y1divs*num_z1divs) - (iy1*num_z1divs)
+
+            leftmost_ix2 = ix1*num_x2_per_x1 - num_x2_covering_steps
+            leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
+            leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
+
+            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
+
+            for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
+                if nonPBC_ix2 < 0:
+                    x2shift = -xperiod*PBCs
+                elif nonPBC_ix2 >= num_x2divs:
+                    x2shift = +xperiod*PBCs
+                else:
+                    x2shift = 0.
+                # Now apply the PBCs
+                ix2 = nonPBC_ix2 % num_x2divs
+
+                for nonPBC_iy2 in range(leftmost_iy2, rightmost_iy2):
+                    if nonPBC_iy2 < 0:
+                        y2shift = -yperiod*PBCs
+                    elif nonPBC_iy2 >= num_y2divs:
+                        y2shift = +yperiod*PBCs
+                    else:
+                        y2shift = 0.
+                    # Now apply the PBCs
+                    iy2 = nonPBC_iy2 % num_y2divs
+
+                    for nonPBC_iz2 in range(leftmost_iz2, rightmost_iz2):
+                        if nonPBC_iz2 < 0:
+                            z2shift = -zperiod*PBCs
+                        elif nonPBC_iz2 >= num_z2divs:
+                            z2shift = +zperiod*PBCs
+                        else:
+                            z2shift = 0.
+                        # Now apply the PBCs
+                        iz2 = nonPBC_iz2 % num_z2divs
+
+                        icell2 = ix2*(num_y2divs*num_z2divs) + iy2*num_z2divs + iz2
+                        ifirst2 = cell2_indices[icell2]
+                        ilast2 = cell2_indices[icell2+1]
+
+                        if ilast2 == ifirst2:
+                            continue
+
+                        for i in range(ifirst1, ilast1):
+                            x1tmp = x1[i] - x2shift
+                            y1tmp = y1[i] - y2shift
+                            z1tmp = z1[i] - z2shift
+                            vx1 = v1[i, 0]
+                            vy1 = v1[i, 1]
+                            vz1 = v1[i, 2]
+
+                            for j in range(ifirst2, ilast2):
+                                dx = x1tmp - x2[j]
+                                dy = y1tmp - y2[j]
+                                dz = z1tmp - z2[j]
+                                if los:
+                                    if dz*dz > pi_max_squared:
+                                        continue
+                                    dsq = dx*dx + dy*dy
+                                else:
+                                    dsq = dx*dx + dy*dy + dz*dz
+                                if (dsq <= rmin_squared) or (dsq > rmax_squared):
+                                    continue
+
+                                # index of the first bin edge not below dsq
+                                low = 1
+                                high = num_rbins - 1
+                                while low < high:
+                                    mid = (low + high) // 2
+                                    if rbins_squared[mid] < dsq:
+                                        low = mid + 1
+                                    else:
+                                        high = mid
+                                k = low - 1
+
+                                # pairwise velocity with the conventions of
+                                # the velocity marking functions
+                                if los:
+                                    if dz > 0:
+                                        v = vz1 - v2[j, 2]
+                                    elif dz < 0:
+                                        v = v2[j, 2] - vz1
+                                    else:
+                                        v = -fabs(vz1 - v2[j, 2])
+                                else:
+                                    v = ((vx1 - v2[j, 0])*dx + (vy1 - v2[j, 1])*dy +
+                                        (vz1 - v2[j, 2])*dz)/sqrt(dsq)
+
+                                counts[k] += 1
+                                n = counts[k]
+                                delta = v - moments[k, 0]
+                                delta_n = delta/n
+                                moments[k, 0] += delta_n
+                                if num_moments > 1:
+                                    term = delta*delta_n*(n - 1.)
+                                    if num_moments > 3:
+                                        delta_n_sq = delta_n*delta_n
+                                        moments[k, 3] += (term*delta_n_sq*(n*n - 3.*n + 3.) +
+                                            6.*delta_n_sq*moments[k, 1] - 4.*delta_n*moments[k, 2])
+                                    if num_moments > 2:
+                                        moments[k, 2] += (term*delta_n*(n - 2.) -
+                                            3.*delta_n*moments[k, 1])
+                                    moments[k, 1] += term
+
+                                if do_histogram and (v >= vmin) and (v <= vmax):
+                                    # index of the first bin edge above v
+                                    low = 1
+                                    high = num_vbins - 1
+                                    while low < high:
+                                        mid = (low + high) // 2
+                                        if vbins[mid] <= v:
+                                            low = mid + 1
+                                        else:
+                                            high = mid
+                                    b = low - 1
+                                    velocity_histogram[k, b] += 1
+
+    return np.array(counts), np.array(moments), np.array(velocity_histogram)
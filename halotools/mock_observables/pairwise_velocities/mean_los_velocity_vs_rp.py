@@ -8,9 +8,9 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import numpy as np
 
 from .pairwise_velocities_helpers import (_pairwise_velocity_stats_process_args,
-    _process_rp_bins)
+    _process_rp_bins, _unpack_pairwise_velocity_statistic)
 
-from .velocity_marked_npairs_xy_z import velocity_marked_npairs_xy_z
+from .velocity_moments import velocity_moments_xy_z
 
 __all__ = ('mean_los_velocity_vs_rp', )
 __author__ = ['Duncan Campbell']
@@ -106,7 +106,7 @@ def mean_los_velocity_vs_rp(sample1, velocities1, rp_bins, pi_max,
     :math:`\\bar{v}_{z12}(r_p)` is the mean of this quantity in projected radial bins.
 
     Pairs and radial velocities are calculated using
-    `~halotools.mock_observables.pair_counters.velocity_marked_npairs_xy_z`.
+    `~halotools.mock_observables.velocity_moments_xy_z`.
 
     Examples
     --------
@@ -146,99 +146,13 @@ def mean_los_velocity_vs_rp(sample1, velocities1, rp_bins, pi_max,
         num_threads, _sample1_is_sample2, PBCs = _pairwise_velocity_stats_process_args(*function_args)
 
     rp_bins, pi_max = _process_rp_bins(rp_bins, pi_max, period, PBCs)
-    pi_bins = np.array([0.0, pi_max])
-
-    # create marks for the marked pair counter.
-    marks1 = np.vstack((sample1.T, velocities1.T)).T
-    marks2 = np.vstack((sample2.T, velocities2.T)).T
-
-    def marked_pair_counts(sample1, sample2, rp_bins, pi_bins, period, num_threads,
-            do_auto, do_cross, marks1, marks2,
-            weight_func_id, _sample1_is_sample2, approx_cell1_size, approx_cell2_size):
-        """
-        Count velocity weighted data pairs.
-        """
-
-        if do_auto is True:
-            D1D1, dummy, N1N1 = velocity_marked_npairs_xy_z(
-                sample1, sample1, rp_bins, pi_bins,
-                weights1=marks1, weights2=marks1,
-                weight_func_id=weight_func_id,
-                period=period, num_threads=num_threads,
-                approx_cell1_size=approx_cell1_size,
-                approx_cell2_size=approx_cell1_size)
-            D1D1 = np.diff(D1D1, axis=1)[:, 0]
-            D1D1 = np.diff(D1D1)
-            N1N1 = np.diff(N1N1, axis=1)[:, 0]
-            N1N1 = np.diff(N1N1)
-        else:
-            D1D1 = None
-            D2D2 = None
-            N1N1 = None
-            N2N2 = None
-
-        if _sample1_is_sample2:
-            D1D2 = D1D1
-            D2D2 = D1D1
-            N1N2 = N1N1
-            N2N2 = N1N1
-        else:
-            if do_cross is True:
-                D1D2, dummy, N1N2 = velocity_marked_npairs_xy_z(
-                    sample1, sample2, rp_bins, pi_bins,
-                    weights1=marks1, weights2=marks2,
-                    weight_func_id=weight_func_id,
-                    period=period, num_threads=num_threads,
-                    approx_cell1_size=approx_cell1_size,
-                    approx_cell2_size=approx_cell2_size)
-                D1D2 = np.diff(D1D2, axis=1)[:, 0]
-                D1D2 = np.diff(D1D2)
-                N1N2 = np.diff(N1N2, axis=1)[:, 0]
-                N1N2 = np.diff(N1N2)
-            else:
-                D1D2 = None
-                N1N2 = None
-            if do_auto is True:
-                D2D2, dummy, N2N2 = velocity_marked_npairs_xy_z(
-                    sample2, sample2, rp_bins, pi_bins,
-                    weights1=marks2, weights2=marks2,
-                    weight_func_id=weight_func_id, period=period, num_threads=num_threads,
-                    approx_cell1_size=approx_cell2_size,
-                    approx_cell2_size=approx_cell2_size)
-                D2D2 = np.diff(D2D2, axis=1)[:, 0]
-                D2D2 = np.diff(D2D2)
-                N2N2 = np.diff(N2N2, axis=1)[:, 0]
-                N2N2 = np.diff(N2N2)
-            else:
-                D2D2 = None
-                N2N2 = None
-
-        return D1D1, D1D2, D2D2, N1N1, N1N2, N2N2
-
-    # count the sum of radial velocities and number of pairs
-    weight_func_id = 13
-    V1V1, V1V2, V2V2, N1N1, N1N2, N2N2 =\
-        marked_pair_counts(sample1, sample2, rp_bins, pi_bins, period,
-            num_threads, do_auto, do_cross,
-            marks1, marks2, weight_func_id, _sample1_is_sample2,
-            approx_cell1_size, approx_cell2_size)
-
-    # return results: the sum of radial velocities divided by the number of pairs
-    if _sample1_is_sample2:
-        M_11 = V1V1/N1N1
-        return np.where(np.isfinite(M_11), M_11, 0.)
-    else:
-        if (do_auto is True) & (do_cross is True):
-            M_11 = V1V1/N1N1
-            M_12 = V1V2/N1N2
-            M_22 = V2V2/N2N2
-            return (np.where(np.isfinite(M_11), M_11, 0.),
-                np.where(np.isfinite(M_12), M_12, 0.),
-                np.where(np.isfinite(M_22), M_22, 0.))
-        elif (do_cross is True):
-            M_12 = V1V2/N1N2
-            return np.where(np.isfinite(M_12), M_12, 0.)
-        elif (do_auto is True):
-            M_11 = V1V1/N1N1
-            M_22 = V2V2/N2N2
-            return np.where(np.isfinite(M_11), M_11, 0.), np.where(np.isfinite(M_22), M_22, 0.)
+
+    # accumulate the mean line-of-sight velocity of all requested combinations of samples at once
+    counts, moments = velocity_moments_xy_z(sample1, velocities1, rp_bins, pi_max,
+        sample2=None if _sample1_is_sample2 else sample2,
+        velocities2=None if _sample1_is_sample2 else velocities2,
+        period=period, do_auto=do_auto, do_cross=do_cross, num_moments=1,
+        num_threads=num_threads,
+        approx_cell1_size=approx_cell1_size, approx_cell2_size=approx_cell2_size)
+
+    return _unpack_pairwise_velocity_statistic(moments[:, :, 0])
@@ -8,9 +8,10 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import numpy as np
 
-from .pairwise_velocities_helpers import _pairwise_velocity_stats_process_args
+from .pairwise_velocities_helpers import (_pairwise_velocity_stats_process_args,
+    _unpack_pairwise_velocity_statistic)
 
-from .velocity_marked_npairs_3d import velocity_marked_npairs_3d
+from .velocity_moments import velocity_moments_3d
 
 __all__ = ('mean_radial_velocity_vs_r', )
 __author__ = ['Duncan Campbell']
@@ -107,7 +108,7 @@ def mean_radial_velocity_vs_r(sample1, velocities1, rbins,
     :math:`\\bar{v}_{12}(r)` is the mean of that quantity calculated in radial bins.
 
     Pairs and radial velocities are calculated using
-    `~halotools.mock_observables.pair_counters.velocity_marked_npairs`.
+    `~halotools.mock_observables.velocity_moments_3d`.
 
     For radial separation bins in which there are zero pairs, function returns zero.
 
@@ -155,92 +156,12 @@ def mean_radial_velocity_vs_r(sample1, velocities1, rbins,
 
     rbins = np.atleast_1d(rbins)
 
-    # create marks for the marked pair counter.
-    marks1 = np.vstack((sample1.T, velocities1.T)).T
-    marks2 = np.vstack((sample2.T, velocities2.T)).T
-
-    def marked_pair_counts(sample1, sample2, rbins, period, num_threads,
-            do_auto, do_cross, marks1, marks2,
-            weight_func_id, _sample1_is_sample2, approx_cell1_size, approx_cell2_size):
-        """
-        Count velocity weighted data pairs.
-        """
-
-        if do_auto is True:
-            D1D1, dummy, N1N1 = velocity_marked_npairs_3d(
-                sample1, sample1, rbins,
-                weights1=marks1, weights2=marks1,
-                weight_func_id=weight_func_id,
-                period=period, num_threads=num_threads,
-                approx_cell1_size=approx_cell1_size,
-                approx_cell2_size=approx_cell1_size)
-            D1D1 = np.diff(D1D1)
-            N1N1 = np.diff(N1N1)
-        else:
-            D1D1 = None
-            D2D2 = None
-            N1N1 = None
-            N2N2 = None
-
-        if _sample1_is_sample2:
-            D1D2 = D1D1
-            D2D2 = D1D1
-            N1N2 = N1N1
-            N2N2 = N1N1
-        else:
-            if do_cross is True:
-                D1D2, dummy, N1N2 = velocity_marked_npairs_3d(
-                    sample1, sample2, rbins,
-                    weights1=marks1, weights2=marks2,
-                    weight_func_id=weight_func_id,
-                    period=period, num_threads=num_threads,
-                    approx_cell1_size=approx_cell1_size,
-                    approx_cell2_size=approx_cell2_size)
-                D1D2 = np.diff(D1D2)
-                N1N2 = np.diff(N1N2)
-            else:
-                D1D2 = None
-                N1N2 = None
-            if do_auto is True:
-                D2D2, dummy, N2N2 = velocity_marked_npairs_3d(
-                    sample2, sample2, rbins,
-                    weights1=marks2, weights2=marks2,
-                    weight_func_id=weight_func_id,
-                    period=period, num_threads=num_threads,
-                    approx_cell1_size=approx_cell2_size,
-                    approx_cell2_size=approx_cell2_size)
-                D2D2 = np.diff(D2D2)
-                N2N2 = np.diff(N2N2)
-            else:
-                D2D2 = None
-                N2N2 = None
-
-        return D1D1, D1D2, D2D2, N1N1, N1N2, N2N2
-
-    # count the sum of radial velocities and number of pairs
-    weight_func_id = 11
-    V1V1, V1V2, V2V2, N1N1, N1N2, N2N2 =\
-        marked_pair_counts(sample1, sample2, rbins, period,
-            num_threads, do_auto, do_cross,
-            marks1, marks2, weight_func_id,
-            _sample1_is_sample2,
-            approx_cell1_size, approx_cell2_size)
-
-    # return results: the sum of radial velocities divided by the number of pairs
-    if _sample1_is_sample2:
-        M_11 = V1V1/N1N1
-        return np.where(np.isfinite(M_11), M_11, 0.)
-    else:
-        if (do_auto is True) & (do_cross is True):
-            M_11 = V1V1/N1N1
-            M_12 = V1V2/N1N2
-            M_22 = V2V2/N2N2
-            return (np.where(np.isfinite(M_11), M_11, 0.),
-                np.where(np.isfinite(M_12), M_12, 0.), np.where(np.isfinite(M_22), M_22, 0.))
-        elif do_cross is True:
-            M_12 = V1V2/N1N2
-            return np.where(np.isfinite(M_12), M_12, 0.)
-        elif (do_auto is True):
-            M_11 = V1V1/N1N1
-            M_22 = V2V2/N2N2
-            return np.where(np.isfinite(M_11), M_11, 0.), np.where(np.isfinite(M_22), M_22, 0.)
+    # accumulate the mean radial velocity of all requested combinations of samples at once
+    counts, moments = velocity_moments_3d(sample1, velocities1, rbins,
+        sample2=None if _sample1_is_sample2 else sample2,
+        velocities2=None if _sample1_is_sample2 else velocities2,
+        period=period, do_auto=do_auto, do_cross=do_cross, num_moments=1,
+        num_threads=num_threads,
+        approx_cell1_size=approx_cell1_size, approx_cell2_size=approx_cell2_size)
+
+    return _unpack_pairwise_velocity_statistic(moments[:, :, 0])
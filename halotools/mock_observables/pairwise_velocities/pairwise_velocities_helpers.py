@@ -14,7 +14,8 @@ from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
 from ...custom_exceptions import HalotoolsError
 from ...utils.array_utils import array_is_monotonic
 
-__all__ = ['_pairwise_velocity_stats_process_args', '_process_radial_bins', '_process_rp_bins']
+__all__ = ['_pairwise_velocity_stats_process_args', '_process_radial_bins', '_process_rp_bins',
+    '_unpack_pairwise_velocity_statistic', '_pairwise_velocity_dispersion']
 __author__ = ['Duncan Campbell']
 
 
@@ -159,3 +160,24 @@ def _process_rp_bins(rp_bins, pi_max, period, PBCs):
             raise ValueError(msg)
 
     return rp_bins, pi_max
+
+
+def _unpack_pairwise_velocity_statistic(statistic):
+    """
+    return the statistic of the single requested combination of samples,
+    or a tuple with one array per combination, in the order 11, 12, 22
+    """
+    if len(statistic) == 1:
+        return statistic[0]
+    else:
+        return tuple(statistic)
+
+
+def _pairwise_velocity_dispersion(counts, moments):
+    """
+    calculate the sample standard deviation of the pairwise velocities
+    from the number of pairs and the variance normalized by the number of pairs
+    """
+    n = counts.astype(float)
+    variance = np.where(n > 1, moments[:, :, 1]*n/np.maximum(n - 1, 1), 0.)
+    return np.sqrt(variance)
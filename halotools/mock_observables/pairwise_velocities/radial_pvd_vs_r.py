@@ -8,9 +8,9 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import numpy as np
 
 from .pairwise_velocities_helpers import (_pairwise_velocity_stats_process_args,
-    _process_radial_bins)
+    _process_radial_bins, _unpack_pairwise_velocity_statistic, _pairwise_velocity_dispersion)
 
-from .velocity_marked_npairs_3d import velocity_marked_npairs_3d
+from .velocity_moments import velocity_moments_3d
 
 __all__ = ('radial_pvd_vs_r', )
 __author__ = ['Duncan Campbell']
@@ -89,7 +89,7 @@ def radial_pvd_vs_r(sample1, velocities1, rbins, sample2=None,
     :math:`\\sigma_{12}(r)` is the standard deviation of this quantity in radial bins.
 
     Pairs and radial velocities are calculated using
-    `~halotools.mock_observables.pair_counters.velocity_marked_npairs`.
+    `~halotools.mock_observables.velocity_moments_3d`.
 
     Examples
     --------
@@ -136,113 +136,13 @@ def radial_pvd_vs_r(sample1, velocities1, rbins, sample2=None,
 
     rbins = _process_radial_bins(rbins, period, PBCs)
 
-    # calculate velocity difference scale
-    std_v1 = np.sqrt(np.std(velocities1[0, :]))
-    std_v2 = np.sqrt(np.std(velocities2[0, :]))
-
-    # build the marks.
-    shift1 = np.repeat(std_v1, len(sample1))
-    shift2 = np.repeat(std_v2, len(sample2))
-    marks1 = np.vstack((sample1.T, velocities1.T, shift1)).T
-    marks2 = np.vstack((sample2.T, velocities2.T, shift2)).T
-
-    def marked_pair_counts(sample1, sample2, rbins, period, num_threads,
-            do_auto, do_cross, marks1, marks2,
-            weight_func_id, _sample1_is_sample2, approx_cell1_size, approx_cell2_size):
-        """
-        Count velocity weighted data pairs.
-        """
-
-        if do_auto is True:
-            D1D1, S1S1, N1N1 = velocity_marked_npairs_3d(
-                sample1, sample1, rbins,
-                weights1=marks1, weights2=marks1,
-                weight_func_id=weight_func_id,
-                period=period, num_threads=num_threads,
-                approx_cell1_size=approx_cell1_size,
-                approx_cell2_size=approx_cell1_size)
-            D1D1 = np.diff(D1D1)
-            S1S1 = np.diff(S1S1)
-            N1N1 = np.diff(N1N1)
-        else:
-            D1D1 = None
-            D2D2 = None
-            N1N1 = None
-            N2N2 = None
-            S1S1 = None
-            S2S2 = None
-
-        if _sample1_is_sample2:
-            D1D2 = D1D1
-            D2D2 = D1D1
-            N1N2 = N1N1
-            N2N2 = N1N1
-            S1S2 = S1S1
-            S2S2 = S1S1
-        else:
-            if do_cross == True:
-                D1D2, S1S2, N1N2 = velocity_marked_npairs_3d(
-                    sample1, sample2, rbins,
-                    weights1=marks1, weights2=marks2,
-                    weight_func_id=weight_func_id,
-                    period=period, num_threads=num_threads,
-                    approx_cell1_size=approx_cell1_size,
-                    approx_cell2_size=approx_cell2_size)
-                D1D2 = np.diff(D1D2)
-                S1S2 = np.diff(S1S2)
-                N1N2 = np.diff(N1N2)
-            else:
-                D1D2 = None
-                N1N2 = None
-                S1S2 = None
-            if do_auto is True:
-                D2D2, S2S2, N2N2 = velocity_marked_npairs_3d(sample2, sample2, rbins,
-                    weights1=marks2, weights2=marks2,
-                    weight_func_id=weight_func_id,
-                    period=period, num_threads=num_threads,
-                    approx_cell1_size=approx_cell2_size,
-                    approx_cell2_size=approx_cell2_size)
-                D2D2 = np.diff(D2D2)
-                S2S2 = np.diff(S2S2)
-                N2N2 = np.diff(N2N2)
-            else:
-                D2D2 = None
-                N2N2 = None
-
-        return D1D1, D1D2, D2D2, S1S1, S1S2, S2S2, N1N1, N1N2, N2N2
-
-    weight_func_id = 12
-    V1V1, V1V2, V2V2, S1S1, S1S2, S2S2, N1N1, N1N2, N2N2 = marked_pair_counts(
-        sample1, sample2, rbins, period,
-        num_threads, do_auto, do_cross,
-        marks1, marks2, weight_func_id,
-        _sample1_is_sample2,
-        approx_cell1_size, approx_cell2_size)
-
-    def _shifted_std(N, sum_x, sum_x_sqr):
-        """
-        calculate the variance
-        """
-        variance = (sum_x_sqr - (sum_x * sum_x)/N)/(N - 1)
-        return np.sqrt(variance)
-
-    # return results
-    if _sample1_is_sample2:
-        sigma_11 = _shifted_std(N1N1, V1V1, S1S1)
-        return np.where(np.isfinite(sigma_11), sigma_11, 0.)
-    else:
-        if (do_auto is True) & (do_cross is True):
-            sigma_11 = _shifted_std(N1N1, V1V1, S1S1)
-            sigma_12 = _shifted_std(N1N2, V1V2, S1S2)
-            sigma_22 = _shifted_std(N2N2, V2V2, S2S2)
-            return (np.where(np.isfinite(sigma_11), sigma_11, 0.),
-            np.where(np.isfinite(sigma_12), sigma_12, 0.),
-            np.where(np.isfinite(sigma_22), sigma_22, 0.))
-        elif (do_cross is True):
-            sigma_12 = _shifted_std(N1N2, V1V2, S1S2)
-            return np.where(np.isfinite(sigma_12), sigma_12, 0.)
-        elif (do_auto is True):
-            sigma_11 = _shifted_std(N1N1, V1V1, S1S1)
-            sigma_22 = _shifted_std(N2N2, V2V2, S2S2)
-            return (np.where(np.isfinite(sigma_11), sigma_11, 0.),
-                np.where(np.isfinite(sigma_22), sigma_22, 0.))
+    # accumulate the mean and variance of the radial velocities
+    # of all requested combinations of samples at once
+    counts, moments = velocity_moments_3d(sample1, velocities1, rbins,
+        sample2=None if _sample1_is_sample2 else sample2,
+        velocities2=None if _sample1_is_sample2 else velocities2,
+        period=period, do_auto=do_auto, do_cross=do_cross, num_moments=2,
+        num_threads=num_threads,
+        approx_cell1_size=approx_cell1_size, approx_cell2_size=approx_cell2_size)
+
+    return _unpack_pairwise_velocity_statistic(_pairwise_velocity_dispersion(counts, moments))
@@ -0,0 +1,173 @@
+""" Module providing testing for the `~halotools.mock_observables.velocity_moments_3d`
+and `~halotools.mock_observables.velocity_moments_xy_z` functions.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+from ..velocity_moments import velocity_moments_3d, velocity_moments_xy_z
+
+__all__ = ('test_velocity_moments_3d_brute_force', 'test_velocity_moments_xy_z_brute_force',
+    'test_velocity_moments_3d_threads', 'test_velocity_moments_large_mean',
+    'test_velocity_moments_bad_args')
+
+fixed_seed = 43
+
+
+def brute_force_pairwise_velocities(sample1, velocities1, sample2, velocities2,
+        bins, pi_max=None, period=None):
+    """ Separation bin and pairwise velocity of all pairs of points,
+    using the minimum image convention.
+    """
+    d = sample1[:, np.newaxis, :] - sample2[np.newaxis, :, :]
+    if period is not None:
+        period = np.zeros(3) + period
+        d = np.where(d > period/2., d - period, d)
+        d = np.where(d < -period/2., d + period, d)
+    dv = velocities1[:, np.newaxis, :] - velocities2[np.newaxis, :, :]
+
+    if pi_max is None:
+        r = np.sqrt(np.sum(d**2, axis=2))
+        keep = r > 0
+        v = np.sum(dv*d, axis=2)[keep]/r[keep]
+    else:
+        r = np.sqrt(d[:, :, 0]**2 + d[:, :, 1]**2)
+        keep = np.abs(d[:, :, 2]) <= pi_max
+        v = dv[:, :, 2][keep]*np.sign(d[:, :, 2][keep])
+    r = r[keep]
+    ibin = np.searchsorted(bins, r, side='left') - 1
+    inside = (ibin >= 0) & (ibin < len(bins) - 1)
+    return ibin[inside], v[inside]
+
+
+def brute_force_moments(ibin, v, num_bins):
+    """ Number of pairs, mean and 2nd to 4th central moments in each bin.
+    """
+    counts = np.zeros(num_bins, dtype=int)
+    moments = np.zeros((num_bins, 4))
+    for i in range(num_bins):
+        vi = v[ibin == i]
+        counts[i] = len(vi)
+        if len(vi) > 0:
+            moments[i, 0] = np.mean(vi)
+            for p in (2, 3, 4):
+                moments[i, p-1] = np.mean((vi - np.mean(vi))**p)
+    return counts, moments
+
+
+def test_velocity_moments_3d_brute_force():
+    """ Compare all moments and the distribution of the radial pairwise velocities
+    of the auto- and cross-pairs to a brute force calculation, with and without PBCs.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((200, 3))
+        sample2 = np.random.random((150, 3))
+        velocities1 = np.random.normal(0, 100, (200, 3))
+        velocities2 = np.random.normal(50, 100, (150, 3))
+    rbins = np.linspace(0.05, 0.3, 6)
+    velocity_bins = np.linspace(-300, 300, 13)
+
+    for period in (1, None):
+        counts, moments, velocity_pdf = velocity_moments_3d(sample1, velocities1, rbins,
+            sample2=sample2, velocities2=velocities2, period=period,
+            num_moments=4, velocity_bins=velocity_bins)
+        assert counts.shape == (3, len(rbins)-1)
+        assert moments.shape == (3, len(rbins)-1, 4)
+
+        samples = ((sample1, velocities1), (sample2, velocities2))
+        for i, (a, b) in enumerate(((0, 0), (0, 1), (1, 1))):
+            ibin, v = brute_force_pairwise_velocities(samples[a][0], samples[a][1],
+                samples[b][0], samples[b][1], rbins, period=period)
+            correct_counts, correct_moments = brute_force_moments(ibin, v, len(rbins)-1)
+            assert np.all(counts[i] == correct_counts)
+            assert np.allclose(moments[i], correct_moments)
+
+            for k in range(len(rbins)-1):
+                hist = np.histogram(v[ibin == k], bins=velocity_bins)[0]
+                correct_pdf = hist/float(correct_counts[k])/np.diff(velocity_bins)
+                assert np.allclose(velocity_pdf[i, k], correct_pdf)
+
+
+def test_velocity_moments_xy_z_brute_force():
+    """ Compare the mean and variance of the line-of-sight pairwise velocities
+    of the cross-pairs to a brute force calculation in a periodic box.
+    """
+    period = 1.
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((200, 3))
+        sample2 = np.random.random((150, 3))
+        velocities1 = np.random.normal(0, 100, (200, 3))
+        velocities2 = np.random.normal(50, 100, (150, 3))
+    rp_bins, pi_max = np.linspace(0.05, 0.3, 6), 0.2
+
+    counts, moments = velocity_moments_xy_z(sample1, velocities1, rp_bins, pi_max,
+        sample2=sample2, velocities2=velocities2, period=period, do_auto=False)
+    assert moments.shape == (1, len(rp_bins)-1, 2)
+
+    ibin, v = brute_force_pairwise_velocities(sample1, velocities1,
+        sample2, velocities2, rp_bins, pi_max=pi_max, period=period)
+    correct_counts, correct_moments = brute_force_moments(ibin, v, len(rp_bins)-1)
+    assert np.all(counts[0] == correct_counts)
+    assert np.allclose(moments[0], correct_moments[:, :2])
+
+
+def test_velocity_moments_3d_threads():
+    """ Verify that the partial moments accumulated by several threads
+    are correctly merged.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((1000, 3))
+        velocities1 = np.random.normal(0, 100, (1000, 3))
+    rbins = np.linspace(0.02, 0.2, 5)
+
+    counts, moments = velocity_moments_3d(sample1, velocities1, rbins,
+        period=1, num_moments=4)
+    counts2, moments2 = velocity_moments_3d(sample1, velocities1, rbins,
+        period=1, num_moments=4, num_threads=3)
+    assert np.all(counts == counts2)
+    assert np.allclose(moments, moments2)
+
+
+def test_velocity_moments_large_mean():
+    """ Verify that the variance is accurate for pairwise velocities with a mean
+    much larger than their dispersion, for which the variance computed from
+    the sums of the velocities and of their squares is dominated by round-off errors.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((300, 3))
+        sample2 = np.random.random((300, 3))
+        velocities1 = np.random.normal(0, 1e-3, (300, 3))
+        velocities2 = np.random.normal(0, 1e-3, (300, 3))
+    # every pair has z1 > z2, so that all pairwise velocities are close to -1e6
+    sample1[:, 2] = 0.5 + 0.1*sample1[:, 2]
+    sample2[:, 2] = 0.4 + 0.1*sample2[:, 2]
+    velocities2[:, 2] += 1e6
+    rp_bins, pi_max = np.array([0.1, 0.2, 0.3]), 0.2
+
+    counts, moments = velocity_moments_xy_z(sample1, velocities1, rp_bins, pi_max,
+        sample2=sample2, velocities2=velocities2, period=1, do_auto=False, num_threads=2)
+
+    ibin, v = brute_force_pairwise_velocities(sample1, velocities1,
+        sample2, velocities2, rp_bins, pi_max=pi_max, period=1)
+    for k in range(len(rp_bins)-1):
+        assert np.allclose(moments[0, k, 0], np.mean(v[ibin == k]), rtol=1e-12)
+        assert np.allclose(moments[0, k, 1], np.var(v[ibin == k]), rtol=1e-4)
+
+
+def test_velocity_moments_bad_args():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((100, 3))
+        velocities1 = np.random.random((100, 3))
+    rbins = np.array([0.05, 0.1])
+
+    with pytest.raises(ValueError) as err:
+        velocity_moments_3d(sample1, velocities1, rbins, num_moments=5, period=1)
+    substr = "Input ``num_moments`` must be an integer between 1 and 4"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        velocity_moments_3d(sample1, velocities1[:10], rbins, period=1)
+    substr = "Input ``velocities1`` must have shape (100, 3)"
+    assert substr in err.value.args[0]
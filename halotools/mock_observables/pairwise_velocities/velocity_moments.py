@@ -0,0 +1,448 @@
+"""
+Module containing the `~halotools.mock_observables.velocity_moments_3d` and
+`~halotools.mock_observables.velocity_moments_xy_z` functions used to accumulate
+the moments and the distribution of the pairwise velocities
+of several combinations of samples in a single pass over the pairs.
+"""
+from __future__ import (absolute_import, division, print_function, unicode_literals)
+import numpy as np
+import multiprocessing
+from functools import partial
+
+from ..pair_counters.npairs_3d import _npairs_3d_process_args
+from ..pair_counters.npairs_xy_z import _npairs_xy_z_process_args
+from ..pair_counters.mesh_helpers import _set_approximate_cell_sizes, _cell1_parallelization_indices
+from ..pair_counters.rectangular_mesh import RectangularDoubleMesh
+from ..mock_observables_helpers import enforce_sample_has_correct_shape
+
+from .engines import velocity_moments_engine
+
+__all__ = ('velocity_moments_3d', 'velocity_moments_xy_z')
+
+
+def velocity_moments_3d(sample1, velocities1, rbins, sample2=None, velocities2=None,
+        period=None, do_auto=True, do_cross=True, num_moments=2, velocity_bins=None,
+        num_threads=1, approx_cell1_size=None, approx_cell2_size=None):
+    """
+    Calculate the number of pairs, the moments and optionally the distribution
+    of the radial pairwise velocity in bins of 3-D separation, for all the requested
+    combinations of ``sample1`` and ``sample2`` in a single pass over the pairs.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+        See the :ref:`mock_obs_pos_formatting` documentation page
+        for instructions on how to transform your coordinate position arrays into the
+        format accepted by the ``sample1`` and ``sample2`` arguments.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    velocities1 : array_like
+        Npts1 x 3 array containing the 3-D velocities of the points in ``sample1``.
+
+    rbins : array_like
+        Array of boundaries defining the real space radial bins in which pairs are counted.
+        A pair separated by *r* is counted in bin *i* if rbins[i] < r <= rbins[i+1].
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    sample2 : array_like, optional
+        Npts2 x 3 array containing 3-D positions of points.
+        If None, the default option, only the pairs of ``sample1`` are used.
+
+    velocities2 : array_like, optional
+        Npts2 x 3 array containing the 3-D velocities of the points in ``sample2``.
+        Must be passed if ``sample2`` is passed.
+
+    period : array_like, optional
+        Length-3 sequence defining the periodic boundary conditions
+        in each dimension. If you instead provide a single scalar, Lbox,
+        period is assumed to be the same in all Cartesian directions.
+        If set to None (the default option), PBCs are set to infinity.
+
+    do_auto : boolean, optional
+        Use the pairs of ``sample1`` and the pairs of ``sample2``.
+        Ignored if ``sample2`` is None.
+
+    do_cross : boolean, optional
+        Use the pairs between ``sample1`` and ``sample2``.
+        Ignored if ``sample2`` is None.
+
+    num_moments : int, optional
+        Number of moments of the pairwise velocity to compute, between 1 and 4.
+        Default is 2, for the mean and the variance.
+
+    velocity_bins : array_like, optional
+        Array of boundaries defining the bins of the pairwise velocity
+        used to compute its distribution. Default is None, in which case
+        the distribution is not computed.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the pair counters should use all available cores on the machine.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        Default choice is to use the largest value of ``rbins`` in each dimension.
+
+    approx_cell2_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for sample2.
+
+    Returns
+    -------
+    counts : numpy.array
+        Integer array of shape (Ncombinations, len(rbins)-1) storing the number of pairs
+        in each bin. The combinations are, in this order, the pairs of ``sample1``,
+        the pairs between ``sample1`` and ``sample2``, and the pairs of ``sample2``,
+        keeping only those requested with ``do_auto`` and ``do_cross``.
+
+    moments : numpy.array
+        Array of shape (Ncombinations, len(rbins)-1, num_moments) storing the mean
+        of the pairwise velocity, followed by its 2nd, 3rd and 4th central moments,
+        normalized by the number of pairs. Bins without pairs are set to zero.
+
+    velocity_pdf : numpy.array
+        Array of shape (Ncombinations, len(rbins)-1, len(velocity_bins)-1) storing
+        the probability density of the pairwise velocity in each bin of separation,
+        normalized by the total number of pairs in the bin of separation.
+        Only returned if ``velocity_bins`` is not None.
+
+    Notes
+    -----
+    The radial pairwise velocity of points 1 and 2 is defined as
+    :math:`(\\vec{v}_{1} - \\vec{v}_{2}) \\cdot \\vec{r}_{12} / r_{12}`,
+    as in `~halotools.mock_observables.mean_radial_velocity_vs_r`.
+
+    The moments are accumulated pair by pair with numerically stable one-pass
+    updates, so that they do not suffer from the cancellation of large sums
+    of powers of the velocity.
+
+    Examples
+    --------
+    >>> Npts, Lbox = 1000, 250.
+    >>> sample1 = np.random.uniform(0, Lbox, Npts*3).reshape((Npts, 3))
+    >>> velocities1 = np.random.normal(0, 100., Npts*3).reshape((Npts, 3))
+    >>> rbins = np.logspace(0, 1.5, 10)
+    >>> counts, moments = velocity_moments_3d(sample1, velocities1, rbins, period=Lbox)
+    >>> mean_v12, var_v12 = moments[0, :, 0], moments[0, :, 1]
+    """
+    result = _velocity_moments_process_args(sample1, velocities1, sample2, velocities2,
+        do_auto, do_cross, num_moments, velocity_bins)
+    samples, velocities, combinations, num_moments, velocity_bins = result
+
+    sums = []
+    for a, b in combinations:
+        result = _npairs_3d_process_args(samples[a], samples[b], rbins, period,
+                False, num_threads, approx_cell1_size, approx_cell2_size)
+        x1in, y1in, z1in, x2in, y2in, z2in = result[0:6]
+        _rbins, _period, _num_threads, PBCs, _cell1_size, _cell2_size = result[6:]
+
+        rmax = np.max(_rbins)
+        search_lengths = rmax, rmax, rmax
+
+        sums.append(_velocity_moment_sums(x1in, y1in, z1in, x2in, y2in, z2in,
+            velocities[a], velocities[b], _rbins, None, num_moments, velocity_bins,
+            search_lengths, _period, PBCs, _num_threads, _cell1_size, _cell2_size))
+
+    return _normalize_velocity_moments(sums, num_moments, velocity_bins)
+
+
+def velocity_moments_xy_z(sample1, velocities1, rp_bins, pi_max, sample2=None,
+        velocities2=None, period=None, do_auto=True, do_cross=True, num_moments=2,
+        velocity_bins=None, num_threads=1, approx_cell1_size=None, approx_cell2_size=None):
+    """
+    Calculate the number of pairs, the moments and optionally the distribution
+    of the line-of-sight pairwise velocity in bins of projected separation,
+    for all the requested combinations of ``sample1`` and ``sample2``
+    in a single pass over the pairs.
+
+    The z-dimension is taken as the line-of-sight.
+
+    Parameters
+    ----------
+    sample1 : array_like
+        Npts1 x 3 numpy array containing 3-D positions of points.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    velocities1 : array_like
+        Npts1 x 3 array containing the 3-D velocities of the points in ``sample1``.
+
+    rp_bins : array_like
+        Array of boundaries defining the bins of separation in the xy-plane in which
+        pairs are counted. A pair separated by *rp* is counted in bin *i*
+        if rp_bins[i] < rp <= rp_bins[i+1].
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    pi_max : float
+        Maximum separation along the line-of-sight of the pairs that are counted.
+        Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
+
+    sample2 : array_like, optional
+        Npts2 x 3 array containing 3-D positions of points.
+        If None, the default option, only the pairs of ``sample1`` are used.
+
+    velocities2 : array_like, optional
+        Npts2 x 3 array containing the 3-D velocities of the points in ``sample2``.
+        Must be passed if ``sample2`` is passed.
+
+    period : array_like, optional
+        Length-3 sequence defining the periodic boundary conditions
+        in each dimension. If you instead provide a single scalar, Lbox,
+        period is assumed to be the same in all Cartesian directions.
+        If set to None (the default option), PBCs are set to infinity.
+
+    do_auto : boolean, optional
+        Use the pairs of ``sample1`` and the pairs of ``sample2``.
+        Ignored if ``sample2`` is None.
+
+    do_cross : boolean, optional
+        Use the pairs between ``sample1`` and ``sample2``.
+        Ignored if ``sample2`` is None.
+
+    num_moments : int, optional
+        Number of moments of the pairwise velocity to compute, between 1 and 4.
+        Default is 2, for the mean and the variance.
+
+    velocity_bins : array_like, optional
+        Array of boundaries defining the bins of the pairwise velocity
+        used to compute its distribution. Default is None, in which case
+        the distribution is not computed.
+
+    num_threads : int, optional
+        Number of threads to use in calculation, where parallelization is performed
+        using the python ``multiprocessing`` module. Default is 1 for a purely serial
+        calculation, in which case a multiprocessing Pool object will
+        never be instantiated. A string 'max' may be used to indicate that
+        the pair counters should use all available cores on the machine.
+
+    approx_cell1_size : array_like, optional
+        Length-3 array serving as a guess for the optimal manner by how points
+        will be apportioned into subvolumes of the simulation box.
+        Default choice is to use the largest value of ``rp_bins`` in the xy-plane,
+        and ``pi_max`` in the z-dimension.
+
+    approx_cell2_size : array_like, optional
+        Analogous to ``approx_cell1_size``, but for sample2.
+
+    Returns
+    -------
+    counts : numpy.array
+        Integer array of shape (Ncombinations, len(rp_bins)-1) storing the number of pairs
+        in each bin. The combinations are, in this order, the pairs of ``sample1``,
+        the pairs between ``sample1`` and ``sample2``, and the pairs of ``sample2``,
+        keeping only those requested with ``do_auto`` and ``do_cross``.
+
+    moments : numpy.array
+        Array of shape (Ncombinations, len(rp_bins)-1, num_moments) storing the mean
+        of the pairwise velocity, followed by its 2nd, 3rd and 4th central moments,
+        normalized by the number of pairs. Bins without pairs are set to zero.
+
+    velocity_pdf : numpy.array
+        Array of shape (Ncombinations, len(rp_bins)-1, len(velocity_bins)-1) storing
+        the probability density of the pairwise velocity in each bin of separation,
+        normalized by the total number of pairs in the bin of separation.
+        Only returned if ``velocity_bins`` is not None.
+
+    Notes
+    -----
+    The line-of-sight pairwise velocity of points 1 and 2 is defined as
+    :math:`(v_{z, 1} - v_{z, 2}) \\times {\\rm sign}(z_1 - z_2)`,
+    as in `~halotools.mock_observables.mean_los_velocity_vs_rp`.
+
+    Examples
+    --------
+    >>> Npts, Lbox = 1000, 250.
+    >>> sample1 = np.random.uniform(0, Lbox, Npts*3).reshape((Npts, 3))
+    >>> velocities1 = np.random.normal(0, 100., Npts*3).reshape((Npts, 3))
+    >>> rp_bins, pi_max = np.logspace(0, 1.5, 10), 20.
+    >>> counts, moments = velocity_moments_xy_z(sample1, velocities1, rp_bins, pi_max, period=Lbox)
+    """
+    result = _velocity_moments_process_args(sample1, velocities1, sample2, velocities2,
+        do_auto, do_cross, num_moments, velocity_bins)
+    samples, velocities, combinations, num_moments, velocity_bins = result
+
+    sums = []
+    for a, b in combinations:
+        pi_bins = np.array([0., pi_max])
+        result = _npairs_xy_z_process_args(samples[a], samples[b], rp_bins, pi_bins, period,
+                False, num_threads, approx_cell1_size, approx_cell2_size)
+        x1in, y1in, z1in, x2in, y2in, z2in = result[0:6]
+        _rp_bins, pi_bins, _period, _num_threads, PBCs, _cell1_size, _cell2_size = result[6:]
+
+        rp_max = np.max(_rp_bins)
+        _pi_max = float(np.max(pi_bins))
+        search_lengths = rp_max, rp_max, _pi_max
+
+        sums.append(_velocity_moment_sums(x1in, y1in, z1in, x2in, y2in, z2in,
+            velocities[a], velocities[b], _rp_bins, _pi_max, num_moments, velocity_bins,
+            search_lengths, _period, PBCs, _num_threads, _cell1_size, _cell2_size))
+
+    return _normalize_velocity_moments(sums, num_moments, velocity_bins)
+
+
+def _velocity_moment_sums(x1in, y1in, z1in, x2in, y2in, z2in, velocities1, velocities2,
+        bins, pi_max, num_moments, velocity_bins, search_lengths,
+        period, PBCs, num_threads, approx_cell1_size, approx_cell2_size):
+    """ Private function building the mesh of one combination of samples and calling
+    the engine, shared by `~halotools.mock_observables.velocity_moments_3d` and
+    `~halotools.mock_observables.velocity_moments_xy_z`.
+
+    Returns the number of pairs, the mean and the sums of the powers of the deviations
+    from the mean, and the histogram of the velocities, merged over all threads.
+    """
+    xperiod, yperiod, zperiod = period
+    search_xlength, search_ylength, search_zlength = search_lengths
+
+    # Compute the estimates for the cell sizes
+    approx_cell1_size, approx_cell2_size = (
+        _set_approximate_cell_sizes(approx_cell1_size, approx_cell2_size, period)
+        )
+    approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
+    approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
+
+    # Build the rectangular mesh
+    double_mesh = RectangularDoubleMesh(x1in, y1in, z1in, x2in, y2in, z2in,
+        approx_x1cell_size, approx_y1cell_size, approx_z1cell_size,
+        approx_x2cell_size, approx_y2cell_size, approx_z2cell_size,
+        search_xlength, search_ylength, search_zlength, xperiod, yperiod, zperiod, PBCs)
+
+    # Create a function object that has a single argument, for parallelization purposes
+    engine = partial(velocity_moments_engine, double_mesh,
+        x1in, y1in, z1in, x2in, y2in, z2in, velocities1, velocities2,
+        bins, pi_max, num_moments, velocity_bins)
+
+    # Calculate the cell1 indices that will be looped over by the engine
+    num_threads, cell1_tuples = _cell1_parallelization_indices(
+        double_mesh.mesh1.ncells, num_threads)
+
+    if num_threads > 1:
+        pool = multiprocessing.Pool(num_threads)
+        result = pool.map(engine, cell1_tuples)
+        pool.close()
+    else:
+        result = [engine(cell1_tuples[0])]
+
+    # merge the partial results of each thread
+    counts, moments, velocity_histogram = result[0]
+    for partial_result in result[1:]:
+        counts, moments = _combine_velocity_moments(counts, moments,
+            partial_result[0], partial_result[1])
+        velocity_histogram = velocity_histogram + partial_result[2]
+
+    return counts, moments, velocity_histogram
+
+
+def _normalize_velocity_moments(sums, num_moments, velocity_bins):
+    """ Stack the results of `_velocity_moment_sums` for each combination of samples
+    and normalize the sums of the powers of the deviations by the number of pairs.
+    """
+    counts = np.array([result[0] for result in sums])
+    moments = np.array([result[1] for result in sums])
+    velocity_histogram = np.array([result[2] for result in sums])
+
+    n = np.maximum(counts, 1).astype(float)
+    moments[:, :, 1:] /= n[:, :, np.newaxis]
+    moments = moments[:, :, :num_moments]
+
+    if velocity_bins is None:
+        return counts, moments
+    else:
+        velocity_pdf = velocity_histogram/(n[:, :, np.newaxis]*np.diff(velocity_bins))
+        return counts, moments, velocity_pdf
+
+
+def _combine_velocity_moments(counts_a, moments_a, counts_b, moments_b):
+    """ Merge the number of pairs, mean and sums of the powers of the deviations
+    from the mean of two sets of pairs, using the pairwise formulas of
+    Chan et al. (1979) and Pebay (2008).
+
+    The moments arrays have shape (Nbins, 4), and store the mean
+    followed by the sums of the 2nd, 3rd and 4th powers of the deviations.
+    """
+    na = counts_a.astype(float)
+    nb = counts_b.astype(float)
+    counts = counts_a + counts_b
+    n = np.maximum(counts, 1).astype(float)
+
+    mean_a, m2a, m3a, m4a = (moments_a[..., i] for i in range(4))
+    mean_b, m2b, m3b, m4b = (moments_b[..., i] for i in range(4))
+    delta = mean_b - mean_a
+
+    moments = np.zeros_like(moments_a)
+    moments[..., 0] = mean_a + delta*nb/n
+    moments[..., 1] = m2a + m2b + delta**2*na*nb/n
+    moments[..., 2] = (m3a + m3b + delta**3*na*nb*(na - nb)/n**2 +
+        3*delta*(na*m2b - nb*m2a)/n)
+    moments[..., 3] = (m4a + m4b + delta**4*na*nb*(na*na - na*nb + nb*nb)/n**3 +
+        6*delta**2*(na*na*m2b + nb*nb*m2a)/n**2 + 4*delta*(na*m3b - nb*m3a)/n)
+    return counts, moments
+
+
+def _velocity_moments_process_args(sample1, velocities1, sample2, velocities2,
+        do_auto, do_cross, num_moments, velocity_bins):
+    """ Private function to process the arguments of
+    `~halotools.mock_observables.velocity_moments_3d` and
+    `~halotools.mock_observables.velocity_moments_xy_z`.
+
+    Returns the lists of the samples and velocities, 0 for ``sample1`` and 1 for ``sample2``,
+    and the list of the requested (a, b) combinations of samples,
+    each of which is counted with its own mesh.
+    """
+    samples = [enforce_sample_has_correct_shape(sample1)]
+    velocities = [_enforce_velocities_have_correct_shape(velocities1, len(samples[0]), 1)]
+
+    if sample2 is None:
+        combinations = [(0, 0)]
+    else:
+        samples.append(enforce_sample_has_correct_shape(sample2))
+        if velocities2 is None:
+            msg = ("\n If `sample2` is passed as an argument, \n"
+                   "`velocities2` must also be specified.")
+            raise ValueError(msg)
+        velocities.append(_enforce_velocities_have_correct_shape(velocities2, len(samples[1]), 2))
+
+        combinations = []
+        if do_auto is True:
+            combinations.append((0, 0))
+        if do_cross is True:
+            combinations.append((0, 1))
+        if do_auto is True:
+            combinations.append((1, 1))
+        if len(combinations) == 0:
+            msg = ("Both ``do_auto`` and ``do_cross`` have been set to False")
+            raise ValueError(msg)
+
+    try:
+        assert int(num_moments) == num_moments
+        assert 1 <= num_moments <= 4
+    except (AssertionError, TypeError, ValueError):
+        msg = "Input ``num_moments`` must be an integer between 1 and 4"
+        raise ValueError(msg)
+    num_moments = int(num_moments)
+
+    if velocity_bins is not None:
+        velocity_bins = np.atleast_1d(velocity_bins).astype('f8')
+        try:
+            assert velocity_bins.ndim == 1
+            assert len(velocity_bins) > 1
+            assert np.all(np.diff(velocity_bins) > 0)
+        except AssertionError:
+            msg = ("Input ``velocity_bins`` must be a monotonically increasing 1D array "
+                "with at least two entries")
+            raise ValueError(msg)
+
+    return samples, velocities, combinations, num_moments, velocity_bins
+
+
+def _enforce_velocities_have_correct_shape(velocities, npts, sample_id):
+    """ Private function ensuring that the velocities of a sample have shape (npts, 3).
+    """
+    velocities = np.atleast_1d(velocities).astype('f8')
+    if np.shape(velocities) != (npts, 3):
+        msg = ("Input ``velocities{0}`` must have shape ({1}, 3), "
+            "the same length as ``sample{0}``".format(sample_id, npts))
+        raise ValueError(msg)
+    return velocities
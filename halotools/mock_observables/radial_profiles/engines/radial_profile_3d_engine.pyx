@@ -13,49 +13,58 @@ __all__ = ('radial_profile_3d_engine', )
 @cython.boundscheck(False)
 @cython.wraparound(False)
 @cython.nonecheck(False)
-def radial_profile_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in, 
-    squared_normalize_rbins_by_in, sample2_quantity_in, rbins_normalized, cell1_tuple):
-    """ Cython engine for computing radial profiles 
-    as a function of (optionally normalized) three-dimensional separation. 
+def radial_profile_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
+    squared_normalize_rbins_by_in, sample2_quantities_in, rbins_normalized, per_object, cell1_tuple):
+    """ Cython engine for computing radial profiles of several quantities at once
+    as a function of (optionally normalized) three-dimensional separation.
 
-    Parameters 
+    Parameters
     ------------
-    double_mesh : object 
+    double_mesh : object
         Instance of `~halotools.mock_observables.RectangularDoubleMesh`
 
-    x1in, y1in, z1in : arrays 
+    x1in, y1in, z1in : arrays
         Numpy arrays storing Cartesian coordinates of points in sample 1
 
-    x2in, y2in, z2in : arrays 
+    x2in, y2in, z2in : arrays
         Numpy arrays storing Cartesian coordinates of points in sample 2
 
-    squared_normalize_rbins_by_in : array 
+    squared_normalize_rbins_by_in : array
+        Array of length Npts1 storing the square of the length-scale
+        used to normalize the distances to each point in sample 1.
 
-    sample2_quantity_in : array 
+    sample2_quantities_in : array
+        Array of shape (Npts2, Nquantities) storing the quantities
+        whose profiles are computed.
 
     rbins_normalized : array
         Boundaries defining the bins in which pairs are counted.
+        A pair is counted in bin *k* if rbins_normalized[k] < r/R <= rbins_normalized[k+1].
+
+    per_object : bool
+        If True, the profiles are accumulated separately for each point in sample 1.
 
     cell1_tuple : tuple
-        Two-element tuple defining the first and last cells in 
-        double_mesh.mesh1 that will be looped over. Intended for use with 
-        python multiprocessing. 
+        Two-element tuple defining the first and last cells in
+        double_mesh.mesh1 that will be looped over. Intended for use with
+        python multiprocessing.
 
-    Returns 
+    Returns
     --------
-    weighted_counts : array 
-        Array of length len(rbins_normalized) giving the number of pairs 
-        in ``sample2``separated from points in ``sample1`` by a distance less than 
-        the corresponding entry of ``rbins_normalized``, 
-        weighted by the values stored in sample2_quantity_in. 
-
-    counts : array 
-        Array of length len(rbins_normalized) giving the number of pairs 
-        in ``sample2``separated from points in ``sample1`` by a distance less than 
-        the corresponding entry of ``rbins_normalized``.
+    weighted_counts : array
+        Array of shape (Nquantities, len(rbins_normalized)-1) storing the sum of
+        each quantity over the pairs in each bin. If ``per_object`` is True, the array
+        has shape (Npts, Nquantities, len(rbins_normalized)-1) instead, with one entry for
+        each point of sample 1 in the cells defined by ``cell1_tuple``,
+        in the order of ``double_mesh.mesh1.idx_sorted``.
+
+    counts : array
+        Integer array of shape (len(rbins_normalized)-1, ) storing the number of pairs
+        in each bin, or of shape (Npts, len(rbins_normalized)-1) if ``per_object`` is True.
     """
 
-    cdef cnp.float64_t[:] rbins_normalized_squared = rbins_normalized*rbins_normalized
+    cdef cnp.float64_t[:] rbins_normalized_squared = np.ascontiguousarray(
+        rbins_normalized*rbins_normalized, dtype=np.float64)
     cdef cnp.float64_t xperiod = double_mesh.xperiod
     cdef cnp.float64_t yperiod = double_mesh.yperiod
     cdef cnp.float64_t zperiod = double_mesh.zperiod
@@ -63,10 +72,10 @@ def radial_profile_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef cnp.int64_t last_cell1_element = cell1_tuple[1]
     cdef int PBCs = double_mesh._PBCs
 
-    cdef int Ncell1 = double_mesh.mesh1.ncells
     cdef int num_rbins_normalized = len(rbins_normalized)
-    cdef cnp.float64_t[:] counts = np.zeros(num_rbins_normalized, dtype=np.float64)
-    cdef cnp.float64_t[:] counts2 = np.zeros(num_rbins_normalized, dtype=np.float64)
+    cdef cnp.float64_t rmin_squared = rbins_normalized_squared[0]
+    cdef cnp.float64_t rmax_squared = rbins_normalized_squared[num_rbins_normalized-1]
+    cdef int num_quantities = sample2_quantities_in.shape[1]
 
     cdef cnp.float64_t[:] x1 = np.ascontiguousarray(x1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] y1 = np.ascontiguousarray(y1in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
@@ -76,13 +85,25 @@ def radial_profile_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef cnp.float64_t[:] z2 = np.ascontiguousarray(z2in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
     cdef cnp.float64_t[:] squared_normalize_rbins_by = np.ascontiguousarray(
         squared_normalize_rbins_by_in[double_mesh.mesh1.idx_sorted], dtype=np.float64)
-    cdef cnp.float64_t[:] sample2_quantity = np.ascontiguousarray(
-        sample2_quantity_in[double_mesh.mesh2.idx_sorted], dtype=np.float64)
+    cdef cnp.float64_t[:, :] sample2_quantities = np.ascontiguousarray(
+        sample2_quantities_in[double_mesh.mesh2.idx_sorted, :], dtype=np.float64)
 
     cdef cnp.int64_t icell1, icell2
     cdef cnp.int64_t[:] cell1_indices = np.ascontiguousarray(double_mesh.mesh1.cell_id_indices, dtype=np.int64)
     cdef cnp.int64_t[:] cell2_indices = np.ascontiguousarray(double_mesh.mesh2.cell_id_indices, dtype=np.int64)
 
+    # points of sample 1 handled by this call, in the order of the mesh
+    cdef cnp.int64_t first_point = cell1_indices[first_cell1_element]
+    cdef cnp.int64_t num_rows = 1
+    cdef bint accumulate_per_object = per_object
+    if accumulate_per_object:
+        num_rows = cell1_indices[last_cell1_element] - first_point
+
+    cdef cnp.float64_t[:, :, :] weighted_counts = np.zeros(
+        (num_rows, num_quantities, num_rbins_normalized-1), dtype=np.float64)
+    cdef cnp.int64_t[:, :] counts = np.zeros(
+        (num_rows, num_rbins_normalized-1), dtype=np.int64)
+
     cdef cnp.int64_t ifirst1, ilast1, ifirst2, ilast2
 
     cdef int ix2, iy2, iz2, ix1, iy1, iz1
@@ -109,29 +130,17 @@ def radial_profile_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
     cdef int num_y2_per_y1 = num_y2divs // num_y1divs
     cdef int num_z2_per_z1 = num_z2divs // num_z1divs
 
-    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq, weight
+    cdef cnp.float64_t x2shift, y2shift, z2shift, dx, dy, dz, dsq
     cdef cnp.float64_t x1tmp, y1tmp, z1tmp, distance_norm1tmp
-    cdef int Ni, Nj, i, j, k, l
-
-    cdef cnp.float64_t[:] x_icell1, x_icell2
-    cdef cnp.float64_t[:] y_icell1, y_icell2
-    cdef cnp.float64_t[:] z_icell1, z_icell2
-    cdef cnp.float64_t[:] w_icell1, w_icell2
+    cdef cnp.int64_t i, j, row
+    cdef int k, q, low, high, mid
 
     for icell1 in range(first_cell1_element, last_cell1_element):
 
         ifirst1 = cell1_indices[icell1]
         ilast1 = cell1_indices[icell1+1]
 
-        #extract the points in cell1
-        x_icell1 = x1[ifirst1:ilast1]
-        y_icell1 = y1[ifirst1:ilast1]
-        z_icell1 = z1[ifirst1:ilast1]
-
-        w_icell1 = squared_normalize_rbins_by[ifirst1:ilast1]
-
-        Ni = ilast1 - ifirst1
-        if Ni > 0:
+        if ilast1 > ifirst1:
 
             ix1 = icell1 // (num_y1divs*num_z1divs)
             iy1 = (icell1 - ix1*num_y1divs*num_z1divs) // num_z1divs
@@ -141,9 +150,9 @@ def radial_profile_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
             leftmost_iy2 = iy1*num_y2_per_y1 - num_y2_covering_steps
             leftmost_iz2 = iz1*num_z2_per_z1 - num_z2_covering_steps
 
-            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps 
-            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps 
-            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps 
+            rightmost_ix2 = (ix1+1)*num_x2_per_x1 + num_x2_covering_steps
+            rightmost_iy2 = (iy1+1)*num_y2_per_y1 + num_y2_covering_steps
+            rightmost_iz2 = (iz1+1)*num_z2_per_z1 + num_z2_covering_steps
 
             for nonPBC_ix2 in range(leftmost_ix2, rightmost_ix2):
                 if nonPBC_ix2 < 0:
@@ -179,38 +188,41 @@ def radial_profile_3d_engine(double_mesh, x1in, y1in, z1in, x2in, y2in, z2in,
                         ifirst2 = cell2_indices[icell2]
                         ilast2 = cell2_indices[icell2+1]
 
-                        #extract the points in cell2
-                        x_icell2 = x2[ifirst2:ilast2]
-                        y_icell2 = y2[ifirst2:ilast2]
-                        z_icell2 = z2[ifirst2:ilast2]
-
-                        #extract the weights in cell2
-                        w_icell2 = sample2_quantity[ifirst2:ilast2]
-
-                        Nj = ilast2 - ifirst2
-                        #loop over points in cell1 points
-                        if Nj > 0:
-                            for i in range(0,Ni):
-                                x1tmp = x_icell1[i] - x2shift
-                                y1tmp = y_icell1[i] - y2shift
-                                z1tmp = z_icell1[i] - z2shift
-                                distance_norm1tmp = squared_normalize_rbins_by[i]
-                                #loop over points in cell2 points
-                                for j in range(0,Nj):
-                                    #calculate the square distance
-                                    dx = x1tmp - x_icell2[j]
-                                    dy = y1tmp - y_icell2[j]
-                                    dz = z1tmp - z_icell2[j]
-                                    dsq = (dx*dx + dy*dy + dz*dz)/distance_norm1tmp
-
-                                    weight = w_icell2[j]
-                                    k = num_rbins_normalized-1
-                                    while dsq <= rbins_normalized_squared[k]:
-                                        counts[k] += weight
-                                        counts2[k] += 1.
-                                        k=k-1
-                                        if k<0: break
-                                        
-    return np.array(counts), np.array(counts2)
-
-
+                        if ilast2 == ifirst2:
+                            continue
+
+                        for i in range(ifirst1, ilast1):
+                            x1tmp = x1[i] - x2shift
+                            y1tmp = y1[i] - y2shift
+                            z1tmp = z1[i] - z2shift
+                            distance_norm1tmp = squared_normalize_rbins_by[i]
+                            row = i - first_point if accumulate_per_object else 0
+
+                            for j in range(ifirst2, ilast2):
+                                #calculate the square distance
+                                dx = x1tmp - x2[j]
+                                dy = y1tmp - y2[j]
+                                dz = z1tmp - z2[j]
+                                dsq = (dx*dx + dy*dy + dz*dz)/distance_norm1tmp
+                                if (dsq <= rmin_squared) or (dsq > rmax_squared):
+                                    continue
+
+                                # index of the first bin edge not below dsq
+                                low = 1
+                                high = num_rbins_normalized - 1
+                                while low < high:
+                                    mid = (low + high) // 2
+                                    if rbins_normalized_squared[mid] < dsq:
+                                        low = mid + 1
+                                    else:
+                                        high = mid
+                                k = low - 1
+
+                                counts[row, k] += 1
+                                for q in range(num_quantities):
+                                    weighted_counts[row, q, k] += sample2_quantities[j, q]
+
+    if accumulate_per_object:
+        return np.array(weighted_counts), np.array(counts)
+    else:
+        return np.array(weighted_counts[0]), np.array(counts[0])
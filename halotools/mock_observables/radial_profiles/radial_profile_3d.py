@@ -16,6 +16,8 @@ from ..pair_counters.mesh_helpers import (_set_approximate_cell_sizes,
     _cell1_parallelization_indices, _enclose_in_box)
 from ..pair_counters.rectangular_mesh import RectangularDoubleMesh
 
+from ...utils.array_utils import unsorting_indices
+
 np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. marked_counts/counts
 
 __author__ = ('Andrew Hearin', )
@@ -24,7 +26,7 @@ __all__ = ('radial_profile_3d', )
 
 def radial_profile_3d(sample1, sample2, sample2_quantity,
         rbins_absolute=None, rbins_normalized=None, normalize_rbins_by=None,
-        return_counts=False, period=None, num_threads=1,
+        return_counts=False, per_object=False, period=None, num_threads=1,
         approx_cell1_size=None, approx_cell2_size=None):
     """ Function used to calculate the mean value of some quantity in ``sample2``
     as a function of 3d distance from the points in ``sample1``.
@@ -44,6 +46,11 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
     and set the ``return_counts`` argument to True.
     See the Examples below for an explicit demonstration.
 
+    Several quantities can be profiled at once by passing in a two-dimensional
+    ``sample2_quantity``, and the profiles of each point in ``sample1`` can be
+    returned individually by setting ``per_object`` to True. In all cases
+    the pairs are only traversed once.
+
     Parameters
     -----------
     sample1 : array_like
@@ -60,6 +67,8 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
     sample2_quantity: array_like
         Length-*Npts2* array containing the ``sample2`` quantity whose mean
         value is being calculated as a function of distance from points in ``sample1``.
+        Alternatively, an array of shape (*Npts2*, *Nquantities*) storing
+        several quantities whose profiles are all computed in the same pass.
 
     rbins_absolute : array_like, optional
         Array of length *Nrbins+1* defining the boundaries of bins in which
@@ -96,6 +105,10 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
         If set to True, `radial_profile_3d` will additionally return the number of
         pairs in each separation bin. Default is False.
 
+    per_object : bool, optional
+        If set to True, the profiles are computed separately for each point in ``sample1``
+        rather than averaged over all of ``sample1``. Default is False.
+
     period : array_like, optional
         Length-3 sequence defining the periodic boundary conditions
         in each dimension. If you instead provide a single scalar, Lbox,
@@ -127,11 +140,15 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
     result : array_like
         Numpy array of length *Nrbins* containing the mean value of
         ``sample2_quantity`` as a function of 3d distance from the points
-        in ``sample1``.
+        in ``sample1``. If ``sample2_quantity`` is two-dimensional, ``result``
+        has shape (*Nquantities*, *Nrbins*). If ``per_object`` is True,
+        ``result`` has an additional leading axis of length *Npts1*.
+        Bins without any pairs store NaN.
 
     counts : array_like, optional
         Numpy array of length *Nrbins* containing the number of pairs of
-        points in ``sample1`` and ``sample2`` as a function of 3d distance from the points.
+        points in ``sample1`` and ``sample2`` as a function of 3d distance from the points,
+        or of shape (*Npts1*, *Nrbins*) if ``per_object`` is True.
         Only returned if ``return_counts`` is set to True (default is False).
 
     Examples
@@ -178,6 +195,13 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
     >>> rbins_normalized = np.linspace(0.5, 10, 15)
     >>> result1 = radial_profile_3d(sample1, sample2, dmdt_sample2, rbins_normalized=rbins_normalized, normalize_rbins_by=rvir, period=halocat.Lbox)
 
+    The profiles of several quantities around each individual halo in ``sample1``
+    can be computed in a single pass:
+
+    >>> quantities = np.vstack([dmdt_sample2, halo_sample2['halo_spin']]).T
+    >>> result2 = radial_profile_3d(sample1, sample2, quantities, rbins_normalized=rbins_normalized, normalize_rbins_by=rvir, period=halocat.Lbox, per_object=True)
+    >>> assert result2.shape == (len(sample1), 2, len(rbins_normalized)-1)
+
     See also
     ---------
     :ref:`halo_catalog_analysis_tutorial2`
@@ -198,8 +222,8 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
     if period is None:
         x1in, y1in, z1in, x2in, y2in, z2in, period = (
             _enclose_in_box(
-                sample1[:, 0], sample1[:, 2], sample1[:, 2],
-                sample2[:, 0], sample2[:, 2], sample2[:, 2],
+                sample1[:, 0], sample1[:, 1], sample1[:, 2],
+                sample2[:, 0], sample2[:, 1], sample2[:, 2],
                 min_size=[max_rbins_absolute*3.0, max_rbins_absolute*3.0, max_rbins_absolute*3.0]))
     else:
         x1in = sample1[:, 0]
@@ -225,6 +249,7 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
     approx_x1cell_size, approx_y1cell_size, approx_z1cell_size = approx_cell1_size
     approx_x2cell_size, approx_y2cell_size, approx_z2cell_size = approx_cell2_size
 
+    single_quantity = np.ndim(sample2_quantity) < 2
     sample2_quantity = bounds_check_sample2_quantity(sample2, sample2_quantity)
 
     # Build the rectangular mesh
@@ -236,29 +261,33 @@ def radial_profile_3d(sample1, sample2, sample2_quantity,
     # Create a function object that has a single argument, for parallelization purposes
     engine = partial(radial_profile_3d_engine, double_mesh,
         x1in, y1in, z1in, x2in, y2in, z2in,
-        squared_normalize_rbins_by, sample2_quantity, rbins_normalized)
+        squared_normalize_rbins_by, sample2_quantity, rbins_normalized, per_object)
 
     # Calculate the cell1 indices that will be looped over by the engine
     num_threads, cell1_tuples = _cell1_parallelization_indices(
         double_mesh.mesh1.ncells, num_threads)
 
-    # print(rbins_normalized)
-    # print(set(normalize_rbins_by))
-
     if num_threads > 1:
         pool = multiprocessing.Pool(num_threads)
         result = pool.map(engine, cell1_tuples)
-        marked_counts, counts = result
-        marked_counts = np.sum(np.array(marked_counts), axis=0)
-        counts = np.sum(np.array(counts), axis=0)
         pool.close()
     else:
-        marked_counts, counts = engine(cell1_tuples[0])
-
-    marked_counts = np.diff(marked_counts)
-    counts = np.diff(counts)
+        result = [engine(cell1_tuples[0])]
+
+    if per_object:
+        # each thread returns the points of a contiguous range of cells,
+        # in the order in which they are stored in the mesh
+        idx_unsorted = unsorting_indices(double_mesh.mesh1.idx_sorted)
+        marked_counts = np.concatenate([r[0] for r in result])[idx_unsorted]
+        counts = np.concatenate([r[1] for r in result])[idx_unsorted]
+        result = marked_counts/counts[:, np.newaxis, :]
+    else:
+        marked_counts = np.sum([r[0] for r in result], axis=0)
+        counts = np.sum([r[1] for r in result], axis=0)
+        result = marked_counts/counts
 
-    result = marked_counts/counts
+    if single_quantity:
+        result = result[..., 0, :]
 
     if return_counts is True:
         return result, counts
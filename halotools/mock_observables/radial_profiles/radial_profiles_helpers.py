@@ -10,6 +10,10 @@ __all__ = ('bounds_check_sample2_quantity', )
 
 def bounds_check_sample2_quantity(sample2, sample2_quantity):
     """ Function enforces that input ``sample2_quantity`` has the appropriate shape.
+
+    The input may either be a length-*Npts2* array storing a single quantity,
+    or an array of shape (*Npts2*, *Nquantities*) storing several quantities.
+    The returned array always has shape (*Npts2*, *Nquantities*).
     """
     npts2 = sample2.shape[0]
     sample2_quantity = np.atleast_1d(sample2_quantity).astype('f8')
@@ -20,6 +24,13 @@ def bounds_check_sample2_quantity(sample2, sample2_quantity):
         msg = ("Input ``sample2_quantity`` has %i elements, "
             "but input ``sample2`` has %i elements.\n" % (npts_quantity2, npts2))
         raise ValueError(msg)
+
+    if sample2_quantity.ndim == 1:
+        sample2_quantity = sample2_quantity.reshape((npts2, 1))
+    elif sample2_quantity.ndim != 2:
+        msg = ("Input ``sample2_quantity`` must be a 1d array of length Npts2 \n"
+            "or a 2d array of shape (Npts2, Nquantities).\n")
+        raise ValueError(msg)
     return sample2_quantity
 
 
@@ -344,3 +344,96 @@ def test_enforce_search_length():
             rbins_normalized=rbins_normalized, normalize_rbins_by=normalize_rbins_by, period=1)
     substr = "This exceeds the maximum permitted search length of period/3."
     assert substr in err.value.args[0]
+
+
+def brute_force_radial_profile(sample1, sample2, quantities, rbins_normalized,
+        normalize_rbins_by, period=None):
+    """ Sum of each quantity and number of pairs in each normalized separation bin
+    around each point in sample1, using the minimum image convention.
+    """
+    d = sample1[:, np.newaxis, :] - sample2[np.newaxis, :, :]
+    if period is not None:
+        d = np.where(d > period/2., d - period, d)
+        d = np.where(d < -period/2., d + period, d)
+    x = np.sqrt(np.sum(d**2, axis=2))/normalize_rbins_by[:, np.newaxis]
+
+    nbins = len(rbins_normalized) - 1
+    sums = np.zeros((len(sample1), quantities.shape[1], nbins))
+    counts = np.zeros((len(sample1), nbins), dtype=int)
+    for k in range(nbins):
+        mask = (x > rbins_normalized[k]) & (x <= rbins_normalized[k+1])
+        counts[:, k] = np.sum(mask, axis=1)
+        sums[:, :, k] = np.dot(mask, quantities)
+    return sums, counts
+
+
+def test_radial_profile_3d_per_object():
+    """ Compare the per-object profiles of several quantities to a brute force calculation,
+    with and without PBCs, for normalization radii varying from point to point.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((100, 3))
+        sample2 = np.random.random((400, 3))
+        quantities = np.random.random((400, 3))
+        rvir = np.random.uniform(0.02, 0.05, 100)
+    rbins_normalized = np.array([0.5, 1, 2, 4])
+
+    for period in (1, None):
+        result, counts = radial_profile_3d(sample1, sample2, quantities,
+            rbins_normalized=rbins_normalized, normalize_rbins_by=rvir,
+            period=period, per_object=True, return_counts=True)
+        assert result.shape == (100, 3, 3)
+        assert counts.shape == (100, 3)
+
+        sums, correct_counts = brute_force_radial_profile(sample1, sample2, quantities,
+            rbins_normalized, rvir, period=period)
+        assert np.all(counts == correct_counts)
+        has_pairs = correct_counts > 0
+        for q in range(3):
+            correct_result = sums[:, q, :][has_pairs]/correct_counts[has_pairs]
+            assert np.allclose(result[:, q, :][has_pairs], correct_result)
+            assert np.all(np.isnan(result[:, q, :][~has_pairs]))
+
+        result2, counts2 = radial_profile_3d(sample1, sample2, quantities,
+            rbins_normalized=rbins_normalized, normalize_rbins_by=rvir,
+            period=period, return_counts=True)
+        assert result2.shape == (3, 3)
+        assert np.all(counts2 == np.sum(correct_counts, axis=0))
+        assert np.allclose(result2, np.sum(sums, axis=0)/np.sum(correct_counts, axis=0))
+
+
+def test_radial_profile_3d_multiple_quantities():
+    """ Verify that profiling several quantities at once gives the same results
+    as profiling them one at a time, using multiple threads.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+        sample2 = np.random.random((1000, 3))
+        quantities = np.random.random((1000, 2))
+    rbins_absolute = np.linspace(0.02, 0.2, 5)
+
+    result = radial_profile_3d(sample1, sample2, quantities,
+        rbins_absolute=rbins_absolute, period=1, num_threads=2)
+    per_object_result = radial_profile_3d(sample1, sample2, quantities,
+        rbins_absolute=rbins_absolute, period=1, num_threads=3, per_object=True)
+    for q in range(2):
+        result_q = radial_profile_3d(sample1, sample2, quantities[:, q],
+            rbins_absolute=rbins_absolute, period=1)
+        assert np.allclose(result[q], result_q)
+        per_object_result_q = radial_profile_3d(sample1, sample2, quantities[:, q],
+            rbins_absolute=rbins_absolute, period=1, per_object=True)
+        assert np.allclose(per_object_result[:, q, :], per_object_result_q, equal_nan=True)
+
+
+def test_args_processing4():
+    """ Verify that a 3d ``sample2_quantity`` raises an informative exception.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((10, 3))
+        sample2 = np.random.random((10, 3))
+        quantity = np.random.random((10, 2, 2))
+
+    with pytest.raises(ValueError) as err:
+        radial_profile_3d(sample1, sample2, quantity, rbins_absolute=[0.1, 0.2], period=1)
+    substr = "or a 2d array of shape (Npts2, Nquantities)."
+    assert substr in err.value.args[0]
@@ -0,0 +1,149 @@
+""" Module providing unit-testing for the functions in
+the `~halotools.mock_observables.lightcone` module
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.tests.helper import pytest
+from astropy.utils.misc import NumpyRNGContext
+from astropy.cosmology import WMAP9, FlatLambdaCDM
+
+from ..lightcone import (lightcone, lightcone_shells, comoving_distance_to_redshift,
+    _distance_redshift_tables)
+
+__all__ = ('test_comoving_distance_to_redshift', 'test_lightcone_brute_force',
+    'test_lightcone_angles_and_redshifts', 'test_lightcone_footprint',
+    'test_lightcone_multiple_boxes', 'test_lightcone_bad_args')
+
+fixed_seed = 43
+
+
+def test_comoving_distance_to_redshift():
+    """ Verify that the redshifts interpolated from the cached tables agree with
+    the comoving distances computed by astropy, and that the tables are only computed once.
+    """
+    z = np.array((0.001, 0.1, 0.5, 1., 3., 10.))
+    for cosmo in (WMAP9, FlatLambdaCDM(H0=70, Om0=0.3)):
+        distance = cosmo.comoving_distance(z).value*cosmo.h
+        redshift = comoving_distance_to_redshift(distance, cosmo=cosmo)
+        assert np.allclose(redshift, z, rtol=1e-5)
+
+        table = _distance_redshift_tables[repr(cosmo)]
+        comoving_distance_to_redshift(distance, cosmo=cosmo)
+        assert _distance_redshift_tables[repr(cosmo)] is table
+
+    with pytest.raises(ValueError) as err:
+        comoving_distance_to_redshift(-1.)
+    substr = "Input ``distance`` must be between 0 and the comoving distance"
+    assert substr in err.value.args[0]
+
+
+def test_lightcone_brute_force():
+    """ Compare the points of the lightcone to an explicit replication of the box,
+    for an observer at the corner and at an arbitrary position in a non-cubic box.
+    """
+    Npts = 200
+    period = np.array((1., 1.5, 2.))
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((Npts, 3))*period
+    distance_bins = np.array((0.2, 1., 2.5, 3.))
+
+    for observer in (None, (0.3, 1.2, 0.1)):
+        obs = np.zeros(3) if observer is None else np.array(observer)
+        offsets = np.array([(i, j, k) for i in range(-4, 5)
+            for j in range(-4, 5) for k in range(-4, 5)])*period
+        replicated = (sample[np.newaxis, :, :] + offsets[:, np.newaxis, :]).reshape((-1, 3))
+        replicated_idx = np.tile(np.arange(Npts), len(offsets))
+        d = np.sqrt(np.sum((replicated - obs)**2, axis=1))
+
+        shells = lightcone_shells(sample, period, distance_bins, observer=observer,
+            chunk_size=57)
+        for ishell, (ra, dec, redshift, idx) in enumerate(shells):
+            in_shell = (d >= distance_bins[ishell]) & (d < distance_bins[ishell+1])
+            assert len(idx) == np.count_nonzero(in_shell)
+            assert np.all(np.sort(idx) == np.sort(replicated_idx[in_shell]))
+            assert np.allclose(np.sort(redshift),
+                comoving_distance_to_redshift(np.sort(d[in_shell])))
+
+
+def test_lightcone_angles_and_redshifts():
+    """ Verify the angular coordinates and the contribution of the peculiar velocities
+    to the redshifts for points of the central replica of the box.
+    """
+    Npts, Lbox = 500, 100.
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((Npts, 3))*Lbox
+        velocities = np.random.normal(0, 300, (Npts, 3))
+    observer = np.array((50., 50., 50.))
+    distance_bins = np.array((0., 50.))
+
+    ra, dec, redshift, idx = lightcone(sample, Lbox, distance_bins,
+        velocities=velocities, cosmo=WMAP9, observer=observer)
+    assert np.all((ra >= 0) & (ra < 360))
+    assert np.all((dec >= -90) & (dec <= 90))
+
+    pos = sample[idx] - observer
+    d = np.sqrt(np.sum(pos**2, axis=1))
+    assert np.allclose(np.cos(np.radians(dec))*np.cos(np.radians(ra)), pos[:, 0]/d)
+    assert np.allclose(np.cos(np.radians(dec))*np.sin(np.radians(ra)), pos[:, 1]/d)
+    assert np.allclose(np.sin(np.radians(dec)), pos[:, 2]/d)
+
+    z_cos = lightcone(sample, Lbox, distance_bins, cosmo=WMAP9, observer=observer)[2]
+    vr = np.sum(velocities[idx]*pos, axis=1)/d
+    assert np.allclose(redshift, z_cos + vr/299792.458*(1 + z_cos))
+
+
+def test_lightcone_footprint():
+    Npts, Lbox = 500, 100.
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((Npts, 3))*Lbox
+    distance_bins = np.linspace(0, 250, 4)
+
+    ra, dec, redshift, idx = lightcone(sample, Lbox, distance_bins)
+
+    def footprint(ra, dec):
+        return (dec > 10) & (ra < 90)
+    ra2, dec2, redshift2, idx2 = lightcone(sample, Lbox, distance_bins, footprint=footprint)
+    mask = footprint(ra, dec)
+    assert np.all(ra2 == ra[mask])
+    assert np.all(dec2 == dec[mask])
+    assert np.all(idx2 == idx[mask])
+
+
+def test_lightcone_multiple_boxes():
+    """ Verify that each shell is built from the box provided for that shell.
+    """
+    Npts, Lbox = 300, 100.
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))*Lbox
+        sample2 = np.random.random((2*Npts, 3))*Lbox
+    distance_bins = np.array((0., 100., 200.))
+
+    shells = list(lightcone_shells([sample1, sample2], Lbox, distance_bins))
+    shells1 = list(lightcone_shells(sample1, Lbox, distance_bins))
+    shells2 = list(lightcone_shells(sample2, Lbox, distance_bins))
+    for result, correct_result in zip(shells[0], shells1[0]):
+        assert np.all(result == correct_result)
+    for result, correct_result in zip(shells[1], shells2[1]):
+        assert np.all(result == correct_result)
+
+
+def test_lightcone_bad_args():
+    Npts, Lbox = 10, 100.
+    with NumpyRNGContext(fixed_seed):
+        sample = np.random.random((Npts, 3))*Lbox
+
+    with pytest.raises(ValueError) as err:
+        lightcone(sample, Lbox, [100., 50.])
+    substr = "Input ``distance_bins`` must be a 1d array of at least two"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        lightcone([sample, sample], Lbox, [0., 50., 100., 150.])
+    substr = "it must have one entry for each shell"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(ValueError) as err:
+        lightcone(sample, Lbox, [0., 50.], velocities=sample[:-1])
+    substr = "Input ``velocities`` must have the same length as ``sample``"
+    assert substr in err.value.args[0]
@@ -11,12 +11,14 @@ from astropy.utils.misc import NumpyRNGContext
 from .tpcf_estimators import _TP_estimator_requirements, _TP_estimator
 from .clustering_helpers import (verify_tpcf_estimator,
     downsample_inputs_exceeding_max_sample_size, process_optional_input_sample2)
+from .random_pair_counts import (random_pair_counts, spherical_cap_areas,
+    number_of_randoms, process_precomputed_random_counts)
 
 
-from ..pair_counters import npairs_3d
+from ..pair_counters import npairs_angular
 from ..mock_observables_helpers import get_num_threads
 
-from ...utils.spherical_geometry import spherical_to_cartesian, chord_to_cartesian
+from ...utils.spherical_geometry import chord_to_cartesian
 from ...custom_exceptions import HalotoolsError
 from ...utils.array_utils import array_is_monotonic
 
@@ -28,7 +30,7 @@ np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. DD
 
 def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
         do_auto=True, do_cross=True, estimator='Natural', num_threads=1,
-        max_sample_size=int(1e6), seed=None):
+        max_sample_size=int(1e6), RR_precomputed=None, NR_precomputed=None, seed=None):
     """
     Calculate the angular two-point correlation function, :math:`w(\\theta)`.
 
@@ -83,6 +85,19 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
         the sample will be randomly down-sampled such that the subsample
         is equal to ``max_sample_size``. Default value is 1e6.
 
+    RR_precomputed : array_like, optional
+        Array of length *len(theta_bins)-1* storing the number of RR-counts
+        calculated in advance during a pre-processing phase.
+        If the ``RR_precomputed`` argument is provided,
+        you must also provide the ``NR_precomputed`` argument.
+        Default is None.
+
+    NR_precomputed : int, optional
+        Number of points in the random sample used to calculate ``RR_precomputed``.
+        If the ``NR_precomputed`` argument is provided,
+        you must also provide the ``RR_precomputed`` argument.
+        Default is None.
+
     seed : int, optional
         Random number seed used to randomly downsample data, if applicable.
         Default is None, in which case downsampling will be stochastic.
@@ -117,7 +132,7 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
 
     Notes
     -----
-    Pairs are counted using `~halotools.mock_observables.npairs_3d`.
+    Pairs are counted using `~halotools.mock_observables.npairs_angular`.
 
     Examples
     --------
@@ -138,96 +153,44 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
 
     # check input arguments using clustering helper functions
     function_args = (sample1, theta_bins, sample2, randoms, do_auto, do_cross,
-        estimator, num_threads, max_sample_size, seed)
+        estimator, num_threads, max_sample_size, RR_precomputed, NR_precomputed, seed)
 
     # pass arguments in, and get out processed arguments, plus some control flow variables
     sample1, theta_bins, sample2, randoms, do_auto, do_cross, num_threads,\
-        _sample1_is_sample2 = _angular_tpcf_process_args(*function_args)
+        _sample1_is_sample2, RR_precomputed, NR_precomputed =\
+        _angular_tpcf_process_args(*function_args)
 
     # convert angular bins to coord lengths on a unit sphere
     chord_bins = chord_to_cartesian(theta_bins, radians=False)
 
-    # convert samples and randoms to cartesian coordinates (x,y,z) on a unit sphere
-    x, y, z = spherical_to_cartesian(sample1[:, 0], sample1[:, 1])
-    sample1 = np.vstack((x, y, z)).T
-    if _sample1_is_sample2:
-        sample2 = sample1
-    else:
-        x, y, z = spherical_to_cartesian(sample2[:, 0], sample2[:, 1])
-        sample2 = np.vstack((x, y, z)).T
-    if randoms is not None:
-        x, y, z = spherical_to_cartesian(randoms[:, 0], randoms[:, 1])
-        randoms = np.vstack((x, y, z)).T
-
-    def random_counts(sample1, sample2, randoms, chord_bins,
+    def random_counts(sample1, sample2, randoms, theta_bins,
             num_threads, do_RR, do_DR, _sample1_is_sample2):
         """
         Count random pairs.
+        See `~halotools.mock_observables.two_point_clustering.random_pair_counts.random_pair_counts`.
+
+        Analytical counts are N**2*da*rho, where da is the area of the rings
+        on the unit sphere, which is only correct for continuous all-sky coverage.
         """
-        def area_spherical_cap(chord):
-            """
-            Calculate the area of a spherical cap on a unit sphere given the chord length
-            """
-            h = 1.0 - np.sqrt(1.0-chord**2)
-            return np.pi*(chord**2+h**2)
-
-        # randoms provided, so calculate random pair counts.
-        if randoms is not None:
-            if do_RR is True:
-                RR = npairs_3d(randoms, randoms, chord_bins,
-                            num_threads=num_threads)
-                RR = np.diff(RR)
-            else:
-                RR = None
-            if do_DR is True:
-                D1R = npairs_3d(sample1, randoms, chord_bins,
-                             num_threads=num_threads)
-                D1R = np.diff(D1R)
-            else:
-                D1R = None
-            if _sample1_is_sample2:
-                D2R = None
-            else:
-                if do_DR is True:
-                    D2R = npairs_3d(sample2, randoms, chord_bins,
-                                 num_threads=num_threads)
-                    D2R = np.diff(D2R)
-                else:
-                    D2R = None
-            return D1R, D2R, RR
-        elif randoms is None:
-
-            # set the number of randoms equal to the number of points in sample1
-            NR = len(sample1)
-
-            # do area calculations
-            da = area_spherical_cap(chord_bins)
-            da = np.diff(da)
-            global_area = 4.0*np.pi  # surface area of a unit sphere
-
-            # calculate randoms for sample1
-            N1 = np.shape(sample1)[0]  # number of points in sample1
-            rho1 = N1/global_area  # number density of points
-            D1R = (N1)*(da*rho1)  # random counts are N**2*dv*rho
-
-            N2 = np.shape(sample2)[0]
-            rho2 = N2/global_area  # number density of points
-            D2R = N2*(da*rho2)
-
-            # calculate the random-random pairs.
-            rhor = NR**2/global_area
-            RR = (da*rhor)
-
-            return D1R, D2R, RR
-
-    def pair_counts(sample1, sample2, chord_bins,
+        def count_pairs(s1, s2, approx_cell1_size, approx_cell2_size):
+            return np.diff(npairs_angular(s1, s2, theta_bins, num_threads=num_threads))
+
+        # surface area of a unit sphere
+        global_area = 4.0*np.pi
+
+        return random_pair_counts(sample1, sample2, randoms, count_pairs,
+            spherical_cap_areas(chord_bins), global_area,
+            do_RR, do_DR, _sample1_is_sample2,
+            RR_precomputed=RR_precomputed, NR_precomputed=NR_precomputed)
+
+    def pair_counts(sample1, sample2, theta_bins,
             N_thread, do_auto, do_cross, _sample1_is_sample2):
         """
         Count data-data pairs.
         """
 
         if do_auto is True:
-            D1D1 = npairs_3d(sample1, sample1, chord_bins, num_threads=num_threads)
+            D1D1 = npairs_angular(sample1, sample1, theta_bins, num_threads=num_threads)
             D1D1 = np.diff(D1D1)
         else:
             D1D1 = None
@@ -238,12 +201,12 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
             D2D2 = D1D1
         else:
             if do_cross is True:
-                D1D2 = npairs_3d(sample1, sample2, chord_bins, num_threads=num_threads)
+                D1D2 = npairs_angular(sample1, sample2, theta_bins, num_threads=num_threads)
                 D1D2 = np.diff(D1D2)
             else:
                 D1D2 = None
             if do_auto is True:
-                D2D2 = npairs_3d(sample2, sample2, chord_bins, num_threads=num_threads)
+                D2D2 = npairs_angular(sample2, sample2, theta_bins, num_threads=num_threads)
                 D2D2 = np.diff(D2D2)
             else:
                 D2D2 = None
@@ -256,18 +219,13 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
     # How many points are there (for normalization purposes)?
     N1 = len(sample1)
     N2 = len(sample2)
-    if randoms is not None:
-        NR = len(randoms)
-    else:
-        # set the number of randoms equal to the number of points in sample1
-        # this is arbitrarily set, but must remain consistent!
-        NR = N1
+    NR = number_of_randoms(sample1, randoms, NR_precomputed)
 
     # count data pairs
-    D1D1, D1D2, D2D2 = pair_counts(sample1, sample2, chord_bins,
+    D1D1, D1D2, D2D2 = pair_counts(sample1, sample2, theta_bins,
         num_threads, do_auto, do_cross, _sample1_is_sample2)
     # count random pairs
-    D1R, D2R, RR = random_counts(sample1, sample2, randoms, chord_bins,
+    D1R, D2R, RR = random_counts(sample1, sample2, randoms, theta_bins,
         num_threads, do_RR, do_DR, _sample1_is_sample2)
 
     # run results through the estimator and return relavent/user specified results.
@@ -290,7 +248,8 @@ def angular_tpcf(sample1, theta_bins, sample2=None, randoms=None,
 
 
 def _angular_tpcf_process_args(sample1, theta_bins, sample2, randoms,
-        do_auto, do_cross, estimator, num_threads, max_sample_size, seed):
+        do_auto, do_cross, estimator, num_threads, max_sample_size,
+        RR_precomputed, NR_precomputed, seed):
     """
     Private method to do bounds-checking on the arguments passed to
     `~halotools.mock_observables.angular_tpcf`.
@@ -333,5 +292,8 @@ def _angular_tpcf_process_args(sample1, theta_bins, sample2, randoms,
 
     verify_tpcf_estimator(estimator)
 
+    RR_precomputed, NR_precomputed = process_precomputed_random_counts(
+        RR_precomputed, NR_precomputed, randoms, (len(theta_bins)-1, ), 'theta_bins')
+
     return sample1, theta_bins, sample2, randoms, do_auto, do_cross, num_threads,\
-        _sample1_is_sample2
+        _sample1_is_sample2, RR_precomputed, NR_precomputed
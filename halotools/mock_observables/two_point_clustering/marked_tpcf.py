@@ -6,7 +6,6 @@ calculate the marked two-point correlation function.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import numpy as np
-from astropy.utils.misc import NumpyRNGContext
 
 from .clustering_helpers import (process_optional_input_sample2,
     downsample_inputs_exceeding_max_sample_size)
@@ -18,6 +17,7 @@ from ..pair_counters.mesh_helpers import _enforce_maximum_search_length
 from ..pair_counters import npairs_3d, marked_npairs_3d
 
 from ...custom_exceptions import HalotoolsError
+from ...utils.random_streams import rng_stream
 
 
 __all__ = ['marked_tpcf']
@@ -108,7 +108,7 @@ def marked_tpcf(sample1, rbins, sample2=None,
 
     iterations : int, optional
         integer indicating the number of times to calculate the random weights,
-        taking the mean of the outcomes.  Only applicable if ``normalize_by`` is set
+        taking the median of the outcomes.  Only applicable if ``normalize_by`` is set
         to 'random_marks'.  See Notes for further explanation.
 
     randomize_marks : array_like, optional
@@ -169,8 +169,9 @@ def marked_tpcf(sample1, rbins, sample2=None,
     and marks :math:`m_i,m_j`.  :math:`f()` is the marking function, ``weight_func_id``.  The sum
     in the denominator is over an equal number of random pairs :math:`k,l`. The
     calculation of this sum can be done multiple times, by setting the ``iterations``
-    parameter. The mean of the sum is then taken amongst iterations and used in the
-    calculation.
+    parameter. The median of the sum is then taken amongst iterations and used in the
+    calculation. All iterations are computed in a single pass over the pairs,
+    so that additional iterations only add the cost of evaluating the marking function.
 
     If ``normalize_by`` is 'number_counts', then :math:`\\mathrm{XX} \\equiv \\mathrm{DD}`
     is calculated by counting total number of pairs using
@@ -322,32 +323,19 @@ def marked_tpcf(sample1, rbins, sample2=None,
             num_threads, do_auto, do_cross, _sample1_is_sample2, None, None)
     # calculate randomized marked pairs
     elif normalize_by == 'random_marks':
-        if iterations > 1:
-            # create storage arrays of the right shape
-            R1R1 = np.zeros((iterations, len(rbins)-1))
-            R1R2 = np.zeros((iterations, len(rbins)-1))
-            R2R2 = np.zeros((iterations, len(rbins)-1))
-            for i in range(iterations):
-                # get arrays to randomize marks
-                with NumpyRNGContext(seed):
-                    permutate1 = np.random.permutation(np.arange(0, len(sample1)))
-                    permutate2 = np.random.permutation(np.arange(0, len(sample2)))
-                R1R1[i, :], R1R2[i, :], R2R2[i, :] = random_counts(
-                    sample1, sample2, rbins, period, num_threads,
-                    do_auto, do_cross, marks1, marks2, weight_func_id,
-                    _sample1_is_sample2, permutate1, permutate2, randomize_marks)
-
-            R1R1 = np.median(R1R1, axis=0)
-            R1R2 = np.median(R1R2, axis=0)
-            R2R2 = np.median(R2R2, axis=0)
-        else:
-            # get arrays to randomize marks
-            with NumpyRNGContext(seed):
-                permutate1 = np.random.permutation(np.arange(0, len(sample1)))
-                permutate2 = np.random.permutation(np.arange(0, len(sample2)))
-            R1R1, R1R2, R2R2 = random_counts(sample1, sample2, rbins, period,
-                num_threads, do_auto, do_cross, marks1, marks2, weight_func_id,
-                _sample1_is_sample2, permutate1, permutate2, randomize_marks)
+        # get arrays to randomize marks, one permutation per iteration
+        # both samples draw from the same stream, so identical samples get identical permutations
+        rng1 = rng_stream(seed, 'marked_tpcf', 'marks')
+        permutate1 = np.array([rng1.permutation(len(sample1)) for i in range(int(iterations))])
+        rng2 = rng_stream(seed, 'marked_tpcf', 'marks')
+        permutate2 = np.array([rng2.permutation(len(sample2)) for i in range(int(iterations))])
+        # all iterations are counted in a single pass over the pairs
+        R1R1, R1R2, R2R2 = random_counts(sample1, sample2, rbins, period,
+            num_threads, do_auto, do_cross, marks1, marks2, weight_func_id,
+            _sample1_is_sample2, permutate1, permutate2, randomize_marks)
+
+        R1R1, R1R2, R2R2 = (None if R is None else np.median(R, axis=0)
+            for R in (R1R1, R1R2, R2R2))
 
     # return results
     if _sample1_is_sample2:
@@ -410,22 +398,21 @@ def random_counts(sample1, sample2, rbins, period, num_threads,
         _sample1_is_sample2, permutate1, permutate2, randomize_marks):
     """
     Count random weighted data pairs.
+
+    ``permutate1`` and ``permutate2`` have shape (iterations, Npts), storing one
+    permutation of the marks per iteration. The permuted marks of all iterations are
+    stacked into 3-D weights so that `marked_npairs_3d` counts every iteration
+    in a single pass over the pairs. Each returned array has shape (iterations, len(rbins)-1).
     """
 
-    permuted_marks1 = marks1
-    permuted_marks2 = marks2
-    for i in range(marks1.shape[1]):
-        if randomize_marks[i]:
-            permuted_marks1[:, i] = marks1[permutate1, i]
-    for i in range(marks2.shape[1]):
-        if randomize_marks[i]:
-            permuted_marks2[:, i] = marks2[permutate2, i]
+    permuted_marks1 = _permuted_mark_sets(marks1, permutate1, randomize_marks)
+    permuted_marks2 = _permuted_mark_sets(marks2, permutate2, randomize_marks)
 
     if do_auto is True:
         R1R1 = marked_npairs_3d(sample1, sample1, rbins,
-            weights1=marks1, weights2=permuted_marks1,
+            weights1=permuted_marks1, weights2=permuted_marks1,
             weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-        R1R1 = np.diff(R1R1)
+        R1R1 = np.diff(R1R1, axis=-1)
     else:
         R1R1 = None
         R2R2 = None
@@ -439,20 +426,33 @@ def random_counts(sample1, sample2, rbins, period, num_threads,
                 weights1=permuted_marks1,
                 weights2=permuted_marks2,
                 weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-            R1R2 = np.diff(R1R2)
+            R1R2 = np.diff(R1R2, axis=-1)
         else:
             R1R2 = None
         if do_auto is True:
             R2R2 = marked_npairs_3d(sample2, sample2, rbins,
-                weights1=marks2, weights2=permuted_marks2,
+                weights1=permuted_marks2, weights2=permuted_marks2,
                 weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-            R2R2 = np.diff(R2R2)
+            R2R2 = np.diff(R2R2, axis=-1)
         else:
             R2R2 = None
 
     return R1R1, R1R2, R2R2
 
 
+def _permuted_mark_sets(marks, permutations, randomize_marks):
+    """
+    Return the array of shape (Npts, iterations, N_marks) storing the marks
+    randomized by each permutation. Marks not selected by ``randomize_marks``
+    keep their original order in every iteration.
+    """
+    mark_sets = np.repeat(marks[:, np.newaxis, :], len(permutations), axis=1)
+    for i in range(marks.shape[1]):
+        if randomize_marks[i]:
+            mark_sets[:, :, i] = marks[permutations.T, i]
+    return mark_sets
+
+
 def pair_counts(sample1, sample2, rbins, period, num_threads, do_auto, do_cross,
         _sample1_is_sample2, approx_cell1_size, approx_cell2_size):
     """
@@ -516,6 +516,14 @@ def _marked_tpcf_process_args(sample1, rbins, sample2, marks1, marks2,
         msg = ("\n `normalize_by` parameter not recognized.")
         raise ValueError(msg)
 
+    # process iterations parameter
+    try:
+        assert int(iterations) == iterations
+        assert iterations >= 1
+    except (TypeError, ValueError, AssertionError):
+        msg = ("\n `iterations` parameter must be a positive integer.")
+        raise ValueError(msg)
+
     # process marks
     if marks1 is not None:
         marks1 = np.atleast_1d(marks1).astype(float)
@@ -0,0 +1,264 @@
+"""
+Module containing the functions used by all two-point clustering estimators in
+`~halotools.mock_observables` to count, or analytically compute,
+the data-random and random-random pairs.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from warnings import warn
+
+from ...custom_exceptions import HalotoolsError
+
+__all__ = ('random_pair_counts', 'spherical_shell_volumes', 's_mu_sector_volumes',
+    'rp_pi_cylinder_volumes', 'spherical_cap_areas', 'number_of_randoms',
+    'process_precomputed_random_counts')
+
+__author__ = ['Duncan Campbell', 'Andrew Hearin']
+
+
+def spherical_shell_volumes(rbins):
+    """ Volume of the spherical shells defined by ``rbins``.
+
+    Parameters
+    -----------
+    rbins : array_like
+        Array of length *Nrbins+1* storing the boundaries of the shells.
+
+    Returns
+    --------
+    volumes : array_like
+        Array of length *Nrbins*.
+    """
+    return np.diff((4.0*np.pi/3.0)*rbins**3)
+
+
+def s_mu_sector_volumes(s_bins, mu_bins):
+    """ Volume of the pieces of the spherical shells defined by ``s_bins`` in which
+    the cosine of the angle to the line-of-sight, :math:`\\mu`, lies within
+    the bins ``mu_bins``, on both sides of the plane perpendicular to the line-of-sight.
+
+    The volume of the sphere of radius *s* with :math:`|\\mu| < \\mu_{\\rm max}`
+    is :math:`\\frac{4\\pi}{3}s^{3}\\mu_{\\rm max}`.
+
+    Parameters
+    -----------
+    s_bins : array_like
+        Array of length *Nsbins+1* storing the boundaries of the bins in radial separation.
+
+    mu_bins : array_like
+        Array of length *Nmubins+1* storing the boundaries of the bins in
+        the cosine of the angle to the line-of-sight, between 0 and 1.
+
+    Returns
+    --------
+    volumes : array_like
+        Array of shape (*Nsbins*, *Nmubins*).
+    """
+    v = (4.0*np.pi/3.0)*np.outer(s_bins**3, mu_bins)
+    return np.diff(np.diff(v, axis=0), axis=1)
+
+
+def rp_pi_cylinder_volumes(rp_bins, pi_bins):
+    """ Volume of the pieces of the cylinders defined by the bins of separation
+    perpendicular to, ``rp_bins``, and along, ``pi_bins``, the line-of-sight.
+    Each cylinder extends on both sides of the plane perpendicular to the line-of-sight.
+
+    Parameters
+    -----------
+    rp_bins : array_like
+        Array of length *Nrp_bins+1* storing the boundaries of the bins in
+        projected separation.
+
+    pi_bins : array_like
+        Array of length *Npi_bins+1* storing the boundaries of the bins in
+        line-of-sight separation.
+
+    Returns
+    --------
+    volumes : array_like
+        Array of shape (*Nrp_bins*, *Npi_bins*).
+    """
+    v = np.pi*np.outer(rp_bins**2, 2.0*pi_bins)
+    return np.diff(np.diff(v, axis=0), axis=1)
+
+
+def spherical_cap_areas(chord_bins):
+    """ Area of the rings on the unit sphere defined by the chord lengths ``chord_bins``
+    between the pole of the caps and their boundaries.
+
+    The area of a cap of chord length *c* is :math:`\\pi c^{2}`.
+
+    Parameters
+    -----------
+    chord_bins : array_like
+        Array of length *Nbins+1* storing the chord lengths of the boundaries of the caps.
+
+    Returns
+    --------
+    areas : array_like
+        Array of length *Nbins*.
+    """
+    return np.diff(np.pi*chord_bins**2)
+
+
+def number_of_randoms(sample1, randoms, NR_precomputed=None):
+    """ Number of randoms used to normalize the random pair counts.
+
+    This is the number of points in ``randoms`` if randoms are provided,
+    and otherwise ``NR_precomputed`` or, if None, the number of points in ``sample1``.
+    """
+    if randoms is not None:
+        return len(randoms)
+    elif NR_precomputed is not None:
+        return NR_precomputed
+    else:
+        # this is arbitrarily set, but must remain consistent!
+        return len(sample1)
+
+
+def random_pair_counts(sample1, sample2, randoms, count_pairs, bin_volumes, total_volume,
+        do_RR, do_DR, _sample1_is_sample2, approx_cell1_size=None, approx_cell2_size=None,
+        approx_cellran_size=None, analytic_RR=False, RR_precomputed=None, NR_precomputed=None):
+    """
+    Count the data-random and random-random pairs,
+    or compute them analytically from the volume of the bins.
+
+    If ``randoms`` is None, all pair counts are computed analytically as
+    the expected numbers of pairs between uniformly distributed points, :math:`N_{1}N_{2}dV/V`,
+    which is the correct result in a periodic box or on the whole sky.
+    If randoms are provided, the data-random pairs are counted, and the random-random
+    pairs are counted unless ``analytic_RR`` is True or ``RR_precomputed`` is provided.
+    In all cases, the number of randoms is given by
+    `~halotools.mock_observables.two_point_clustering.random_pair_counts.number_of_randoms`.
+
+    Parameters
+    -----------
+    sample1, sample2, randoms : array_like
+        Positions of the points, with ``randoms`` possibly None.
+
+    count_pairs : function
+        Function called as ``count_pairs(sampleA, sampleB, approx_cellA_size, approx_cellB_size)``
+        returning the number of pairs in each bin, with the same shape as ``bin_volumes``.
+
+    bin_volumes : array_like
+        Volume, or area, of each bin.
+
+    total_volume : float
+        Volume, or area, of the region containing the points.
+
+    do_RR, do_DR : bool
+        Whether the random-random and data-random pairs are required by the estimator.
+
+    _sample1_is_sample2 : bool
+        If True, the pairs between ``sample2`` and ``randoms`` are not counted.
+
+    approx_cell1_size, approx_cell2_size, approx_cellran_size : array_like, optional
+        Cell sizes passed to ``count_pairs`` for ``sample1``, ``sample2`` and ``randoms``.
+
+    analytic_RR : bool, optional
+        If True, the random-random pairs are computed analytically even if randoms are
+        provided, e.g., for randoms in a periodic box. Default is False.
+
+    RR_precomputed : array_like, optional
+        Random-random pair counts returned instead of counting the pairs.
+
+    NR_precomputed : int, optional
+        Number of randoms used to compute ``RR_precomputed``.
+
+    Returns
+    --------
+    D1R, D2R, RR : array_like
+        Data-random and random-random pairs in each bin, or None if not needed.
+    """
+    NR = number_of_randoms(sample1, randoms, NR_precomputed)
+
+    if randoms is not None:
+        if do_DR is True:
+            D1R = count_pairs(sample1, randoms, approx_cell1_size, approx_cellran_size)
+            if _sample1_is_sample2:
+                D2R = None
+            else:
+                D2R = count_pairs(sample2, randoms, approx_cell2_size, approx_cellran_size)
+        else:
+            D1R, D2R = None, None
+    else:
+        # random counts are N1*N2*dv/V
+        D1R = NR*len(sample1)*bin_volumes/total_volume
+        D2R = NR*len(sample2)*bin_volumes/total_volume
+
+    if RR_precomputed is not None:
+        RR = RR_precomputed
+    elif (randoms is None) | (analytic_RR is True):
+        RR = NR*NR*bin_volumes/total_volume
+    elif do_RR is True:
+        RR = count_pairs(randoms, randoms, approx_cellran_size, approx_cellran_size)
+    else:
+        RR = None
+
+    return D1R, D2R, RR
+
+
+def process_precomputed_random_counts(RR_precomputed, NR_precomputed, randoms,
+        expected_shape, bins_name='rbins'):
+    """ Require that ``RR_precomputed`` and ``NR_precomputed`` are either both None or
+    both provided, that ``RR_precomputed`` has the shape of the pair counts
+    in the bins, and that ``NR_precomputed`` agrees with the number of randoms.
+
+    Parameters
+    -----------
+    RR_precomputed : array_like or None
+
+    NR_precomputed : int or None
+
+    randoms : array_like or None
+
+    expected_shape : tuple
+        Shape of the pair counts in the bins, e.g., (len(rbins)-1, ).
+
+    bins_name : string, optional
+        Name of the argument defining the bins, used in the error message
+        for one-dimensional bins.
+
+    Returns
+    --------
+    RR_precomputed : array_like or None
+
+    NR_precomputed : int or None
+    """
+    if (RR_precomputed is None) & (NR_precomputed is None):
+        return None, None
+
+    try:
+        assert ((RR_precomputed is not None) & (NR_precomputed is not None)) is True
+    except AssertionError:
+        msg = ("\nYou must either provide both "
+            "``RR_precomputed`` and ``NR_precomputed`` arguments, or neither\n")
+        raise HalotoolsError(msg)
+    # At this point, we have been provided *both* RR_precomputed *and* NR_precomputed
+
+    RR_precomputed = np.atleast_1d(RR_precomputed).astype(float)
+    try:
+        assert np.shape(RR_precomputed) == tuple(expected_shape)
+    except AssertionError:
+        if len(expected_shape) == 1:
+            msg = ("\nLength of ``RR_precomputed`` must match length of ``%s``\n" % bins_name)
+        else:
+            msg = ("\nShape of ``RR_precomputed`` must be %s, "
+                "one entry for each bin\n" % str(tuple(expected_shape)))
+        raise HalotoolsError(msg)
+
+    if np.any(RR_precomputed == 0):
+        msg = ("RR_precomputed has radial bin(s) which contain no pairs. \n"
+               "Consider increasing the number of randoms, or using larger bins.")
+        warn(msg)
+
+    if randoms is not None:
+        try:
+            assert len(randoms) == NR_precomputed
+        except AssertionError:
+            msg = ("If passing in randoms and also NR_precomputed, \n"
+                "the value of NR_precomputed must agree with the number of randoms\n")
+            raise HalotoolsError(msg)
+
+    return RR_precomputed, NR_precomputed
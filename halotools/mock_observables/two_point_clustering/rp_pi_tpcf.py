@@ -6,11 +6,12 @@ calculate the redshift-space two-point correlation function in 3d, :math:`\\xi(r
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import numpy as np
-from math import pi
 
 from .clustering_helpers import (process_optional_input_sample2,
     downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator)
 from .tpcf_estimators import _TP_estimator, _TP_estimator_requirements
+from .random_pair_counts import (random_pair_counts, rp_pi_cylinder_volumes,
+    number_of_randoms, process_precomputed_random_counts)
 
 from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
     get_separation_bins_array, get_line_of_sight_bins_array, get_period, get_num_threads)
@@ -28,7 +29,8 @@ np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. DD
 def rp_pi_tpcf(sample1, rp_bins, pi_bins, sample2=None, randoms=None,
         period=None, do_auto=True, do_cross=True, estimator='Natural',
         num_threads=1, max_sample_size=int(1e6), approx_cell1_size=None,
-        approx_cell2_size=None, approx_cellran_size=None, seed=None):
+        approx_cell2_size=None, approx_cellran_size=None,
+        RR_precomputed=None, NR_precomputed=None, seed=None):
     """
     Calculate the redshift space correlation function, :math:`\\xi(r_{p}, \\pi)`
 
@@ -77,6 +79,8 @@ def rp_pi_tpcf(sample1, rp_bins, pi_bins, sample2=None, randoms=None,
         If no randoms are provided (the default option),
         calculation of the tpcf can proceed using analytical randoms
         (only valid for periodic boundary conditions).
+        If ``period`` is also provided, the randoms are only used to count
+        the data-random pairs, and the random-random pairs are computed analytically.
 
     period : array_like, optional
         Length-3 sequence defining the periodic boundary conditions
@@ -131,6 +135,19 @@ def rp_pi_tpcf(sample1, rp_bins, pi_bins, sample2=None, randoms=None,
         Analogous to ``approx_cell1_size``, but for randoms.  See comments for
         ``approx_cell1_size`` for details.
 
+        RR_precomputed : array_like, optional
+        Array of shape (*len(rp_bins)-1*, *len(pi_bins)-1*) storing the number of RR-counts
+        calculated in advance during a pre-processing phase.
+        If the ``RR_precomputed`` argument is provided,
+        you must also provide the ``NR_precomputed`` argument.
+        Default is None.
+
+    NR_precomputed : int, optional
+        Number of points in the random sample used to calculate ``RR_precomputed``.
+        If the ``NR_precomputed`` argument is provided,
+        you must also provide the ``RR_precomputed`` argument.
+        Default is None.
+
     seed : int, optional
         Random number seed used to randomly downsample data, if applicable.
         Default is None, in which case downsampling will be stochastic.
@@ -191,22 +208,19 @@ def rp_pi_tpcf(sample1, rp_bins, pi_bins, sample2=None, randoms=None,
 
     function_args = (sample1, rp_bins, pi_bins, sample2, randoms, period, do_auto,
         do_cross, estimator, num_threads, max_sample_size,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size, seed)
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed, NR_precomputed, seed)
 
     sample1, rp_bins, pi_bins, sample2, randoms, period, do_auto, do_cross, num_threads,\
-        _sample1_is_sample2, PBCs = _rp_pi_tpcf_process_args(*function_args)
+        _sample1_is_sample2, PBCs, RR_precomputed, NR_precomputed =\
+        _rp_pi_tpcf_process_args(*function_args)
 
     do_DD, do_DR, do_RR = _TP_estimator_requirements(estimator)
 
     # How many points are there (for normalization purposes)?
     N1 = len(sample1)
     N2 = len(sample2)
-    if randoms is not None:
-        NR = len(randoms)
-    else:
-        # set the number of randoms equal to the number of points in sample1
-        # this is arbitrarily set, but must remain consistent!
-        NR = N1
+    NR = number_of_randoms(sample1, randoms, NR_precomputed)
 
     # count pairs
     D1D1, D1D2, D2D2 = pair_counts(sample1, sample2, rp_bins, pi_bins,
@@ -215,7 +229,8 @@ def rp_pi_tpcf(sample1, rp_bins, pi_bins, sample2=None, randoms=None,
 
     D1R, D2R, RR = random_counts(sample1, sample2, randoms, rp_bins, pi_bins,
         period, PBCs, num_threads, do_RR, do_DR,
-        _sample1_is_sample2, approx_cell1_size, approx_cell2_size, approx_cellran_size)
+        _sample1_is_sample2, approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed, NR_precomputed)
 
     if _sample1_is_sample2:
         xi_11 = _TP_estimator(D1D1, D1R, RR, N1, N1, NR, NR, estimator)
@@ -269,89 +284,36 @@ def pair_counts(sample1, sample2, rp_bins, pi_bins, period,
     return D1D1, D1D2, D2D2
 
 
-def cylinder_volume(R, h):
-    """
-    Calculate the volume of a cylinder(s), used for the analytical randoms.
-    """
-    return pi*np.outer(R**2.0, h)
-
-
 def random_counts(sample1, sample2, randoms, rp_bins, pi_bins, period,
         PBCs, num_threads, do_RR, do_DR, _sample1_is_sample2,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size):
-    """
-    Count random pairs.  There are two high level branches:
-        1. w/ or wo/ PBCs and randoms.
-        2. PBCs and analytical randoms
-    There are also logical bits to do RR and DR pair counts, as not all estimators
-    need one or the other, and not doing these can save a lot of calculation.
-
-    Analytical counts are N**2*dv*rho, where dv can is the volume of the spherical
-    shells, which is the correct volume to use for a continious cubic volume with PBCs
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed=None, NR_precomputed=None):
     """
+    Count random pairs.
+    See `~halotools.mock_observables.two_point_clustering.random_pair_counts.random_pair_counts`.
 
-    # No PBCs, randoms must have been provided.
-    if randoms is not None:
-        if do_RR is True:
-            RR = npairs_xy_z(randoms, randoms, rp_bins, pi_bins,
-                period=period, num_threads=num_threads,
-                approx_cell1_size=approx_cellran_size,
-                approx_cell2_size=approx_cellran_size)
-            RR = np.diff(np.diff(RR, axis=0), axis=1)
-        else:
-            RR = None
-        if do_DR is True:
-            D1R = npairs_xy_z(sample1, randoms, rp_bins, pi_bins,
-                period=period, num_threads=num_threads,
-                approx_cell1_size=approx_cell1_size,
-                approx_cell2_size=approx_cellran_size)
-            D1R = np.diff(np.diff(D1R, axis=0), axis=1)
-        else:
-            D1R = None
-        if _sample1_is_sample2:  # calculating the cross-correlation
-            D2R = None
-        else:
-            if do_DR is True:
-                D2R = npairs_xy_z(sample2, randoms, rp_bins, pi_bins,
-                    period=period, num_threads=num_threads,
-                    approx_cell1_size=approx_cell2_size,
-                    approx_cell2_size=approx_cellran_size)
-                D2R = np.diff(np.diff(D2R, axis=0), axis=1)
-            else:
-                D2R = None
-
-        return D1R, D2R, RR
-    # PBCs and no randoms--calculate randoms analytically.
-    elif randoms is None:
-
-        # set the number of randoms equal to the number of points in sample1
-        NR = len(sample1)
-
-        # do volume calculations
-        v = cylinder_volume(rp_bins, 2.0*pi_bins)  # volume of spheres
-        dv = np.diff(np.diff(v, axis=0), axis=1)  # volume of annuli
-        global_volume = period.prod()
-
-        # calculate randoms for sample1
-        N1 = np.shape(sample1)[0]
-        rho1 = N1/global_volume
-        D1R = (N1)*(dv*rho1)  # read note about pair counter
-
-        # calculate randoms for sample2
-        N2 = np.shape(sample2)[0]
-        rho2 = N2/global_volume
-        D2R = N2*(dv*rho2)  # read note about pair counter
-
-        # calculate the random-random pairs.
-        rhor = NR**2/global_volume
-        RR = (dv*rhor)  # RR is only the RR for the cross-correlation.
+    Analytical counts are N**2*dv*rho, where dv can is the volume of the cylindrical
+    annuli, which is the correct volume to use for a continious cubic volume with PBCs.
+    In a periodic box, RR is always computed analytically.
+    """
+    def count_pairs(s1, s2, approx_cell1_size, approx_cell2_size):
+        counts = npairs_xy_z(s1, s2, rp_bins, pi_bins,
+            period=period, num_threads=num_threads,
+            approx_cell1_size=approx_cell1_size,
+            approx_cell2_size=approx_cell2_size)
+        return np.diff(np.diff(counts, axis=0), axis=1)
 
-        return D1R, D2R, RR
+    return random_pair_counts(sample1, sample2, randoms, count_pairs,
+        rp_pi_cylinder_volumes(rp_bins, pi_bins), np.prod(period),
+        do_RR, do_DR, _sample1_is_sample2,
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        analytic_RR=PBCs, RR_precomputed=RR_precomputed, NR_precomputed=NR_precomputed)
 
 
 def _rp_pi_tpcf_process_args(sample1, rp_bins, pi_bins, sample2, randoms,
         period, do_auto, do_cross, estimator, num_threads, max_sample_size,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size, seed):
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed, NR_precomputed, seed):
     """
     Private method to do bounds-checking on the arguments passed to
     `~halotools.mock_observables.redshift_space_tpcf`.
@@ -391,5 +353,9 @@ def _rp_pi_tpcf_process_args(sample1, rp_bins, pi_bins, sample2, randoms,
 
     verify_tpcf_estimator(estimator)
 
+    RR_precomputed, NR_precomputed = process_precomputed_random_counts(
+        RR_precomputed, NR_precomputed, randoms, (len(rp_bins)-1, len(pi_bins)-1))
+
     return sample1, rp_bins, pi_bins, sample2, randoms, period,\
-        do_auto, do_cross, num_threads, _sample1_is_sample2, PBCs
+        do_auto, do_cross, num_threads, _sample1_is_sample2, PBCs,\
+        RR_precomputed, NR_precomputed
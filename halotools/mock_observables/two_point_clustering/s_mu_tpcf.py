@@ -14,6 +14,8 @@ from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
 from ..pair_counters.mesh_helpers import _enforce_maximum_search_length
 
 from .tpcf_estimators import _TP_estimator_requirements, _TP_estimator
+from .random_pair_counts import (random_pair_counts, s_mu_sector_volumes,
+    number_of_randoms, process_precomputed_random_counts)
 from ..pair_counters import npairs_s_mu
 
 __all__ = ['s_mu_tpcf']
@@ -25,7 +27,8 @@ np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. DD
 def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,
         period=None, do_auto=True, do_cross=True, estimator='Natural',
         num_threads=1, max_sample_size=int(1e6), approx_cell1_size=None,
-        approx_cell2_size=None, approx_cellran_size=None, seed=None):
+        approx_cell2_size=None, approx_cellran_size=None,
+        RR_precomputed=None, NR_precomputed=None, seed=None):
     """
     Calculate the redshift space correlation function, :math:`\\xi(s, \\mu)`
 
@@ -70,6 +73,8 @@ def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,
         If no randoms are provided (the default option),
         calculation of the tpcf can proceed using analytical randoms
         (only valid for periodic boundary conditions).
+        If ``period`` is also provided, the randoms are only used to count
+        the data-random pairs, and the random-random pairs are computed analytically.
 
     period : array_like, optional
         Length-3 sequence defining the periodic boundary conditions
@@ -124,6 +129,20 @@ def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,
         Analogous to ``approx_cell1_size``, but for randoms.  See comments for
         ``approx_cell1_size`` for details.
 
+    RR_precomputed : array_like, optional
+        Array of shape (*len(s_bins)-1*, *len(mu_bins)-1*) storing the number of RR-counts
+        calculated in advance during a pre-processing phase, in the same bins as
+        the returned correlation function.
+        If the ``RR_precomputed`` argument is provided,
+        you must also provide the ``NR_precomputed`` argument.
+        Default is None.
+
+    NR_precomputed : int, optional
+        Number of points in the random sample used to calculate ``RR_precomputed``.
+        If the ``NR_precomputed`` argument is provided,
+        you must also provide the ``RR_precomputed`` argument.
+        Default is None.
+
     seed : int, optional
         Random number seed used to randomly downsample data, if applicable.
         Default is None, in which case downsampling will be stochastic.
@@ -207,10 +226,12 @@ def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,
     # process arguments
     function_args = (sample1, s_bins, mu_bins, sample2, randoms, period,
         do_auto, do_cross, estimator, num_threads, max_sample_size,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size, seed)
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed, NR_precomputed, seed)
 
     sample1, s_bins, mu_bins, sample2, randoms, period, do_auto, do_cross, num_threads,\
-        _sample1_is_sample2, PBCs = _s_mu_tpcf_process_args(*function_args)
+        _sample1_is_sample2, PBCs, RR_precomputed, NR_precomputed =\
+        _s_mu_tpcf_process_args(*function_args)
 
     # what needs to be done?
     do_DD, do_DR, do_RR = _TP_estimator_requirements(estimator)
@@ -218,12 +239,7 @@ def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,
     # How many points are there (for normalization purposes)?
     N1 = len(sample1)
     N2 = len(sample2)
-    if randoms is not None:
-        NR = len(randoms)
-    else:
-        # set the number of randoms equal to the number of points in sample1
-        # this is arbitrarily set, but must remain consistent!
-        NR = N1
+    NR = number_of_randoms(sample1, randoms, NR_precomputed)
 
     D1D1, D1D2, D2D2 = pair_counts(sample1, sample2, s_bins, mu_bins, period,
         num_threads, do_auto, do_cross, _sample1_is_sample2,
@@ -231,116 +247,52 @@ def s_mu_tpcf(sample1, s_bins, mu_bins, sample2=None, randoms=None,
 
     D1R, D2R, RR = random_counts(sample1, sample2, randoms, s_bins, mu_bins,
         period, PBCs, num_threads, do_RR, do_DR, _sample1_is_sample2,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size)
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed, NR_precomputed)
 
-    # return results.  remember to reverse the final result because we used sin(theta_los)
-    # bins instead of the user passed in mu = cos(theta_los).
+    # return results
     if _sample1_is_sample2:
-        xi_11 = _TP_estimator(D1D1, D1R, RR, N1, N1, NR, NR, estimator)[:, ::-1]
+        xi_11 = _TP_estimator(D1D1, D1R, RR, N1, N1, NR, NR, estimator)
         return xi_11
     else:
         if (do_auto is True) & (do_cross is True):
-            xi_11 = _TP_estimator(D1D1, D1R, RR, N1, N1, NR, NR, estimator)[:, ::-1]
-            xi_12 = _TP_estimator(D1D2, D1R, RR, N1, N2, NR, NR, estimator)[:, ::-1]
-            xi_22 = _TP_estimator(D2D2, D2R, RR, N2, N2, NR, NR, estimator)[:, ::-1]
+            xi_11 = _TP_estimator(D1D1, D1R, RR, N1, N1, NR, NR, estimator)
+            xi_12 = _TP_estimator(D1D2, D1R, RR, N1, N2, NR, NR, estimator)
+            xi_22 = _TP_estimator(D2D2, D2R, RR, N2, N2, NR, NR, estimator)
             return xi_11, xi_12, xi_22
         elif (do_cross is True):
-            xi_12 = _TP_estimator(D1D2, D1R, RR, N1, N2, NR, NR, estimator)[:, ::-1]
+            xi_12 = _TP_estimator(D1D2, D1R, RR, N1, N2, NR, NR, estimator)
             return xi_12
         elif (do_auto is True):
-            xi_11 = _TP_estimator(D1D1, D1R, RR, N1, N1, NR, NR, estimator)[:, ::-1]
-            xi_22 = _TP_estimator(D2D2, D2R, RR, N2, N2, NR, NR, estimator)[:, ::-1]
+            xi_11 = _TP_estimator(D1D1, D1R, RR, N1, N1, NR, NR, estimator)
+            xi_22 = _TP_estimator(D2D2, D2R, RR, N2, N2, NR, NR, estimator)
             return xi_11, xi_22
 
 
-def spherical_sector_volume(s, mu):
-    """
-    This function is used to calculate analytical randoms.
-
-    Calculate the volume of a spherical sector, used for the analytical randoms.
-    https://en.wikipedia.org/wiki/Spherical_sector
-
-    Note that the extra *2 is to get the reflection.
-    """
-    theta = np.arcsin(mu)
-    vol = (2.0*np.pi/3.0) * np.outer((s**3.0), (1.0-np.cos(theta)))*2.0
-    return vol
-
-
 def random_counts(sample1, sample2, randoms, s_bins, mu_bins,
         period, PBCs, num_threads, do_RR, do_DR, _sample1_is_sample2,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size):
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed=None, NR_precomputed=None):
     """
-    Count random pairs.  There are two high level branches:
-        1. w/ or wo/ PBCs and randoms.
-        2. PBCs and analytical randoms
-    There are also logical bits to do RR and DR pair counts, as not all estimators
-    need one or the other, and not doing these can save a lot of calculation.
+    Count random pairs.
+    See `~halotools.mock_observables.two_point_clustering.random_pair_counts.random_pair_counts`.
 
     Analytical counts are N**2*dv*rho, where dv can is the volume of the spherical
     wedge sectors, which is the correct volume to use for a continious cubic volume
-    with PBCs
+    with PBCs. In a periodic box, RR is always computed analytically.
     """
+    def count_pairs(s1, s2, approx_cell1_size, approx_cell2_size):
+        counts = npairs_s_mu(s1, s2, s_bins, mu_bins, period=period,
+            num_threads=num_threads,
+            approx_cell1_size=approx_cell1_size,
+            approx_cell2_size=approx_cell2_size)
+        return np.diff(np.diff(counts, axis=0), axis=1)
 
-    # PBCs and randoms.
-    if randoms is not None:
-        if do_RR is True:
-            RR = npairs_s_mu(randoms, randoms, s_bins, mu_bins, period=period,
-                             num_threads=num_threads,
-                             approx_cell1_size=approx_cellran_size,
-                             approx_cell2_size=approx_cellran_size)
-            RR = np.diff(np.diff(RR, axis=0), axis=1)
-        else:
-            RR = None
-        if do_DR is True:
-            D1R = npairs_s_mu(sample1, randoms, s_bins, mu_bins, period=period,
-                              num_threads=num_threads,
-                              approx_cell1_size=approx_cell1_size,
-                              approx_cell2_size=approx_cellran_size)
-            D1R = np.diff(np.diff(D1R, axis=0), axis=1)
-        else:
-            D1R = None
-        if _sample1_is_sample2:  # calculating the cross-correlation
-            D2R = None
-        else:
-            if do_DR is True:
-                D2R = npairs_s_mu(sample2, randoms, s_bins, mu_bins, period=period,
-                                  num_threads=num_threads,
-                                  approx_cell1_size=approx_cell2_size,
-                                  approx_cell2_size=approx_cellran_size)
-                D2R = np.diff(np.diff(D2R, axis=0), axis=1)
-            else:
-                D2R = None
-
-        return D1R, D2R, RR
-    # PBCs and no randoms--calculate randoms analytically.
-    elif randoms is None:
-
-        # set the number of randoms equal to the number of points in sample1
-        NR = len(sample1)
-
-        # do volume calculations
-        dv = spherical_sector_volume(s_bins, mu_bins)
-        dv = np.diff(dv, axis=1)  # volume of wedges
-        dv = np.diff(dv, axis=0)  # volume of wedge 'pieces'
-        global_volume = period.prod()
-
-        # calculate randoms for sample1
-        N1 = np.shape(sample1)[0]
-        rho1 = N1/global_volume
-        D1R = (N1-1.0)*(dv*rho1)  # read note about pair counter
-
-        N2 = np.shape(sample2)[0]
-        rho2 = N2/global_volume
-        D2R = (N2-1.0)*(dv*rho2)  # read note about pair counter
-
-        # calculate the random-random pairs.
-        rhor = NR**2/global_volume
-        RR = (dv*rhor)
-
-        return D1R, D2R, RR
-    else:
-        raise ValueError('Un-supported combination of PBCs and randoms provided.')
+    return random_pair_counts(sample1, sample2, randoms, count_pairs,
+        s_mu_sector_volumes(s_bins, mu_bins), np.prod(period),
+        do_RR, do_DR, _sample1_is_sample2,
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        analytic_RR=PBCs, RR_precomputed=RR_precomputed, NR_precomputed=NR_precomputed)
 
 
 def pair_counts(sample1, sample2, s_bins, mu_bins, period,
@@ -385,7 +337,8 @@ def pair_counts(sample1, sample2, s_bins, mu_bins, period,
 
 def _s_mu_tpcf_process_args(sample1, s_bins, mu_bins, sample2, randoms,
         period, do_auto, do_cross, estimator, num_threads, max_sample_size,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size, seed):
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed, NR_precomputed, seed):
     """
     Private method to do bounds-checking on the arguments passed to
     `~halotools.mock_observables.s_mu_tpcf`.
@@ -409,12 +362,6 @@ def _s_mu_tpcf_process_args(sample1, s_bins, mu_bins, sample2, randoms,
     # process angular bins
     mu_bins = get_line_of_sight_bins_array(mu_bins)
 
-    # work with the sine of the angle between s and the LOS.  Only using cosine as the
-    # input because of convention.  sin(theta_los) increases as theta_los increases, which
-    # is required in order to get the pair counter to work.
-    theta = np.arccos(mu_bins)
-    mu_bins = np.sin(theta)[::-1]  # must be increasing, remember to reverse result.
-
     if (np.min(mu_bins) < 0.0) | (np.max(mu_bins) > 1.0):
         msg = "`mu_bins` must be in the range [0,1]."
         raise ValueError(msg)
@@ -438,5 +385,9 @@ def _s_mu_tpcf_process_args(sample1, s_bins, mu_bins, sample2, randoms,
 
     verify_tpcf_estimator(estimator)
 
+    RR_precomputed, NR_precomputed = process_precomputed_random_counts(
+        RR_precomputed, NR_precomputed, randoms, (len(s_bins)-1, len(mu_bins)-1))
+
     return sample1, s_bins, mu_bins, sample2, randoms, period,\
-        do_auto, do_cross, num_threads, _sample1_is_sample2, PBCs
+        do_auto, do_cross, num_threads, _sample1_is_sample2, PBCs,\
+        RR_precomputed, NR_precomputed
@@ -8,6 +8,8 @@ from astropy.tests.helper import pytest
 from astropy.utils.misc import NumpyRNGContext
 
 from ..marked_tpcf import marked_tpcf
+from ...pair_counters import marked_npairs_3d
+from ....utils.random_streams import rng_stream
 
 from ....custom_exceptions import HalotoolsError
 
@@ -138,6 +140,36 @@ def test_iterations():
         period=period, num_threads=1, weight_func_id=weight_func_id, seed=fixed_seed, iterations=3)
 
 
+def test_iterations_single_pass():
+    """ Randomized normalizations computed in one pass must agree with
+    counting the pairs once per permutation of the marks.
+    """
+    Npts, iterations = 100, 4
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        weights1 = np.random.random(Npts)
+
+    rbins = np.linspace(0.001, 0.25, 5)
+    period = 1
+
+    result = marked_tpcf(sample1, rbins, marks1=weights1,
+        period=period, num_threads=1, weight_func_id=1, seed=fixed_seed, iterations=iterations)
+
+    rng = rng_stream(fixed_seed, 'marked_tpcf', 'marks')
+    permutations = [rng.permutation(Npts) for i in range(iterations)]
+    WW = np.diff(marked_npairs_3d(sample1, sample1, rbins, period=period,
+        weights1=weights1, weights2=weights1, weight_func_id=1))
+    RR = [np.diff(marked_npairs_3d(sample1, sample1, rbins, period=period,
+        weights1=weights1[p], weights2=weights1[p], weight_func_id=1)) for p in permutations]
+    assert np.allclose(result, WW/np.median(RR, axis=0))
+
+    with pytest.raises(ValueError) as err:
+        __ = marked_tpcf(sample1, rbins, marks1=weights1,
+            period=period, weight_func_id=1, seed=fixed_seed, iterations=0)
+    substr = "`iterations` parameter must be a positive integer."
+    assert substr in err.value.args[0]
+
+
 def test_exception_handling1():
     Npts1, Npts2 = 100, 90
     with NumpyRNGContext(fixed_seed):
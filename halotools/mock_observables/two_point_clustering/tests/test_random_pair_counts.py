@@ -0,0 +1,181 @@
+""" Module providing unit-testing for the functions in the
+`~halotools.mock_observables.two_point_clustering.random_pair_counts` module,
+and for the ``RR_precomputed`` arguments of the two-point clustering functions.
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+from astropy.utils.misc import NumpyRNGContext
+from astropy.tests.helper import pytest
+
+from ..random_pair_counts import (spherical_shell_volumes, s_mu_sector_volumes,
+    rp_pi_cylinder_volumes, spherical_cap_areas)
+from ..s_mu_tpcf import s_mu_tpcf
+from ..rp_pi_tpcf import rp_pi_tpcf
+from ..wp import wp
+from ..angular_tpcf import angular_tpcf
+
+from ...pair_counters import npairs_3d, npairs_s_mu, npairs_xy_z
+
+from ....utils.spherical_geometry import (sample_spherical_surface,
+    spherical_to_cartesian, chord_to_cartesian)
+from ....custom_exceptions import HalotoolsError
+
+__all__ = ('test_bin_volumes', 'test_analytic_rp_pi_random_counts',
+    'test_analytic_angular_random_counts', 'test_periodic_randoms_use_analytic_RR',
+    'test_rp_pi_tpcf_RR_precomputed', 'test_s_mu_tpcf_RR_precomputed',
+    'test_wp_RR_precomputed', 'test_angular_tpcf_RR_precomputed',
+    'test_RR_precomputed_shape')
+
+fixed_seed = 43
+
+
+def test_bin_volumes():
+    """ Verify that the volumes of the bins in (s, mu) and (rp, pi), and the areas of
+    the angular bins, add up to the volume of the enclosing shapes.
+    """
+    s_bins = np.array([0.1, 0.5, 1., 2.])
+    mu_bins = np.linspace(0, 1, 5)
+    volumes = s_mu_sector_volumes(s_bins, mu_bins)
+    assert volumes.shape == (3, 4)
+    assert np.allclose(np.sum(volumes, axis=1), spherical_shell_volumes(s_bins))
+
+    rp_bins, pi_bins = np.array([0, 1., 2.]), np.array([0, 0.5, 3.])
+    volumes = rp_pi_cylinder_volumes(rp_bins, pi_bins)
+    assert volumes.shape == (2, 2)
+    assert np.allclose(np.sum(volumes), np.pi*2.**2*6.)
+
+    chord_bins = chord_to_cartesian(np.array([0, 10., 90., 180.]), radians=False)
+    areas = spherical_cap_areas(chord_bins)
+    assert np.allclose(np.sum(areas), 4*np.pi)
+    assert np.allclose(np.sum(areas[:2]), 2*np.pi)
+
+
+def test_analytic_rp_pi_random_counts():
+    """ Compare the analytic volumes of the (rp, pi) bins to
+    the pair counts of uniformly distributed points in a periodic box.
+    """
+    npts, period = 5000, 1.
+    with NumpyRNGContext(fixed_seed):
+        randoms = np.random.random((npts, 3))
+    rp_bins, pi_bins = np.array([0.05, 0.1, 0.2]), np.array([0, 0.1, 0.2])
+
+    counts = npairs_xy_z(randoms, randoms, rp_bins, pi_bins, period=period)
+    counts = np.diff(np.diff(counts, axis=0), axis=1)
+    expected_counts = npts*npts*rp_pi_cylinder_volumes(rp_bins, pi_bins)/period**3
+    assert np.allclose(counts, expected_counts, rtol=0.05)
+
+    s_bins, mu_bins = np.array([0.05, 0.1, 0.2]), np.array([0, 0.2, 0.7, 1])
+    counts = npairs_s_mu(randoms, randoms, s_bins, mu_bins, period=period)
+    counts = np.diff(np.diff(counts, axis=0), axis=1)
+    expected_counts = npts*npts*s_mu_sector_volumes(s_bins, mu_bins)/period**3
+    assert np.allclose(counts, expected_counts, rtol=0.05)
+
+
+def test_analytic_angular_random_counts():
+    """ Compare the analytic areas of the angular bins to
+    the pair counts of uniformly distributed points on the sky.
+    """
+    npts = 5000
+    coords = np.array(sample_spherical_surface(npts, seed=fixed_seed))
+    randoms = np.vstack(spherical_to_cartesian(coords[:, 0], coords[:, 1])).T
+    theta_bins = np.array([5., 10., 20., 40.])
+    chord_bins = chord_to_cartesian(theta_bins, radians=False)
+
+    counts = np.diff(npairs_3d(randoms, randoms, chord_bins))
+    expected_counts = npts*npts*spherical_cap_areas(chord_bins)/(4*np.pi)
+    assert np.allclose(counts, expected_counts, rtol=0.05)
+
+
+def test_periodic_randoms_use_analytic_RR():
+    """ Verify that, in a periodic box, the randoms only enter the natural estimator
+    through their number, so that the result is the same as with analytic randoms.
+    """
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((1000, 3))
+        randoms = np.random.random((500, 3))
+    rp_bins, pi_bins = np.array([0.05, 0.1, 0.2]), np.array([0, 0.1, 0.2])
+
+    xi = rp_pi_tpcf(sample1, rp_bins, pi_bins, randoms=randoms, period=1)
+    xi2 = rp_pi_tpcf(sample1, rp_bins, pi_bins, period=1)
+    assert np.allclose(xi, xi2)
+
+
+def test_rp_pi_tpcf_RR_precomputed():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+        randoms = np.random.random((1000, 3))
+    rp_bins, pi_bins = np.array([0.05, 0.1, 0.2]), np.array([0, 0.1, 0.2])
+
+    xi = rp_pi_tpcf(sample1, rp_bins, pi_bins, randoms=randoms, estimator='Landy-Szalay')
+
+    RR = npairs_xy_z(randoms, randoms, rp_bins, pi_bins)
+    RR = np.diff(np.diff(RR, axis=0), axis=1)
+    xi2 = rp_pi_tpcf(sample1, rp_bins, pi_bins, randoms=randoms, estimator='Landy-Szalay',
+        RR_precomputed=RR, NR_precomputed=len(randoms))
+    assert np.allclose(xi, xi2)
+
+
+def test_s_mu_tpcf_RR_precomputed():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+        randoms = np.random.random((1000, 3))
+    s_bins, mu_bins = np.array([0.05, 0.1, 0.2]), np.array([0, 0.2, 0.7, 1])
+
+    xi = s_mu_tpcf(sample1, s_bins, mu_bins, randoms=randoms)
+
+    RR = npairs_s_mu(randoms, randoms, s_bins, mu_bins)
+    RR = np.diff(np.diff(RR, axis=0), axis=1)
+    xi2 = s_mu_tpcf(sample1, s_bins, mu_bins, randoms=randoms,
+        RR_precomputed=RR, NR_precomputed=len(randoms))
+    assert np.allclose(xi, xi2)
+
+
+def test_wp_RR_precomputed():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((500, 3))
+        randoms = np.random.random((1000, 3))
+    rp_bins, pi_max = np.array([0.05, 0.1, 0.2]), 0.2
+
+    w = wp(sample1, rp_bins, pi_max, randoms=randoms)
+
+    RR = npairs_xy_z(randoms, randoms, rp_bins, [0, pi_max])
+    RR = np.diff(RR[:, 1])
+    w2 = wp(sample1, rp_bins, pi_max, RR_precomputed=RR, NR_precomputed=len(randoms),
+        period=1)
+    w3 = wp(sample1, rp_bins, pi_max, randoms=randoms,
+        RR_precomputed=RR, NR_precomputed=len(randoms))
+    assert np.allclose(w, w3)
+    assert w2.shape == w.shape
+
+
+def test_angular_tpcf_RR_precomputed():
+    coords1 = np.array(sample_spherical_surface(500, seed=fixed_seed))
+    coords_randoms = np.array(sample_spherical_surface(1000, seed=fixed_seed+1))
+    theta_bins = np.array([5., 10., 20.])
+
+    w = angular_tpcf(coords1, theta_bins, randoms=coords_randoms)
+
+    randoms = np.vstack(spherical_to_cartesian(coords_randoms[:, 0], coords_randoms[:, 1])).T
+    RR = np.diff(npairs_3d(randoms, randoms, chord_to_cartesian(theta_bins, radians=False)))
+    w2 = angular_tpcf(coords1, theta_bins, randoms=coords_randoms,
+        RR_precomputed=RR, NR_precomputed=len(randoms))
+    assert np.allclose(w, w2)
+
+
+def test_RR_precomputed_shape():
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((100, 3))
+    rp_bins, pi_bins = np.array([0.05, 0.1, 0.2]), np.array([0, 0.1, 0.2])
+
+    with pytest.raises(HalotoolsError) as err:
+        rp_pi_tpcf(sample1, rp_bins, pi_bins, period=1,
+            RR_precomputed=np.ones(2), NR_precomputed=100)
+    substr = "Shape of ``RR_precomputed`` must be (2, 2)"
+    assert substr in err.value.args[0]
+
+    with pytest.raises(HalotoolsError) as err:
+        wp(sample1, rp_bins, 0.2, period=1,
+            RR_precomputed=np.ones(3), NR_precomputed=100)
+    substr = "Length of ``RR_precomputed`` must match length of ``rp_bins``"
+    assert substr in err.value.args[0]
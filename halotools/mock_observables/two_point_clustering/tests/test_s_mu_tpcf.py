@@ -8,7 +8,8 @@ from astropy.tests.helper import pytest
 
 from ..s_mu_tpcf import s_mu_tpcf
 
-__all__ = ['test_s_mu_tpcf_auto_periodic', 'test_s_mu_tpcf_auto_nonperiodic']
+__all__ = ['test_s_mu_tpcf_auto_periodic', 'test_s_mu_tpcf_auto_nonperiodic',
+    'test_s_mu_tpcf_line_of_sight_pairs']
 
 fixed_seed = 43
 
@@ -94,3 +95,26 @@ def test_s_mu_auto_consistency():
 
     assert np.allclose(result_11a, result_11b)
     assert np.allclose(result_22a, result_22b)
+
+
+def test_s_mu_tpcf_line_of_sight_pairs():
+    """ Verify that pairs of points displaced along the line-of-sight are
+    found in the bin of mu = cos(theta_LOS) closest to 1, and that
+    uniformly distributed points have a vanishing correlation function in all bins.
+    """
+    Npts = 2000
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+    period = 1.
+    s_bins = np.array([0.05, 0.1, 0.15])
+    mu_bins = np.array([0, 0.2, 0.7, 1])
+
+    result = s_mu_tpcf(sample1, s_bins, mu_bins, period=period)
+    assert np.allclose(result, 0, atol=0.1)
+
+    sample2 = np.copy(sample1)
+    sample2[:, 2] = (sample2[:, 2] + 0.075) % period
+    sample = np.concatenate((sample1, sample2))
+    result = s_mu_tpcf(sample, s_bins, mu_bins, period=period)
+    assert result[0, 2] > 0.1
+    assert np.allclose(result[0, :2], 0, atol=0.05)
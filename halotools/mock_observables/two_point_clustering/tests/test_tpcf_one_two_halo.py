@@ -8,6 +8,7 @@ from astropy.utils.misc import NumpyRNGContext
 from astropy.tests.helper import pytest
 
 from ..tpcf_one_two_halo_decomp import tpcf_one_two_halo_decomp
+from ..tpcf import tpcf
 
 from ....custom_exceptions import HalotoolsError
 
@@ -241,3 +242,20 @@ def test_tpcf_decomposition_auto_consistency():
     assert np.allclose(result_2h_11a, result_2h_11b)
     assert np.allclose(result_1h_22a, result_1h_22b)
     assert np.allclose(result_2h_22a, result_2h_22b)
+
+
+def test_tpcf_decomposition_sums_to_tpcf():
+    """ Verify that, with the natural estimator, the sum of the one-halo and two-halo terms
+    is equal to the full correlation function minus one.
+    """
+    Npts = 500
+    with NumpyRNGContext(fixed_seed):
+        IDs1 = np.random.randint(0, 50, Npts)
+        sample1 = np.random.random((Npts, 3))
+
+    result_1h, result_2h = tpcf_one_two_halo_decomp(sample1, IDs1, rbins,
+        period=period, estimator='Natural', num_threads=2)
+    result = tpcf(sample1, rbins, period=period, estimator='Natural')
+
+    assert np.allclose(result_1h + result_2h, result - 1)
+    assert np.all(result_1h > -1)
@@ -5,20 +5,19 @@ calculate the two-point correlation function in 3d (aka galaxy clustering).
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import numpy as np
-from math import gamma
-from warnings import warn
 
 from .clustering_helpers import (process_optional_input_sample2,
     downsample_inputs_exceeding_max_sample_size, verify_tpcf_estimator,
     tpcf_estimator_dd_dr_rr_requirements)
 from .tpcf_estimators import _TP_estimator
+from .random_pair_counts import (random_pair_counts, spherical_shell_volumes,
+    number_of_randoms, process_precomputed_random_counts)
 
 from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
     get_separation_bins_array, get_period, get_num_threads)
 from ..pair_counters.mesh_helpers import _enforce_maximum_search_length
 from ..pair_counters import npairs_3d
 
-from ...custom_exceptions import HalotoolsError
 ##########################################################################################
 
 
@@ -30,84 +29,26 @@ np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. DD
 
 def _random_counts(sample1, sample2, randoms, rbins, period, PBCs, num_threads,
         do_RR, do_DR, _sample1_is_sample2, approx_cell1_size,
-        approx_cell2_size, approx_cellran_size):
+        approx_cell2_size, approx_cellran_size, RR_precomputed=None, NR_precomputed=None):
     """
     Internal function used to random pairs during the calculation of the tpcf.
-    There are two high level branches:
-        1. w/ or wo/ PBCs and randoms.
-        2. PBCs and analytical randoms
-    There is also control flow governing whether RR and DR pairs are counted,
-    as not all estimators need one or the other.
+    See `~halotools.mock_observables.two_point_clustering.random_pair_counts.random_pair_counts`.
 
     Analytical counts are N**2*dv*rho, where dv is the volume of the spherical
     shells, which is the correct volume to use for a continious cubical volume with PBCs.
+    In a periodic box, RR is always computed analytically.
     """
-    def nball_volume(R, k=3):
-        """
-        Calculate the volume of a n-shpere.
-        This is used for the analytical randoms.
-        """
-        return (np.pi**(k/2.0)/gamma(k/2.0+1.0))*R**k
-
-    # randoms provided, so calculate random pair counts.
-    if randoms is not None:
-        if do_RR is True:
-            RR = npairs_3d(randoms, randoms, rbins, period=period,
-                        num_threads=num_threads,
-                        approx_cell1_size=approx_cellran_size,
-                        approx_cell2_size=approx_cellran_size)
-            RR = np.diff(RR)
-        else:
-            RR = None
-        if do_DR is True:
-            D1R = npairs_3d(sample1, randoms, rbins, period=period,
-                         num_threads=num_threads,
-                         approx_cell1_size=approx_cell1_size,
-                         approx_cell2_size=approx_cellran_size
-                            )
-            D1R = np.diff(D1R)
-        else:
-            D1R = None
-        if _sample1_is_sample2:
-            D2R = None
-        else:
-            if do_DR is True:
-                D2R = npairs_3d(sample2, randoms, rbins, period=period,
-                             num_threads=num_threads,
-                             approx_cell1_size=approx_cell2_size,
-                             approx_cell2_size=approx_cellran_size)
-                D2R = np.diff(D2R)
-            else:
-                D2R = None
-
-        return D1R, D2R, RR
-
-    # PBCs and no randoms--calculate randoms analytically.
-    elif randoms is None:
-
-        # set the number of randoms equal to the number of points in sample1
-        NR = len(sample1)
-
-        # do volume calculations
-        v = nball_volume(rbins)  # volume of spheres
-        dv = np.diff(v)  # volume of shells
-        global_volume = period.prod()  # volume of simulation
-
-        # calculate randoms for sample1
-        N1 = np.shape(sample1)[0]  # number of points in sample1
-        rho1 = N1/global_volume  # number density of points
-        D1R = (NR)*(dv*rho1)  # random counts are N**2*dv*rho
-
-        # calculate randoms for sample2
-        N2 = np.shape(sample2)[0]  # number of points in sample2
-        rho2 = N2/global_volume  # number density of points
-        D2R = (NR)*(dv*rho2)  # random counts are N**2*dv*rho
-
-        # calculate the random-random pairs.
-        rhor = (NR**2)/global_volume
-        RR = (dv*rhor)
+    def count_pairs(s1, s2, approx_cell1_size, approx_cell2_size):
+        return np.diff(npairs_3d(s1, s2, rbins, period=period,
+            num_threads=num_threads,
+            approx_cell1_size=approx_cell1_size,
+            approx_cell2_size=approx_cell2_size))
 
-        return D1R, D2R, RR
+    return random_pair_counts(sample1, sample2, randoms, count_pairs,
+        spherical_shell_volumes(rbins), np.prod(period),
+        do_RR, do_DR, _sample1_is_sample2,
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        analytic_RR=PBCs, RR_precomputed=RR_precomputed, NR_precomputed=NR_precomputed)
 
 
 def _pair_counts(sample1, sample2, rbins,
@@ -192,6 +133,8 @@ def tpcf(sample1, rbins, sample2=None, randoms=None, period=None,
         If no randoms are provided (the default option),
         calculation of the tpcf can proceed using analytical randoms
         (only valid for periodic boundary conditions).
+        If ``period`` is also provided, the randoms are only used to count
+        the data-random pairs, and the random-random pairs are computed analytically.
 
     period : array_like, optional
         Length-3 sequence defining the periodic boundary conditions
@@ -248,7 +191,7 @@ def tpcf(sample1, rbins, sample2=None, randoms=None, period=None,
 
     RR_precomputed : array_like, optional
         Array storing the number of RR-counts calculated in advance during
-        a pre-processing phase. Must have the same length as *len(rbins)*.
+        a pre-processing phase. Must have length *len(rbins)-1*.
         If the ``RR_precomputed`` argument is provided,
         you must also provide the ``NR_precomputed`` argument.
         Default is None.
@@ -341,22 +284,11 @@ def tpcf(sample1, rbins, sample2=None, randoms=None, period=None,
 
     # What needs to be done?
     do_DD, do_DR, do_RR = tpcf_estimator_dd_dr_rr_requirements[estimator]
-    if RR_precomputed is not None:
-        # overwrite do_RR as necessary
-        do_RR = False
 
     # How many points are there (for normalization purposes)?
     N1 = len(sample1)
     N2 = len(sample2)
-    if randoms is not None:
-        NR = len(randoms)
-    else:
-        # set the number of randoms equal to the number of points in sample1
-        # this is arbitrarily set, but must remain consistent!
-        if NR_precomputed is not None:
-            NR = NR_precomputed
-        else:
-            NR = N1
+    NR = number_of_randoms(sample1, randoms, NR_precomputed)
 
     # count data pairs
     D1D1, D1D2, D2D2 = _pair_counts(sample1, sample2, rbins, period,
@@ -366,9 +298,8 @@ def tpcf(sample1, rbins, sample2=None, randoms=None, period=None,
     # count random pairs
     D1R, D2R, RR = _random_counts(sample1, sample2, randoms, rbins,
         period, PBCs, num_threads, do_RR, do_DR, _sample1_is_sample2,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size)
-    if RR_precomputed is not None:
-        RR = RR_precomputed
+        approx_cell1_size, approx_cell2_size, approx_cellran_size,
+        RR_precomputed, NR_precomputed)
 
     # run results through the estimator and return relavent/user specified results.
     if _sample1_is_sample2:
@@ -430,32 +361,8 @@ def _tpcf_process_args(sample1, rbins, sample2, randoms,
 
     verify_tpcf_estimator(estimator)
 
-    if ((RR_precomputed is not None) | (NR_precomputed is not None)):
-        try:
-            assert ((RR_precomputed is not None) & (NR_precomputed is not None)) is True
-        except AssertionError:
-            msg = ("\nYou must either provide both "
-                "``RR_precomputed`` and ``NR_precomputed`` arguments, or neither\n")
-            raise HalotoolsError(msg)
-        # At this point, we have been provided *both* RR_precomputed *and* NR_precomputed
-
-        try:
-            assert len(RR_precomputed) == len(rbins)-1
-        except AssertionError:
-            msg = ("\nLength of ``RR_precomputed`` must match length of ``rbins``\n")
-            raise HalotoolsError(msg)
-
-        if np.any(RR_precomputed == 0):
-            msg = ("RR_precomputed has radial bin(s) which contain no pairs. \n"
-                   "Consider increasing the number of randoms, or using larger bins.")
-            warn(msg)
-
-        try:
-            assert len(randoms) == NR_precomputed
-        except AssertionError:
-            msg = ("If passing in randoms and also NR_precomputed, \n"
-                "the value of NR_precomputed must agree with the number of randoms\n")
-            raise HalotoolsError(msg)
+    RR_precomputed, NR_precomputed = process_precomputed_random_counts(
+        RR_precomputed, NR_precomputed, randoms, (len(rbins)-1, ))
 
     assert np.all(rbins > 0.), "All values of input ``rbins`` must be positive"
 
@@ -9,6 +9,7 @@ import numpy as np
 from astropy.utils.misc import NumpyRNGContext
 
 from .tpcf_estimators import _TP_estimator, _TP_estimator_requirements
+from .random_pair_counts import spherical_shell_volumes
 from ..pair_counters import npairs_jackknife_3d
 
 from .clustering_helpers import (process_optional_input_sample2,
@@ -76,6 +77,10 @@ def tpcf_jackknife(sample1, randoms, rbins, Nsub=[5, 5, 5],
         in each dimension. If you instead provide a single scalar, Lbox,
         period is assumed to be the same in all Cartesian directions.
         If set to None (the default option), PBCs are set to infinity.
+        If ``period`` is provided, the random-random pairs of the full sample are
+        computed analytically, and the random-random pairs of each jackknife sample
+        are the analytic counts rescaled by the fraction of the counted random pairs
+        that lie in that jackknife sample.
         Length units are comoving and assumed to be in Mpc/h, here and throughout Halotools.
 
     do_auto : boolean, optional
@@ -279,8 +284,17 @@ def tpcf_jackknife(sample1, randoms, rbins, Nsub=[5, 5, 5],
         D2R_full = None
         D2R_sub = None
     if do_RR is True:
-        RR_full = RR[0, :]
-        RR_sub = RR[1:, :]
+        # in a periodic box, the full sample RR is computed analytically,
+        # as in `~halotools.mock_observables.tpcf`, and the jackknife samples
+        # use the same normalization so that all estimators are consistent
+        if PBCs is True:
+            RR_full = NR*NR*spherical_shell_volumes(rbins)/np.prod(period)
+            RR_scale = np.divide(RR_full, RR[0, :],
+                out=np.zeros(len(RR_full)), where=RR[0, :] > 0)
+            RR_sub = RR[1:, :]*RR_scale
+        else:
+            RR_full = RR[0, :]
+            RR_sub = RR[1:, :]
     else:
         RR_full = None
         RR_sub = None
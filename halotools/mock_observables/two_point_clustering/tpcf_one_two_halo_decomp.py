@@ -7,7 +7,6 @@ two-point correlation function in 3d.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import numpy as np
-from math import gamma
 from warnings import warn
 
 from .clustering_helpers import (process_optional_input_sample2,
@@ -18,8 +17,9 @@ from ..mock_observables_helpers import (enforce_sample_has_correct_shape,
 from ..pair_counters.mesh_helpers import _enforce_maximum_search_length
 
 from .tpcf_estimators import _TP_estimator, _TP_estimator_requirements
+from .random_pair_counts import random_pair_counts, spherical_shell_volumes, number_of_randoms
 from ..pair_counters import npairs_3d
-from ..pair_counters import marked_npairs_3d
+from ..pair_counters import npairs_same_group_3d
 
 from ...custom_exceptions import HalotoolsError
 
@@ -210,26 +210,16 @@ def tpcf_one_two_halo_decomp(sample1, sample1_host_halo_id, rbins,
     # How many points are there (for normalization purposes)?
     N1 = len(sample1)
     N2 = len(sample2)
-    if randoms is not None:
-        NR = len(randoms)
-    else:
-        # set the number of randoms equal to the number of points in sample1
-        # this is arbitrarily set, but must remain consistent!
-        NR = N1
-
-    # calculate 1-halo pairs
-    weight_func_id = 3
-    one_halo_D1D1, one_halo_D1D2, one_halo_D2D2 = marked_pair_counts(
-            sample1, sample2, rbins, period, num_threads,
-            do_auto, do_cross, sample1_host_halo_id,
-            sample2_host_halo_id, weight_func_id, _sample1_is_sample2)
+    NR = number_of_randoms(sample1, randoms)
 
-    # calculate 2-halo pairs
-    weight_func_id = 4
-    two_halo_D1D1, two_halo_D1D2, two_halo_D2D2 = marked_pair_counts(
+    # calculate 1-halo and 2-halo pairs
+    one_halo_counts, two_halo_counts = one_two_halo_pair_counts(
             sample1, sample2, rbins, period, num_threads,
             do_auto, do_cross, sample1_host_halo_id,
-            sample2_host_halo_id, weight_func_id, _sample1_is_sample2)
+            sample2_host_halo_id, _sample1_is_sample2,
+            approx_cell1_size, approx_cell2_size)
+    one_halo_D1D1, one_halo_D1D2, one_halo_D2D2 = one_halo_counts
+    two_halo_D1D1, two_halo_D1D2, two_halo_D2D2 = two_halo_counts
 
     # count random pairs
     D1R, D2R, RR = random_counts(sample1, sample2, randoms, rbins, period,
@@ -263,126 +253,68 @@ def tpcf_one_two_halo_decomp(sample1, sample1_host_halo_id, rbins,
             return one_halo_xi_11, two_halo_xi_11, one_halo_xi_22, two_halo_xi_22
 
 
-def nball_volume(R, k=3):
-    """
-    Calculate the volume of a n-shpere.
-    This is used for the analytical randoms.
-    """
-    return (np.pi**(k/2.0)/gamma(k/2.0+1.0))*R**k
-
-
 def random_counts(sample1, sample2, randoms, rbins, period, PBCs, num_threads,
         do_RR, do_DR, _sample1_is_sample2, approx_cell1_size,
         approx_cell2_size, approx_cellran_size):
     """
-    Count random pairs.  There are two high level branches:
-        1. w/ or wo/ PBCs and randoms.
-        2. PBCs and analytical randoms
-    There are also logical bits to do RR and DR pair counts, as not all estimators
-    need one or the other, and not doing these can save a lot of calculation.
+    Count random pairs.
+    See `~halotools.mock_observables.two_point_clustering.random_pair_counts.random_pair_counts`.
 
     Analytical counts are N**2*dv*rho, where dv can is the volume of the spherical
-    shells, which is the correct volume to use for a continious cubic volume with PBCs
+    shells, which is the correct volume to use for a continious cubic volume with PBCs.
+    In a periodic box, RR is always computed analytically.
     """
+    def count_pairs(s1, s2, approx_cell1_size, approx_cell2_size):
+        return np.diff(npairs_3d(s1, s2, rbins, period=period,
+            num_threads=num_threads,
+            approx_cell1_size=approx_cell1_size,
+            approx_cell2_size=approx_cell2_size))
 
-    # randoms provided, so calculate random pair counts.
-    if randoms is not None:
-        if do_RR is True:
-            RR = npairs_3d(randoms, randoms, rbins, period=period,
-                        num_threads=num_threads,
-                        approx_cell1_size=approx_cellran_size,
-                        approx_cell2_size=approx_cellran_size)
-            RR = np.diff(RR)
-        else:
-            RR = None
-        if do_DR is True:
-            D1R = npairs_3d(sample1, randoms, rbins, period=period,
-                         num_threads=num_threads,
-                         approx_cell1_size=approx_cell1_size,
-                         approx_cell2_size=approx_cellran_size
-                            )
-            D1R = np.diff(D1R)
-        else:
-            D1R = None
-        if _sample1_is_sample2:
-            D2R = None
-        else:
-            if do_DR is True:
-                D2R = npairs_3d(sample2, randoms, rbins, period=period,
-                             num_threads=num_threads,
-                             approx_cell1_size=approx_cell2_size,
-                             approx_cell2_size=approx_cellran_size)
-                D2R = np.diff(D2R)
-            else:
-                D2R = None
-
-        return D1R, D2R, RR
-    # PBCs and no randoms--calculate randoms analytically.
-    elif randoms is None:
-        # set the number of randoms equal to the number of points in sample1
-        NR = len(sample1)
-
-        # do volume calculations
-        v = nball_volume(rbins)  # volume of spheres
-        dv = np.diff(v)  # volume of shells
-        global_volume = period.prod()  # volume of simulation
-
-        # calculate randoms for sample1
-        N1 = np.shape(sample1)[0]  # number of points in sample1
-        rho1 = N1/global_volume  # number density of points
-        D1R = (NR)*(dv*rho1)  # random counts are N**2*dv*rho
-
-        # calculate randoms for sample2
-        N2 = np.shape(sample2)[0]  # number of points in sample2
-        rho2 = N2/global_volume  # number density of points
-        D2R = (NR)*(dv*rho2)  # random counts are N**2*dv*rho
-
-        # calculate the random-random pairs.
-        rhor = (NR**2)/global_volume
-        RR = (dv*rhor)
-
-        return D1R, D2R, RR
-
-
-def marked_pair_counts(sample1, sample2, rbins, period, num_threads,
-        do_auto, do_cross, marks1, marks2, weight_func_id, _sample1_is_sample2):
+    return random_pair_counts(sample1, sample2, randoms, count_pairs,
+        spherical_shell_volumes(rbins), np.prod(period),
+        do_RR, do_DR, _sample1_is_sample2,
+        approx_cell1_size, approx_cell2_size, approx_cellran_size, analytic_RR=PBCs)
+
+
+def one_two_halo_pair_counts(sample1, sample2, rbins, period, num_threads,
+        do_auto, do_cross, host_halo_id1, host_halo_id2, _sample1_is_sample2,
+        approx_cell1_size, approx_cell2_size):
     """
-    Count weighted data pairs.
+    Count data pairs, separately for points in the same halo and in different halos.
+    Both sets of pairs are counted in the same pass.
     """
 
-    # add ones to weights, so returned value is return 1.0*1.0
-    marks1 = np.vstack((marks1, np.ones(len(marks1)))).T
-    marks2 = np.vstack((marks2, np.ones(len(marks2)))).T
+    def pair_counts(s1, s2, ids1, ids2, cell1_size, cell2_size):
+        one_halo, two_halo = npairs_same_group_3d(s1, s2, rbins, ids1, ids2,
+            period=period, num_threads=num_threads,
+            approx_cell1_size=cell1_size, approx_cell2_size=cell2_size)
+        return np.diff(one_halo), np.diff(two_halo)
 
     if do_auto is True:
-        D1D1 = marked_npairs_3d(sample1, sample1, rbins,
-            weights1=marks1, weights2=marks1,
-            weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-        D1D1 = np.diff(D1D1)
+        D1D1 = pair_counts(sample1, sample1, host_halo_id1, host_halo_id1,
+            approx_cell1_size, approx_cell1_size)
     else:
-        D1D1 = None
-        D2D2 = None
+        D1D1 = (None, None)
+        D2D2 = (None, None)
 
     if _sample1_is_sample2:
         D1D2 = D1D1
         D2D2 = D1D1
     else:
         if do_cross is True:
-            D1D2 = marked_npairs_3d(sample1, sample2, rbins,
-                weights1=marks1, weights2=marks2,
-                weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-            D1D2 = np.diff(D1D2)
+            D1D2 = pair_counts(sample1, sample2, host_halo_id1, host_halo_id2,
+                approx_cell1_size, approx_cell2_size)
         else:
-            D1D2 = None
+            D1D2 = (None, None)
         if do_auto is True:
-            D2D2 = marked_npairs_3d(sample2, sample2, rbins,
-                weights1=marks2, weights2=marks2,
-                weight_func_id=weight_func_id, period=period, num_threads=num_threads)
-            D2D2 = np.diff(D2D2)
+            D2D2 = pair_counts(sample2, sample2, host_halo_id2, host_halo_id2,
+                approx_cell2_size, approx_cell2_size)
         else:
-            D2D2 = None
+            D2D2 = (None, None)
 
-    return D1D1, D1D2, D2D2
+    one_halo_counts = (D1D1[0], D1D2[0], D2D2[0])
+    two_halo_counts = (D1D1[1], D1D2[1], D2D2[1])
+    return one_halo_counts, two_halo_counts
 
 
 def _tpcf_one_two_halo_decomp_process_args(sample1, sample1_host_halo_id, rbins,
@@ -8,6 +8,7 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 import numpy as np
 
 from .rp_pi_tpcf import rp_pi_tpcf, _rp_pi_tpcf_process_args
+from .random_pair_counts import process_precomputed_random_counts
 
 
 __all__ = ['wp']
@@ -20,7 +21,7 @@ np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. DD
 def wp(sample1, rp_bins, pi_max, sample2=None, randoms=None, period=None,
         do_auto=True, do_cross=True, estimator='Natural', num_threads=1,
         max_sample_size=int(1e6), approx_cell1_size=None, approx_cell2_size=None,
-        approx_cellran_size=None, seed=None):
+        approx_cellran_size=None, RR_precomputed=None, NR_precomputed=None, seed=None):
     """
     Calculate the projected two point correlation function, :math:`w_{p}(r_p)`,
     where :math:`r_p` is the separation perpendicular to the line-of-sight (LOS).
@@ -75,6 +76,8 @@ def wp(sample1, rp_bins, pi_max, sample2=None, randoms=None, period=None,
         If no randoms are provided (the default option),
         calculation of the tpcf can proceed using analytical randoms
         (only valid for periodic boundary conditions).
+        If ``period`` is also provided, the randoms are only used to count
+        the data-random pairs, and the random-random pairs are computed analytically.
 
     period : array_like, optional
         Length-3 sequence defining the periodic boundary conditions
@@ -129,6 +132,20 @@ def wp(sample1, rp_bins, pi_max, sample2=None, randoms=None, period=None,
         Analogous to ``approx_cell1_size``, but for randoms.  See comments for
         ``approx_cell1_size`` for details.
 
+        RR_precomputed : array_like, optional
+        Array of length *len(rp_bins)-1* storing the number of RR-counts
+        with line-of-sight separation smaller than ``pi_max``
+        calculated in advance during a pre-processing phase.
+        If the ``RR_precomputed`` argument is provided,
+        you must also provide the ``NR_precomputed`` argument.
+        Default is None.
+
+    NR_precomputed : int, optional
+        Number of points in the random sample used to calculate ``RR_precomputed``.
+        If the ``NR_precomputed`` argument is provided,
+        you must also provide the ``RR_precomputed`` argument.
+        Default is None.
+
     seed : int, optional
         Random number seed used to randomly downsample data, if applicable.
         Default is None, in which case downsampling will be stochastic.
@@ -204,9 +221,15 @@ def wp(sample1, rp_bins, pi_max, sample2=None, randoms=None, period=None,
     # process input parameters
     function_args = (sample1, rp_bins, pi_bins, sample2, randoms, period, do_auto,
         do_cross, estimator, num_threads, max_sample_size,
-        approx_cell1_size, approx_cell2_size, approx_cellran_size, seed)
+        approx_cell1_size, approx_cell2_size, approx_cellran_size, None, None, seed)
     sample1, rp_bins, pi_bins, sample2, randoms, period, do_auto, do_cross, num_threads,\
-        _sample1_is_sample2, PBCs = _rp_pi_tpcf_process_args(*function_args)
+        _sample1_is_sample2, PBCs = _rp_pi_tpcf_process_args(*function_args)[:11]
+
+    RR_precomputed, NR_precomputed = process_precomputed_random_counts(
+        RR_precomputed, NR_precomputed, randoms, (len(rp_bins)-1, ), 'rp_bins')
+    if RR_precomputed is not None:
+        # a single bin of line-of-sight separation
+        RR_precomputed = RR_precomputed.reshape((len(rp_bins)-1, 1))
 
     if _sample1_is_sample2:
         sample2 = None
@@ -219,7 +242,8 @@ def wp(sample1, rp_bins, pi_max, sample2=None, randoms=None, period=None,
         max_sample_size=max_sample_size,
         approx_cell1_size=approx_cell1_size,
         approx_cell2_size=approx_cell2_size,
-        approx_cellran_size=approx_cellran_size)
+        approx_cellran_size=approx_cellran_size,
+        RR_precomputed=RR_precomputed, NR_precomputed=NR_precomputed)
 
     # return the results.
     if _sample1_is_sample2:
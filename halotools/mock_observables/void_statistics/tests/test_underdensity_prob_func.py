@@ -3,17 +3,20 @@
 """
 from __future__ import (absolute_import, division, print_function)
 
+import sys
 import numpy as np
 from astropy.tests.helper import pytest
 from astropy.utils.misc import NumpyRNGContext
 
 from ..underdensity_prob_func import underdensity_prob_func
 from ..void_prob_func import void_prob_func
+from ...pair_counters import npairs_per_object_3d
 
 from ...tests.cf_helpers import generate_locus_of_3d_points
 from ....custom_exceptions import HalotoolsError
 
-__all__ = ('test_upf1', 'test_upf2', 'test_upf3', 'test_upf4')
+__all__ = ('test_upf1', 'test_upf2', 'test_upf3', 'test_upf4', 'test_upf_counts_in_spheres',
+    'test_upf_pair_count_path')
 
 fixed_seed = 43
 
@@ -104,6 +107,55 @@ def test_upf4():
     vpf = void_prob_func(sample1, rbins, n_ran=n_ran, period=Lbox)
 
 
+def test_upf_counts_in_spheres():
+    """ Verify that the UPF agrees with the fraction of spheres
+    found to be underdense by counting the points inside each sphere.
+    """
+    Npts = 1000
+    Lbox = 1
+    period = np.array([Lbox, Lbox, Lbox])
+    u = 0.5
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        random_sphere_centers = np.random.random((1000, 3))
+
+    rbins = np.linspace(0.05, 0.15, 5)
+    upf = underdensity_prob_func(sample1, rbins,
+        random_sphere_centers=random_sphere_centers, period=period, u=u)
+
+    counts = npairs_per_object_3d(random_sphere_centers, sample1, rbins, period=period)
+    N_max = Npts*(4.0/3.0)*np.pi*rbins**3*u
+    assert np.all(upf == np.mean(counts <= N_max, axis=0))
+    assert np.any(upf > 0) & np.any(upf < 1)
+
+
+def test_upf_pair_count_path():
+    """ Verify that counting the points inside each sphere, used for large density thresholds,
+    agrees with the distances to the nearest neighbors of each sphere center.
+    """
+    Npts = 1000
+    Lbox = 1
+    period = np.array([Lbox, Lbox, Lbox])
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        random_sphere_centers = np.random.random((1000, 3))
+
+    rbins = np.linspace(0.05, 0.15, 5)
+    upf1 = underdensity_prob_func(sample1, rbins,
+        random_sphere_centers=random_sphere_centers, period=period, u=0.5)
+
+    # The void_statistics package binds the function to the name of its module
+    upf_module = sys.modules[underdensity_prob_func.__module__]
+    default_max_num_nearest_neighbors = upf_module.max_num_nearest_neighbors
+    upf_module.max_num_nearest_neighbors = 1
+    try:
+        upf2 = underdensity_prob_func(sample1, rbins,
+            random_sphere_centers=random_sphere_centers, period=period, u=0.5)
+    finally:
+        upf_module.max_num_nearest_neighbors = default_max_num_nearest_neighbors
+    assert np.all(upf1 == upf2)
+
+
 def test_underdensity_prob_func_process_args1():
     Npts = 1000
     Lbox = 1
@@ -7,12 +7,13 @@ from astropy.tests.helper import pytest
 from astropy.utils.misc import NumpyRNGContext
 
 from ..void_prob_func import void_prob_func
+from ...pair_counters import npairs_per_object_3d
 
 from ...tests.cf_helpers import generate_locus_of_3d_points
 
 from ....custom_exceptions import HalotoolsError
 
-__all__ = ('test_vpf1', 'test_vpf2', 'test_vpf3')
+__all__ = ('test_vpf1', 'test_vpf2', 'test_vpf3', 'test_vpf_counts_in_spheres')
 
 fixed_seed = 43
 
@@ -75,6 +76,25 @@ def test_vpf3():
     assert np.allclose(vpf, vpf2, rtol=0.01)
 
 
+def test_vpf_counts_in_spheres():
+    """ Verify that the VPF agrees with the fraction of spheres
+    found to be empty by counting the points inside each sphere.
+    """
+    Npts = 1000
+    Lbox = 1
+    period = np.array([Lbox, Lbox, Lbox])
+    with NumpyRNGContext(fixed_seed):
+        sample1 = np.random.random((Npts, 3))
+        random_sphere_centers = np.random.random((1000, 3))
+
+    rbins = np.logspace(-2, -1, 5)
+    vpf = void_prob_func(sample1, rbins,
+        random_sphere_centers=random_sphere_centers, period=period)
+
+    counts = npairs_per_object_3d(random_sphere_centers, sample1, rbins, period=period)
+    assert np.all(vpf == np.mean(counts == 0, axis=0))
+
+
 def test_vpf_process_args1():
     Npts = 1000
     Lbox = 1
@@ -7,10 +7,9 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import numpy as np
 
-from astropy.extern.six.moves import xrange as range
 from astropy.utils.misc import NumpyRNGContext
 
-from ..pair_counters import npairs_per_object_3d
+from ..pair_counters import nearest_neighbors_3d, npairs_per_object_3d
 
 from ...utils.array_utils import array_is_monotonic
 from ...custom_exceptions import HalotoolsError
@@ -22,6 +21,10 @@ __author__ = ['Duncan Campbell', 'Andrew Hearin']
 
 np.seterr(divide='ignore', invalid='ignore')  # ignore divide by zero in e.g. DD/RR
 
+# Largest number of nearest neighbors stored for each sphere center.
+# Above this number, the pairs around each sphere center are counted instead
+max_num_nearest_neighbors = 64
+
 
 def underdensity_prob_func(sample1, rbins, n_ran=None,
         random_sphere_centers=None, period=None,
@@ -111,9 +114,15 @@ def underdensity_prob_func(sample1, rbins, n_ran=None,
 
     Notes
     -----
-    This function requires the calculation of the number of pairs per randomly placed
-    sphere, and thus storage of an array of shape(n_ran,len(rbins)).  This can be a
-    memory intensive process as this array becomes large.
+    A sphere of radius :math:`r` contains at most :math:`N` points if and only if
+    the distance between its center and its :math:`(N+1)`-th nearest point
+    in ``sample1`` exceeds :math:`r`, so the UPF at all radii is computed from
+    the distances to the nearest neighbors of each sphere center, which requires
+    storage of an array of shape (n_ran, N+1) for the largest threshold :math:`N`.
+    If :math:`N+1` exceeds 64, the number of points within each radius of each
+    sphere center is instead counted with
+    `~halotools.mock_observables.pair_counters.npairs_per_object_3d`,
+    which requires storage of an array of shape (n_ran, len(rbins)).
 
     Examples
     --------
@@ -149,20 +158,31 @@ def underdensity_prob_func(sample1, rbins, n_ran=None,
             period, sample_volume, u,
             num_threads, approx_cell1_size, approx_cellran_size, seed))
 
-    result = npairs_per_object_3d(random_sphere_centers, sample1, rbins,
-        period=period, num_threads=num_threads,
-        approx_cell1_size=approx_cell1_size,
-        approx_cell2_size=approx_cellran_size)
-
     # calculate the number of galaxies as a
     # function of r that corresponds to the
     # specified under-density
     mean_rho = len(sample1)/sample_volume
     vol = (4.0/3.0) * np.pi * rbins**3
-    N_max = mean_rho*vol*u
+    N_max = np.floor(mean_rho*vol*u).astype(int)
+
+    if np.max(N_max)+1 > max_num_nearest_neighbors:
+        counts = npairs_per_object_3d(random_sphere_centers, sample1, rbins,
+            period=period, num_threads=num_threads,
+            approx_cell1_size=approx_cell1_size,
+            approx_cell2_size=approx_cellran_size)
+        num_underdense_spheres = np.array(
+            [np.count_nonzero(counts[:, i] <= N_max[i]) for i in range(len(N_max))])
+        return num_underdense_spheres/n_ran
+
+    # a sphere with at most N_max galaxies is one whose
+    # (N_max+1)-th nearest galaxy lies outside the sphere
+    distances = nearest_neighbors_3d(random_sphere_centers, sample1, np.max(rbins),
+        num_neighbors=np.max(N_max)+1, period=period, num_threads=num_threads,
+        approx_cell1_size=approx_cell1_size,
+        approx_cell2_size=approx_cellran_size, return_indices=False)
 
     num_underdense_spheres = np.array(
-        [sum(result[:, i] <= N_max[i]) for i in range(len(N_max))])
+        [np.count_nonzero(distances[:, n] > r) for n, r in zip(N_max, rbins)])
     return num_underdense_spheres/n_ran
 
 
@@ -7,10 +7,9 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import numpy as np
 
-from astropy.extern.six.moves import xrange as range
 from astropy.utils.misc import NumpyRNGContext
 
-from ..pair_counters import npairs_per_object_3d
+from ..pair_counters import nearest_neighbors_3d
 
 from ...utils.array_utils import array_is_monotonic
 from ...custom_exceptions import HalotoolsError
@@ -103,9 +102,10 @@ def void_prob_func(sample1, rbins, n_ran=None, random_sphere_centers=None,
 
     Notes
     -----
-    This function requires the calculation of the number of pairs per randomly placed
-    sphere, and thus storage of an array of shape(n_ran,len(rbins)).  This can be a
-    memory intensive process as this array becomes large.
+    A sphere of radius :math:`r` is empty if and only if the distance between its center
+    and the nearest point in ``sample1`` exceeds :math:`r`, so the VPF at all radii
+    is computed from the nearest-neighbor distance of each sphere center, which only
+    requires storage of an array of shape (n_ran, ).
 
     Examples
     --------
@@ -140,13 +140,13 @@ def void_prob_func(sample1, rbins, n_ran=None, random_sphere_centers=None,
         _void_prob_func_process_args(sample1, rbins, n_ran, random_sphere_centers,
             period, num_threads, approx_cell1_size, approx_cellran_size, seed))
 
-    result = npairs_per_object_3d(random_sphere_centers, sample1, rbins,
-        period=period, num_threads=num_threads,
+    distances = nearest_neighbors_3d(random_sphere_centers, sample1, np.max(rbins),
+        num_neighbors=1, period=period, num_threads=num_threads,
         approx_cell1_size=approx_cell1_size,
-        approx_cell2_size=approx_cellran_size)
+        approx_cell2_size=approx_cellran_size, return_indices=False)
 
     num_empty_spheres = np.array(
-        [sum(result[:, i] == 0) for i in range(result.shape[1])])
+        [np.count_nonzero(distances[:, 0] > r) for r in rbins])
     return num_empty_spheres/n_ran
 
 
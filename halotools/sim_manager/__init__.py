@@ -21,6 +21,10 @@ from .fake_sim import FakeSim
 from .download_manager import DownloadManager
 
 from .cached_halo_catalog import CachedHaloCatalog
+from .lazy_halo_table import LazyHaloTable
+from .derived_column_store import DerivedColumnStore
+from .hdf5_table_io import *
+from .spatial_index import *
 from .user_supplied_halo_catalog import UserSuppliedHaloCatalog
 from .user_supplied_ptcl_catalog import UserSuppliedPtclCatalog
 
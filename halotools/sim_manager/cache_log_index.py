@@ -0,0 +1,261 @@
+""" Module storing the `CacheLogIndex` class, the SQLite database
+used by `~halotools.sim_manager.HaloTableCache` and
+`~halotools.sim_manager.PtclTableCache` to store the cache log.
+"""
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+
+__all__ = ('CacheLogIndex', )
+
+
+class CacheLogIndex(object):
+    """ SQLite database storing the rows of a Halotools cache log.
+
+    The database is the authoritative copy of the log. Rows are indexed on
+    every log attribute other than ``fname``, and each update of the log is made
+    inside a single transaction holding the write lock of the database, so that
+    many processes sharing the same cache directory can update the log concurrently
+    without losing each other's changes.
+
+    The ASCII cache log, e.g., ``$HOME/.astropy/cache/halotools/halo_table_cache_log.txt``,
+    is kept as a human-readable export of the database that is rewritten after each update.
+    The size and modification time of the ASCII file are recorded each time it is written.
+    If the ASCII file is later found to differ, e.g., because it was edited by hand
+    or written by a previous version of Halotools, its rows are imported into the database,
+    which also provides the migration path for existing caches.
+    Deleting the ASCII file after it has been written empties the log.
+    If the database can neither be read nor created, e.g., in a read-only
+    cache directory, the rows of the log are read from the ASCII file.
+    """
+
+    def __init__(self, db_fname, log_attributes, ascii_fname,
+            read_ascii_rows, write_ascii_rows, timeout=60.):
+        """
+        Parameters
+        ----------
+        db_fname : string
+            Name of the SQLite database file.
+
+        log_attributes : list of strings
+            Names of the attributes of each log entry, e.g.,
+            ``HaloTableCacheLogEntry.log_attributes``.
+
+        ascii_fname : string
+            Name of the ASCII cache log.
+
+        read_ascii_rows : callable
+            Function of ``ascii_fname`` returning the list of rows stored in the ASCII log,
+            each row a tuple of strings ordered as ``log_attributes``,
+            or None if the file could not be read. Must return an empty list
+            if the file does not exist.
+
+        write_ascii_rows : callable
+            Function with signature ``write_ascii_rows(ascii_fname, rows)``
+            writing the input list of rows to the ASCII log.
+
+        timeout : float, optional
+            Number of seconds to wait for another process to release the write lock
+            of the database before raising an exception. Default is 60.
+        """
+        self.db_fname = db_fname
+        self.log_attributes = list(log_attributes)
+        self.index_attributes = [attr for attr in self.log_attributes if attr != 'fname']
+        self.ascii_fname = ascii_fname
+        self.read_ascii_rows = read_ascii_rows
+        self.write_ascii_rows = write_ascii_rows
+        self.timeout = timeout
+
+    def _connect(self):
+        dirname = os.path.dirname(self.db_fname)
+        if (dirname != '') and (not os.path.isdir(dirname)):
+            try:
+                os.makedirs(dirname)
+            except OSError:
+                pass
+        # Transactions are managed explicitly
+        return sqlite3.connect(self.db_fname, timeout=self.timeout, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self, lock=True):
+        """ Context manager yielding a connection to the database inside a transaction.
+        If ``lock`` is True, the write lock is acquired upon entering the block,
+        so that no other process can modify the log until the block exits.
+        """
+        conn = self._connect()
+        try:
+            if lock is True:
+                conn.execute('BEGIN IMMEDIATE')
+            else:
+                conn.execute('BEGIN')
+            try:
+                yield conn
+            except:
+                conn.execute('ROLLBACK')
+                raise
+            else:
+                conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def _create_schema(self, conn):
+        columns = ', '.join(attr + ' TEXT NOT NULL' for attr in self.log_attributes)
+        conn.execute('CREATE TABLE IF NOT EXISTS log (%s, UNIQUE (%s))' %
+            (columns, ', '.join(self.log_attributes)))
+        conn.execute('CREATE INDEX IF NOT EXISTS log_metadata_index ON log (%s)' %
+            ', '.join(self.index_attributes))
+        conn.execute('CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _select(self, conn, **constraints):
+        query = 'SELECT %s FROM log' % ', '.join(self.log_attributes)
+        keys = [attr for attr in self.log_attributes if attr in constraints]
+        if len(keys) > 0:
+            query += ' WHERE ' + ' AND '.join(key + ' = ?' for key in keys)
+        query += ' ORDER BY %s' % ', '.join(self.log_attributes)
+        return [tuple(row) for row in
+            conn.execute(query, tuple(str(constraints[key]) for key in keys))]
+
+    def _insert(self, conn, rows):
+        query = 'INSERT OR IGNORE INTO log VALUES (%s)' % ', '.join('?'*len(self.log_attributes))
+        num_changes = conn.total_changes
+        conn.executemany(query, [tuple(str(x) for x in row) for row in rows])
+        return conn.total_changes - num_changes
+
+    def _ascii_fingerprint(self):
+        try:
+            stat = os.stat(self.ascii_fname)
+        except OSError:
+            return None
+        mtime = getattr(stat, 'st_mtime_ns', stat.st_mtime)
+        return json.dumps([stat.st_size, repr(mtime)])
+
+    def _stored_ascii_fingerprint(self, conn):
+        row = conn.execute("SELECT value FROM metadata WHERE key = 'ascii_fingerprint'").fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def _ascii_is_current(self, conn):
+        """ True unless the ASCII log was modified or deleted since it was last written
+        by this class, or was created after the database.
+        """
+        return self._ascii_fingerprint() == self._stored_ascii_fingerprint(conn)
+
+    def _import_modified_ascii(self, conn):
+        self._create_schema(conn)
+        if self._ascii_is_current(conn):
+            return
+        rows = self.read_ascii_rows(self.ascii_fname)
+        if rows is None:
+            # The ASCII log could not be read, so keep the rows of the database
+            return
+        conn.execute('DELETE FROM log')
+        self._insert(conn, rows)
+        self._export_ascii(conn)
+
+    def _export_ascii(self, conn):
+        self.write_ascii_rows(self.ascii_fname, self._select(conn))
+        conn.execute("INSERT OR REPLACE INTO metadata VALUES ('ascii_fingerprint', ?)",
+            (self._ascii_fingerprint(), ))
+
+    def _ascii_rows(self, **constraints):
+        """ Rows of the ASCII log matching the input constraints, in the order of `_select`.
+        """
+        rows = self.read_ascii_rows(self.ascii_fname)
+        if rows is None:
+            return []
+        indices = [self.log_attributes.index(key) for key in self.log_attributes
+            if key in constraints]
+        values = [str(constraints[self.log_attributes[i]]) for i in indices]
+        rows = [tuple(str(x) for x in row) for row in rows]
+        return sorted(set(row for row in rows
+            if all(row[i] == value for i, value in zip(indices, values))))
+
+    def rows(self, **constraints):
+        """ Rows of the log, each row a tuple of strings ordered as ``log_attributes``.
+
+        Parameters
+        ----------
+        **constraints : optional
+            Only rows whose attributes are equal to the input values are returned,
+            e.g., ``rows(simname='bolshoi', halo_finder='rockstar')``.
+
+        Returns
+        -------
+        rows : list of tuples
+        """
+        try:
+            with self._transaction(lock=False) as conn:
+                if self._ascii_is_current(conn):
+                    return self._select(conn, **constraints)
+        except sqlite3.OperationalError:
+            # The database has not been created yet
+            pass
+
+        try:
+            with self._transaction(lock=True) as conn:
+                self._import_modified_ascii(conn)
+                return self._select(conn, **constraints)
+        except sqlite3.OperationalError:
+            # The database cannot be created or updated, e.g., in a read-only cache directory
+            return self._ascii_rows(**constraints)
+
+    def add_rows(self, rows):
+        """ Add rows to the log, ignoring any rows already stored.
+
+        Parameters
+        ----------
+        rows : list of tuples
+
+        Returns
+        -------
+        num_added : int
+            Number of rows that were not already stored in the log.
+
+        rows : list of tuples
+            All rows of the log after the update, including rows added by other processes.
+        """
+        with self._transaction(lock=True) as conn:
+            self._import_modified_ascii(conn)
+            num_added = self._insert(conn, rows)
+            if (num_added > 0) or (self._ascii_fingerprint() is None):
+                self._export_ascii(conn)
+            return num_added, self._select(conn)
+
+    def remove_row(self, row):
+        """ Remove a row from the log.
+
+        Parameters
+        ----------
+        row : tuple
+
+        Returns
+        -------
+        num_removed : int
+            Number of removed rows, either 0 or 1.
+
+        rows : list of tuples
+            All rows of the log after the update, including rows added by other processes.
+        """
+        query = 'DELETE FROM log WHERE ' + ' AND '.join(
+            attr + ' = ?' for attr in self.log_attributes)
+        with self._transaction(lock=True) as conn:
+            self._import_modified_ascii(conn)
+            num_removed = conn.execute(query, tuple(str(x) for x in row)).rowcount
+            if num_removed > 0:
+                self._export_ascii(conn)
+            return num_removed, self._select(conn)
+
+    def replace_rows(self, rows):
+        """ Replace all rows of the log with the input rows.
+
+        Parameters
+        ----------
+        rows : list of tuples
+        """
+        with self._transaction(lock=True) as conn:
+            self._create_schema(conn)
+            conn.execute('DELETE FROM log')
+            self._insert(conn, rows)
+            self._export_ascii(conn)
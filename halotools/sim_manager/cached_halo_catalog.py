@@ -5,8 +5,7 @@ keyword inputs such as ``simname`` and ``redshift``.
 import os
 from warnings import warn
 from copy import deepcopy
-
-from astropy.table import Table
+import numpy as np
 
 try:
     import h5py
@@ -17,17 +16,50 @@ except ImportError:
 
 from ..sim_manager import sim_defaults, supported_sims
 
-from ..utils import broadcast_host_halo_property, add_halo_hostid
+from ..utils import broadcast_host_halo_property, add_halo_hostid, rng_stream
 
 from .halo_table_cache import HaloTableCache
 from .ptcl_table_cache import PtclTableCache
 from .halo_table_cache_log_entry import get_redshift_string
+from .lazy_halo_table import LazyHaloTable
+from .derived_column_store import DerivedColumnStore
+from .hdf5_table_io import read_table_from_hdf5, hdf5_table_num_rows
+from .spatial_index import read_spatial_index, read_table_subvolume, subvolume_mask
 
 from ..custom_exceptions import HalotoolsError, InvalidCacheLogEntry
 
 
 __all__ = ('CachedHaloCatalog', )
 
+# Parameters identifying the derived columns of every halo catalog
+# in the derived column store of the catalog
+_derived_column_params = {
+    'halo_hostid': {'function': 'add_halo_hostid'},
+    'halo_mvir_host_halo': {'function': 'broadcast_host_halo_property',
+        'halo_property_key': 'halo_mvir'}
+    }
+
+
+def _sorted_random_subset(rng, num_rows, num_selected):
+    """ Sorted array of ``num_selected`` distinct integers drawn at random in [0, num_rows).
+
+    Indices are drawn with replacement and the duplicates are drawn again,
+    so that no array of length ``num_rows`` is allocated. When more than half of
+    the rows are selected, the rows that are not selected are drawn instead,
+    and the selection is stored in a boolean mask of ``num_rows`` bytes,
+    which is smaller than the returned array of indices.
+    """
+    if 2*num_selected > num_rows:
+        mask = np.ones(num_rows, dtype=bool)
+        mask[_sorted_random_subset(rng, num_rows, num_rows - num_selected)] = False
+        return np.flatnonzero(mask)
+
+    indices = np.unique(rng.integers(0, num_rows, num_selected))
+    while len(indices) < num_selected:
+        indices = np.union1d(indices,
+            rng.integers(0, num_rows, num_selected - len(indices)))
+    return indices
+
 
 class CachedHaloCatalog(object):
     """
@@ -54,7 +86,7 @@ class CachedHaloCatalog(object):
     """
     acceptable_kwargs = ('ptcl_version_name', 'fname', 'simname',
         'halo_finder', 'redshift', 'version_name', 'dz_tol', 'update_cached_fname',
-        'preload_halo_table')
+        'preload_halo_table', 'persist_derived_columns')
 
     def __init__(self, *args, **kwargs):
         """
@@ -115,6 +147,13 @@ class CachedHaloCatalog(object):
             Halo catalogs in cache with a redshift that differs by greater
             than ``dz_tol`` will be ignored. Default is 0.05.
 
+        persist_derived_columns : bool, optional
+            If True, columns derived from the halo catalog, such as ``halo_hostid``,
+            ``halo_mvir_host_halo`` and the conditional percentiles of assembly-biased models,
+            are saved to the `derived_column_store` the first time they are computed
+            and retrieved from the store afterwards. Default is False,
+            in which case these columns are computed every time and nothing is written to disk.
+
         Examples
         ---------
         If you followed the instructions in the
@@ -157,8 +196,8 @@ class CachedHaloCatalog(object):
         >>> cache = HaloTableCache()
         >>> for entry in cache.log: print(entry) # doctest: +SKIP
 
-        Alternatively, you can simply use a text editor to open the cache log,
-        which is stored as ASCII data in the following location on your machine:
+        Alternatively, you can simply use a text editor to open the ASCII copy
+        of the cache log, which is stored in the following location on your machine:
 
         $HOME/.astropy/cache/halotools/halo_table_cache_log.txt
 
@@ -188,6 +227,11 @@ class CachedHaloCatalog(object):
             update_cached_fname = False
         self._update_cached_fname = update_cached_fname
 
+        try:
+            self._persist_derived_columns = kwargs['persist_derived_columns']
+        except KeyError:
+            self._persist_derived_columns = False
+
         self.halo_table_cache = HaloTableCache()
 
         self._disallow_catalogs_with_known_bugs(**kwargs)
@@ -544,18 +588,282 @@ class CachedHaloCatalog(object):
             return self._halo_table
         except AttributeError:
             if self.log_entry.safe_for_cache is True:
-                self._halo_table = Table.read(self.fname, path='data')
+                self._halo_table = read_table_from_hdf5(self.fname)
                 self._add_new_derived_columns(self._halo_table)
                 return self._halo_table
             else:
                 raise InvalidCacheLogEntry(self.log_entry._cache_safety_message)
 
-    def _add_new_derived_columns(self, t):
-        if 'halo_hostid' not in list(t.keys()):
-            add_halo_hostid(t)
+    @property
+    def lazy_halo_table(self):
+        """
+        `~halotools.sim_manager.LazyHaloTable` object providing read-only access
+        to the columns of the halo catalog without loading the entire catalog into memory.
+        Each column is read from disk, or memory-mapped, the first time it is requested.
+
+        >>> halocat = CachedHaloCatalog() # doctest: +SKIP
+        >>> mass_array = halocat.lazy_halo_table['halo_mvir'] # doctest: +SKIP
+
+        Unlike `halo_table`, the ``halo_hostid`` and ``halo_mvir_host_halo`` columns
+        are only available if they are stored on disk.
+        See `load_halo_table_columns` for a way to compute them from the stored columns.
+        """
+        try:
+            return self._lazy_halo_table
+        except AttributeError:
+            if self.log_entry.safe_for_cache is True:
+                self._lazy_halo_table = LazyHaloTable(self.fname, path='data')
+                return self._lazy_halo_table
+            else:
+                raise InvalidCacheLogEntry(self.log_entry._cache_safety_message)
+
+    def load_halo_table_columns(self, keys):
+        """ Load only the requested columns of the halo catalog into memory.
+
+        For wide halo catalogs, this is much faster and requires much less memory
+        than loading the full `halo_table`. If the full `halo_table` has already
+        been loaded, the columns are taken from it.
+
+        Parameters
+        ----------
+        keys : sequence of strings
+            Names of the columns to load. The ``halo_hostid`` and ``halo_mvir_host_halo``
+            columns are computed from the stored columns if they are not stored on disk.
+
+        Returns
+        -------
+        table : `~astropy.table.Table`
+            Table storing the requested columns.
+
+        Examples
+        --------
+        >>> halocat = CachedHaloCatalog() # doctest: +SKIP
+        >>> halos = halocat.load_halo_table_columns(['halo_upid', 'halo_mvir', 'halo_x']) # doctest: +SKIP
+        """
+        keys = list(keys)
+        if hasattr(self, '_halo_table'):
+            return self._halo_table[keys]
+
+        halos = self.lazy_halo_table
+        derived_keys = ('halo_hostid', 'halo_mvir_host_halo')
+        stored_keys = [key for key in keys if (key in halos) or (key not in derived_keys)]
+
+        missing_derived_keys = [key for key in derived_keys if (key in keys) and (key not in halos)]
+
+        stored_derived_columns = {}
+        store = self.derived_column_store
+        for key in missing_derived_keys:
+            if store is None:
+                break
+            column = store.retrieve(key, _derived_column_params[key], num_rows=len(halos))
+            if column is not None:
+                stored_derived_columns[key] = column
+
+        if len(stored_derived_columns) < len(missing_derived_keys):
+            for key in ('halo_id', 'halo_upid', 'halo_mvir'):
+                if key not in stored_keys:
+                    stored_keys.append(key)
+
+        t = halos.to_table(stored_keys)
+        for key, column in stored_derived_columns.items():
+            t[key] = column
+        if len(stored_derived_columns) < len(missing_derived_keys):
+            self._add_new_derived_columns(t)
+        return t[keys]
+
+    def load_halo_table_subvolume(self, xlim, ylim, zlim, keys=None):
+        """ Load the halos inside a rectangular subvolume of the periodic box.
+
+        If the halo catalog was stored with a spatial index, e.g., by passing
+        ``spatial_index_cells_per_dim`` to the
+        `~halotools.sim_manager.UserSuppliedHaloCatalog.add_halocat_to_cache` method,
+        only the rows overlapping the subvolume are read from disk.
+        Otherwise the subvolume is selected from the full `halo_table`.
+
+        Parameters
+        ----------
+        xlim, ylim, zlim : sequence
+            Two-element sequences (min, max) defining the half-open interval
+            [min, max) of the subvolume in each dimension. The limits may extend
+            beyond [0, Lbox), in which case the subvolume wraps around the periodic
+            boundary, e.g., ``xlim = (-10, 10)`` selects halos with x < 10 or x >= Lbox - 10.
+
+        keys : sequence of strings, optional
+            Names of the columns to return. Default is None, in which case all columns are returned.
+
+        Returns
+        -------
+        halos : `~astropy.table.Table`
+            Table storing the halos inside the subvolume.
+            Derived columns that are not stored on disk, such as ``halo_mvir_host_halo``,
+            are only included when the subvolume is selected from the full `halo_table`.
 
-        if 'halo_mvir_host_halo' not in list(t.keys()):
-            broadcast_host_halo_property(t, 'halo_mvir')
+        Examples
+        --------
+        >>> halocat = CachedHaloCatalog() # doctest: +SKIP
+        >>> halos = halocat.load_halo_table_subvolume((0, 50), (0, 50), (-25, 25)) # doctest: +SKIP
+        """
+        if self.log_entry.safe_for_cache is not True:
+            raise InvalidCacheLogEntry(self.log_entry._cache_safety_message)
+        return self._load_subvolume(self.fname, lambda: self.halo_table,
+            ('halo_x', 'halo_y', 'halo_z'), xlim, ylim, zlim, keys)
+
+    def load_ptcl_table_subvolume(self, xlim, ylim, zlim, keys=None):
+        """ Load the particles inside a rectangular subvolume of the periodic box.
+
+        If the particle catalog was stored with a spatial index, e.g., by passing
+        ``spatial_index_cells_per_dim`` to the
+        `~halotools.sim_manager.UserSuppliedPtclCatalog.add_ptclcat_to_cache` method,
+        only the rows overlapping the subvolume are read from disk.
+        Otherwise the subvolume is selected from the full `ptcl_table`.
+        See `load_halo_table_subvolume` for a description of the arguments.
+        """
+        ptcl_log_entry = self._retrieve_ptcl_log_entry()
+        if ptcl_log_entry.safe_for_cache is not True:
+            raise InvalidCacheLogEntry(ptcl_log_entry._cache_safety_message)
+        return self._load_subvolume(ptcl_log_entry.fname, lambda: self.ptcl_table,
+            ('x', 'y', 'z'), xlim, ylim, zlim, keys)
+
+    def load_ptcl_table_subset(self, num_ptcls=None, fraction=None, stride=None,
+            seed=None, keys=None):
+        """ Load a random or strided subset of the particle catalog,
+        reading only the selected particles from disk.
+
+        Exactly one of ``num_ptcls``, ``fraction`` and ``stride`` must be passed.
+        Unlike downsampling the full `ptcl_table` with
+        `~halotools.utils.randomly_downsample_data`, memory scales with
+        the size of the subset rather than with the size of the particle catalog,
+        except for a temporary boolean mask of one byte per particle
+        when more than half of the particles are selected at random.
+        For a spatial subset, see `load_ptcl_table_subvolume`.
+
+        Parameters
+        ----------
+        num_ptcls : int, optional
+            Number of randomly selected particles to load.
+
+        fraction : float, optional
+            Fraction of the particles to load, selected at random.
+
+        stride : int, optional
+            Load every ``stride``-th particle, starting with the first.
+
+        seed : int, optional
+            Random number seed used to select the random subset. Default is None,
+            which will produce stochastic results. For a fixed ``seed``, the same
+            particles are selected regardless of the layout of the hdf5 file.
+
+        keys : sequence of strings, optional
+            Names of the columns to load. Default is None, in which case all columns are loaded.
+
+        Returns
+        -------
+        table : `~astropy.table.Table`
+            Table storing the selected particles in the order they are stored on disk.
+
+        Examples
+        --------
+        >>> halocat = CachedHaloCatalog() # doctest: +SKIP
+        >>> ptcls = halocat.load_ptcl_table_subset(fraction=0.05, seed=43) # doctest: +SKIP
+        """
+        num_options = sum(option is not None for option in (num_ptcls, fraction, stride))
+        if num_options != 1:
+            msg = ("\nExactly one of the ``num_ptcls``, ``fraction`` and ``stride`` arguments "
+                "must be passed to the load_ptcl_table_subset method.\n")
+            raise HalotoolsError(msg)
+
+        ptcl_log_entry = self._retrieve_ptcl_log_entry()
+        if ptcl_log_entry.safe_for_cache is not True:
+            raise InvalidCacheLogEntry(ptcl_log_entry._cache_safety_message)
+
+        if hasattr(self, '_ptcl_table'):
+            num_rows = len(self._ptcl_table)
+        else:
+            f = self.h5py.File(ptcl_log_entry.fname, 'r')
+            try:
+                num_rows = hdf5_table_num_rows(f['data'])
+            finally:
+                f.close()
+
+        if stride is not None:
+            if (int(stride) != stride) or (stride < 1):
+                raise HalotoolsError("\nThe ``stride`` argument must be a positive integer.\n")
+            row_indices = slice(None, None, int(stride))
+        else:
+            if fraction is not None:
+                if not (0 <= fraction <= 1):
+                    raise HalotoolsError("\nThe ``fraction`` argument must lie in [0, 1].\n")
+                num_ptcls = int(round(fraction*num_rows))
+            if (num_ptcls < 0) or (num_ptcls > num_rows):
+                msg = ("\nThe requested number of particles = %i, "
+                    "but the particle catalog only has %i particles.\n")
+                raise HalotoolsError(msg % (num_ptcls, num_rows))
+            rng = rng_stream(seed, 'ptcl_table_subset')
+            row_indices = _sorted_random_subset(rng, num_rows, int(num_ptcls))
+
+        if hasattr(self, '_ptcl_table'):
+            t = self._ptcl_table[row_indices]
+            if keys is not None:
+                t = t[list(keys)]
+            return t
+        else:
+            return read_table_from_hdf5(ptcl_log_entry.fname, keys=keys, row_indices=row_indices)
+
+    def _load_subvolume(self, fname, full_table_func, position_keys, xlim, ylim, zlim, keys):
+        if read_spatial_index(fname) is not None:
+            return read_table_subvolume(fname, xlim, ylim, zlim, keys=keys)
+        else:
+            t = full_table_func()
+            xkey, ykey, zkey = position_keys
+            mask = subvolume_mask(t[xkey], t[ykey], t[zkey], xlim, ylim, zlim, self.Lbox)
+            t = t[mask]
+            if keys is not None:
+                t = t[list(keys)]
+            return t
+
+    @property
+    def derived_column_store(self):
+        """
+        `~halotools.sim_manager.DerivedColumnStore` object persisting the columns
+        derived from the halo catalog, such as ``halo_hostid`` and ``halo_mvir_host_halo``,
+        so that they are only computed the first time the catalog is loaded.
+        Mock factories also use the store for the
+        ``new_haloprop_func_dict`` functions that declare their parameters.
+        None unless the catalog was instantiated with ``persist_derived_columns=True``.
+        """
+        if self._persist_derived_columns is not True:
+            return None
+        try:
+            return self._derived_column_store
+        except AttributeError:
+            self._derived_column_store = DerivedColumnStore(self.fname)
+            return self._derived_column_store
+
+    def _add_new_derived_columns(self, t):
+        """ Add the ``halo_hostid`` and ``halo_mvir_host_halo`` columns to the input table
+        of all the halos in the catalog, retrieving them from the `derived_column_store`
+        when possible and saving them to the store otherwise.
+        The input table must have just been read from the catalog file,
+        since the stored columns are only tied to the file on disk.
+        """
+        store = self.derived_column_store
+        for key in ('halo_hostid', 'halo_mvir_host_halo'):
+            if key in list(t.keys()):
+                continue
+            params = _derived_column_params[key]
+            if store is None:
+                column = None
+            else:
+                column = store.retrieve(key, params, num_rows=len(t))
+            if column is None:
+                if key == 'halo_hostid':
+                    add_halo_hostid(t)
+                else:
+                    broadcast_host_halo_property(t, 'halo_mvir')
+                if store is not None:
+                    store.save(key, params, t[key])
+            else:
+                t[key] = column
 
     def _bind_additional_metadata(self):
         """ Create convenience bindings of all metadata to the `CachedHaloCatalog` instance.
@@ -615,20 +923,23 @@ class CachedHaloCatalog(object):
         try:
             return self._ptcl_table
         except AttributeError:
-            try:
-                ptcl_log_entry = self.ptcl_log_entry
-            except AttributeError:
-                self.ptcl_log_entry = (
-                    self._retrieve_matching_ptcl_cache_log_entry()
-                    )
-                ptcl_log_entry = self.ptcl_log_entry
+            ptcl_log_entry = self._retrieve_ptcl_log_entry()
 
             if ptcl_log_entry.safe_for_cache is True:
-                self._ptcl_table = Table.read(ptcl_log_entry.fname, path='data')
+                self._ptcl_table = read_table_from_hdf5(ptcl_log_entry.fname)
                 return self._ptcl_table
             else:
                 raise InvalidCacheLogEntry(ptcl_log_entry._cache_safety_message)
 
+    def _retrieve_ptcl_log_entry(self):
+        try:
+            return self.ptcl_log_entry
+        except AttributeError:
+            self.ptcl_log_entry = (
+                self._retrieve_matching_ptcl_cache_log_entry()
+                )
+            return self.ptcl_log_entry
+
     def _disallow_catalogs_with_known_bugs(self, simname=sim_defaults.default_simname,
             version_name=sim_defaults.default_version_name, **kwargs):
         """
@@ -0,0 +1,255 @@
+""" Module storing the `~halotools.sim_manager.DerivedColumnStore` class,
+used to persist columns derived from a cached catalog so that they are
+computed only once rather than every time the catalog is loaded.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+from ..sim_manager import halotools_cache_dirname
+from ..custom_exceptions import HalotoolsError
+
+__all__ = ('DerivedColumnStore', )
+
+default_derived_column_dirname = os.path.join(halotools_cache_dirname, 'derived_columns')
+
+
+def _json_default(obj):
+    """ Serialize Numpy scalars and arrays appearing in the parameters of a derived column.
+    """
+    try:
+        return obj.tolist()
+    except AttributeError:
+        return str(obj)
+
+
+class DerivedColumnStore(object):
+    """ Persistent store of the columns derived from the data of a cached catalog,
+    e.g., ``halo_mvir_host_halo`` or the conditional percentiles used by
+    assembly-biased models.
+
+    Each column is stored together with the name of the column and
+    a dictionary of the parameters that determine its values, e.g., the name of the function
+    that computed it and the keyword arguments passed to that function.
+    A column is only retrieved if both the name and the parameters match.
+    The store is tied to the size and modification time of the catalog file,
+    so that all stored columns are discarded if the catalog is overwritten.
+    Columns derived from a table that may differ from the catalog file,
+    e.g., a table modified in memory, should include the `column_hash`
+    of their input columns in their parameters.
+
+    Stored columns are written to a separate hdf5 file, by default in the
+    ``derived_columns`` subdirectory of the Halotools cache, so that the
+    catalog file itself is never modified.
+
+    Instances are typically obtained from the
+    `~halotools.sim_manager.CachedHaloCatalog.derived_column_store` attribute.
+
+    Examples
+    --------
+    >>> store = DerivedColumnStore(catalog_fname) # doctest: +SKIP
+    >>> params = {'function': 'compute_conditional_percentiles', 'prim_haloprop_key': 'halo_mvir', 'sec_haloprop_key': 'halo_vmax'}
+    >>> percentiles = store.retrieve('halo_vmax_percentile', params) # doctest: +SKIP
+    >>> if percentiles is None: # doctest: +SKIP
+    ...     percentiles = compute_conditional_percentiles(table=halos, **params) # doctest: +SKIP
+    ...     store.save('halo_vmax_percentile', params, percentiles) # doctest: +SKIP
+    """
+
+    def __init__(self, catalog_fname, store_fname=None):
+        """
+        Parameters
+        ----------
+        catalog_fname : string
+            Name of the hdf5 file storing the catalog.
+
+        store_fname : string, optional
+            Name of the hdf5 file storing the derived columns.
+            Default is None, in which case the file is stored in the ``derived_columns``
+            subdirectory of the Halotools cache with a name determined by ``catalog_fname``.
+        """
+        try:
+            import h5py
+            self.h5py = h5py
+        except ImportError:
+            raise HalotoolsError("Must have h5py package installed "
+                "to use DerivedColumnStore objects")
+
+        self.catalog_fname = os.path.abspath(catalog_fname)
+        if store_fname is None:
+            basename = hashlib.md5(self.catalog_fname.encode('utf-8')).hexdigest() + '.hdf5'
+            store_fname = os.path.join(default_derived_column_dirname, basename)
+        self.store_fname = store_fname
+
+    @staticmethod
+    def tag(column_name, params):
+        """ String uniquely identifying a derived column by its name and parameters.
+
+        Parameters
+        ----------
+        column_name : string
+            Name of the derived column.
+
+        params : dict
+            Dictionary of parameters determining the values of the column.
+            Values must be strings, numbers, or sequences or Numpy arrays thereof.
+
+        Returns
+        -------
+        tag : string
+        """
+        s = json.dumps([column_name, params], sort_keys=True, default=_json_default)
+        return hashlib.md5(s.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def column_hash(column):
+        """ md5 hash of the contents of an input column of a derived column,
+        used to tie a stored column to the data it was derived from.
+
+        Parameters
+        ----------
+        column : array_like
+
+        Returns
+        -------
+        hash : string
+        """
+        column = np.ascontiguousarray(column)
+        h = hashlib.md5(json.dumps([column.dtype.str, column.shape]).encode('utf-8'))
+        h.update(column.reshape(-1).view(np.uint8))
+        return h.hexdigest()
+
+    def _catalog_fingerprint(self):
+        try:
+            stat = os.stat(self.catalog_fname)
+        except OSError:
+            return None
+        mtime = getattr(stat, 'st_mtime_ns', stat.st_mtime)
+        return json.dumps([stat.st_size, repr(mtime)])
+
+    def _stored_fingerprint(self, f):
+        fingerprint = f.attrs.get('catalog_fingerprint', None)
+        try:
+            return fingerprint.decode('ascii')
+        except AttributeError:
+            return fingerprint
+
+    def retrieve(self, column_name, params, num_rows=None):
+        """ Retrieve a derived column from the store.
+
+        Parameters
+        ----------
+        column_name : string
+            Name of the derived column.
+
+        params : dict
+            Dictionary of parameters determining the values of the column.
+
+        num_rows : int, optional
+            If passed, the stored column is only returned if it has ``num_rows`` rows.
+
+        Returns
+        -------
+        column : array or None
+            Stored column, or None if no matching column is stored for the current catalog file.
+        """
+        if not os.path.isfile(self.store_fname):
+            return None
+
+        fingerprint = self._catalog_fingerprint()
+        tag = self.tag(column_name, params)
+        try:
+            f = self.h5py.File(self.store_fname, 'r')
+        except (IOError, OSError):
+            return None
+        try:
+            if (fingerprint is None) or (self._stored_fingerprint(f) != fingerprint):
+                return None
+            if tag not in f:
+                return None
+            dset = f[tag]
+            if (num_rows is not None) and (dset.shape[0] != num_rows):
+                return None
+            return dset[...]
+        finally:
+            f.close()
+
+    def save(self, column_name, params, column):
+        """ Save a derived column in the store, replacing any column with the same tag.
+
+        If the catalog file has changed since the store was written,
+        all previously stored columns are discarded.
+        Failure to write the store, e.g., because the cache directory is read-only,
+        is silently ignored, since the column can always be recomputed.
+
+        Parameters
+        ----------
+        column_name : string
+            Name of the derived column.
+
+        params : dict
+            Dictionary of parameters determining the values of the column.
+
+        column : array_like
+            Values of the derived column.
+        """
+        fingerprint = self._catalog_fingerprint()
+        if fingerprint is None:
+            return
+        tag = self.tag(column_name, params)
+        column = np.asarray(column)
+
+        try:
+            dirname = os.path.dirname(self.store_fname)
+            if (dirname != '') and (not os.path.isdir(dirname)):
+                os.makedirs(dirname)
+            f = self.h5py.File(self.store_fname, 'a')
+        except (IOError, OSError):
+            return
+        try:
+            if self._stored_fingerprint(f) != fingerprint:
+                for key in list(f.keys()):
+                    del f[key]
+                f.attrs['catalog_fingerprint'] = fingerprint.encode('ascii')
+                f.attrs['catalog_fname'] = self.catalog_fname.encode('utf-8')
+            if tag in f:
+                del f[tag]
+            dset = f.create_dataset(tag, data=column)
+            dset.attrs['column_name'] = column_name.encode('utf-8')
+            dset.attrs['params'] = json.dumps(params, sort_keys=True,
+                default=_json_default).encode('utf-8')
+        except (IOError, OSError):
+            pass
+        finally:
+            f.close()
+
+    def stored_columns(self):
+        """ List of the (column_name, params) pairs stored for the current catalog file.
+        """
+        if not os.path.isfile(self.store_fname):
+            return []
+        f = self.h5py.File(self.store_fname, 'r')
+        try:
+            if self._stored_fingerprint(f) != self._catalog_fingerprint():
+                return []
+            result = []
+            for tag in f.keys():
+                attrs = f[tag].attrs
+                column_name = attrs['column_name']
+                params = attrs['params']
+                if isinstance(column_name, bytes):
+                    column_name = column_name.decode('utf-8')
+                if isinstance(params, bytes):
+                    params = params.decode('utf-8')
+                result.append((column_name, json.loads(params)))
+            return result
+        finally:
+            f.close()
+
+    def clear(self):
+        """ Delete the file storing the derived columns.
+        """
+        try:
+            os.remove(self.store_fname)
+        except OSError:
+            pass
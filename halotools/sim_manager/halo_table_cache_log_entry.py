@@ -1,18 +1,52 @@
 """
 """
 import os
-from astropy.table import Table
+import json
+import hashlib
 import numpy as np
 
+from .hdf5_table_io import hdf5_table_colnames, read_hdf5_table_column
 from ..custom_exceptions import HalotoolsError
 
 __all__ = ('HaloTableCacheLogEntry', )
 
+# Number of bytes at the beginning and end of the file hashed by the fingerprint
+_fingerprint_block_size = 2**20
+
 
 def get_redshift_string(redshift):
     return str('{0:.4f}'.format(float(redshift)))
 
 
+class _HaloTableColumnReader(object):
+    """ Read-only view of the ``data`` table of a halo catalog stored in hdf5
+    that only reads a column from disk when it is requested.
+    """
+
+    def __init__(self, fname, h5py):
+        self.fname = fname
+        self.h5py = h5py
+        f = h5py.File(fname, 'r')
+        try:
+            obj = f['data']
+            self._keys = hdf5_table_colnames(obj)
+            __ = read_hdf5_table_column(obj, self._keys[0], 0, 1)
+        finally:
+            f.close()
+
+    def keys(self):
+        return self._keys
+
+    def __getitem__(self, key):
+        if key not in self._keys:
+            raise KeyError(key)
+        f = self.h5py.File(self.fname, 'r')
+        try:
+            return np.asarray(read_hdf5_table_column(f['data'], key))
+        finally:
+            f.close()
+
+
 class HaloTableCacheLogEntry(object):
     """ Object serving as an entry in the `~halotools.sim_manager.HaloTableCache`.
     """
@@ -21,7 +55,8 @@ class HaloTableCacheLogEntry(object):
     required_metadata = ['Lbox', 'particle_mass']
     required_metadata.extend(log_attributes)
 
-    def __init__(self, simname, halo_finder, version_name, redshift, fname):
+    def __init__(self, simname, halo_finder, version_name, redshift, fname,
+            validation_log_fname=None):
         """
         Parameters
         -----------
@@ -43,6 +78,14 @@ class HaloTableCacheLogEntry(object):
         fname : string
             Name of the hdf5 file storing the table of halos.
 
+        validation_log_fname : string, optional
+            Name of the json file recording the halo catalogs that have passed
+            the `safe_for_cache` tests, so that the tests are not repeated on every load.
+            Default is None, in which case the tests are always carried out and
+            nothing is written to disk. The `~halotools.sim_manager.HaloTableCache`
+            sets this to ``halo_table_cache_validation_log.json`` in the directory
+            of its cache log for the entries of the log.
+
         Notes
         ------
         This class overrides the python built-in comparison functions __eq__, __lt__, etc.
@@ -67,6 +110,7 @@ class HaloTableCacheLogEntry(object):
         self.version_name = version_name
         self.redshift = get_redshift_string(redshift)
         self.fname = fname
+        self.validation_log_fname = validation_log_fname
 
     def __eq__(self, other):
         if type(other) is type(self):
@@ -122,8 +166,7 @@ class HaloTableCacheLogEntry(object):
         """ Boolean determining whether the
         `~halotools.sim_manager.HaloTableCacheLogEntry` instance stores a valid
         halo catalog that can safely be added to the cache for future use.
-        `safe_for_cache` is implemented as a property method, so that each request
-        performs all the checks from scratch. A log entry is considered valid
+        A log entry is considered valid
         if it passes the following tests:
 
         1. The file exists.
@@ -134,7 +177,7 @@ class HaloTableCacheLogEntry(object):
 
         4. Each value in the above metadata is consistent with the corresponding value bound to the `~halotools.sim_manager.HaloTableCacheLogEntry` instance.
 
-        5. The halo table data can be read in using the `~astropy.table.Table.read` method of the `~astropy.table.Table` class.
+        5. The hdf5 file stores the halo table in the ``data`` dataset, as written by the `~astropy.table.Table.write` method of the `~astropy.table.Table` class.
 
         6. The halo table has the following columns ``halo_id``, ``halo_x``, ``halo_y``, ``halo_z``, plus at least one additional column storing a mass-like variable.
 
@@ -144,6 +187,15 @@ class HaloTableCacheLogEntry(object):
 
         9. The ``halo_id`` column stores a set of unique integers.
 
+        Only the columns needed by the above tests are read from disk.
+        If ``validation_log_fname`` is set and a file passes all the tests,
+        the result is recorded in this file together with the fingerprint
+        returned by ``_file_fingerprint``: the size and modification time of the file
+        and a hash of its first and last blocks. Subsequent requests for the same log entry
+        return True without repeating the tests, provided that the fingerprint
+        has not changed. Note that an edit of the middle of the file
+        that preserves its size and modification time is not detected.
+
         Note in particular that `safe_for_cache` performs no checks whatsoever concerning
         the log other entries that may or may not be stored in the cache. Such checks are
         the responsibility of the `~halotools.sim_manager.HaloTableCache` class.
@@ -167,6 +219,14 @@ class HaloTableCacheLogEntry(object):
             self._num_failures = num_failures
             return False
         else:
+            if self.validation_log_fname is None:
+                file_fingerprint = None
+            else:
+                file_fingerprint = self._file_fingerprint()
+            if ((file_fingerprint is not None) and
+                    (self._retrieve_validation_record() == file_fingerprint)):
+                self._num_failures = 0
+                return True
 
             tmp_msg, num_failures = self._verify_h5py_extension(num_failures)
             msg += tmp_msg
@@ -189,23 +249,98 @@ class HaloTableCacheLogEntry(object):
 
             if num_failures > 0:
                 self._cache_safety_message = message_preamble + msg
+            elif file_fingerprint is not None:
+                self._store_validation_record(file_fingerprint)
 
             self._num_failures = num_failures
             return num_failures == 0
 
+    @property
+    def _validation_key(self):
+        return '|'.join((self.simname, self.halo_finder, self.version_name,
+            self.redshift, os.path.abspath(self.fname)))
+
+    def _file_fingerprint(self):
+        """ Return the size and modification time of the hdf5 file and the md5 hash
+        of its first and last ``_fingerprint_block_size`` bytes,
+        or None if the file cannot be read.
+
+        The hashed blocks include the hdf5 superblock and metadata, so that
+        computing the fingerprint does not require reading the entire file.
+        The fingerprint is not a checksum of the file: a change of the data
+        in the middle of the file is only detected through the modification time.
+        """
+        try:
+            stat = os.stat(self.fname)
+            mtime = getattr(stat, 'st_mtime_ns', stat.st_mtime)
+            h = hashlib.md5()
+            with open(self.fname, 'rb') as f:
+                h.update(f.read(_fingerprint_block_size))
+                if stat.st_size > 2*_fingerprint_block_size:
+                    f.seek(-_fingerprint_block_size, os.SEEK_END)
+                h.update(f.read(_fingerprint_block_size))
+        except (IOError, OSError):
+            return None
+        return {'size': int(stat.st_size), 'mtime': repr(mtime), 'sampled_md5': h.hexdigest()}
+
+    def _read_validation_log(self):
+        try:
+            with open(self.validation_log_fname, 'r') as f:
+                validation_log = json.load(f)
+            assert isinstance(validation_log, dict)
+        except (IOError, OSError, ValueError, AssertionError):
+            validation_log = {}
+        return validation_log
+
+    def _retrieve_validation_record(self):
+        """ Return the fingerprint of the file at the time it last passed
+        the `safe_for_cache` tests, or None if there is no such record.
+        """
+        return self._read_validation_log().get(self._validation_key, None)
+
+    def _store_validation_record(self, file_fingerprint):
+        """ Record that the file with the input fingerprint passed the `safe_for_cache` tests.
+        Failure to write the record, e.g., in a read-only directory, is not an error;
+        the tests will simply be repeated the next time.
+        """
+        validation_log = self._read_validation_log()
+        # Drop records of files that have since been deleted
+        for key in list(validation_log.keys()):
+            if not os.path.isfile(key.split('|')[-1]):
+                del validation_log[key]
+        validation_log[self._validation_key] = file_fingerprint
+
+        # Write to a temporary file first so that concurrent readers
+        # never encounter a partially written log
+        tmp_fname = self.validation_log_fname + '.' + str(os.getpid()) + '.tmp'
+        try:
+            with open(tmp_fname, 'w') as f:
+                json.dump(validation_log, f, indent=1, sort_keys=True)
+            try:
+                os.replace(tmp_fname, self.validation_log_fname)
+            except AttributeError:
+                os.rename(tmp_fname, self.validation_log_fname)
+        except (IOError, OSError):
+            try:
+                os.remove(tmp_fname)
+            except OSError:
+                pass
+
     def _verify_table_read(self, num_failures):
-        """ Enforce that the data can be read using the usual Astropy syntax
+        """ Enforce that the data can be read using the usual Astropy syntax.
+        Only the column names and the first row are read from disk;
+        the returned object reads each column on demand.
         """
         msg = ''
 
         try:
-            halo_table = Table.read(self.fname, path='data')
+            halo_table = _HaloTableColumnReader(self.fname, self.h5py)
         except:
             num_failures += 1
-            msg = (str(num_failures)+". The hdf5 file must be readable with "
-                "Astropy \nusing the following syntax:\n\n"
-                ">>> halo_data = Table.read(fname, path='data')\n\n")
-            halo_table = Table()
+            msg = (str(num_failures)+". The hdf5 file must be readable "
+                "using the following syntax:\n\n"
+                ">>> halo_data = read_table_from_hdf5(fname)\n\n")
+            halo_table = {}
         return msg, num_failures, halo_table
 
     def _verify_metadata_consistency(self, num_failures):
@@ -218,7 +353,7 @@ class HaloTableCacheLogEntry(object):
         msg = ''
 
         try:
-            f = self.h5py.File(self.fname)
+            f = self.h5py.File(self.fname, 'r')
 
             for key in HaloTableCacheLogEntry.log_attributes:
                 try:
@@ -309,13 +444,13 @@ class HaloTableCacheLogEntry(object):
         msg = ''
 
         try:
-            f = self.h5py.File(self.fname)
+            f = self.h5py.File(self.fname, 'r')
             Lbox = f.attrs['Lbox']
             f.close()
             try:
-                halo_x = halo_table['halo_x'].data
-                halo_y = halo_table['halo_y'].data
-                halo_z = halo_table['halo_z'].data
+                halo_x = halo_table['halo_x']
+                halo_y = halo_table['halo_y']
+                halo_z = halo_table['halo_z']
 
                 assert np.all(halo_x >= 0)
                 assert np.all(halo_x <= Lbox)
@@ -342,9 +477,10 @@ class HaloTableCacheLogEntry(object):
 
         try:
             try:
-                halo_id = halo_table['halo_id'].data
+                halo_id = halo_table['halo_id']
                 assert halo_id.dtype.str[1] in ('i', 'u')
-                assert len(halo_id) == len(set(halo_id))
+                sorted_halo_id = np.sort(halo_id)
+                assert np.all(sorted_halo_id[1:] != sorted_halo_id[:-1])
             except AssertionError:
                 num_failures += 1
                 msg = (str(num_failures)+". The ``halo_id`` column "
@@ -388,7 +524,7 @@ class HaloTableCacheLogEntry(object):
 
         try:
             halo_rvir = halo_table['halo_rvir']
-            assert np.all(halo_rvir.data < 50)
+            assert np.all(halo_rvir < 50)
         except AssertionError:
             num_failures += 1
             msg = (str(num_failures)+". All values of the "
@@ -406,7 +542,7 @@ class HaloTableCacheLogEntry(object):
         msg = ''
 
         try:
-            f = self.h5py.File(self.fname)
+            f = self.h5py.File(self.fname, 'r')
             required_set = set(HaloTableCacheLogEntry.required_metadata)
             actual_set = set(f.attrs.keys())
 
@@ -0,0 +1,464 @@
+""" Module storing functions used to read and write the ``data`` table
+of the hdf5 files storing halo and particle catalogs.
+
+Two layouts of the table are supported. In the ``compound`` layout,
+which is the layout written by the `~astropy.table.Table.write` method of
+`~astropy.table.Table`, the table is a single dataset with a compound dtype,
+so that the values of each row are stored next to each other.
+In the ``columnar`` layout, ``data`` is an hdf5 group storing one dataset per column,
+so that reading a single column only touches that column on disk.
+In either layout the datasets may be chunked and compressed.
+"""
+import numpy as np
+from astropy.table import Table
+
+from ..custom_exceptions import HalotoolsError
+
+__all__ = ('write_table_to_hdf5', 'read_table_from_hdf5',
+    'hdf5_table_colnames', 'hdf5_table_num_rows', 'hdf5_table_layout',
+    'read_hdf5_table_column', 'HDF5TableAppender')
+
+table_layouts = ('compound', 'columnar')
+supported_compression_filters = (None, 'gzip', 'lzf')
+
+# Number of rows spanned by each hyperslab when reading a selection of rows
+default_row_block_size = 2**16
+
+
+def _import_h5py():
+    try:
+        import h5py
+    except ImportError:
+        msg = ("\nMust have h5py installed to read or write hdf5 tables.\n")
+        raise HalotoolsError(msg)
+    return h5py
+
+
+def _verify_storage_options(table_layout, chunk_size, compression):
+    if table_layout not in table_layouts:
+        msg = ("\nThe ``table_layout`` argument must be one of the following:\n%s\n")
+        raise HalotoolsError(msg % str(table_layouts))
+
+    if compression not in supported_compression_filters:
+        msg = ("\nThe ``compression`` argument must be one of the following:\n%s\n")
+        raise HalotoolsError(msg % str(supported_compression_filters))
+
+    if chunk_size is not None:
+        try:
+            assert int(chunk_size) == chunk_size
+            assert chunk_size >= 1
+        except (TypeError, ValueError, AssertionError):
+            msg = ("\nThe ``chunk_size`` argument must be None or a positive integer.\n")
+            raise HalotoolsError(msg)
+
+
+def _dataset_kwargs(num_rows, chunk_size, compression, shuffle, resizable):
+    """ Keyword arguments passed to the create_dataset method of h5py.
+    Datasets that are neither resizable, chunked nor compressed are stored contiguously,
+    which allows them to be memory-mapped.
+    """
+    kwargs = {}
+    if (resizable is True) or (num_rows == 0):
+        kwargs['maxshape'] = (None, )
+        resizable = True
+
+    if chunk_size is not None:
+        if resizable is True:
+            kwargs['chunks'] = (int(chunk_size), )
+        else:
+            kwargs['chunks'] = (int(min(chunk_size, num_rows)), )
+    elif (resizable is True) or (compression is not None):
+        kwargs['chunks'] = True
+
+    if compression is not None:
+        kwargs['compression'] = compression
+        kwargs['shuffle'] = bool(shuffle)
+    return kwargs
+
+
+def _is_columnar(obj):
+    """ True if the input h5py object is a group storing the table in the columnar layout.
+    """
+    return not hasattr(obj, 'dtype')
+
+
+def hdf5_table_layout(obj):
+    """ Layout of the table stored in the input h5py object.
+
+    Parameters
+    ----------
+    obj : h5py Dataset or Group
+        Object storing the table, e.g., ``f['data']`` for an open h5py File ``f``.
+
+    Returns
+    -------
+    table_layout : string
+        Either 'compound' or 'columnar'.
+    """
+    if _is_columnar(obj):
+        return 'columnar'
+    else:
+        return 'compound'
+
+
+def hdf5_table_colnames(obj):
+    """ Names of the columns of the table stored in the input h5py object.
+
+    Parameters
+    ----------
+    obj : h5py Dataset or Group
+        Object storing the table, e.g., ``f['data']`` for an open h5py File ``f``.
+
+    Returns
+    -------
+    colnames : list
+        List of column names, in the order the columns were written.
+    """
+    if _is_columnar(obj):
+        try:
+            colnames = list(obj.attrs['colnames'])
+        except KeyError:
+            return list(obj.keys())
+        return [name.decode('ascii') if isinstance(name, bytes) else str(name)
+            for name in colnames]
+    else:
+        return list(obj.dtype.names)
+
+
+def hdf5_table_num_rows(obj):
+    """ Number of rows of the table stored in the input h5py object.
+
+    Parameters
+    ----------
+    obj : h5py Dataset or Group
+        Object storing the table, e.g., ``f['data']`` for an open h5py File ``f``.
+
+    Returns
+    -------
+    num_rows : int
+    """
+    if _is_columnar(obj):
+        colnames = hdf5_table_colnames(obj)
+        if len(colnames) == 0:
+            return 0
+        return obj[colnames[0]].shape[0]
+    else:
+        return obj.shape[0]
+
+
+def _read_rows(dset, row_indices, block_size=default_row_block_size):
+    """ Read the rows of the input h5py dataset stored at the input sorted,
+    unique row indices, one hyperslab per block of ``block_size`` rows,
+    so that memory scales with the number of selected rows plus one block.
+    Each hyperslab only spans the first through last selected row of its block.
+    """
+    result = np.empty(len(row_indices), dtype=dset.dtype)
+    if len(row_indices) == 0:
+        return result
+
+    block_ids = row_indices // block_size
+    boundaries = np.flatnonzero(np.diff(block_ids)) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [len(row_indices)]))
+    for i0, i1 in zip(starts, stops):
+        first, last = int(row_indices[i0]), int(row_indices[i1-1])
+        result[i0:i1] = dset[first:last+1][row_indices[i0:i1] - first]
+    return result
+
+
+def _verify_row_indices(row_indices, num_rows):
+    """ Return the input row selection as a slice or as a sorted array of unique indices.
+    """
+    if isinstance(row_indices, slice):
+        if (row_indices.step is not None) and (row_indices.step < 1):
+            msg = ("\nA slice passed as ``row_indices`` must have a positive step.\n")
+            raise HalotoolsError(msg)
+        return row_indices
+
+    row_indices = np.unique(np.atleast_1d(row_indices).astype('i8'))
+    if (len(row_indices) > 0) and ((row_indices[0] < 0) or (row_indices[-1] >= num_rows)):
+        msg = ("\nThe ``row_indices`` must lie in the range [0, %i) "
+            "of the rows of the hdf5 table.\n")
+        raise HalotoolsError(msg % num_rows)
+    return row_indices
+
+
+def read_hdf5_table_column(obj, key, start=None, stop=None):
+    """ Read rows ``start:stop`` of a single column of the table stored in the input h5py object.
+
+    Parameters
+    ----------
+    obj : h5py Dataset or Group
+        Object storing the table, e.g., ``f['data']`` for an open h5py File ``f``.
+
+    key : string
+        Name of the column.
+
+    start, stop : int, optional
+        Range of rows to read. Default is None, in which case all rows are read.
+
+    Returns
+    -------
+    column : array
+    """
+    if _is_columnar(obj):
+        return obj[key][start:stop]
+    elif (start is None) and (stop is None):
+        return np.asarray(obj[key])
+    else:
+        return obj[start:stop][key]
+
+
+class HDF5TableAppender(object):
+    """ Object used to write a table to an open hdf5 file
+    one chunk of rows at a time, in either layout.
+
+    Examples
+    --------
+    >>> f = h5py.File(fname, 'w') # doctest: +SKIP
+    >>> appender = HDF5TableAppender(f, chunk.dtype, table_layout='columnar') # doctest: +SKIP
+    >>> for chunk in chunks: appender.append(chunk) # doctest: +SKIP
+    >>> f.close() # doctest: +SKIP
+    """
+
+    def __init__(self, f, dtype, path='data', table_layout='compound',
+            chunk_size=None, compression=None, shuffle=True):
+        """
+        Parameters
+        ----------
+        f : h5py File
+            hdf5 file open for writing.
+
+        dtype : Numpy dtype
+            Structured dtype of the rows of the table.
+
+        path, table_layout, chunk_size, compression, shuffle : optional
+            See `write_table_to_hdf5`.
+        """
+        _verify_storage_options(table_layout, chunk_size, compression)
+        self.dtype = np.dtype(dtype)
+        self.num_rows = 0
+        kwargs = _dataset_kwargs(0, chunk_size, compression, shuffle, True)
+
+        if table_layout == 'compound':
+            self._datasets = {None: f.create_dataset(path, shape=(0, ), dtype=self.dtype, **kwargs)}
+        else:
+            group = f.create_group(path)
+            _write_columnar_attrs(group, self.dtype.names)
+            self._datasets = dict((key, group.create_dataset(key, shape=(0, ),
+                dtype=self.dtype[key], **kwargs)) for key in self.dtype.names)
+
+    def append(self, chunk):
+        """ Append the rows of the input structured array to the table.
+        """
+        num_new_rows = len(chunk)
+        if num_new_rows == 0:
+            return
+        new_num_rows = self.num_rows + num_new_rows
+        for key, dset in self._datasets.items():
+            dset.resize((new_num_rows, ))
+            if key is None:
+                dset[self.num_rows:] = chunk
+            else:
+                dset[self.num_rows:] = chunk[key]
+        self.num_rows = new_num_rows
+
+
+def _write_columnar_attrs(group, colnames):
+    group.attrs.create('table_layout', b'columnar')
+    group.attrs.create('colnames', np.array([name.encode('ascii') for name in colnames]))
+
+
+def write_table_to_hdf5(table, fname, path='data', table_layout='compound',
+        chunk_size=None, compression=None, shuffle=True, overwrite=False, block_size=None):
+    """ Write a table to an hdf5 file in either the ``compound`` or ``columnar`` layout.
+
+    Parameters
+    ----------
+    table : `~astropy.table.Table` or structured Numpy array
+        Table to write.
+
+    fname : string
+        Name of the hdf5 file.
+
+    path : string, optional
+        Path of the table within the hdf5 file. Default is 'data'.
+
+    table_layout : string, optional
+        Either 'compound' or 'columnar'. Default is 'compound', the layout
+        written by the `~astropy.table.Table.write` method of `~astropy.table.Table`.
+        With the 'columnar' layout each column is stored in its own dataset,
+        which makes reading a subset of the columns much faster.
+
+    chunk_size : int, optional
+        Number of rows in each hdf5 chunk. Default is None, in which case
+        uncompressed datasets are stored contiguously and compressed datasets
+        are chunked by h5py.
+
+    compression : string, optional
+        Either None, 'gzip' or 'lzf'. Default is None.
+
+    shuffle : bool, optional
+        If True, the byte-shuffle filter is applied before compression,
+        which typically improves the compression ratio of numerical data.
+        Ignored if ``compression`` is None. Default is True.
+
+    overwrite : bool, optional
+        If True, an existing file named ``fname`` is overwritten. Default is False.
+
+    block_size : int, optional
+        If set, the table is written ``block_size`` rows at a time directly from
+        its columns, so that no copy of the entire table is made in memory.
+        This is useful for tables whose columns are memory-mapped or very large.
+        Default is None, in which case blocks are only used for the ``columnar`` layout
+        and for chunked or compressed datasets.
+
+    Examples
+    --------
+    >>> t = Table({'halo_id': np.arange(10), 'halo_mvir': np.logspace(10, 15, 10)})
+    >>> write_table_to_hdf5(t, fname, table_layout='columnar', compression='gzip') # doctest: +SKIP
+    >>> halo_mvir = read_table_from_hdf5(fname, keys=['halo_mvir'])['halo_mvir'] # doctest: +SKIP
+    """
+    _verify_storage_options(table_layout, chunk_size, compression)
+
+    if block_size is not None:
+        try:
+            assert int(block_size) == block_size
+            assert block_size >= 1
+        except (TypeError, ValueError, AssertionError):
+            msg = ("\nThe ``block_size`` argument must be None or a positive integer.\n")
+            raise HalotoolsError(msg)
+    elif (table_layout == 'compound') & (chunk_size is None) & (compression is None):
+        if not isinstance(table, Table):
+            table = Table(table)
+        table.write(fname, path=path, overwrite=overwrite)
+        return
+
+    h5py = _import_h5py()
+    if isinstance(table, Table):
+        colnames = table.colnames
+        dtype = np.dtype([(key, table[key].dtype, table[key].shape[1:]) for key in colnames])
+    else:
+        table = np.asarray(table)
+        colnames = table.dtype.names
+        dtype = table.dtype
+    num_rows = len(table)
+    if block_size is None:
+        block_size = max(num_rows, 1)
+    block_size = int(block_size)
+    kwargs = _dataset_kwargs(num_rows, chunk_size, compression, shuffle, False)
+
+    if overwrite is True:
+        mode = 'w'
+    else:
+        mode = 'w-'
+    f = h5py.File(fname, mode)
+    try:
+        if table_layout == 'compound':
+            dset = f.create_dataset(path, shape=(num_rows, ), dtype=dtype, **kwargs)
+            for start in range(0, num_rows, block_size):
+                stop = min(start + block_size, num_rows)
+                block = np.empty(stop - start, dtype=dtype)
+                for key in colnames:
+                    block[key] = table[key][start:stop]
+                dset[start:stop] = block
+        else:
+            group = f.create_group(path)
+            _write_columnar_attrs(group, colnames)
+            for key in colnames:
+                dset = group.create_dataset(key, shape=(num_rows, ) + dtype[key].shape,
+                    dtype=dtype[key].base, **kwargs)
+                for start in range(0, num_rows, block_size):
+                    stop = min(start + block_size, num_rows)
+                    dset[start:stop] = table[key][start:stop]
+    finally:
+        f.close()
+
+
+def read_table_from_hdf5(fname, path='data', keys=None, row_ranges=None, row_indices=None):
+    """ Read a table written in either layout into an `~astropy.table.Table`.
+
+    Parameters
+    ----------
+    fname : string
+        Name of the hdf5 file.
+
+    path : string, optional
+        Path of the table within the hdf5 file. Default is 'data'.
+
+    keys : sequence of strings, optional
+        Names of the columns to read. Default is None, in which case all columns are read.
+
+    row_ranges : sequence, optional
+        Sequence of (start, stop) pairs of row indices to read.
+        Default is None, in which case all rows are read.
+
+    row_indices : array_like or slice, optional
+        Indices of the rows to read, e.g., a random subset of the rows.
+        Rows are returned in increasing order of index, without repetition.
+        The rows are read block by block, so that memory scales with
+        the number of selected rows rather than with the size of the table.
+        A slice with a step, e.g., ``slice(None, None, 10)``, is read
+        as a single strided hyperslab. Cannot be combined with ``row_ranges``.
+        Default is None, in which case all rows are read.
+
+    Returns
+    -------
+    table : `~astropy.table.Table`
+
+    Examples
+    --------
+    >>> every_tenth_row = read_table_from_hdf5(fname, row_indices=slice(None, None, 10)) # doctest: +SKIP
+    """
+    if (row_ranges is not None) and (row_indices is not None):
+        msg = ("\nOnly one of ``row_ranges`` and ``row_indices`` may be passed.\n")
+        raise HalotoolsError(msg)
+
+    h5py = _import_h5py()
+    with h5py.File(fname, 'r') as f:
+        obj = f[path]
+        columnar = _is_columnar(obj)
+        if (columnar is False) & (keys is None) & (row_ranges is None) & (row_indices is None):
+            return Table.read(f, path=path, format='hdf5')
+
+        colnames = hdf5_table_colnames(obj)
+        if keys is None:
+            keys = colnames
+        missing_keys = [key for key in keys if key not in colnames]
+        if len(missing_keys) > 0:
+            msg = ("\nThe following columns were requested but are not stored "
+                "in the hdf5 table:\n%s\n")
+            raise KeyError(msg % str(missing_keys))
+
+        table = Table()
+        if row_indices is not None:
+            row_indices = _verify_row_indices(row_indices, hdf5_table_num_rows(obj))
+            if isinstance(row_indices, slice):
+                if columnar is True:
+                    for key in keys:
+                        table[key] = obj[key][row_indices]
+                else:
+                    data = obj[row_indices]
+                    for key in keys:
+                        table[key] = data[key]
+            elif columnar is True:
+                for key in keys:
+                    table[key] = _read_rows(obj[key], row_indices)
+            else:
+                data = _read_rows(obj, row_indices)
+                for key in keys:
+                    table[key] = data[key]
+        elif row_ranges is None:
+            for key in keys:
+                table[key] = read_hdf5_table_column(obj, key)
+        elif columnar is True:
+            for key in keys:
+                dset = obj[key]
+                table[key] = np.concatenate([np.zeros(0, dtype=dset.dtype)] +
+                    [dset[start:stop] for start, stop in row_ranges])
+        else:
+            data = np.concatenate([np.zeros(0, dtype=obj.dtype)] +
+                [obj[start:stop] for start, stop in row_ranges])
+            for key in keys:
+                table[key] = data[key]
+        return table
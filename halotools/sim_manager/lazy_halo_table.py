@@ -0,0 +1,181 @@
+""" Module storing the `~halotools.sim_manager.LazyHaloTable` class,
+a read-only view of a halo catalog stored on disk that
+only loads the columns that are actually requested.
+"""
+import numpy as np
+from astropy.table import Table
+
+from .hdf5_table_io import hdf5_table_colnames, hdf5_table_layout, read_hdf5_table_column
+
+from ..custom_exceptions import HalotoolsError
+
+__all__ = ('LazyHaloTable', )
+
+
+class LazyHaloTable(object):
+    """ Read-only, column-oriented view of a halo catalog stored in hdf5,
+    in either of the layouts written by `~halotools.sim_manager.write_table_to_hdf5`.
+
+    Nothing but the column names and the number of rows is read upon instantiation.
+    Each column is read from disk the first time it is requested.
+    When the data are stored contiguously and uncompressed,
+    the file is memory-mapped instead, so that requesting a column
+    costs no I/O until its values are actually used.
+
+    Instances are typically obtained from the
+    `~halotools.sim_manager.CachedHaloCatalog.lazy_halo_table` attribute.
+
+    Examples
+    --------
+    >>> halocat = CachedHaloCatalog() # doctest: +SKIP
+    >>> halos = halocat.lazy_halo_table # doctest: +SKIP
+    >>> mass_array = halos['halo_mvir'] # doctest: +SKIP
+
+    To load a handful of columns into an ordinary `~astropy.table.Table`:
+
+    >>> t = halos.to_table(['halo_x', 'halo_y', 'halo_z', 'halo_mvir']) # doctest: +SKIP
+    """
+
+    def __init__(self, fname, path='data', memmap=True):
+        """
+        Parameters
+        ----------
+        fname : string
+            Name of the hdf5 file storing the halo catalog.
+
+        path : string, optional
+            Path of the dataset within the hdf5 file. Default is 'data'.
+
+        memmap : bool, optional
+            If True, memory-map the data when the layout of the hdf5 dataset allows.
+            Default is True.
+        """
+        try:
+            import h5py
+            self.h5py = h5py
+        except ImportError:
+            raise HalotoolsError("Must have h5py package installed "
+                "to use LazyHaloTable objects")
+
+        self.fname = fname
+        self.path = path
+        self._columns = {}
+        self._memmap_columns = {}
+
+        f = self.h5py.File(self.fname, 'r')
+        try:
+            obj = f[self.path]
+            if hdf5_table_layout(obj) == 'columnar':
+                colnames = hdf5_table_colnames(obj)
+                self.dtype = np.dtype([(key, obj[key].dtype) for key in colnames])
+                self._num_rows = obj[colnames[0]].shape[0] if len(colnames) > 0 else 0
+                if memmap is True:
+                    for key in colnames:
+                        self._bind_memmap(obj[key], key)
+            else:
+                if obj.dtype.names is None:
+                    msg = ("\nThe ``%s`` dataset of the following hdf5 file is not a table:\n%s\n")
+                    raise HalotoolsError(msg % (self.path, self.fname))
+                self.dtype = obj.dtype
+                self._num_rows = obj.shape[0]
+                if memmap is True:
+                    self._bind_memmap(obj, None)
+        finally:
+            f.close()
+
+    def _bind_memmap(self, dset, key):
+        """ Memory-map the input dataset if its layout allows. For a compound dataset,
+        ``key`` is None and every column is bound to a view of the same memory map.
+        """
+        offset = self._contiguous_offset(dset)
+        if offset is None:
+            return
+        mm = np.memmap(self.fname, mode='r',
+            dtype=dset.dtype, offset=offset, shape=(self._num_rows, ))
+        if key is None:
+            for name in self.dtype.names:
+                self._memmap_columns[name] = mm[name]
+        else:
+            self._memmap_columns[key] = mm
+
+    @staticmethod
+    def _contiguous_offset(dset):
+        """ Return the byte offset of the data within the file if the dataset
+        can be memory-mapped, otherwise None.
+        """
+        if (dset.chunks is not None) or (dset.compression is not None):
+            return None
+        if dset.dtype.hasobject or (dset.shape[0] == 0):
+            return None
+        try:
+            return dset.id.get_offset()
+        except Exception:
+            return None
+
+    @property
+    def is_memory_mapped(self):
+        """ True if the columns are served from a memory map of the hdf5 file.
+        """
+        return len(self._memmap_columns) == len(self.dtype.names)
+
+    @property
+    def colnames(self):
+        """ List of the names of the columns stored on disk.
+        """
+        return list(self.dtype.names)
+
+    def keys(self):
+        return self.colnames
+
+    def __contains__(self, key):
+        return key in self.dtype.names
+
+    def __len__(self):
+        return self._num_rows
+
+    def __getitem__(self, key):
+        """ Return the column ``key`` as a read-only numpy array.
+        """
+        try:
+            return self._columns[key]
+        except KeyError:
+            if key not in self:
+                raise KeyError(key)
+
+        if key in self._memmap_columns:
+            column = self._memmap_columns[key]
+        else:
+            f = self.h5py.File(self.fname, 'r')
+            try:
+                column = np.asarray(read_hdf5_table_column(f[self.path], key))
+            finally:
+                f.close()
+            column.flags.writeable = False
+        self._columns[key] = column
+        return column
+
+    def to_table(self, keys=None):
+        """ Load the requested columns into an `~astropy.table.Table`.
+
+        Parameters
+        ----------
+        keys : sequence of strings, optional
+            Names of the columns to load. Default is None, in which case all columns are loaded.
+
+        Returns
+        -------
+        table : `~astropy.table.Table`
+            Table storing an in-memory copy of the requested columns.
+        """
+        if keys is None:
+            keys = self.colnames
+        missing_keys = [key for key in keys if key not in self]
+        if len(missing_keys) > 0:
+            msg = ("\nThe following columns were requested but are not stored "
+                "in the halo catalog:\n%s\n")
+            raise KeyError(msg % str(missing_keys))
+
+        table = Table()
+        for key in keys:
+            table[key] = np.array(self[key])
+        return table
@@ -7,6 +7,7 @@ from warnings import warn
 import numpy as np
 
 from .ptcl_table_cache_log_entry import PtclTableCacheLogEntry
+from .cache_log_index import CacheLogIndex
 
 from ..sim_manager import halotools_cache_dirname
 from ..custom_exceptions import InvalidCacheLogEntry, HalotoolsError
@@ -16,6 +17,13 @@ __all__ = ('PtclTableCache', )
 
 class PtclTableCache(object):
     """ Object providing a collection of particle catalogs for use with Halotools.
+
+    The cache log is stored in an indexed SQLite database,
+    ``$HOME/.astropy/cache/halotools/ptcl_table_cache_log.sqlite3``,
+    that can be safely updated by many processes at once. The ASCII file
+    ``$HOME/.astropy/cache/halotools/ptcl_table_cache_log.txt`` is rewritten after
+    each update as a human-readable copy of the log. Edits made to the ASCII file,
+    e.g., with a text editor, are imported into the database the next time the log is read.
     """
 
     def __init__(self, read_log_from_standard_loc=True, **kwargs):
@@ -33,6 +41,14 @@ class PtclTableCache(object):
             self.cache_log_fname = copy(self._standard_log_fname)
         self._cache_log_fname_exists = os.path.isfile(self.cache_log_fname)
 
+        try:
+            self.cache_log_db_fname = kwargs['cache_log_db_fname']
+        except KeyError:
+            self.cache_log_db_fname = os.path.splitext(self.cache_log_fname)[0] + '.sqlite3'
+        self._log_index = CacheLogIndex(self.cache_log_db_fname,
+            PtclTableCacheLogEntry.log_attributes, self.cache_log_fname,
+            self._read_ascii_rows, self._write_ascii_rows)
+
         if read_log_from_standard_loc is True:
             self.log = self.retrieve_log_from_ascii()
         else:
@@ -42,14 +58,10 @@ class PtclTableCache(object):
         self.log = self.retrieve_log_from_ascii()
 
     def _overwrite_log_ascii(self, new_log):
+        """ Replace the entire log stored on disk with the input log.
+        """
         new_log.sort()
-        log_table = self._log_table_from_log(new_log)
-        try:
-            os.remove(self.cache_log_fname)
-        except OSError:
-            pass
-        finally:
-            log_table.write(self.cache_log_fname, format='ascii')
+        self._log_index.replace_rows(self._rows_from_log(new_log))
 
     def _clean_log_of_repeated_entries(self, input_log):
         cleaned_log = list(set(input_log))
@@ -59,29 +71,67 @@ class PtclTableCache(object):
                    "particle table cache log with identical entries.\n"
                    "This is harmless. The log will be now be cleaned.\n")
             warn(msg)
-            self._overwrite_log_ascii(cleaned_log)
 
         return cleaned_log
 
+    def _read_ascii_rows(self, fname):
+        """ Rows of the ASCII log ``fname``, or None if the file could not be read.
+        A missing file has no rows. Used by the `CacheLogIndex` to import the ASCII log.
+        """
+        if not os.path.isfile(fname):
+            return []
+        log_table = self._read_log_table_from_ascii(fname)
+        if self._cache_log_fname_is_kosher is False:
+            return None
+        log = self._clean_log_of_repeated_entries(self._log_from_log_table(log_table))
+        return self._rows_from_log(log)
+
+    def _write_ascii_rows(self, fname, rows):
+        """ Write the input rows to the ASCII log, replacing the file atomically
+        so that other processes never read a partially written log.
+        """
+        log_table = self._log_table_from_log(self._log_from_rows(rows))
+        tmp_fname = fname + '.' + str(os.getpid()) + '.tmp'
+        log_table.write(tmp_fname, format='ascii')
+        try:
+            os.replace(tmp_fname, fname)
+        except AttributeError:
+            # Python 2
+            if os.path.isfile(fname):
+                os.remove(fname)
+            os.rename(tmp_fname, fname)
+
+    def _rows_from_log(self, log):
+        return [tuple(str(getattr(entry, attr)) for attr in PtclTableCacheLogEntry.log_attributes)
+            for entry in log]
+
+    def _log_from_rows(self, rows):
+        return [PtclTableCacheLogEntry(**dict(zip(PtclTableCacheLogEntry.log_attributes, row)))
+            for row in rows]
+
     def retrieve_log_from_ascii(self):
-        """ Read '$HOME/.astropy/cache/halotools/ptcl_table_cache_log.txt',
-        clean the log of any repeated entries, sort the log, and return the resulting
+        """ Read the cache log from disk, sort the log, and return the resulting
         list of `~halotools.sim_manager.PtclTableCacheLogEntry` instances.
+
+        The log is read from the SQLite database. If
+        '$HOME/.astropy/cache/halotools/ptcl_table_cache_log.txt' has been modified
+        since it was last written by Halotools, its entries are first
+        cleaned of repetitions and imported into the database.
         """
+        log = self._log_from_rows(self._log_index.rows())
+        log.sort()
+        return log
 
-        log_table = self._read_log_table_from_ascii()
-        log_inferred_from_ascii = self._log_from_log_table(log_table)
-        cleaned_log = self._clean_log_of_repeated_entries(log_inferred_from_ascii)
-        cleaned_log.sort()
-        return cleaned_log
+    def _read_log_table_from_ascii(self, fname=None):
+        if fname is None:
+            fname = self.cache_log_fname
 
-    def _read_log_table_from_ascii(self):
-
-        self._cache_log_fname_exists = os.path.isfile(self.cache_log_fname)
+        self._cache_log_fname_exists = os.path.isfile(fname)
+        self._cache_log_fname_is_kosher = False
 
         if self._cache_log_fname_exists:
             try:
-                log_table = Table.read(self.cache_log_fname, format='ascii')
+                log_table = Table.read(fname, format='ascii')
                 assert set(log_table.keys()) == set(
                     PtclTableCacheLogEntry.log_attributes)
                 self._cache_log_fname_is_kosher = True
@@ -135,17 +185,49 @@ class PtclTableCache(object):
             msg = msg[:-2]
             raise KeyError(msg)
 
-        for entry in self.log:
-            yield_entry = True
-            for key in list(kwargs.keys()):
-                if key == 'redshift':
-                    requested_redshift = float(kwargs[key])
-                    redshift_of_entry = float(getattr(entry, key))
-                    yield_entry *= abs(redshift_of_entry - requested_redshift) <= dz_tol
-                else:
-                    yield_entry *= kwargs[key] == getattr(entry, key)
-            if bool(yield_entry) is True:
-                yield entry
+        exact_keys = tuple(key for key in PtclTableCacheLogEntry.log_attributes
+            if (key in kwargs) and (key != 'redshift'))
+        lookup_table = self._log_lookup_table(exact_keys)
+        candidates = lookup_table.get(tuple(kwargs[key] for key in exact_keys), [])
+
+        for entry in candidates:
+            if 'redshift' in kwargs:
+                requested_redshift = float(kwargs['redshift'])
+                redshift_of_entry = float(entry.redshift)
+                if abs(redshift_of_entry - requested_redshift) > dz_tol:
+                    continue
+            yield entry
+
+    @property
+    def log(self):
+        """ List of the log entries of the cache.
+        """
+        return self._log
+
+    @log.setter
+    def log(self, new_log):
+        self._log = new_log
+        self._log_version = getattr(self, '_log_version', 0) + 1
+
+    def _log_lookup_table(self, keys):
+        """ Dictionary mapping the values of the input log attributes
+        to the list of matching log entries. The tables are rebuilt whenever ``log``
+        is assigned, and whenever entries are added to or removed from it in place.
+        """
+        log_state = (self._log_version, len(self.log))
+        if getattr(self, '_indexed_log_state', None) != log_state:
+            self._indexed_log_state = log_state
+            self._lookup_tables = {}
+
+        try:
+            return self._lookup_tables[keys]
+        except KeyError:
+            lookup_table = {}
+            for entry in self.log:
+                key = tuple(getattr(entry, attr) for attr in keys)
+                lookup_table.setdefault(key, []).append(entry)
+            self._lookup_tables[keys] = lookup_table
+            return lookup_table
 
     def add_entry_to_cache_log(self, log_entry, update_ascii=True):
         """
@@ -160,13 +242,18 @@ class PtclTableCache(object):
         if log_entry.safe_for_cache is False:
             raise InvalidCacheLogEntry(log_entry._cache_safety_message)
 
-        if log_entry in self.log:
+        if update_ascii is True:
+            # Entries added to the log on disk by other processes are also picked up here
+            num_added, rows = self._log_index.add_rows(self._rows_from_log([log_entry]))
+            if num_added == 0:
+                warn("The cache log already contains the entry")
+            self.log = self._log_from_rows(rows)
+            self.log.sort()
+        elif log_entry in self.log:
             warn("The cache log already contains the entry")
         else:
             self.log.append(log_entry)
             self.log.sort()
-            if update_ascii is True:
-                self._overwrite_log_ascii(self.log)
 
     def remove_entry_from_cache_log(self, simname, version_name,
                                     redshift, fname,
@@ -217,17 +304,23 @@ class PtclTableCache(object):
             version_name=version_name,
             redshift=redshift, fname=fname)
 
-        try:
-            self.log.remove(log_entry)
-
-            if update_ascii is True:
-                self._overwrite_log_ascii(self.log)
-                msg = ("\nThe log has been updated on disk and in memory.\n")
-            else:
-                msg = ("\nThe log has been updated in memory "
-                    "but not on disk because \n"
-                    "the update_ascii argument is set to False.\n")
-
+        if update_ascii is True:
+            num_removed, rows = self._log_index.remove_row(self._rows_from_log([log_entry])[0])
+            _existing_log_entry_detected = (num_removed > 0) or (log_entry in self.log)
+            self.log = self._log_from_rows(rows)
+            self.log.sort()
+            msg = ("\nThe log has been updated on disk and in memory.\n")
+        else:
+            try:
+                self.log.remove(log_entry)
+                _existing_log_entry_detected = True
+            except ValueError:
+                _existing_log_entry_detected = False
+            msg = ("\nThe log has been updated in memory "
+                "but not on disk because \n"
+                "the update_ascii argument is set to False.\n")
+
+        if _existing_log_entry_detected is True:
             if delete_corresponding_ptcl_catalog is True:
                 try:
                     os.remove(log_entry.fname)
@@ -237,8 +330,7 @@ class PtclTableCache(object):
                         )
                 except OSError:
                     pass
-
-        except ValueError:
+        else:
             if raise_non_existence_exception is False:
                 pass
             else:
@@ -1,11 +1,11 @@
 """
 """
 import os
-from astropy.table import Table
 import numpy as np
 
 from ..custom_exceptions import HalotoolsError
 from .halo_table_cache_log_entry import get_redshift_string
+from .hdf5_table_io import read_table_from_hdf5
 
 __all__ = ('PtclTableCacheLogEntry', )
 
@@ -173,12 +173,12 @@ class PtclTableCacheLogEntry(object):
         """ Enforce that the data can be read using the usual Astropy syntax
         """
         try:
-            data = Table.read(self.fname, path='data')
+            data = read_table_from_hdf5(self.fname)
         except:
             num_failures += 1
-            msg += (str(num_failures)+". The hdf5 file must be readable with "
-                "Astropy \nusing the following syntax:\n\n"
-                ">>> ptcl_data = Table.read(fname, path='data')\n\n")
+            msg += (str(num_failures)+". The hdf5 file must be readable "
+                "using the following syntax:\n\n"
+                ">>> ptcl_data = read_table_from_hdf5(fname)\n\n")
             pass
         return msg, num_failures
 
@@ -237,7 +237,7 @@ class PtclTableCacheLogEntry(object):
         """
         """
         try:
-            data = Table.read(self.fname, path='data')
+            data = read_table_from_hdf5(self.fname)
             keys = list(data.keys())
             try:
                 assert 'x' in keys
@@ -258,7 +258,7 @@ class PtclTableCacheLogEntry(object):
         """
         """
         try:
-            data = Table.read(self.fname, path='data')
+            data = read_table_from_hdf5(self.fname)
             f = self.h5py.File(self.fname)
             Lbox = f.attrs['Lbox']
             f.close()
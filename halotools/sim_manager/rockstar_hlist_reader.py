@@ -6,6 +6,9 @@ publicly available Rockstar hlist files and store them in cache.
 """
 
 import os
+import numpy as np
+from time import time
+from collections import OrderedDict
 
 from warnings import warn
 from astropy.table import Table
@@ -15,6 +18,8 @@ import datetime
 from .tabular_ascii_reader import TabularAsciiReader
 from .halo_table_cache import HaloTableCache
 from .halo_table_cache_log_entry import HaloTableCacheLogEntry, get_redshift_string
+from .spatial_index import write_table_with_spatial_index
+from .hdf5_table_io import write_table_to_hdf5, HDF5TableAppender
 
 from ..sim_manager import halotools_cache_dirname
 from ..custom_exceptions import HalotoolsError
@@ -521,7 +526,8 @@ class RockstarHlistReader(TabularAsciiReader):
 
     def read_halocat(self, columns_to_convert_from_kpc_to_mpc,
             write_to_disk=False, update_cache_log=False,
-            add_supplementary_halocat_columns=True, **kwargs):
+            add_supplementary_halocat_columns=True, spatial_index_cells_per_dim=None,
+            table_layout='compound', chunk_size=None, compression=None, shuffle=True, **kwargs):
         """ Method reads the ascii data and
         binds the resulting catalog to ``self.halo_table``.
 
@@ -566,6 +572,14 @@ class RockstarHlistReader(TabularAsciiReader):
             Note that this feature is rather bare-bones and is likely to significantly
             evolve and/or entirely vanish in future releases.
 
+        spatial_index_cells_per_dim : int, optional
+            Passed to the `write_to_disk` method if ``write_to_disk`` is True.
+            Default is None, in which case the halos are stored in the order of the ascii file.
+
+        table_layout, chunk_size, compression, shuffle : optional
+            Passed to the `write_to_disk` method if ``write_to_disk`` is True.
+            Default is an uncompressed table in the 'compound' layout.
+
         chunk_memory_size : int, optional
             Determine the approximate amount of Megabytes of memory
             that will be processed in chunks. This variable
@@ -573,6 +587,10 @@ class RockstarHlistReader(TabularAsciiReader):
             choosing larger values typically improves performance.
             Default is 500 Mb.
 
+        num_processes : int, optional
+            Number of worker processes used to parse an uncompressed ASCII file.
+            Default is 1. See `~halotools.sim_manager.TabularAsciiReader.read_ascii`.
+
         Notes
         -----
         Regarding the ``columns_to_convert_from_kpc_to_mpc`` argument,
@@ -590,14 +608,7 @@ class RockstarHlistReader(TabularAsciiReader):
         `write_to_disk`, and bind these notes to the ``processing_notes`` argument.
 
         """
-        for key in columns_to_convert_from_kpc_to_mpc:
-            try:
-                assert key in self.columns_to_keep_dict
-            except AssertionError:
-                msg = ("\nYou included the ``" + key + "`` column in the input \n"
-                    "``columns_to_convert_from_kpc_to_mpc`` but not in the input "
-                    "``columns_to_keep_dict``\n")
-                raise HalotoolsError(msg)
+        self._verify_columns_to_convert_from_kpc_to_mpc(columns_to_convert_from_kpc_to_mpc)
 
         result = self._read_ascii(**kwargs)
         self.halo_table = Table(result)
@@ -609,7 +620,9 @@ class RockstarHlistReader(TabularAsciiReader):
             self.add_supplementary_halocat_columns()
 
         if write_to_disk is True:
-            self.write_to_disk()
+            self.write_to_disk(spatial_index_cells_per_dim=spatial_index_cells_per_dim,
+                table_layout=table_layout, chunk_size=chunk_size,
+                compression=compression, shuffle=shuffle)
             self._file_has_been_written_to_disk = True
         else:
             self._file_has_been_written_to_disk = False
@@ -632,6 +645,123 @@ class RockstarHlistReader(TabularAsciiReader):
                         "the write_to_disk and update_cache_log methods.\n")
                     raise HalotoolsError(msg)
 
+    def _verify_columns_to_convert_from_kpc_to_mpc(self, columns_to_convert_from_kpc_to_mpc):
+        for key in columns_to_convert_from_kpc_to_mpc:
+            try:
+                assert key in self.columns_to_keep_dict
+            except AssertionError:
+                msg = ("\nYou included the ``" + key + "`` column in the input \n"
+                    "``columns_to_convert_from_kpc_to_mpc`` but not in the input "
+                    "``columns_to_keep_dict``\n")
+                raise HalotoolsError(msg)
+
+    def stream_halocat_to_disk(self, columns_to_convert_from_kpc_to_mpc,
+            update_cache_log=False, add_supplementary_halocat_columns=True,
+            chunk_memory_size=500, table_layout='compound', chunk_size=None,
+            compression=None, shuffle=True):
+        """ Method reads the ascii data and writes the processed catalog
+        to ``self.output_fname`` one chunk at a time,
+        without ever holding the full catalog in memory.
+
+        Each chunk of rows passing the cuts is converted to the requested units,
+        supplemented with the columns computed by `add_supplementary_halocat_columns`,
+        and appended to a resizable hdf5 dataset. The metadata
+        is written once all the chunks have been processed.
+        Peak memory is therefore set by ``chunk_memory_size``, not by the size
+        of the catalog. The resulting file is identical in content to
+        the one written by calling `read_halocat` with ``write_to_disk`` set to True,
+        but ``self.halo_table`` is not bound to the instance.
+
+        Parameters
+        -----------
+        columns_to_convert_from_kpc_to_mpc : list of strings
+            List providing column names that should be divided by 1000
+            in order to convert from kpc/h to Mpc/h units.
+            See `read_halocat`.
+
+        update_cache_log : bool, optional
+            If True, the `update_cache_log` method will be called automatically
+            after the file has been written. Default is False.
+
+        add_supplementary_halocat_columns : bool, optional
+            Boolean determining whether each chunk will have additional
+            columns added to it computed by the add_supplementary_halocat_columns method.
+            Default is True.
+
+        chunk_memory_size : int, optional
+            Approximate amount of Megabytes of ASCII data processed in each chunk.
+            Default is 500 Mb.
+
+        table_layout, chunk_size, compression, shuffle : optional
+            Layout and filters of the hdf5 table. See `write_to_disk`.
+            Because the table is written incrementally, its datasets are always chunked.
+
+        Examples
+        --------
+        >>> reader = RockstarHlistReader(input_fname, columns_to_keep_dict, output_fname, simname, halo_finder, redshift, version_name, Lbox, particle_mass) # doctest: +SKIP
+        >>> reader.stream_halocat_to_disk(['halo_rvir', 'halo_rs'], update_cache_log=True) # doctest: +SKIP
+        """
+        self._verify_columns_to_convert_from_kpc_to_mpc(columns_to_convert_from_kpc_to_mpc)
+
+        print(("\n...Streaming ASCII data of file: \n%s\n"
+            "to the following hdf5 file:\n%s\n" % (self.input_fname, self.output_fname)))
+        start = time()
+
+        if self.overwrite is True:
+            mode = 'w'
+        else:
+            mode = 'w-'
+        storage_kwargs = dict(table_layout=table_layout, chunk_size=chunk_size,
+            compression=compression, shuffle=shuffle)
+        f = self.h5py.File(self.output_fname, mode)
+        try:
+            appender = None
+            for _i, chunk in enumerate(self.row_cut_chunk_generator(chunk_memory_size)):
+                print(("... working on chunk " + str(_i)))
+                output_chunk = self._process_streamed_chunk(chunk,
+                    columns_to_convert_from_kpc_to_mpc, add_supplementary_halocat_columns)
+                if appender is None:
+                    appender = HDF5TableAppender(f, output_chunk.dtype, **storage_kwargs)
+                appender.append(output_chunk)
+
+            if appender is None:
+                empty_chunk = self._process_streamed_chunk(np.zeros(0, dtype=self.dt),
+                    columns_to_convert_from_kpc_to_mpc, add_supplementary_halocat_columns)
+                appender = HDF5TableAppender(f, empty_chunk.dtype, **storage_kwargs)
+            print(("Total number of rows written = %i" % appender.num_rows))
+        finally:
+            f.close()
+
+        self._write_metadata()
+        self._file_has_been_written_to_disk = True
+
+        runtime = time() - start
+        print(("Total runtime to stream the catalog to disk = %.2f seconds\n" % runtime))
+
+        if update_cache_log is True:
+            self.update_cache_log()
+
+    def _process_streamed_chunk(self, chunk,
+            columns_to_convert_from_kpc_to_mpc, add_supplementary_halocat_columns):
+        """ Private method applies the unit conversions to a chunk of the catalog
+        and returns a structured array including any supplementary columns.
+        """
+        for key in columns_to_convert_from_kpc_to_mpc:
+            chunk[key] /= 1000.
+
+        if add_supplementary_halocat_columns is False:
+            return chunk
+
+        new_columns = self._supplementary_halocat_columns(chunk)
+        dt = np.dtype(chunk.dtype.descr +
+            [(key, column.dtype) for key, column in new_columns.items()])
+        output_chunk = np.zeros(len(chunk), dtype=dt)
+        for key in chunk.dtype.names:
+            output_chunk[key] = chunk[key]
+        for key, column in new_columns.items():
+            output_chunk[key] = column
+        return output_chunk
+
     def _read_ascii(self, **kwargs):
         """ Method reads the input ascii and returns
         a structured Numpy array of the data
@@ -646,6 +776,10 @@ class RockstarHlistReader(TabularAsciiReader):
             choosing larger values typically improves performance.
             Default is 500 Mb.
 
+        num_processes : int, optional
+            Number of worker processes used to parse an uncompressed ASCII file.
+            Default is 1. See `~halotools.sim_manager.TabularAsciiReader.read_ascii`.
+
         Returns
         --------
         full_array : array_like
@@ -664,20 +798,55 @@ class RockstarHlistReader(TabularAsciiReader):
         """
         return TabularAsciiReader.read_ascii(self, **kwargs)
 
-    def write_to_disk(self):
+    def write_to_disk(self, spatial_index_cells_per_dim=None,
+            table_layout='compound', chunk_size=None, compression=None, shuffle=True):
         """ Method writes ``self.halo_table`` to ``self.output_fname``
         and also calls the ``self._write_metadata`` method to place the
         hdf5 file into standard form.
+
+        Parameters
+        ----------
+        spatial_index_cells_per_dim : int, optional
+            If set, the halos are stored sorted by their cell in a regular grid
+            with ``spatial_index_cells_per_dim`` cells per dimension, together with
+            an index of the rows of each cell, so that the
+            `~halotools.sim_manager.CachedHaloCatalog.load_halo_table_subvolume`
+            method only reads the halos in the requested subvolume.
+            Default is None, in which case the halos are stored in the order of the ascii file.
+
+        table_layout : string, optional
+            Either 'compound' or 'columnar'. With the default 'compound' layout,
+            the halos are stored in a single hdf5 dataset with one field per column.
+            With the 'columnar' layout each column is stored in its own dataset,
+            so that reading a few columns of a wide catalog is much faster.
+
+        chunk_size : int, optional
+            Number of rows in each hdf5 chunk. Default is None, in which case
+            uncompressed data are stored contiguously and compressed data
+            are chunked by h5py.
+
+        compression : string, optional
+            Compression filter, either None, 'gzip' or 'lzf'. Default is None.
+
+        shuffle : bool, optional
+            If True, the byte-shuffle filter is applied before compression.
+            Ignored if ``compression`` is None. Default is True.
         """
-        self.halo_table.write(
-            self.output_fname, path='data', overwrite=self.overwrite)
+        storage_kwargs = dict(table_layout=table_layout, chunk_size=chunk_size,
+            compression=compression, shuffle=shuffle)
+        if spatial_index_cells_per_dim is None:
+            write_table_to_hdf5(self.halo_table, self.output_fname,
+                overwrite=self.overwrite, **storage_kwargs)
+        else:
+            write_table_with_spatial_index(self.halo_table, self.output_fname,
+                self.Lbox, spatial_index_cells_per_dim, overwrite=self.overwrite, **storage_kwargs)
         self._write_metadata()
 
     def _write_metadata(self):
         """ Private method to add metadata to the hdf5 file.
         """
         # Now add the metadata
-        f = self.h5py.File(self.output_fname)
+        f = self.h5py.File(self.output_fname, 'a')
         f.attrs.create('simname', str(self.simname))
         f.attrs.create('halo_finder', str(self.halo_finder))
         redshift_string = str(get_redshift_string(self.redshift))
@@ -726,15 +895,29 @@ class RockstarHlistReader(TabularAsciiReader):
         This implementation will eventually change in favor of something
         more flexible.
         """
+        new_columns = self._supplementary_halocat_columns(self.halo_table)
+        for key, column in new_columns.items():
+            self.halo_table[key] = column
+
+    def _supplementary_halocat_columns(self, table):
+        """ Private method returns an ordered dictionary storing the supplementary
+        columns of the input table, which may be either an `~astropy.table.Table`
+        or a chunk of the catalog stored in a structured Numpy array.
+        Each supplementary column only depends on the other columns of the same row.
+        """
+        new_columns = OrderedDict()
+        keys = list(table.dtype.names)
+
         # Add the halo_nfw_conc column
-        if ('halo_rvir' in list(self.halo_table.keys())) & ('halo_rs' in list(self.halo_table.keys())):
-            self.halo_table['halo_nfw_conc'] = (
-                self.halo_table['halo_rvir'] / self.halo_table['halo_rs']
+        if ('halo_rvir' in keys) & ('halo_rs' in keys):
+            new_columns['halo_nfw_conc'] = (
+                np.asarray(table['halo_rvir']) / np.asarray(table['halo_rs'])
                 )
 
-        # Add the halo_nfw_conc column
-        self.halo_table['halo_hostid'] = self.halo_table['halo_id']
-        subhalo_mask = self.halo_table['halo_upid'] != -1
-        self.halo_table['halo_hostid'][subhalo_mask] = (
-            self.halo_table['halo_upid'][subhalo_mask]
-            )
+        # Add the halo_hostid column
+        halo_id = np.asarray(table['halo_id'])
+        halo_upid = np.asarray(table['halo_upid'])
+        new_columns['halo_hostid'] = np.where(
+            halo_upid != -1, halo_upid, halo_id).astype(halo_id.dtype)
+
+        return new_columns
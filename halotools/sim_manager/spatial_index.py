@@ -0,0 +1,324 @@
+""" Module storing functions used to write halo and particle catalogs to disk
+sorted by a spatial cell key, and to read back only the rows of the catalog
+that lie within a rectangular subvolume of the periodic box.
+
+A spatially indexed hdf5 file stores the table in the usual ``data`` dataset,
+with rows sorted by the cell of a regular 3d grid in which each row lies.
+The ``spatial_index`` dataset stores the row offsets of each cell,
+so that the rows of cell ``i`` are ``data[offsets[i]:offsets[i+1]]``.
+"""
+import numpy as np
+
+from .hdf5_table_io import write_table_to_hdf5, read_table_from_hdf5
+
+from ..custom_exceptions import HalotoolsError
+
+__all__ = ('spatial_cell_ids', 'sort_table_by_spatial_cell',
+    'write_table_with_spatial_index', 'read_spatial_index',
+    'read_table_subvolume', 'subvolume_mask')
+
+spatial_index_dataset_name = 'spatial_index'
+
+
+def spatial_cell_ids(x, y, z, Lbox, num_cells_per_dim):
+    """ Calculate the integer ID of the cell of a regular grid
+    in which each input point lies.
+
+    Parameters
+    ----------
+    x, y, z : array_like
+        Length-Npts arrays storing the positions of the points.
+        Points outside of [0, Lbox) are wrapped into the box.
+
+    Lbox : float
+        Length of the periodic box.
+
+    num_cells_per_dim : int
+        Number of cells in each dimension of the grid.
+
+    Returns
+    -------
+    cell_ids : array
+        Length-Npts integer array in the range [0, num_cells_per_dim**3).
+        The cell ID of the point lying in cell (ix, iy, iz) is
+        ``ix*num_cells_per_dim**2 + iy*num_cells_per_dim + iz``.
+
+    Examples
+    --------
+    >>> x, y, z = np.random.uniform(0, 250, (3, 100))
+    >>> cell_ids = spatial_cell_ids(x, y, z, 250., 10)
+    """
+    n = int(num_cells_per_dim)
+    ix = _cell_index_1d(x, Lbox, n)
+    iy = _cell_index_1d(y, Lbox, n)
+    iz = _cell_index_1d(z, Lbox, n)
+    return ix*n*n + iy*n + iz
+
+
+def _cell_index_1d(x, Lbox, n):
+    x = np.mod(np.atleast_1d(x).astype('f8'), Lbox)
+    return np.minimum((x*n/Lbox).astype('i8'), n-1)
+
+
+def sort_table_by_spatial_cell(table, Lbox, num_cells_per_dim,
+        position_keys=('halo_x', 'halo_y', 'halo_z')):
+    """ Sort the rows of a table by spatial cell.
+
+    Parameters
+    ----------
+    table : `~astropy.table.Table`
+        Table storing the positions of the points in the ``position_keys`` columns.
+
+    Lbox : float
+        Length of the periodic box.
+
+    num_cells_per_dim : int
+        Number of cells in each dimension of the grid.
+
+    position_keys : sequence of strings, optional
+        Names of the x, y and z columns. Default is ('halo_x', 'halo_y', 'halo_z').
+
+    Returns
+    -------
+    sorted_table : `~astropy.table.Table`
+        Copy of the input table sorted by cell ID.
+        Within each cell, rows retain their original order.
+
+    cell_offsets : array
+        Integer array of length num_cells_per_dim**3 + 1. The rows of
+        ``sorted_table`` lying in cell ``i`` are
+        ``sorted_table[cell_offsets[i]:cell_offsets[i+1]]``.
+    """
+    xkey, ykey, zkey = position_keys
+    cell_ids = spatial_cell_ids(table[xkey], table[ykey], table[zkey], Lbox, num_cells_per_dim)
+    idx_sorted = np.argsort(cell_ids, kind='mergesort')
+    num_cells = int(num_cells_per_dim)**3
+    counts = np.bincount(cell_ids, minlength=num_cells)
+    cell_offsets = np.concatenate(([0], np.cumsum(counts))).astype('i8')
+    return table[idx_sorted], cell_offsets
+
+
+def write_table_with_spatial_index(table, fname, Lbox, num_cells_per_dim,
+        position_keys=('halo_x', 'halo_y', 'halo_z'), overwrite=False, **kwargs):
+    """ Write a table to the ``data`` dataset of an hdf5 file
+    with rows sorted by spatial cell, together with the ``spatial_index``
+    dataset storing the row offsets of each cell.
+
+    Parameters
+    ----------
+    table : `~astropy.table.Table`
+        Table to write. The table itself is not modified.
+
+    fname : string
+        Name of the hdf5 file.
+
+    Lbox : float
+        Length of the periodic box.
+
+    num_cells_per_dim : int
+        Number of cells in each dimension of the grid.
+        Subvolume queries read whole cells, so the cells should be
+        comparable to or smaller than typical subvolumes.
+
+    position_keys : sequence of strings, optional
+        Names of the x, y and z columns. Default is ('halo_x', 'halo_y', 'halo_z').
+
+    overwrite : bool, optional
+        If True, an existing file named ``fname`` is overwritten. Default is False.
+
+    **kwargs : optional
+        The ``table_layout``, ``chunk_size``, ``compression`` and ``shuffle``
+        keyword arguments are passed to `~halotools.sim_manager.write_table_to_hdf5`.
+    """
+    try:
+        import h5py
+    except ImportError:
+        msg = ("\nMust have h5py installed to write a spatially indexed table.\n")
+        raise HalotoolsError(msg)
+
+    num_cells_per_dim = int(num_cells_per_dim)
+    if num_cells_per_dim < 1:
+        raise HalotoolsError("\n``num_cells_per_dim`` must be a positive integer.\n")
+
+    sorted_table, cell_offsets = sort_table_by_spatial_cell(
+        table, Lbox, num_cells_per_dim, position_keys=position_keys)
+    write_table_to_hdf5(sorted_table, fname, overwrite=overwrite, **kwargs)
+
+    f = h5py.File(fname, 'a')
+    try:
+        dset = f.create_dataset(spatial_index_dataset_name, data=cell_offsets)
+        dset.attrs.create('num_cells_per_dim', num_cells_per_dim)
+        dset.attrs.create('Lbox', float(Lbox))
+        for attrname, key in zip(('xkey', 'ykey', 'zkey'), position_keys):
+            dset.attrs.create(attrname, key.encode('ascii'))
+    finally:
+        f.close()
+
+
+def read_spatial_index(fname):
+    """ Read the spatial index of an hdf5 file written by `write_table_with_spatial_index`.
+
+    Parameters
+    ----------
+    fname : string
+        Name of the hdf5 file.
+
+    Returns
+    -------
+    spatial_index : dict or None
+        Dictionary with keys ``num_cells_per_dim``, ``Lbox``, ``position_keys``
+        and ``cell_offsets``, or None if the file has no spatial index.
+    """
+    import h5py
+    f = h5py.File(fname, 'r')
+    try:
+        if spatial_index_dataset_name not in f:
+            return None
+        dset = f[spatial_index_dataset_name]
+        position_keys = []
+        for attrname in ('xkey', 'ykey', 'zkey'):
+            key = dset.attrs[attrname]
+            try:
+                key = key.decode('ascii')
+            except AttributeError:
+                pass
+            position_keys.append(str(key))
+        return {'num_cells_per_dim': int(dset.attrs['num_cells_per_dim']),
+            'Lbox': float(dset.attrs['Lbox']),
+            'position_keys': tuple(position_keys),
+            'cell_offsets': dset[...]}
+    finally:
+        f.close()
+
+
+def _verify_subvolume_limits(limits, Lbox):
+    try:
+        lo, hi = float(limits[0]), float(limits[1])
+        assert hi > lo
+    except (TypeError, ValueError, IndexError, AssertionError):
+        msg = ("\nEach of ``xlim``, ``ylim`` and ``zlim`` must be a "
+            "two-element sequence (min, max) with max > min.\n")
+        raise HalotoolsError(msg)
+    return lo, hi
+
+
+def _overlapping_cells_1d(lo, hi, Lbox, n):
+    """ Indices of the cells of a periodic 1d grid overlapping [lo, hi).
+    """
+    if hi - lo >= Lbox:
+        return np.arange(n)
+    cell_size = Lbox/float(n)
+    first = int(np.floor(lo/cell_size))
+    last = int(np.floor(hi/cell_size))
+    return np.unique(np.mod(np.arange(first, last+1), n))
+
+
+def _subvolume_row_ranges(xlim, ylim, zlim, Lbox, num_cells_per_dim, cell_offsets):
+    """ Return the (start, stop) row ranges of the cells overlapping the subvolume,
+    with ranges of adjacent cells merged.
+    """
+    n = num_cells_per_dim
+    ix = _overlapping_cells_1d(xlim[0], xlim[1], Lbox, n)
+    iy = _overlapping_cells_1d(ylim[0], ylim[1], Lbox, n)
+    iz = _overlapping_cells_1d(zlim[0], zlim[1], Lbox, n)
+    cell_ids = (ix[:, None, None]*n*n + iy[None, :, None]*n + iz[None, None, :]).flatten()
+    cell_ids = np.sort(cell_ids)
+
+    starts = cell_offsets[cell_ids]
+    stops = cell_offsets[cell_ids + 1]
+    nonempty = stops > starts
+    starts, stops = starts[nonempty], stops[nonempty]
+    if len(starts) == 0:
+        return []
+
+    # Merge ranges that are contiguous on disk
+    new_range = np.ones(len(starts), dtype=bool)
+    new_range[1:] = starts[1:] != stops[:-1]
+    range_starts = starts[new_range]
+    range_stops = stops[np.append(np.flatnonzero(new_range)[1:] - 1, len(stops) - 1)]
+    return list(zip(range_starts, range_stops))
+
+
+def subvolume_mask(x, y, z, xlim, ylim, zlim, Lbox):
+    """ Boolean mask selecting the points inside a rectangular subvolume
+    of a periodic box.
+
+    Parameters
+    ----------
+    x, y, z : array_like
+        Length-Npts arrays storing the positions of the points.
+
+    xlim, ylim, zlim : sequence
+        Two-element sequences (min, max) defining the half-open interval
+        [min, max) of the subvolume in each dimension. The limits may extend
+        beyond [0, Lbox), in which case the subvolume wraps around the periodic
+        boundary, e.g., ``xlim = (-10, 10)`` selects points with x < 10 or x >= Lbox - 10.
+
+    Lbox : float
+        Length of the periodic box.
+
+    Returns
+    -------
+    mask : array
+        Length-Npts boolean array.
+    """
+    mask = np.ones(len(np.atleast_1d(x)), dtype=bool)
+    for coord, limits in zip((x, y, z), (xlim, ylim, zlim)):
+        lo, hi = _verify_subvolume_limits(limits, Lbox)
+        if hi - lo < Lbox:
+            mask &= np.mod(np.atleast_1d(coord) - lo, Lbox) < (hi - lo)
+    return mask
+
+
+def read_table_subvolume(fname, xlim, ylim, zlim, keys=None):
+    """ Read the rows of a spatially indexed table that lie inside a
+    rectangular subvolume of the periodic box.
+
+    Only the rows of the cells overlapping the subvolume are read from disk.
+
+    Parameters
+    ----------
+    fname : string
+        Name of an hdf5 file written by `write_table_with_spatial_index`.
+
+    xlim, ylim, zlim : sequence
+        Two-element sequences (min, max) defining the subvolume.
+        See `subvolume_mask` for the treatment of periodic boundaries.
+
+    keys : sequence of strings, optional
+        Names of the columns to return. Default is None, in which case all columns are returned.
+
+    Returns
+    -------
+    table : `~astropy.table.Table`
+        Table storing the rows inside the subvolume, in the order they are stored on disk.
+
+    Examples
+    --------
+    >>> subvol = read_table_subvolume(fname, (0, 50), (0, 50), (-10, 10)) # doctest: +SKIP
+    """
+    spatial_index = read_spatial_index(fname)
+    if spatial_index is None:
+        msg = ("\nThe following hdf5 file does not have a spatial index:\n%s\n")
+        raise HalotoolsError(msg % fname)
+    Lbox = spatial_index['Lbox']
+    xlim = _verify_subvolume_limits(xlim, Lbox)
+    ylim = _verify_subvolume_limits(ylim, Lbox)
+    zlim = _verify_subvolume_limits(zlim, Lbox)
+
+    row_ranges = _subvolume_row_ranges(xlim, ylim, zlim, Lbox,
+        spatial_index['num_cells_per_dim'], spatial_index['cell_offsets'])
+
+    xkey, ykey, zkey = spatial_index['position_keys']
+    if keys is not None:
+        keys = list(keys)
+        read_keys = keys + [key for key in (xkey, ykey, zkey) if key not in keys]
+    else:
+        read_keys = None
+    table = read_table_from_hdf5(fname, keys=read_keys, row_ranges=row_ranges)
+
+    mask = subvolume_mask(table[xkey], table[ykey], table[zkey], xlim, ylim, zlim, Lbox)
+    table = table[mask]
+    if keys is not None:
+        table = table[keys]
+    return table
@@ -7,13 +7,19 @@ of a data type that is known in advance.
 import os
 import gzip
 import collections
+import multiprocessing
 from time import time
 import numpy as np
 
-from astropy.extern.six.moves import xrange as range
-
 __all__ = ('TabularAsciiReader', )
 
+# Approximate size in bytes of the pieces of a block that are split into fields at once
+_parse_piece_size = 2**24
+
+# Lookup table of the whitespace bytes separating the fields of a line
+_is_whitespace_byte = np.zeros(256, dtype=bool)
+_is_whitespace_byte[np.frombuffer(b' \t\n\r\x0b\x0c', dtype=np.uint8)] = True
+
 
 class TabularAsciiReader(object):
     """
@@ -23,9 +29,9 @@ class TabularAsciiReader(object):
 
     When reading ASCII data with
     `~halotools.sim_manager.TabularAsciiReader.read_ascii`, user-defined
-    cuts on columns are applied on-the-fly using a python generator
-    to yield only those columns whose indices appear in the
-    input ``columns_to_keep_dict``.
+    cuts on columns are applied on-the-fly, and only those columns whose
+    indices appear in the input ``columns_to_keep_dict`` are converted
+    into Numpy arrays.
 
     As the file is read, the data is generated in chunks,
     and a customizable mask is applied to each newly generated chunk.
@@ -511,11 +517,204 @@ class TabularAsciiReader(object):
 
         return array_chunk[mask]
 
-    def read_ascii(self, chunk_memory_size=500):
+    def _parse_data_block(self, block):
+        """ Parse a block of complete lines of the ASCII file
+        into a structured Numpy array with dtype ``self.dt``.
+
+        The block is split into fields with Numpy operations on its bytes,
+        in pieces of about ``_parse_piece_size`` bytes so that the temporary
+        index arrays do not grow with the size of the block.
+        Only the columns in ``self.column_indices_to_keep`` are converted.
+        Lines beginning with ``self.header_char`` and empty lines are skipped.
+
+        Parameters
+        -----------
+        block : bytes
+            Bytes read from the file, beginning at the start of a line
+            and ending at the end of a line.
+
+        Returns
+        --------
+        array_chunk : Numpy array
+            Structured array storing the data of the block, before any row-cut.
+        """
+        buf = np.frombuffer(block, dtype=np.uint8)
+
+        chunklist = []
+        num_cols = None
+        start = 0
+        while start < len(buf):
+            stop = block.find(b'\n', start + _parse_piece_size) + 1
+            if stop == 0:
+                stop = len(buf)
+            array_chunk, num_cols = self._parse_data_piece(buf[start:stop], num_cols)
+            chunklist.append(array_chunk)
+            start = stop
+
+        if len(chunklist) == 0:
+            return np.zeros(0, dtype=self.dt)
+        elif len(chunklist) == 1:
+            return chunklist[0]
+        else:
+            return np.concatenate(chunklist)
+
+    def _parse_data_piece(self, buf, num_cols):
+        """ Parse the complete lines stored in the uint8 array ``buf``.
+        ``num_cols`` is the number of columns found in the previous pieces of the block,
+        or None. Returns the structured array of the piece and the number of columns.
+        """
+        is_space = _is_whitespace_byte[buf]
+        is_field = ~is_space
+
+        # first and one-past-last byte of each whitespace-separated field
+        field_starts = np.flatnonzero(is_field[1:] & is_space[:-1]) + 1
+        field_ends = np.flatnonzero(is_space[1:] & is_field[:-1]) + 1
+        if is_field[0]:
+            field_starts = np.append(0, field_starts)
+        if is_field[-1]:
+            field_ends = np.append(field_ends, len(buf))
+
+        line_starts = np.append(0, np.flatnonzero(buf == ord('\n')) + 1)
+        line_of_field = np.searchsorted(line_starts, field_starts, side='right') - 1
+
+        header_char = np.frombuffer(self.header_char.encode('ascii'), dtype=np.uint8)
+        is_header = line_starts + len(header_char) <= len(buf)
+        for i, char in enumerate(header_char):
+            is_header[is_header] &= buf[line_starts[is_header] + i] == char
+        keep = ~is_header[line_of_field]
+        field_starts = field_starts[keep]
+        field_ends = field_ends[keep]
+        line_of_field = line_of_field[keep]
+
+        num_fields = np.bincount(line_of_field, minlength=len(line_starts))
+        data_lines = np.flatnonzero(num_fields > 0)
+        num_rows = len(data_lines)
+        if num_rows == 0:
+            return np.zeros(0, dtype=self.dt), num_cols
+        if num_cols is None:
+            num_cols = num_fields[data_lines[0]]
+
+        bad_lines = data_lines[num_fields[data_lines] != num_cols]
+        if len(bad_lines) > 0:
+            first = line_starts[bad_lines[0]]
+            line = buf[first:].tobytes().split(b'\n', 1)[0]
+            msg = ("\nThe following line of the ASCII file does not have "
+                "the same number of columns (%i) as the preceding lines:\n%s\n")
+            raise ValueError(msg % (num_cols, line.decode('ascii', 'replace')))
+
+        if max(self.column_indices_to_keep) >= num_cols:
+            msg = ("\nYour ``columns_to_keep_dict`` requests column %i, "
+                "but the ASCII data only has %i columns.\n")
+            raise ValueError(msg % (max(self.column_indices_to_keep), num_cols))
+
+        field_starts = field_starts.reshape((num_rows, num_cols))
+        field_ends = field_ends.reshape((num_rows, num_cols))
+
+        array_chunk = np.zeros(num_rows, dtype=self.dt)
+        for key, column_index in zip(self.dt.names, self.column_indices_to_keep):
+            starts = field_starts[:, column_index]
+            lengths = field_ends[:, column_index] - starts
+            width = lengths.max()
+            offsets = np.arange(width)
+            # pad the shorter fields with null bytes, which are stripped by the 'S' dtype
+            chars = np.where(offsets < lengths[:, None],
+                buf[np.minimum(starts[:, None] + offsets, len(buf) - 1)], 0).astype(np.uint8)
+            column = chars.view('S%i' % width).ravel()
+            array_chunk[key] = column.astype(self.dt[key])
+
+        return array_chunk, num_cols
+
+    def _parse_and_cut_file_block(self, start, stop):
+        """ Parse the bytes ``start:stop`` of an uncompressed file and apply the row-cuts.
+        """
+        with open(self.input_fname, 'rb') as f:
+            f.seek(start)
+            block = f.read(stop - start)
+        return self.apply_row_cut(self._parse_data_block(block))
+
+    def _file_block_boundaries(self, block_size):
+        """ Byte offsets splitting the uncompressed input file into blocks of
+        approximately ``block_size`` bytes, each beginning at the start of a line.
+        """
+        file_size = os.path.getsize(self.input_fname)
+        boundaries = [0]
+        with open(self.input_fname, 'rb') as f:
+            while boundaries[-1] + block_size < file_size:
+                f.seek(boundaries[-1] + block_size)
+                f.readline()
+                boundary = f.tell()
+                if boundary >= file_size:
+                    break
+                boundaries.append(boundary)
+        boundaries.append(file_size)
+        return boundaries
+
+    def _data_block_generator(self, block_size):
+        """ Generator reading the input file in a single pass,
+        yielding blocks of approximately ``block_size`` bytes
+        that end at the end of a line.
+        """
+        remainder = b''
+        with self._compression_safe_file_opener(self.input_fname, 'rb') as f:
+            while True:
+                data = f.read(block_size)
+                if not data:
+                    break
+                data = remainder + data
+                last_newline = data.rfind(b'\n')
+                if last_newline == -1:
+                    remainder = data
+                else:
+                    remainder = data[last_newline+1:]
+                    yield data[:last_newline+1]
+        if remainder:
+            yield remainder
+
+    def _block_size(self, chunk_memory_size):
+        """ Convert ``chunk_memory_size`` in Megabytes into a positive number of bytes.
+        """
+        block_size = int(chunk_memory_size*1e6)
+        if block_size <= 0:
+            msg = ("\nMust choose non-zero size for input "
+                   "``chunk_memory_size``")
+            raise ValueError(msg)
+        return block_size
+
+    def row_cut_chunk_generator(self, chunk_memory_size=500):
+        """ Generator reading the input ascii in a single pass and yielding,
+        for each block of ``chunk_memory_size``, a structured Numpy array of the data
+        in that block that passes the row- and column-cuts.
+
+        Only one block of the file is held in memory at a time,
+        so this generator can be used to process files that are
+        much larger than the available RAM.
+
+        Parameters
+        ----------
+        chunk_memory_size : int, optional
+            Approximate amount of Megabytes of ASCII data in each block.
+            Default is 500 Mb.
+
+        Yields
+        -------
+        cut_chunk : array_like
+            Structured Numpy array with dtype ``self.dt``.
+            Chunks are yielded in the order of the rows in the file.
+        """
+        block_size = self._block_size(chunk_memory_size)
+        for block in self._data_block_generator(block_size):
+            yield self.apply_row_cut(self._parse_data_block(block))
+
+    def read_ascii(self, chunk_memory_size=500, num_processes=1):
         """ Method reads the input ascii and returns
         a structured Numpy array of the data
         that passes the row- and column-cuts.
 
+        The file is read in a single pass, in blocks of ``chunk_memory_size``.
+        Each block is split into fields with vectorized Numpy operations,
+        and only the columns in ``column_indices_to_keep`` are converted;
+        the row-cuts are applied to each block as soon as it is parsed.
+
         Parameters
         ----------
         chunk_memory_size : int, optional
@@ -525,6 +724,14 @@ class TabularAsciiReader(object):
             choosing larger values typically improves performance.
             Default is 500 Mb.
 
+        num_processes : int, optional
+            Number of worker processes used to parse the blocks of
+            an uncompressed file. Default is 1 for a purely serial calculation.
+            Gzipped files cannot be split and are always read serially.
+            Each worker holds about ``chunk_memory_size`` of ASCII in memory at a time.
+            The rows of the returned array appear in the order of the file
+            regardless of ``num_processes``.
+
         Returns
         --------
         full_array : array_like
@@ -535,56 +742,44 @@ class TabularAsciiReader(object):
 
         See also
         ----------
-        data_chunk_generator
+        row_cut_chunk_generator
         """
         print(("\n...Processing ASCII data of file: \n%s\n "
                % self.input_fname))
         start = time()
 
-        file_size = os.path.getsize(self.input_fname)
-        # convert to bytes to match units of file_size
-        chunk_memory_size *= 1e6
-        num_data_rows = int(self.data_len())
-        print(("Total number of rows in detected data = %i" % num_data_rows))
+        block_size = self._block_size(chunk_memory_size)
 
-        # Set the number of chunks to be filesize/chunk_memory,
-        # but enforcing that 0 < Nchunks <= num_data_rows
-        try:
-            Nchunks = int(max(1, min(file_size / chunk_memory_size, num_data_rows)))
-        except ZeroDivisionError:
-            msg = ("\nMust choose non-zero size for input "
-                   "``chunk_memory_size``")
-            raise ValueError(msg)
-
-        num_rows_in_chunk = int(num_data_rows // Nchunks)
-        num_full_chunks = int(num_data_rows // num_rows_in_chunk)
-        num_rows_in_chunk_remainder = num_data_rows - num_rows_in_chunk*Nchunks
-
-        header_length = int(self.header_len())
-        print(("Number of rows in detected header = %i \n" % header_length))
-
-        chunklist = []
-        with self._compression_safe_file_opener(self.input_fname, 'r') as f:
-
-            for skip_header_row in range(header_length):
-                _s = f.readline()
-
-            for _i in range(num_full_chunks):
-                print(("... working on chunk " + str(_i) +
-                       " of " + str(num_full_chunks)))
-
-                chunk_array = np.array(list(
-                    self.data_chunk_generator(num_rows_in_chunk, f)), dtype=self.dt)
-                cut_chunk = self.apply_row_cut(chunk_array)
+        pool_context = None
+        if (num_processes > 1) and (self._compression_safe_file_opener is open):
+            try:
+                pool_context = multiprocessing.get_context('fork')
+            except (AttributeError, ValueError):
+                pool_context = None
+
+        if pool_context is None:
+            chunklist = []
+            for _i, cut_chunk in enumerate(self.row_cut_chunk_generator(chunk_memory_size)):
+                print(("... working on chunk " + str(_i)))
                 chunklist.append(cut_chunk)
-
-            # Now for the remainder chunk
-            chunk_array = np.array(list(
-                self.data_chunk_generator(num_rows_in_chunk_remainder, f)), dtype=self.dt)
-            cut_chunk = self.apply_row_cut(chunk_array)
-            chunklist.append(cut_chunk)
-
-        full_array = np.concatenate(chunklist)
+        else:
+            boundaries = self._file_block_boundaries(block_size)
+            print(("... working on %i chunks with %i processes" %
+                (len(boundaries)-1, num_processes)))
+            pool = pool_context.Pool(processes=num_processes,
+                initializer=_init_ascii_worker, initargs=(self, ))
+            try:
+                chunklist = pool.map(_ascii_worker, list(zip(boundaries[:-1], boundaries[1:])),
+                    chunksize=1)
+            finally:
+                pool.terminate()
+                pool.join()
+
+        if len(chunklist) == 0:
+            full_array = np.zeros(0, dtype=self.dt)
+        else:
+            full_array = np.concatenate(chunklist)
+        print(("Total number of rows passing the cuts = %i" % len(full_array)))
 
         end = time()
         runtime = (end-start)
@@ -598,3 +793,17 @@ class TabularAsciiReader(object):
         print("\a")
 
         return full_array
+
+
+# Reader bound once per worker process by _init_ascii_worker
+# so that it is never pickled
+_worker_state = {}
+
+
+def _init_ascii_worker(reader):
+    _worker_state['reader'] = reader
+
+
+def _ascii_worker(byte_range):
+    start, stop = byte_range
+    return _worker_state['reader']._parse_and_cut_file_block(start, stop)
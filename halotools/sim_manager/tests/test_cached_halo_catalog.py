@@ -21,6 +21,7 @@ import numpy as np
 from . import helper_functions
 
 from ..cached_halo_catalog import CachedHaloCatalog
+from ..ptcl_table_cache_log_entry import PtclTableCacheLogEntry
 from ..halo_table_cache import HaloTableCache
 from ..ptcl_table_cache import PtclTableCache
 from ..download_manager import DownloadManager
@@ -489,6 +490,59 @@ class TestCachedHaloCatalog(TestCase):
         assert ptclcat.log_entry not in ptcl_cache.log
         assert os.path.isfile(ptclcat.log_entry.fname) is False
 
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_load_ptcl_table_subset(self):
+        """ The random and strided subsets of the particles read from disk
+        are the same rows as those taken from the full ptcl_table.
+        """
+        num_ptcls, Lbox = 1000, 250.
+        rng = np.random.RandomState(43)
+        ptcls = Table({'ptcl_id': np.arange(num_ptcls),
+            'x': rng.uniform(0, Lbox, num_ptcls),
+            'y': rng.uniform(0, Lbox, num_ptcls),
+            'z': rng.uniform(0, Lbox, num_ptcls)})
+        fname = os.path.join(self.dummy_cache_baseloc, 'subset_particles.hdf5')
+        ptcls.write(fname, path='data')
+
+        log_entry = PtclTableCacheLogEntry('fake_simname', 'fake_version_name', 0.0, fname)
+        f = h5py.File(fname, 'a')
+        for attr_name in log_entry.log_attributes:
+            f.attrs.create(attr_name, getattr(log_entry, attr_name).encode('ascii'))
+        f.attrs.create('Lbox', Lbox)
+        f.attrs.create('particle_mass', 1e8)
+        f.close()
+        assert log_entry.safe_for_cache is True
+
+        halocat = CachedHaloCatalog.__new__(CachedHaloCatalog)
+        halocat.h5py = h5py
+        halocat.ptcl_log_entry = log_entry
+
+        strided = halocat.load_ptcl_table_subset(stride=7, keys=['ptcl_id', 'x'])
+        assert strided.keys() == ['ptcl_id', 'x']
+        assert np.all(strided['ptcl_id'] == ptcls['ptcl_id'][::7])
+        assert np.all(strided['x'] == ptcls['x'][::7])
+
+        for fraction in (0.1, 0.9):
+            subset = halocat.load_ptcl_table_subset(fraction=fraction, seed=43)
+            assert len(subset) == int(round(fraction*num_ptcls))
+            idx = np.array(subset['ptcl_id'])
+            assert np.all(np.diff(idx) > 0)
+            for key in ('x', 'y', 'z'):
+                assert np.all(subset[key] == ptcls[key][idx])
+            subset2 = halocat.load_ptcl_table_subset(num_ptcls=len(subset), seed=43)
+            assert np.all(subset2['ptcl_id'] == idx)
+
+        halocat._ptcl_table = ptcls
+        for kwargs in ({'stride': 7}, {'fraction': 0.1, 'seed': 43}, {'fraction': 0.9, 'seed': 43}):
+            in_memory = halocat.load_ptcl_table_subset(**kwargs)
+            del halocat._ptcl_table
+            from_disk = halocat.load_ptcl_table_subset(**kwargs)
+            halocat._ptcl_table = ptcls
+            assert np.all(in_memory['ptcl_id'] == from_disk['ptcl_id'])
+
+        assert len(halocat.load_ptcl_table_subset(num_ptcls=0, seed=43)) == 0
+        assert len(halocat.load_ptcl_table_subset(num_ptcls=num_ptcls, seed=43)) == num_ptcls
+
     def tearDown(self):
         try:
             shutil.rmtree(self.dummy_cache_baseloc)
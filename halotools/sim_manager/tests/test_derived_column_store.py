@@ -0,0 +1,106 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from astropy.tests.helper import pytest
+import os
+import shutil
+
+import numpy as np
+from astropy.table import Table
+from astropy.utils.misc import NumpyRNGContext
+
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
+from . import helper_functions
+from ..derived_column_store import DerivedColumnStore
+
+__all__ = ('TestDerivedColumnStore', )
+
+fixed_seed = 43
+
+
+class TestDerivedColumnStore(TestCase):
+    """ Class providing unit testing for `~halotools.sim_manager.DerivedColumnStore`.
+    """
+
+    def setUp(self):
+        self.dummy_cache_baseloc = helper_functions.dummy_cache_baseloc
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
+        os.makedirs(self.dummy_cache_baseloc)
+
+        num_halos = 100
+        with NumpyRNGContext(fixed_seed):
+            halo_mvir = 10**np.random.uniform(10, 15, num_halos)
+        self.table = Table({'halo_id': np.arange(num_halos), 'halo_mvir': halo_mvir})
+        self.catalog_fname = os.path.join(self.dummy_cache_baseloc, 'halos.hdf5')
+        self.table.write(self.catalog_fname, path='data')
+        self.store_fname = os.path.join(self.dummy_cache_baseloc, 'derived', 'store.hdf5')
+
+        self.params = {'function': 'compute_conditional_percentiles',
+            'prim_haloprop_key': 'halo_mvir', 'sec_haloprop_key': 'halo_vmax',
+            'row_selection': {'min_halo_mass': np.float64(1e11)}}
+        self.column = np.linspace(0, 1, num_halos)
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_save_and_retrieve(self):
+        store = DerivedColumnStore(self.catalog_fname, store_fname=self.store_fname)
+        assert store.retrieve('halo_vmax_percentile', self.params) is None
+
+        store.save('halo_vmax_percentile', self.params, self.column)
+        result = store.retrieve('halo_vmax_percentile', self.params, num_rows=len(self.column))
+        assert np.all(result == self.column)
+        assert store.stored_columns()[0][0] == 'halo_vmax_percentile'
+
+        # Retrieval requires matching parameters and length
+        other_params = dict(self.params)
+        other_params['sec_haloprop_key'] = 'halo_spin'
+        assert store.retrieve('halo_vmax_percentile', other_params) is None
+        assert store.retrieve('halo_spin_percentile', self.params) is None
+        assert store.retrieve('halo_vmax_percentile', self.params, num_rows=10) is None
+
+        store.clear()
+        assert not os.path.isfile(self.store_fname)
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_tag_is_order_independent(self):
+        params1 = {'a': 1, 'b': np.arange(3)}
+        params2 = {'b': [0, 1, 2], 'a': 1}
+        assert DerivedColumnStore.tag('x', params1) == DerivedColumnStore.tag('x', params2)
+        assert DerivedColumnStore.tag('x', params1) != DerivedColumnStore.tag('y', params1)
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_column_hash(self):
+        halo_mvir = np.array(self.table['halo_mvir'])
+        h = DerivedColumnStore.column_hash(self.table['halo_mvir'])
+        assert h == DerivedColumnStore.column_hash(np.copy(halo_mvir))
+        assert h != DerivedColumnStore.column_hash(halo_mvir[::-1])
+        assert h != DerivedColumnStore.column_hash(halo_mvir.astype('f4'))
+        halo_mvir[50] *= 2
+        assert h != DerivedColumnStore.column_hash(halo_mvir)
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_catalog_change_invalidates_store(self):
+        store = DerivedColumnStore(self.catalog_fname, store_fname=self.store_fname)
+        store.save('halo_vmax_percentile', self.params, self.column)
+
+        self.table[:50].write(self.catalog_fname, path='data', overwrite=True)
+        assert store.retrieve('halo_vmax_percentile', self.params) is None
+        assert store.stored_columns() == []
+
+        store.save('halo_spin_percentile', self.params, self.column[:50])
+        assert len(store.stored_columns()) == 1
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
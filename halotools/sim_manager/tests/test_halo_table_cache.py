@@ -8,6 +8,7 @@ from astropy.table import Table
 import warnings
 import os
 import shutil
+import multiprocessing
 
 from copy import deepcopy
 
@@ -214,6 +215,136 @@ class TestHaloTableCache(TestCase):
         new_entry = cache.determine_log_entry_from_fname(new_fname)
         assert new_entry in cache.log
 
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_ascii_log_migration(self):
+        """ The rows of an existing ASCII log are imported into the SQLite log,
+        and later edits of the ASCII log are picked up.
+        """
+        log_fname = os.path.join(self.dummy_cache_baseloc, 'halo_table_cache_log.txt')
+        log_table = helper_functions.add_new_row_to_cache_log(1,
+            'bolshoi', 'rockstar', 0.0, 'halotools_v0p4')
+        log_table = helper_functions.add_new_row_to_cache_log(1,
+            'bolshoi', 'rockstar', 1.0, 'halotools_v0p4', existing_table=log_table)
+        log_table.write(log_fname, format='ascii')
+
+        cache = HaloTableCache(cache_log_fname=log_fname)
+        assert os.path.isfile(cache.cache_log_db_fname)
+        assert len(cache.log) == 2
+        matches = list(cache.matching_log_entry_generator(simname='bolshoi',
+            halo_finder='rockstar', version_name='halotools_v0p4', redshift=1.01, dz_tol=0.05))
+        assert len(matches) == 1
+        assert matches[0].redshift == get_redshift_string(1.0)
+        assert len(list(cache.matching_log_entry_generator(simname='consuelo'))) == 0
+
+        log_table = helper_functions.add_new_row_to_cache_log(1,
+            'consuelo', 'rockstar', 0.0, 'halotools_v0p4', existing_table=log_table)
+        log_table.write(log_fname, format='ascii', overwrite=True)
+        cache.update_log_from_current_ascii()
+        assert len(cache.log) == 3
+        assert len(list(cache.matching_log_entry_generator(simname='consuelo'))) == 1
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_log_updates_are_shared_on_disk(self):
+        log_fname = os.path.join(self.dummy_cache_baseloc, 'halo_table_cache_log.txt')
+        cache1 = HaloTableCache(cache_log_fname=log_fname)
+        cache2 = HaloTableCache(cache_log_fname=log_fname)
+        assert len(cache1.log) == 0
+
+        cache1.add_entry_to_cache_log(self.good_log_entry)
+        cache2.add_entry_to_cache_log(self.good_log_entry2)
+        assert set(cache2.log) == set([self.good_log_entry, self.good_log_entry2])
+        validation_log_fname = os.path.join(self.dummy_cache_baseloc,
+            'halo_table_cache_validation_log.json')
+        assert all(entry.validation_log_fname == validation_log_fname for entry in cache2.log)
+
+        with warnings.catch_warnings(record=True) as w:
+            warnings.simplefilter("always")
+            cache2.add_entry_to_cache_log(self.good_log_entry)
+            assert "already contains the entry" in str(w[-1].message)
+
+        entry = self.good_log_entry
+        cache1.remove_entry_from_cache_log(entry.simname, entry.halo_finder,
+            entry.version_name, entry.redshift, entry.fname)
+        assert cache1.log == [self.good_log_entry2]
+        assert HaloTableCache(cache_log_fname=log_fname).log == [self.good_log_entry2]
+        assert len(Table.read(log_fname, format='ascii')) == 1
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_ascii_log_deletion(self):
+        """ Deleting the ASCII log empties the cache log, and rows are read
+        from the ASCII file passed to the reader.
+        """
+        log_fname = os.path.join(self.dummy_cache_baseloc, 'halo_table_cache_log.txt')
+        cache = HaloTableCache(cache_log_fname=log_fname)
+        cache.add_entry_to_cache_log(self.good_log_entry)
+        cache.add_entry_to_cache_log(self.good_log_entry2)
+        assert len(HaloTableCache(cache_log_fname=log_fname).log) == 2
+
+        other_fname = os.path.join(self.dummy_cache_baseloc, 'other_log.txt')
+        shutil.copyfile(log_fname, other_fname)
+        os.remove(log_fname)
+        assert len(cache._read_ascii_rows(other_fname)) == 2
+        assert cache._read_ascii_rows(log_fname) == []
+
+        cache.update_log_from_current_ascii()
+        assert cache.log == []
+        assert HaloTableCache(cache_log_fname=log_fname).log == []
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_unwritable_log_database(self):
+        """ The log is read from the ASCII file if the database cannot be created.
+        """
+        log_fname = os.path.join(self.dummy_cache_baseloc, 'halo_table_cache_log.txt')
+        log_table = helper_functions.add_new_row_to_cache_log(1,
+            'bolshoi', 'rockstar', 0.0, 'halotools_v0p4')
+        log_table = helper_functions.add_new_row_to_cache_log(1,
+            'consuelo', 'rockstar', 0.0, 'halotools_v0p4', existing_table=log_table)
+        log_table.write(log_fname, format='ascii')
+
+        # No database can be opened inside a regular file, whatever the permissions
+        db_fname = os.path.join(log_fname, 'halo_table_cache_log.sqlite3')
+        cache = HaloTableCache(cache_log_fname=log_fname, cache_log_db_fname=db_fname)
+        assert len(cache.log) == 2
+        assert not os.path.exists(db_fname)
+
+        rows = cache._log_index.rows(simname='consuelo')
+        assert len(rows) == 1
+        assert cache._log_from_rows(rows)[0].simname == 'consuelo'
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_log_lookup_table(self):
+        cache = HaloTableCache(read_log_from_standard_loc=False)
+        cache.log = [self.good_log_entry]
+        assert len(list(cache.matching_log_entry_generator(simname='good_simname1'))) == 1
+
+        cache.log = [self.good_log_entry2]
+        assert len(list(cache.matching_log_entry_generator(simname='good_simname1'))) == 0
+        assert len(list(cache.matching_log_entry_generator(simname='good_simname2'))) == 1
+
+        cache.log.append(self.good_log_entry)
+        assert len(list(cache.matching_log_entry_generator(simname='good_simname1'))) == 1
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_concurrent_log_updates(self):
+        try:
+            context = multiprocessing.get_context('fork')
+        except (AttributeError, ValueError):
+            return
+        log_fname = os.path.join(self.dummy_cache_baseloc, 'halo_table_cache_log.txt')
+
+        def add_entry(log_entry):
+            HaloTableCache(cache_log_fname=log_fname).add_entry_to_cache_log(log_entry)
+
+        processes = [context.Process(target=add_entry, args=(log_entry, ))
+            for log_entry in (self.good_log_entry, self.good_log_entry2)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+
+        cache = HaloTableCache(cache_log_fname=log_fname)
+        assert set(cache.log) == set([self.good_log_entry, self.good_log_entry2])
+
     def tearDown(self):
         try:
             shutil.rmtree(self.dummy_cache_baseloc)
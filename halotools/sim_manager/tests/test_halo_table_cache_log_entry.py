@@ -22,6 +22,7 @@ except ImportError:
 
 from . import helper_functions
 from ..halo_table_cache_log_entry import HaloTableCacheLogEntry
+from ...custom_exceptions import HalotoolsError
 
 # Determine whether the machine is mine
 # This will be used to select tests whose
@@ -422,6 +423,57 @@ class TestHaloTableCacheLogEntry(TestCase):
         assert log_entry.safe_for_cache is True
         assert "The halo catalog is safe to add to the cache log." == log_entry._cache_safety_message
 
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_validation_log(self):
+        num_scenario = 4
+
+        try:
+            os.remove(self.fnames[num_scenario])
+        except:
+            pass
+
+        log_entry = HaloTableCacheLogEntry(**self.get_scenario_kwargs(num_scenario))
+        log_entry.validation_log_fname = os.path.join(
+            self.dummy_cache_baseloc, 'validation_log.json')
+
+        self.good_table.write(self.fnames[num_scenario], path='data')
+        f = h5py.File(self.fnames[num_scenario])
+        for attr in self.hard_coded_log_attrs:
+            f.attrs[attr] = getattr(log_entry, attr)
+        f.attrs['Lbox'] = 100.
+        f.attrs['particle_mass'] = 1.e8
+        f.close()
+
+        # Without a validation log, nothing is recorded
+        default_log_entry = HaloTableCacheLogEntry(**self.get_scenario_kwargs(num_scenario))
+        assert default_log_entry.validation_log_fname is None
+        assert default_log_entry.safe_for_cache is True
+        assert not os.path.isfile(log_entry.validation_log_fname)
+
+        assert log_entry._retrieve_validation_record() is None
+        assert log_entry.safe_for_cache is True
+        assert log_entry._retrieve_validation_record() == log_entry._file_fingerprint()
+
+        # A valid record means the table is not read again
+        def fail(*args):
+            raise HalotoolsError("The table should not be read")
+        log_entry._verify_table_read = fail
+        assert log_entry.safe_for_cache is True
+        del log_entry._verify_table_read
+
+        # Changing the file invalidates the record
+        bad_table = deepcopy(self.good_table)
+        bad_table['halo_id'][1] = bad_table['halo_id'][0]
+        bad_table.write(self.fnames[num_scenario], path='data', overwrite=True)
+        f = h5py.File(self.fnames[num_scenario])
+        for attr in self.hard_coded_log_attrs:
+            f.attrs[attr] = getattr(log_entry, attr)
+        f.attrs['Lbox'] = 100.
+        f.attrs['particle_mass'] = 1.e8
+        f.close()
+        assert log_entry.safe_for_cache is False
+        assert "must contain a unique set of integers" in log_entry._cache_safety_message
+
     def tearDown(self):
         try:
             shutil.rmtree(self.dummy_cache_baseloc)
@@ -0,0 +1,206 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from astropy.tests.helper import pytest
+import os
+import shutil
+
+import numpy as np
+from astropy.table import Table
+from astropy.utils.misc import NumpyRNGContext
+
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
+from . import helper_functions
+from ..hdf5_table_io import write_table_to_hdf5, read_table_from_hdf5, hdf5_table_colnames
+from ..hdf5_table_io import hdf5_table_num_rows, _read_rows
+from ..hdf5_table_io import hdf5_table_layout, read_hdf5_table_column, HDF5TableAppender
+from ..lazy_halo_table import LazyHaloTable
+
+from ...custom_exceptions import HalotoolsError
+
+__all__ = ('TestHdf5TableIO', )
+
+fixed_seed = 43
+
+
+class TestHdf5TableIO(TestCase):
+    """ Class providing unit testing for `~halotools.sim_manager.write_table_to_hdf5`
+    and `~halotools.sim_manager.read_table_from_hdf5`.
+    """
+
+    def setUp(self):
+        self.dummy_cache_baseloc = helper_functions.dummy_cache_baseloc
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
+        os.makedirs(self.dummy_cache_baseloc)
+
+        num_halos = 1000
+        with NumpyRNGContext(fixed_seed):
+            halo_x = np.random.uniform(0, 250, num_halos)
+            halo_mvir = 10**np.random.uniform(10, 15, num_halos)
+        self.table = Table()
+        self.table['halo_id'] = np.arange(num_halos)
+        self.table['halo_x'] = halo_x.astype('f4')
+        self.table['halo_mvir'] = halo_mvir
+        self.table['halo_upid'] = np.zeros(num_halos, dtype='i8') - 1
+        self.fname = os.path.join(self.dummy_cache_baseloc, 'halos.hdf5')
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_layouts_agree(self):
+        """ Every combination of layout and filters must round-trip the table exactly.
+        """
+        options = ({'table_layout': 'compound'},
+            {'table_layout': 'columnar'},
+            {'table_layout': 'compound', 'chunk_size': 100, 'compression': 'gzip'},
+            {'table_layout': 'columnar', 'chunk_size': 100, 'compression': 'gzip'},
+            {'table_layout': 'columnar', 'compression': 'lzf', 'shuffle': False})
+        row_ranges = [(10, 20), (500, 1000)]
+        idx = np.concatenate((np.arange(10, 20), np.arange(500, 1000)))
+
+        for storage_kwargs in options:
+            write_table_to_hdf5(self.table, self.fname, overwrite=True, **storage_kwargs)
+
+            t = read_table_from_hdf5(self.fname)
+            assert t.keys() == self.table.keys()
+            for key in self.table.keys():
+                assert np.all(t[key] == self.table[key])
+                assert t[key].dtype == self.table[key].dtype
+
+            t = read_table_from_hdf5(self.fname, keys=['halo_mvir', 'halo_id'])
+            assert t.keys() == ['halo_mvir', 'halo_id']
+            assert np.all(t['halo_mvir'] == self.table['halo_mvir'])
+
+            t = read_table_from_hdf5(self.fname, keys=['halo_x'], row_ranges=row_ranges)
+            assert np.all(t['halo_x'] == self.table['halo_x'][idx])
+
+            halos = LazyHaloTable(self.fname)
+            assert halos.colnames == self.table.keys()
+            assert np.all(halos['halo_upid'] == self.table['halo_upid'])
+            expected_memmap = storage_kwargs.get('compression', None) is None
+            assert halos.is_memory_mapped == expected_memmap
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_columnar_layout_on_disk(self):
+        write_table_to_hdf5(self.table, self.fname, table_layout='columnar',
+            compression='gzip', chunk_size=256)
+        f = h5py.File(self.fname, 'r')
+        try:
+            group = f['data']
+            assert hdf5_table_colnames(group) == self.table.keys()
+            assert group['halo_mvir'].compression == 'gzip'
+            assert group['halo_mvir'].chunks == (256, )
+            assert group['halo_mvir'].shuffle
+        finally:
+            f.close()
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_appender(self):
+        """ A table appended chunk by chunk must read back as the original table
+        in either layout, one column at a time or all at once.
+        """
+        data = self.table.as_array()
+        for table_layout in ('compound', 'columnar'):
+            f = h5py.File(self.fname, 'w')
+            try:
+                appender = HDF5TableAppender(f, data.dtype, table_layout=table_layout,
+                    chunk_size=64)
+                for start in range(0, len(data), 300):
+                    appender.append(data[start:start+300])
+                assert appender.num_rows == len(data)
+            finally:
+                f.close()
+
+            f = h5py.File(self.fname, 'r')
+            try:
+                assert hdf5_table_layout(f['data']) == table_layout
+                column = read_hdf5_table_column(f['data'], 'halo_mvir')
+                assert np.all(column == self.table['halo_mvir'])
+                column = read_hdf5_table_column(f['data'], 'halo_id', 10, 20)
+                assert np.all(column == self.table['halo_id'][10:20])
+            finally:
+                f.close()
+
+            t = read_table_from_hdf5(self.fname)
+            for key in self.table.keys():
+                assert np.all(t[key] == self.table[key])
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_row_indices(self):
+        with NumpyRNGContext(fixed_seed):
+            idx = np.random.choice(len(self.table), size=50, replace=False)
+        sorted_idx = np.sort(idx)
+
+        for table_layout in ('compound', 'columnar'):
+            write_table_to_hdf5(self.table, self.fname, table_layout=table_layout,
+                chunk_size=64, overwrite=True)
+
+            t = read_table_from_hdf5(self.fname, row_indices=idx)
+            assert t.keys() == self.table.keys()
+            for key in self.table.keys():
+                assert np.all(t[key] == self.table[key][sorted_idx])
+
+            t = read_table_from_hdf5(self.fname, keys=['halo_id'], row_indices=slice(3, None, 10))
+            assert np.all(t['halo_id'] == self.table['halo_id'][3::10])
+
+            f = h5py.File(self.fname, 'r')
+            try:
+                assert hdf5_table_num_rows(f['data']) == len(self.table)
+                dset = f['data']['halo_mvir'] if table_layout == 'columnar' else f['data']
+                # Blocks much smaller than the table exercise the block-wise reads
+                result = _read_rows(dset, sorted_idx, block_size=16)
+                if table_layout == 'compound':
+                    result = result['halo_mvir']
+                assert np.all(result == self.table['halo_mvir'][sorted_idx])
+            finally:
+                f.close()
+
+        with pytest.raises(HalotoolsError):
+            __ = read_table_from_hdf5(self.fname, row_indices=[len(self.table)])
+        with pytest.raises(HalotoolsError):
+            __ = read_table_from_hdf5(self.fname, row_indices=[0], row_ranges=[(0, 1)])
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_block_size(self):
+        """ Writing block by block must give the same contiguous file as writing at once.
+        """
+        for table_layout in ('compound', 'columnar'):
+            for data in (self.table, self.table.as_array()):
+                write_table_to_hdf5(data, self.fname, table_layout=table_layout,
+                    block_size=64, overwrite=True)
+                t = read_table_from_hdf5(self.fname)
+                assert t.keys() == self.table.keys()
+                for key in self.table.keys():
+                    assert np.all(t[key] == self.table[key])
+                    assert t[key].dtype == self.table[key].dtype
+                assert LazyHaloTable(self.fname).is_memory_mapped
+
+        with pytest.raises(HalotoolsError):
+            write_table_to_hdf5(self.table, self.fname, overwrite=True, block_size=0)
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_bad_options(self):
+        with pytest.raises(HalotoolsError):
+            write_table_to_hdf5(self.table, self.fname, table_layout='rows')
+        with pytest.raises(HalotoolsError):
+            write_table_to_hdf5(self.table, self.fname, compression='bzip2')
+        with pytest.raises(HalotoolsError):
+            write_table_to_hdf5(self.table, self.fname, chunk_size=0)
+
+        write_table_to_hdf5(self.table, self.fname, table_layout='columnar')
+        with pytest.raises(KeyError):
+            __ = read_table_from_hdf5(self.fname, keys=['halo_vmax'])
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
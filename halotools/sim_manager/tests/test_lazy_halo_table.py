@@ -0,0 +1,95 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from astropy.tests.helper import pytest
+import os
+import shutil
+
+import numpy as np
+from astropy.table import Table
+from astropy.utils.misc import NumpyRNGContext
+
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
+from . import helper_functions
+from ..lazy_halo_table import LazyHaloTable
+
+__all__ = ('TestLazyHaloTable', )
+
+fixed_seed = 43
+
+
+class TestLazyHaloTable(TestCase):
+    """ Class providing unit testing for `~halotools.sim_manager.LazyHaloTable`.
+    """
+
+    def setUp(self):
+        self.dummy_cache_baseloc = helper_functions.dummy_cache_baseloc
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
+        os.makedirs(self.dummy_cache_baseloc)
+
+        num_halos = 1000
+        with NumpyRNGContext(fixed_seed):
+            halo_x = np.random.uniform(0, 250, num_halos)
+            halo_mvir = 10**np.random.uniform(10, 15, num_halos)
+        self.table = Table(
+            {'halo_id': np.arange(num_halos),
+            'halo_x': halo_x,
+            'halo_mvir': halo_mvir,
+            'halo_upid': np.zeros(num_halos, dtype='i8') - 1,
+             })
+        self.fname = os.path.join(self.dummy_cache_baseloc, 'halos.hdf5')
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_memory_mapped_columns(self):
+        self.table.write(self.fname, path='data')
+        halos = LazyHaloTable(self.fname)
+        assert halos.is_memory_mapped
+        assert len(halos) == len(self.table)
+        assert set(halos.keys()) == set(self.table.keys())
+        assert np.all(halos['halo_mvir'] == self.table['halo_mvir'])
+        assert np.all(halos['halo_id'] == self.table['halo_id'])
+
+        with pytest.raises(KeyError):
+            __ = halos['halo_vmax']
+
+        t = halos.to_table(['halo_x', 'halo_upid'])
+        assert t.keys() == ['halo_x', 'halo_upid']
+        assert np.all(t['halo_x'] == self.table['halo_x'])
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_compressed_columns(self):
+        f = h5py.File(self.fname, 'w')
+        f.create_dataset('data', data=self.table.as_array(), compression='gzip')
+        f.close()
+
+        halos = LazyHaloTable(self.fname)
+        assert not halos.is_memory_mapped
+        assert np.all(halos['halo_mvir'] == self.table['halo_mvir'])
+        with pytest.raises(ValueError):
+            halos['halo_mvir'][0] = 0.
+
+        memmap_off = LazyHaloTable(self.fname, memmap=False)
+        assert not memmap_off.is_memory_mapped
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_to_table_bad_keys(self):
+        self.table.write(self.fname, path='data')
+        halos = LazyHaloTable(self.fname)
+        with pytest.raises(KeyError):
+            __ = halos.to_table(['halo_x', 'halo_vmax'])
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
@@ -313,6 +313,49 @@ class TestRockstarHlistReader(TestCase):
         reader.read_halocat([], add_supplementary_halocat_columns=False,
             chunk_memory_size=101)
 
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_stream_halocat_to_disk(self):
+        """ Streaming the catalog to disk in many small chunks must produce
+        the same catalog as reading it into memory and writing it all at once.
+        """
+        num_halos = 500
+        temp_fname = os.path.join(self.tmpdir, 'temp_ascii_halo_catalog.list')
+        write_temporary_ascii(num_halos, temp_fname)
+
+        columns_to_keep_dict = (
+            {'halo_spin_bullock': (0, 'f4'), 'halo_id': (1, 'i8'),
+            'halo_upid': (2, 'i8'),
+            'halo_x': (3, 'f4'),
+            'halo_y': (4, 'f4'),
+            'halo_z': (5, 'f4'),
+             })
+        kwargs = dict(input_fname=temp_fname,
+            columns_to_keep_dict=columns_to_keep_dict,
+            simname='bolplanck', halo_finder='rockstar', redshift=11.8008,
+            version_name='dummy', Lbox=250., particle_mass=1.35e8,
+            row_cut_min_dict={'halo_spin_bullock': 0.2}, overwrite=True)
+
+        fname1 = os.path.join(self.tmpdir, 'in_memory.hdf5')
+        reader1 = RockstarHlistReader(output_fname=fname1, **kwargs)
+        reader1.read_halocat(['halo_x'], write_to_disk=True)
+
+        fname2 = os.path.join(self.tmpdir, 'streamed.hdf5')
+        reader2 = RockstarHlistReader(output_fname=fname2, **kwargs)
+        reader2.stream_halocat_to_disk(['halo_x'], chunk_memory_size=1e-3)
+
+        t1 = Table.read(fname1, path='data')
+        t2 = Table.read(fname2, path='data')
+        assert 0 < len(t2) < num_halos
+        assert set(t1.keys()) == set(t2.keys())
+        assert 'halo_hostid' in t2.keys()
+        for key in t1.keys():
+            assert np.all(t1[key] == t2[key])
+
+        f = h5py.File(fname2, 'r')
+        assert str(f.attrs['simname']) == 'bolplanck'
+        assert 'halo_spin_bullock_row_cut_min' in f.attrs
+        f.close()
+
     def tearDown(self):
         try:
             shutil.rmtree(self.tmpdir)
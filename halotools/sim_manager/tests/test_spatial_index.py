@@ -0,0 +1,118 @@
+"""
+"""
+from __future__ import absolute_import, division, print_function
+
+from unittest import TestCase
+from astropy.tests.helper import pytest
+import os
+import shutil
+
+import numpy as np
+from astropy.table import Table
+from astropy.utils.misc import NumpyRNGContext
+
+try:
+    import h5py
+    HAS_H5PY = True
+except ImportError:
+    HAS_H5PY = False
+
+from . import helper_functions
+from ..spatial_index import (spatial_cell_ids, sort_table_by_spatial_cell,
+    write_table_with_spatial_index, read_spatial_index, read_table_subvolume, subvolume_mask)
+
+from ...custom_exceptions import HalotoolsError
+
+__all__ = ('test_sort_table_by_spatial_cell', 'TestSpatiallyIndexedTable')
+
+fixed_seed = 43
+
+
+def _random_halo_table(num_halos, Lbox):
+    with NumpyRNGContext(fixed_seed):
+        pos = np.random.uniform(0, Lbox, (3, num_halos))
+    return Table({'halo_id': np.arange(num_halos),
+        'halo_x': pos[0], 'halo_y': pos[1], 'halo_z': pos[2]})
+
+
+def test_sort_table_by_spatial_cell():
+    Lbox, num_cells_per_dim = 100., 4
+    t = _random_halo_table(1000, Lbox)
+    sorted_table, cell_offsets = sort_table_by_spatial_cell(t, Lbox, num_cells_per_dim)
+
+    assert len(cell_offsets) == num_cells_per_dim**3 + 1
+    assert cell_offsets[-1] == len(t)
+    assert set(sorted_table['halo_id']) == set(t['halo_id'])
+
+    cell_ids = spatial_cell_ids(sorted_table['halo_x'], sorted_table['halo_y'],
+        sorted_table['halo_z'], Lbox, num_cells_per_dim)
+    for i in (0, 17, 63):
+        assert np.all(cell_ids[cell_offsets[i]:cell_offsets[i+1]] == i)
+
+
+def test_spatial_cell_ids_wrap():
+    Lbox = 100.
+    cell_ids = spatial_cell_ids([0, 99.9, 100., -0.1], [0, 0, 0, 0], [0, 0, 0, 0], Lbox, 10)
+    assert np.all(cell_ids == (0, 9*100, 0, 9*100))
+
+
+def test_subvolume_mask():
+    Lbox = 100.
+    x = np.array([1., 5., 95., 50.])
+    yz = np.zeros(4) + 50.
+    mask = subvolume_mask(x, yz, yz, (-10, 10), (0, 100), (0, 100), Lbox)
+    assert np.all(mask == (True, True, True, False))
+
+    with pytest.raises(HalotoolsError):
+        __ = subvolume_mask(x, yz, yz, (10, -10), (0, 100), (0, 100), Lbox)
+
+
+class TestSpatiallyIndexedTable(TestCase):
+    """ Class providing unit testing of spatially indexed hdf5 tables.
+    """
+
+    def setUp(self):
+        self.dummy_cache_baseloc = helper_functions.dummy_cache_baseloc
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
+        os.makedirs(self.dummy_cache_baseloc)
+
+        self.Lbox = 100.
+        self.table = _random_halo_table(5000, self.Lbox)
+        self.fname = os.path.join(self.dummy_cache_baseloc, 'halos.hdf5')
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_read_table_subvolume(self):
+        write_table_with_spatial_index(self.table, self.fname, self.Lbox, 5)
+
+        spatial_index = read_spatial_index(self.fname)
+        assert spatial_index['num_cells_per_dim'] == 5
+        assert spatial_index['position_keys'] == ('halo_x', 'halo_y', 'halo_z')
+
+        limits_list = [((0, 30), (0, 100), (10, 20)),
+            ((-15, 15), (85, 115), (33, 47)),
+            ((-200, 200), (0, 100), (0, 100))]
+        for xlim, ylim, zlim in limits_list:
+            subvol = read_table_subvolume(self.fname, xlim, ylim, zlim)
+            mask = subvolume_mask(self.table['halo_x'], self.table['halo_y'], self.table['halo_z'],
+                xlim, ylim, zlim, self.Lbox)
+            assert set(subvol['halo_id']) == set(self.table['halo_id'][mask])
+            assert len(subvol) == np.count_nonzero(mask)
+
+        subvol = read_table_subvolume(self.fname, (0, 10), (0, 10), (0, 10), keys=['halo_id'])
+        assert subvol.keys() == ['halo_id']
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_missing_spatial_index(self):
+        self.table.write(self.fname, path='data')
+        assert read_spatial_index(self.fname) is None
+        with pytest.raises(HalotoolsError):
+            __ = read_table_subvolume(self.fname, (0, 10), (0, 10), (0, 10))
+
+    def tearDown(self):
+        try:
+            shutil.rmtree(self.dummy_cache_baseloc)
+        except:
+            pass
@@ -2,14 +2,17 @@
 """
 import os
 import shutil
+import gzip
 import numpy as np
 from unittest import TestCase
 from astropy.tests.helper import pytest
 from astropy.table import Table
+from astropy.utils.misc import NumpyRNGContext
 
 from astropy.config.paths import _find_home
 
 from ..tabular_ascii_reader import TabularAsciiReader
+from .. import tabular_ascii_reader
 
 
 # Determine whether the machine is mine
@@ -25,6 +28,8 @@ else:
 
 __all__ = ('TestTabularAsciiReader', )
 
+fixed_seed = 43
+
 
 def write_tabular_data(fname):
     with open(fname, 'w') as f:
@@ -240,6 +245,81 @@ class TestTabularAsciiReader(TestCase):
         substr = "Must choose non-zero size for input ``chunk_memory_size``"
         assert substr in err.value.args[0]
 
+    def test_read_ascii_blocks_and_processes(self):
+        """ The parsed array must not depend on the block size, the number of
+        processes, or whether the file is compressed.
+        """
+        num_rows = 500
+        with NumpyRNGContext(fixed_seed):
+            data = np.random.uniform(0, 1000, (num_rows, 6))
+        data[:, 0] = np.arange(num_rows)
+        with open(self.dummy_fname, 'w') as f:
+            f.write('# id a b c d e\n#\n')
+            for row in data:
+                f.write('%i %.4f %.4f %.4f %.4f %.4f\n' % tuple(row))
+        gzip_fname = self.dummy_fname + '.gz'
+        with open(self.dummy_fname, 'rb') as f_in:
+            with gzip.open(gzip_fname, 'wb') as f_out:
+                f_out.write(f_in.read())
+
+        columns_to_keep_dict = {'id': (0, 'i8'), 'c': (3, 'f8'), 'a': (1, 'f4')}
+        row_cut_min_dict = {'c': 250.}
+
+        reader = TabularAsciiReader(self.dummy_fname, columns_to_keep_dict,
+            row_cut_min_dict=row_cut_min_dict)
+        arr = reader.read_ascii()
+        mask = data[:, 3] > 250.
+        assert np.all(arr['id'] == data[mask, 0])
+        assert np.allclose(arr['c'], data[mask, 3], atol=1e-4)
+        assert np.allclose(arr['a'], data[mask, 1], atol=1e-3)
+
+        for chunk_memory_size in (1e-5, 1e-3):
+            arr2 = reader.read_ascii(chunk_memory_size=chunk_memory_size)
+            assert np.all(arr == arr2)
+            arr3 = reader.read_ascii(chunk_memory_size=chunk_memory_size, num_processes=2)
+            assert np.all(arr == arr3)
+
+        gzip_reader = TabularAsciiReader(gzip_fname, columns_to_keep_dict,
+            row_cut_min_dict=row_cut_min_dict)
+        arr4 = gzip_reader.read_ascii(chunk_memory_size=1e-3, num_processes=2)
+        assert np.all(arr == arr4)
+
+    def test_read_ascii_inconsistent_columns(self):
+        write_tabular_data(self.dummy_fname)
+        with open(self.dummy_fname, 'a') as f:
+            f.write('104  500.  1e13\n')
+        reader = TabularAsciiReader(self.dummy_fname, {'vmax': (1, 'f4')})
+        with pytest.raises(ValueError) as err:
+            arr = reader.read_ascii()
+        substr = "does not have the same number of columns"
+        assert substr in err.value.args[0]
+
+    def test_parse_data_block_pieces(self):
+        """ Split a block with header, blank and indented lines and Windows line endings
+        into pieces of a few lines, and verify that the inconsistent line
+        of a later piece is reported.
+        """
+        block = (b'# id  vmax  mvir\n#\n100  100.  1e9\n\n  101\t200.  1e10 \r\n'
+            b'102  300.  1e11\n103  400.  1e12\n104  500.  1e13\n')
+        reader = TabularAsciiReader(self.dummy_fname, {'mvir': (2, 'f8'), 'id': (0, 'i8')})
+
+        piece_size = tabular_ascii_reader._parse_piece_size
+        try:
+            for size in (1, 20, piece_size):
+                tabular_ascii_reader._parse_piece_size = size
+                arr = reader._parse_data_block(block)
+                assert np.all(arr['id'] == np.arange(100, 105))
+                assert np.allclose(arr['mvir'], 10.**np.arange(9, 14))
+
+            tabular_ascii_reader._parse_piece_size = 20
+            with pytest.raises(ValueError) as err:
+                reader._parse_data_block(block + b'105  600.\n')
+            substr = "does not have the same number of columns (3)"
+            assert substr in err.value.args[0]
+            assert "105  600." in err.value.args[0]
+        finally:
+            tabular_ascii_reader._parse_piece_size = piece_size
+
     def tearDown(self):
         try:
             shutil.rmtree(self.tmpdir)
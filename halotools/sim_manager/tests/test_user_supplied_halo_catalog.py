@@ -429,6 +429,57 @@ class TestUserSuppliedHaloCatalog(TestCase):
             update_ascii=True,
             delete_corresponding_halo_catalog=True)
 
+    def test_copy_default(self):
+        halocat = UserSuppliedHaloCatalog(Lbox=200,
+            particle_mass=100, redshift=self.redshift,
+            **self.good_halocat_args)
+        assert not np.shares_memory(halocat.halo_table['halo_mass'], self.halo_mass)
+
+    def test_copy_false_memmap(self):
+        fname = os.path.join(self.dummy_cache_baseloc, 'halo_mass.npy')
+        np.save(fname, self.halo_mass)
+        halo_mass = np.load(fname, mmap_mode='r')
+        assert isinstance(halo_mass, np.memmap)
+
+        args = dict(self.good_halocat_args)
+        args['halo_mass'] = halo_mass
+        halocat = UserSuppliedHaloCatalog(Lbox=200,
+            particle_mass=100, redshift=self.redshift, copy=False, **args)
+        assert not hasattr(halocat, 'copy')
+        assert 'halo_mass' in halocat.halo_table.keys()
+        assert np.shares_memory(halocat.halo_table['halo_mass'], halo_mass)
+        assert np.shares_memory(halocat.halo_table['halo_x'], self.halo_x)
+        assert np.all(halocat.halo_table['halo_mass'] == self.halo_mass)
+        del halocat, halo_mass
+
+    @pytest.mark.skipif('not HAS_H5PY')
+    def test_add_halocat_to_cache_block_size(self):
+        halocat = UserSuppliedHaloCatalog(Lbox=200,
+            particle_mass=100, redshift=self.redshift, copy=False,
+            **self.good_halocat_args)
+
+        fname = os.path.join(self.dummy_cache_baseloc, 'abc.hdf5')
+        halocat.add_halocat_to_cache(
+            fname, 'dummy_simname', 'dummy_halo_finder',
+            'dummy_version_name', 'dummy processing notes',
+            overwrite=True, block_size=7)
+
+        t = Table.read(fname, path='data')
+        assert len(t) == self.Nhalos
+        for key in self.good_halocat_args.keys():
+            assert np.all(t[key] == halocat.halo_table[key])
+
+        cache = HaloTableCache()
+        cache.remove_entry_from_cache_log(
+            halocat.log_entry.simname,
+            halocat.log_entry.halo_finder,
+            halocat.log_entry.version_name,
+            halocat.log_entry.redshift,
+            halocat.log_entry.fname,
+            raise_non_existence_exception=True,
+            update_ascii=True,
+            delete_corresponding_halo_catalog=True)
+
     def tearDown(self):
         try:
             shutil.rmtree(self.dummy_cache_baseloc)
@@ -12,12 +12,33 @@ from astropy.table import Table, Column
 from .halo_table_cache import HaloTableCache
 from .halo_table_cache_log_entry import HaloTableCacheLogEntry, get_redshift_string
 from .user_supplied_ptcl_catalog import UserSuppliedPtclCatalog
+from .spatial_index import write_table_with_spatial_index
+from .hdf5_table_io import write_table_to_hdf5
 
 from ..utils.array_utils import custom_len
 from ..custom_exceptions import HalotoolsError
 
 __all__ = ('UserSuppliedHaloCatalog', )
 
+# Number of rows reduced at a time when validating the columns of the catalog
+_validation_block_size = 2**20
+
+
+def _blockwise_min_max(arr, block_size=_validation_block_size):
+    """ Minimum and maximum of the input array, reduced one block at a time
+    so that memory-mapped arrays are paged in only once and no full-length
+    temporary arrays are created.
+    """
+    arr = np.asarray(arr)
+    if len(arr) <= block_size:
+        return arr.min(), arr.max()
+    mins, maxs = [], []
+    for start in range(0, len(arr), block_size):
+        block = arr[start:start+block_size]
+        mins.append(block.min())
+        maxs.append(block.max())
+    return min(mins), max(maxs)
+
 
 class UserSuppliedHaloCatalog(object):
     """ Class used to transform a user-provided halo catalog
@@ -57,6 +78,13 @@ class UserSuppliedHaloCatalog(object):
             randomly selected from the snapshot. At a minimum, the table must have
             columns ``x``, ``y`` and ``z``. Default is None.
 
+        copy : bool, optional
+            If True, the ``halo_table`` stores copies of the input arrays.
+            If False, the columns of the ``halo_table`` are views of the input arrays,
+            including `numpy.memmap` arrays, so that no additional memory is used
+            and changes to the input arrays are reflected in the ``halo_table``.
+            Default is True.
+
         Notes
         -------
         This class is tested by
@@ -143,9 +171,18 @@ class UserSuppliedHaloCatalog(object):
         >>> d = {key:table_of_halos[key] for key in table_of_halos.keys()}
         >>> halocat = UserSuppliedHaloCatalog(simname = simname, redshift = redshift, Lbox = Lbox, particle_mass = particle_mass, **d)
 
+        If your halo catalog is already stored in large arrays, or in `numpy.memmap` arrays,
+        set ``copy`` to False so that the ``halo_table`` wraps your arrays rather than
+        copying them. Passing a ``block_size`` to `add_halocat_to_cache` then writes
+        the catalog to disk a block of rows at a time:
+
+        >>> halocat = UserSuppliedHaloCatalog(copy = False, simname = simname, redshift = redshift, Lbox = Lbox, particle_mass = particle_mass, **d)
+        >>> halocat.add_halocat_to_cache(fname, simname, halo_finder, version_name, processing_notes, block_size = int(1e6)) # doctest: +SKIP
+
         """
-        halo_table_dict, metadata_dict = self._parse_constructor_kwargs(**kwargs)
-        self.halo_table = Table(halo_table_dict)
+        copy = kwargs.pop('copy', True)
+        halo_table_dict, metadata_dict = self._parse_constructor_kwargs(copy=copy, **kwargs)
+        self.halo_table = Table(halo_table_dict, copy=copy)
 
         self._test_metadata_dict(**metadata_dict)
         for key, value in metadata_dict.items():
@@ -153,12 +190,15 @@ class UserSuppliedHaloCatalog(object):
 
         self._passively_bind_ptcl_table(**kwargs)
 
-    def _parse_constructor_kwargs(self, **kwargs):
+    def _parse_constructor_kwargs(self, copy=True, **kwargs):
         """ Private method interprets constructor keyword arguments and returns two
         dictionaries. One stores the halo catalog columns, the other stores the metadata.
 
         Parameters
         ------------
+        copy : bool, optional
+            If False, the returned columns are views of the input arrays. Default is True.
+
         **kwargs : keyword arguments passed to constructor
 
         Returns
@@ -172,7 +212,7 @@ class UserSuppliedHaloCatalog(object):
         """
 
         try:
-            halo_id = np.array(kwargs['halo_id'])
+            halo_id = np.asarray(kwargs['halo_id'])
             assert type(halo_id) is np.ndarray
             Nhalos = custom_len(halo_id)
             assert Nhalos > 1
@@ -181,9 +221,13 @@ class UserSuppliedHaloCatalog(object):
                 "storing an ndarray of length Nhalos > 1.\n")
             raise HalotoolsError(msg)
 
+        if copy is True:
+            as_column = np.array
+        else:
+            as_column = np.asarray
         halo_table_dict = (
-            {key: np.array(kwargs[key]) for key in kwargs
-            if ((type(kwargs[key]) is np.ndarray) | (type(kwargs[key]) is Column)) and
+            {key: as_column(kwargs[key]) for key in kwargs
+            if isinstance(kwargs[key], (np.ndarray, Column)) and
             (custom_len(kwargs[key]) == Nhalos) and (key[:5] == 'halo_')})
         self._test_halo_table_dict(halo_table_dict)
 
@@ -226,17 +270,10 @@ class UserSuppliedHaloCatalog(object):
 
         Lbox = metadata_dict['Lbox']
         try:
-            x, y, z = (
-                self.halo_table['halo_x'],
-                self.halo_table['halo_y'],
-                self.halo_table['halo_z']
-                )
-            assert np.all(x >= 0)
-            assert np.all(x <= Lbox)
-            assert np.all(y >= 0)
-            assert np.all(y <= Lbox)
-            assert np.all(z >= 0)
-            assert np.all(z <= Lbox)
+            for key in ('halo_x', 'halo_y', 'halo_z'):
+                xmin, xmax = _blockwise_min_max(self.halo_table[key])
+                assert xmin >= 0
+                assert xmax <= Lbox
         except AssertionError:
             msg = ("The ``halo_x``, ``halo_y`` and ``halo_z`` columns must only store arrays\n"
                 "that are bound by 0 and the input ``Lbox``. \n")
@@ -249,7 +286,7 @@ class UserSuppliedHaloCatalog(object):
             raise HalotoolsError(msg)
 
         for key, value in metadata_dict.items():
-            if (type(value) == np.ndarray):
+            if isinstance(value, np.ndarray):
                 if custom_len(value) == len(self.halo_table['halo_id']):
                     msg = ("\nThe input ``" + key + "`` argument stores a length-Nhalos ndarray.\n"
                         "However, this key is being interpreted as metadata because \n"
@@ -309,7 +346,9 @@ class UserSuppliedHaloCatalog(object):
 
     def add_halocat_to_cache(self,
             fname, simname, halo_finder, version_name, processing_notes,
-            overwrite=False, **additional_metadata):
+            overwrite=False, spatial_index_cells_per_dim=None,
+            table_layout='compound', chunk_size=None, compression=None, shuffle=True,
+            block_size=None, **additional_metadata):
         """
         Parameters
         ------------
@@ -341,6 +380,39 @@ class UserSuppliedHaloCatalog(object):
             If the chosen ``fname`` already exists, then you must set ``overwrite``
             to True in order to write the file to disk. Default is False.
 
+        spatial_index_cells_per_dim : int, optional
+            If set, the halos are stored sorted by their cell in a regular grid
+            with ``spatial_index_cells_per_dim`` cells per dimension, together with
+            an index of the rows of each cell. This allows the
+            `~halotools.sim_manager.CachedHaloCatalog.load_halo_table_subvolume`
+            method to read only the halos in the requested subvolume.
+            The ``halo_table`` bound to the instance is not reordered.
+            Default is None, in which case the halos are stored in their current order.
+
+        table_layout : string, optional
+            Either 'compound' or 'columnar'. With the default 'compound' layout,
+            the halos are stored in a single hdf5 dataset with one field per column.
+            With the 'columnar' layout each column is stored in its own dataset,
+            so that reading a few columns of a wide catalog is much faster.
+
+        chunk_size : int, optional
+            Number of rows in each hdf5 chunk. Default is None, in which case
+            uncompressed data are stored contiguously and compressed data
+            are chunked by h5py.
+
+        compression : string, optional
+            Compression filter, either None, 'gzip' or 'lzf'. Default is None.
+
+        shuffle : bool, optional
+            If True, the byte-shuffle filter is applied before compression.
+            Ignored if ``compression`` is None. Default is True.
+
+        block_size : int, optional
+            If set, the catalog is written to disk ``block_size`` rows at a time,
+            so that no copy of the entire ``halo_table`` is made in memory.
+            Ignored if ``spatial_index_cells_per_dim`` is set, since sorting
+            the halos by cell requires a copy. Default is None.
+
         **additional_metadata : sequence of strings, optional
             Each keyword of ``additional_metadata`` defines the name
             of a piece of metadata stored in the hdf5 file. The
@@ -402,7 +474,14 @@ class UserSuppliedHaloCatalog(object):
         ############################################################
         # Now write the file to disk and add the appropriate metadata
 
-        self.halo_table.write(fname, path='data', overwrite=overwrite)
+        storage_kwargs = dict(table_layout=table_layout, chunk_size=chunk_size,
+            compression=compression, shuffle=shuffle)
+        if spatial_index_cells_per_dim is None:
+            write_table_to_hdf5(self.halo_table, fname, overwrite=overwrite,
+                block_size=block_size, **storage_kwargs)
+        else:
+            write_table_with_spatial_index(self.halo_table, fname, self.Lbox,
+                spatial_index_cells_per_dim, overwrite=overwrite, **storage_kwargs)
 
         f = h5py.File(fname)
 
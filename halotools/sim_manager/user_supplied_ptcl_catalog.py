@@ -17,6 +17,8 @@ except ImportError:
 from .ptcl_table_cache import PtclTableCache
 from .ptcl_table_cache_log_entry import PtclTableCacheLogEntry
 from .halo_table_cache_log_entry import get_redshift_string
+from .spatial_index import write_table_with_spatial_index
+from .hdf5_table_io import write_table_to_hdf5
 
 from ..utils.array_utils import custom_len
 from ..custom_exceptions import HalotoolsError
@@ -221,7 +223,8 @@ class UserSuppliedPtclCatalog(object):
             raise HalotoolsError(msg)
 
     def add_ptclcat_to_cache(self, fname, simname, version_name,
-                             processing_notes, overwrite=False):
+                             processing_notes, overwrite=False, spatial_index_cells_per_dim=None,
+                             table_layout='compound', chunk_size=None, compression=None, shuffle=True):
 
         """
         Parameters
@@ -249,6 +252,32 @@ class UserSuppliedPtclCatalog(object):
             If the chosen ``fname`` already exists, then you must set ``overwrite``
             to True in order to write the file to disk. Default is False.
 
+        spatial_index_cells_per_dim : int, optional
+            If set, the particles are stored sorted by their cell in a regular grid
+            with ``spatial_index_cells_per_dim`` cells per dimension, together with
+            an index of the rows of each cell. This allows the
+            `~halotools.sim_manager.CachedHaloCatalog.load_ptcl_table_subvolume`
+            method to read only the particles in the requested subvolume.
+            Default is None, in which case the particles are stored in their current order.
+
+        table_layout : string, optional
+            Either 'compound' or 'columnar'. With the default 'compound' layout,
+            the particles are stored in a single hdf5 dataset with one field per column.
+            With the 'columnar' layout each column is stored in its own dataset,
+            so that reading a few columns of a wide catalog is much faster.
+
+        chunk_size : int, optional
+            Number of rows in each hdf5 chunk. Default is None, in which case
+            uncompressed data are stored contiguously and compressed data
+            are chunked by h5py.
+
+        compression : string, optional
+            Compression filter, either None, 'gzip' or 'lzf'. Default is None.
+
+        shuffle : bool, optional
+            If True, the byte-shuffle filter is applied before compression.
+            Ignored if ``compression`` is None. Default is True.
+
         """
 
         ############################################################
@@ -285,7 +314,14 @@ class UserSuppliedPtclCatalog(object):
         ############################################################
         # Now write the file to disk and add the appropriate metadata
 
-        self.ptcl_table.write(fname, path='data', overwrite=overwrite)
+        storage_kwargs = dict(table_layout=table_layout, chunk_size=chunk_size,
+            compression=compression, shuffle=shuffle)
+        if spatial_index_cells_per_dim is None:
+            write_table_to_hdf5(self.ptcl_table, fname, overwrite=overwrite, **storage_kwargs)
+        else:
+            write_table_with_spatial_index(self.ptcl_table, fname, self.Lbox,
+                spatial_index_cells_per_dim, position_keys=('x', 'y', 'z'),
+                overwrite=overwrite, **storage_kwargs)
 
         f = h5py.File(fname)
 
@@ -10,3 +10,4 @@ from .value_added_halo_table_functions import *
 from .group_member_generator import group_member_generator
 from .crossmatch import crossmatch
 from .array_indexing_manipulations import *
+from .random_streams import *
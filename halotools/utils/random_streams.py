@@ -0,0 +1,253 @@
+"""
+Functions providing independent, reproducible streams of random numbers
+for the Monte Carlo methods of Halotools models.
+
+Every stream is a `numpy.random.Generator` driven by the counter-based
+`numpy.random.Philox` bit generator. A stream is identified by the
+user-supplied ``seed`` together with a sequence of ``stream_keys``,
+e.g., the ``gal_type`` of a component model and the name of the
+quantity being drawn. Streams with the same ``seed`` but different
+``stream_keys`` are statistically independent, and no function in this
+module touches the global `numpy.random` state, so streams can be drawn
+concurrently from separate threads.
+
+With numpy versions predating ``numpy.random.SeedSequence`` (numpy < 1.17),
+each stream is instead a `numpy.random.RandomState` seeded by a hash of
+``seed`` and ``stream_keys``, which supports the subset of the
+`numpy.random.Generator` API used by Halotools. Realizations for a fixed seed
+then differ from those drawn with more recent versions of numpy.
+"""
+import hashlib
+import numpy as np
+
+from ..custom_exceptions import HalotoolsError
+
+__all__ = ('rng_stream', 'spawn_rng_streams', 'spawn_integer_seeds',
+    'mc_bernoulli', 'mc_poisson')
+
+_has_generator_api = hasattr(np.random, 'SeedSequence')
+
+
+class _LegacyRandomStream(np.random.RandomState):
+    """ `numpy.random.RandomState` providing the ``random`` and ``integers`` methods
+    of `numpy.random.Generator`, used as a random-number stream when the
+    installed numpy predates ``numpy.random.SeedSequence``.
+    """
+
+    def random(self, size=None):
+        return self.random_sample(size)
+
+    def integers(self, low, high=None, size=None):
+        return self.randint(low, high, size)
+
+
+if _has_generator_api:
+    _generator_types = (np.random.Generator, )
+else:
+    _generator_types = (_LegacyRandomStream, )
+
+
+
+def _stream_key_to_int(key):
+    """ Map a stream key onto a non-negative integer that is stable
+    across Python sessions (unlike the built-in `hash`).
+    """
+    if isinstance(key, (int, np.integer)) and not isinstance(key, bool) and key >= 0:
+        return int(key)
+    digest = hashlib.md5(str(key).encode('utf-8')).hexdigest()
+    return int(digest[:16], 16)
+
+
+def _legacy_rng_stream(seed, spawn_key):
+    """ Return the `_LegacyRandomStream` labeled by ``seed`` and ``spawn_key``.
+    The stream is seeded by the md5 digest of both, split into 32-bit words.
+    """
+    if seed is None:
+        return _LegacyRandomStream(None)
+    digest = hashlib.md5(str((seed, ) + tuple(spawn_key)).encode('utf-8')).hexdigest()
+    seed_words = [int(digest[i:i+8], 16) for i in range(0, len(digest), 8)]
+    return _LegacyRandomStream(seed_words)
+
+
+def rng_stream(seed=None, *stream_keys):
+    """ Return a `numpy.random.Generator` for the random-number stream
+    labeled by ``seed`` and ``stream_keys``.
+
+    Parameters
+    ----------
+    seed : int or `numpy.random.Generator`, optional
+        Random number seed. Default is None, in which case fresh entropy
+        is drawn from the operating system and the stream is stochastic.
+        If a `numpy.random.Generator` is passed, it is returned unchanged
+        and ``stream_keys`` is ignored, so that callers can thread
+        their own generator through a sequence of Monte Carlo methods.
+
+    *stream_keys : sequence of ints or strings
+        Labels distinguishing this stream from all other streams
+        derived from the same ``seed``,
+        e.g., ``('satellites', 'occupation')``.
+
+    Returns
+    -------
+    rng : `numpy.random.Generator`
+
+    Notes
+    -----
+    A `numpy.random.Generator` instance is not safe to share between threads.
+    Concurrent code should call `rng_stream` (or `spawn_rng_streams`)
+    once per thread or per chunk of data, which is cheap.
+
+    Examples
+    --------
+    >>> rng = rng_stream(43, 'centrals', 'occupation')
+    >>> uran = rng.random(100)
+
+    Two streams derived from the same seed are independent:
+
+    >>> uran_sats = rng_stream(43, 'satellites', 'occupation').random(100)
+    >>> assert not np.allclose(uran, uran_sats)
+    """
+    if isinstance(seed, _generator_types):
+        return seed
+
+    if seed is not None:
+        try:
+            seed = int(seed)
+            assert seed >= 0
+        except (TypeError, ValueError, AssertionError):
+            msg = ("\nThe ``seed`` argument must be None, a non-negative integer, \n"
+                "or an instance of numpy.random.Generator.\n")
+            raise HalotoolsError(msg)
+
+    spawn_key = tuple(_stream_key_to_int(key) for key in stream_keys)
+    if not _has_generator_api:
+        return _legacy_rng_stream(seed, spawn_key)
+    seed_sequence = np.random.SeedSequence(entropy=seed, spawn_key=spawn_key)
+    return np.random.Generator(np.random.Philox(seed_sequence))
+
+
+def spawn_rng_streams(seed, num_streams, *stream_keys):
+    """ Return a list of ``num_streams`` independent `numpy.random.Generator` instances,
+    one for each chunk of a calculation that has been split up, e.g., across threads.
+
+    Parameters
+    ----------
+    seed : int or None
+        Random number seed. If None, each stream is stochastic.
+
+    num_streams : int
+        Number of streams to return.
+
+    *stream_keys : sequence of ints or strings
+        Labels shared by all of the returned streams. The i^th stream
+        is identical to ``rng_stream(seed, *stream_keys, 'chunk', i)``,
+        so results do not depend on how the chunks are scheduled.
+
+    Returns
+    -------
+    rng_list : list
+        List of ``num_streams`` `numpy.random.Generator` instances.
+
+    Examples
+    --------
+    >>> rng_list = spawn_rng_streams(43, 4, 'satellites', 'occupation')
+    >>> chunks = [rng.random(10) for rng in rng_list]
+    """
+    if isinstance(seed, _generator_types):
+        msg = ("\nThe ``seed`` argument of spawn_rng_streams must be None or an integer.\n")
+        raise HalotoolsError(msg)
+    stream_keys = tuple(stream_keys) + ('chunk', )
+    return [rng_stream(seed, *(stream_keys + (i, ))) for i in range(int(num_streams))]
+
+
+def spawn_integer_seeds(seed, num_seeds):
+    """ Return a list of ``num_seeds`` integer seeds derived from ``seed``,
+    e.g., one seed for each Monte Carlo realization of an ensemble of mocks.
+
+    Unlike the generators returned by `spawn_rng_streams`, integer seeds can be
+    sent to other processes and passed to any function accepting a ``seed`` argument.
+
+    Parameters
+    ----------
+    seed : int or None
+        Random number seed. If None, the returned seeds are stochastic.
+
+    num_seeds : int
+        Number of seeds to return.
+
+    Returns
+    -------
+    seed_list : list
+        List of ``num_seeds`` non-negative integers.
+
+    Examples
+    --------
+    >>> seed_list = spawn_integer_seeds(43, 10)
+    """
+    if isinstance(seed, _generator_types):
+        msg = ("\nThe ``seed`` argument of spawn_integer_seeds must be None or an integer.\n")
+        raise HalotoolsError(msg)
+    if not _has_generator_api:
+        rng = _legacy_rng_stream(seed, (_stream_key_to_int('spawn_integer_seeds'), ))
+        return [int(s) for s in rng.randint(0, 2**31 - 1, int(num_seeds))]
+    seed_sequence = np.random.SeedSequence(entropy=seed)
+    return [int(s) for s in seed_sequence.generate_state(int(num_seeds), dtype=np.uint32)]
+
+
+def mc_bernoulli(prob, seed=None, stream_keys=()):
+    """ Draw a Monte Carlo realization of Bernoulli trials.
+
+    Parameters
+    ----------
+    prob : array_like
+        Length-N array storing the probability of success of each trial.
+
+    seed : int or `numpy.random.Generator`, optional
+        Random number seed. Default is None, which will produce stochastic results.
+
+    stream_keys : tuple, optional
+        Labels of the random number stream. See `rng_stream`.
+
+    Returns
+    -------
+    result : array
+        Length-N boolean array storing the outcome of each trial.
+
+    Examples
+    --------
+    >>> prob = np.linspace(0, 1, 100)
+    >>> result = mc_bernoulli(prob, seed=43, stream_keys=('centrals', 'occupation'))
+    """
+    prob = np.atleast_1d(prob)
+    rng = rng_stream(seed, *stream_keys)
+    return rng.random(prob.shape[0]) < prob
+
+
+def mc_poisson(mean, seed=None, stream_keys=()):
+    """ Draw a Monte Carlo realization of Poisson-distributed integers.
+
+    Parameters
+    ----------
+    mean : array_like
+        Length-N array storing the first moment of each Poisson distribution.
+        Non-positive values result in zero.
+
+    seed : int or `numpy.random.Generator`, optional
+        Random number seed. Default is None, which will produce stochastic results.
+
+    stream_keys : tuple, optional
+        Labels of the random number stream. See `rng_stream`.
+
+    Returns
+    -------
+    result : array
+        Length-N integer array.
+
+    Examples
+    --------
+    >>> mean = np.logspace(-2, 2, 100)
+    >>> result = mc_poisson(mean, seed=43, stream_keys=('satellites', 'occupation'))
+    """
+    mean = np.maximum(np.atleast_1d(mean).astype(np.float64), 0.)
+    rng = rng_stream(seed, *stream_keys)
+    return rng.poisson(mean)
@@ -5,7 +5,10 @@ Modules performing small, commonly used tasks throughout the package.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 from math import ceil
+import hashlib
 import numpy as np
+from collections import OrderedDict
+from threading import Lock
 from warnings import warn
 from astropy.table import Table
 
@@ -13,6 +16,14 @@ from ..custom_exceptions import HalotoolsError
 
 __all__ = ['SampleSelector']
 
+# Cache of the results of compute_conditional_percentiles called with use_cache=True,
+# so that multiple assembly-biased components sharing a halo catalog
+# only compute the same percentiles once. Least recently used entries are evicted
+# once the cached arrays exceed _max_cached_percentiles_nbytes in total.
+_max_cached_percentiles_nbytes = 64*1024**2
+_conditional_percentiles_cache = OrderedDict()
+_conditional_percentiles_cache_lock = Lock()
+
 
 def compute_conditional_percentiles(**kwargs):
     """
@@ -55,6 +66,13 @@ def compute_conditional_percentiles(**kwargs):
         Logarithmic spacing of bins of the mass-like variable within which
         we will assign secondary property percentiles. Default is 0.2.
 
+    use_cache : bool, optional
+        If True, the result is cached on the contents of the input
+        primary and secondary properties and on the binning, so that repeated calls
+        on the same catalog only pay for hashing the inputs and copying the result.
+        The cache is shared by the whole process and holds at most 64 Mb of results.
+        Default is False.
+
     Examples
     --------
     >>> from halotools.sim_manager import FakeSim
@@ -68,6 +86,10 @@ def compute_conditional_percentiles(**kwargs):
     *smaller* values of the secondary property
     receive *smaller* values of the returned percentile.
 
+    The percentiles of all bins are computed together with a single
+    `numpy.lexsort` on (bin, secondary property), followed by a segmented rank,
+    so the cost is :math:`O(N\\log N)` regardless of the number of bins.
+
     """
 
     if 'table' in kwargs:
@@ -91,6 +113,10 @@ def compute_conditional_percentiles(**kwargs):
                 "you must pass a ``prim_haloprop`` and ``sec_haloprop`` arguments\n")
             raise HalotoolsError(msg)
 
+    # Warnings issued while binning, stored with cached results so that they are
+    # issued again whenever the result is retrieved from the cache
+    binning_warnings = []
+
     def compute_prim_haloprop_bins(dlog10_prim_haloprop=0.05, **kwargs):
         """
         Parameters
@@ -143,11 +169,14 @@ def compute_conditional_percentiles(**kwargs):
                 "input array of primary halo property that were larger than the largest value\n"
                 "of the input ``prim_haloprop_bin_boundaries``. All such points will be assigned\n"
                 "to the largest bin.\nBe sure that this is the behavior you expect for your application.\n\n")
-            warn(msg)
+            binning_warnings.append(msg)
             output = np.where(output == Nbins, Nbins-1, output)
 
         return output
 
+    prim_haloprop = np.asarray(prim_haloprop)
+    sec_haloprop = np.asarray(sec_haloprop)
+
     compute_prim_haloprop_bins_dict = {}
     compute_prim_haloprop_bins_dict['prim_haloprop'] = prim_haloprop
     try:
@@ -159,29 +188,85 @@ def compute_conditional_percentiles(**kwargs):
         compute_prim_haloprop_bins_dict['dlog10_prim_haloprop'] = kwargs['dlog10_prim_haloprop']
     except KeyError:
         pass
+
+    use_cache = kwargs.get('use_cache', False)
+    if use_cache is True:
+        cache_key = _conditional_percentiles_cache_key(
+            prim_haloprop, sec_haloprop, compute_prim_haloprop_bins_dict)
+        with _conditional_percentiles_cache_lock:
+            try:
+                # Re-insert the entry so that it becomes the most recently used
+                cached_output, cached_warnings = _conditional_percentiles_cache.pop(cache_key)
+                _conditional_percentiles_cache[cache_key] = (cached_output, cached_warnings)
+            except KeyError:
+                cached_output = None
+        if cached_output is not None:
+            for msg in cached_warnings:
+                warn(msg)
+            return cached_output.copy()
+
     prim_haloprop_bins = compute_prim_haloprop_bins(**compute_prim_haloprop_bins_dict)
+    for msg in binning_warnings:
+        warn(msg)
+    output = _segmented_rank_percentiles(prim_haloprop_bins, sec_haloprop)
+
+    if (use_cache is True) and (output.nbytes <= _max_cached_percentiles_nbytes):
+        with _conditional_percentiles_cache_lock:
+            _conditional_percentiles_cache[cache_key] = (output.copy(), tuple(binning_warnings))
+            cached_nbytes = sum(entry[0].nbytes for entry in _conditional_percentiles_cache.values())
+            while cached_nbytes > _max_cached_percentiles_nbytes:
+                __, (evicted_output, __) = _conditional_percentiles_cache.popitem(last=False)
+                cached_nbytes -= evicted_output.nbytes
 
-    output = np.zeros_like(prim_haloprop)
+    return output
 
-    # sort on secondary property only with each mass bin
-    bins_in_halocat = set(prim_haloprop_bins)
-    for ibin in bins_in_halocat:
-        indices_of_prim_haloprop_bin = np.where(prim_haloprop_bins == ibin)[0]
 
-        num_in_bin = len(sec_haloprop[indices_of_prim_haloprop_bin])
+def _segmented_rank_percentiles(bin_numbers, values):
+    """ Within each group of points sharing the same ``bin_numbers``,
+    compute the rank-order percentile of ``values``.
 
-        # Find the indices that sort by the secondary property
-        ind_sorted = np.argsort(sec_haloprop[indices_of_prim_haloprop_bin])
+    The rank of each point within its group is (1 + the number of points in the group
+    that precede it after sorting), divided by the number of points in the group,
+    so that the largest value in each group has percentile unity.
+    Ties are broken by the order in which the points appear in the input.
+    """
+    npts = len(values)
+    output = np.zeros(npts, dtype='f8')
+    if npts == 0:
+        return output
 
-        percentiles = np.zeros(num_in_bin)
-        percentiles[ind_sorted] = (np.arange(num_in_bin) + 1.0) / float(num_in_bin)
+    # The last key passed to lexsort is the primary sort key
+    idx_sorted = np.lexsort((values, bin_numbers))
+    sorted_bin_numbers = bin_numbers[idx_sorted]
 
-        # place the percentiles into the catalog
-        output[indices_of_prim_haloprop_bin] = percentiles
+    group_starts = np.concatenate(([0], np.flatnonzero(np.diff(sorted_bin_numbers)) + 1))
+    group_sizes = np.diff(np.append(group_starts, npts))
+    group_index = np.repeat(np.arange(len(group_starts)), group_sizes)
 
+    rank_in_group = np.arange(npts) - group_starts[group_index]
+    output[idx_sorted] = (rank_in_group + 1.0) / group_sizes[group_index]
     return output
 
 
+def _conditional_percentiles_cache_key(prim_haloprop, sec_haloprop, binning_dict):
+    """ Fingerprint of the inputs to `compute_conditional_percentiles`.
+    Hashing the raw bytes is much cheaper than the sort that it saves, and guarantees
+    that an in-place modification of a halo catalog column is never served stale results.
+    """
+    h = hashlib.md5()
+    for arr in (prim_haloprop, sec_haloprop):
+        arr = np.ascontiguousarray(arr)
+        h.update(str((arr.dtype.str, arr.shape)).encode('utf-8'))
+        h.update(arr)
+    if 'prim_haloprop_bin_boundaries' in binning_dict:
+        h.update(b'prim_haloprop_bin_boundaries')
+        h.update(np.ascontiguousarray(binning_dict['prim_haloprop_bin_boundaries'], dtype='f8'))
+    if 'dlog10_prim_haloprop' in binning_dict:
+        h.update(b'dlog10_prim_haloprop')
+        h.update(np.array(binning_dict['dlog10_prim_haloprop'], dtype='f8'))
+    return h.hexdigest()
+
+
 class SampleSelector(object):
     """ Container class for commonly used sample selections.
     """
@@ -0,0 +1,142 @@
+"""
+"""
+import numpy as np
+from threading import Thread
+from astropy.tests.helper import pytest
+
+from ..random_streams import (rng_stream, spawn_rng_streams, spawn_integer_seeds,
+    mc_bernoulli, mc_poisson)
+from ..random_streams import _legacy_rng_stream, _stream_key_to_int
+
+from ...custom_exceptions import HalotoolsError
+
+__all__ = ('test_rng_stream_determinism', )
+
+fixed_seed = 43
+
+
+def test_rng_stream_determinism():
+    x1 = rng_stream(fixed_seed, 'centrals', 'occupation').random(100)
+    x2 = rng_stream(fixed_seed, 'centrals', 'occupation').random(100)
+    x3 = rng_stream(fixed_seed+1, 'centrals', 'occupation').random(100)
+    x4 = rng_stream(None, 'centrals', 'occupation').random(100)
+    assert np.all(x1 == x2)
+    assert not np.allclose(x1, x3)
+    assert not np.allclose(x1, x4)
+
+
+def test_rng_stream_independence():
+    """ Streams sharing a seed but not their keys must be uncorrelated.
+    """
+    npts = int(1e5)
+    x1 = rng_stream(fixed_seed, 'centrals', 'occupation').random(npts)
+    x2 = rng_stream(fixed_seed, 'satellites', 'occupation').random(npts)
+    assert abs(np.corrcoef(x1, x2)[0, 1]) < 0.02
+
+
+def test_rng_stream_does_not_touch_global_state():
+    np.random.seed(fixed_seed)
+    x1 = np.random.random(10)
+    np.random.seed(fixed_seed)
+    __ = rng_stream(fixed_seed, 'centrals').random(10)
+    x2 = np.random.random(10)
+    assert np.all(x1 == x2)
+
+
+def test_rng_stream_generator_passthrough():
+    rng = rng_stream(fixed_seed, 'centrals')
+    assert rng_stream(rng, 'satellites') is rng
+
+
+def test_legacy_rng_stream():
+    """ The RandomState-based streams used with numpy < 1.17
+    must be reproducible and independent.
+    """
+    npts = int(1e5)
+    keys1 = tuple(_stream_key_to_int(key) for key in ('centrals', 'occupation'))
+    keys2 = tuple(_stream_key_to_int(key) for key in ('satellites', 'occupation'))
+    x1 = _legacy_rng_stream(fixed_seed, keys1).random(npts)
+    x2 = _legacy_rng_stream(fixed_seed, keys1).random(npts)
+    x3 = _legacy_rng_stream(fixed_seed, keys2).random(npts)
+    x4 = _legacy_rng_stream(None, keys1).random(npts)
+    assert np.all(x1 == x2)
+    assert abs(np.corrcoef(x1, x3)[0, 1]) < 0.02
+    assert not np.allclose(x1, x4)
+
+    i1 = _legacy_rng_stream(fixed_seed, keys1).integers(0, 10, npts)
+    assert np.all((i1 >= 0) & (i1 < 10))
+
+
+def test_rng_stream_bad_seed():
+    with pytest.raises(HalotoolsError):
+        __ = rng_stream(-1)
+    with pytest.raises(HalotoolsError):
+        __ = rng_stream('abc')
+
+
+def test_spawn_rng_streams():
+    rng_list1 = spawn_rng_streams(fixed_seed, 4, 'satellites')
+    rng_list2 = spawn_rng_streams(fixed_seed, 4, 'satellites')
+    chunks1 = [rng.random(10) for rng in rng_list1]
+    chunks2 = [rng.random(10) for rng in rng_list2]
+    for c1, c2 in zip(chunks1, chunks2):
+        assert np.all(c1 == c2)
+    assert not np.allclose(chunks1[0], chunks1[1])
+
+    x = rng_stream(fixed_seed, 'satellites', 'chunk', 2).random(10)
+    assert np.all(x == chunks1[2])
+
+
+def test_spawn_rng_streams_threads():
+    """ Results drawn concurrently from threads must not depend on scheduling.
+    """
+    nchunks, npts = 8, 1000
+    serial = [rng.poisson(3., npts) for rng in spawn_rng_streams(fixed_seed, nchunks)]
+
+    rng_list = spawn_rng_streams(fixed_seed, nchunks)
+    threaded = [None]*nchunks
+
+    def draw(i):
+        threaded[i] = rng_list[i].poisson(3., npts)
+
+    threads = [Thread(target=draw, args=(i, )) for i in range(nchunks)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for s, t in zip(serial, threaded):
+        assert np.all(s == t)
+
+
+def test_mc_bernoulli():
+    npts = int(1e5)
+    prob = np.zeros(npts) + 0.25
+    result = mc_bernoulli(prob, seed=fixed_seed)
+    assert result.dtype == bool
+    assert np.allclose(result.mean(), 0.25, atol=0.01)
+
+    assert np.all(mc_bernoulli(np.zeros(npts), seed=fixed_seed) == False)
+    assert np.all(mc_bernoulli(np.ones(npts), seed=fixed_seed) == True)
+
+
+def test_mc_poisson():
+    npts = int(1e5)
+    mean = np.zeros(npts) + 2.5
+    result = mc_poisson(mean, seed=fixed_seed)
+    assert np.allclose(result.mean(), 2.5, rtol=0.02)
+    assert np.allclose(result.var(), 2.5, rtol=0.05)
+
+    assert np.all(mc_poisson(np.zeros(npts) - 1., seed=fixed_seed) == 0)
+
+    result2 = mc_poisson(mean, seed=fixed_seed)
+    assert np.all(result == result2)
+
+
+def test_spawn_integer_seeds():
+    seeds1 = spawn_integer_seeds(fixed_seed, 100)
+    seeds2 = spawn_integer_seeds(fixed_seed, 100)
+    assert seeds1 == seeds2
+    assert len(set(seeds1)) == 100
+    assert all(isinstance(s, int) for s in seeds1)
+    assert spawn_integer_seeds(None, 5) != spawn_integer_seeds(None, 5)
@@ -1,11 +1,13 @@
 """
 """
+import warnings
 import numpy as np
 from unittest import TestCase
 from functools import partial
 from astropy.table import Table
 from astropy.utils.misc import NumpyRNGContext
 
+from .. import table_utils
 from ..table_utils import SampleSelector, compute_conditional_percentiles
 
 from ...sim_manager import FakeSim
@@ -147,3 +149,78 @@ class TestComputeConditionalPercentiles(TestCase):
         split = percentiles <= 0.5
         low_zform, high_zform = self.custom_halo_table[split], self.custom_halo_table[np.invert(split)]
         assert len(low_zform) == len(high_zform)
+
+    def test_brute_force_agreement(self):
+        """ Compare the vectorized calculation to a bin-by-bin loop over
+        an explicit set of bins.
+        """
+        Npts = int(1e4)
+        with NumpyRNGContext(fixed_seed):
+            mass = 10**np.random.uniform(10, 15, Npts)
+            vmax = np.random.random(Npts)
+        bin_boundaries = np.logspace(10, 15, 11)
+
+        percentiles = compute_conditional_percentiles(prim_haloprop=mass, sec_haloprop=vmax,
+            prim_haloprop_bin_boundaries=bin_boundaries, use_cache=False)
+
+        bin_numbers = np.digitize(mass, bin_boundaries)
+        correct_percentiles = np.zeros(Npts)
+        for ibin in set(bin_numbers):
+            idx = np.where(bin_numbers == ibin)[0]
+            num_in_bin = len(idx)
+            correct_percentiles[idx[np.argsort(vmax[idx])]] = (
+                (np.arange(num_in_bin) + 1.0) / float(num_in_bin))
+        assert np.allclose(percentiles, correct_percentiles)
+
+    def test_cache(self):
+        t = Table(self.custom_halo_table, copy=True)
+        percentiles1 = compute_conditional_percentiles(table=t,
+            prim_haloprop_key='halo_mvir', sec_haloprop_key='halo_zform', use_cache=True)
+        percentiles2 = compute_conditional_percentiles(table=t,
+            prim_haloprop_key='halo_mvir', sec_haloprop_key='halo_zform', use_cache=True)
+        assert np.all(percentiles1 == percentiles2)
+
+        # Mutating the returned array must not corrupt the cache
+        percentiles2[:] = -1
+        percentiles3 = compute_conditional_percentiles(table=t,
+            prim_haloprop_key='halo_mvir', sec_haloprop_key='halo_zform', use_cache=True)
+        assert np.all(percentiles1 == percentiles3)
+
+        # Modifying the catalog in-place must not return stale results
+        t['halo_zform'] *= -1
+        percentiles4 = compute_conditional_percentiles(table=t,
+            prim_haloprop_key='halo_mvir', sec_haloprop_key='halo_zform', use_cache=True)
+        assert not np.all(percentiles1 == percentiles4)
+
+    def test_cache_reissues_warning(self):
+        """ A result retrieved from the cache must issue the same warning as the original call.
+        """
+        mass = np.logspace(10, 15, 100)
+        vmax = np.linspace(100, 1000, 100)
+        bin_boundaries = np.logspace(10, 14, 5)
+        for __ in range(2):
+            with warnings.catch_warnings(record=True) as w:
+                warnings.simplefilter("always")
+                __ = compute_conditional_percentiles(prim_haloprop=mass, sec_haloprop=vmax,
+                    prim_haloprop_bin_boundaries=bin_boundaries, use_cache=True)
+                assert any('larger than the largest value' in str(wi.message) for wi in w)
+
+    def test_cache_nbytes_bound(self):
+        Npts = int(1e4)
+        with NumpyRNGContext(fixed_seed):
+            mass = 10**np.random.uniform(10, 15, Npts)
+        for i in range(20):
+            __ = compute_conditional_percentiles(prim_haloprop=mass,
+                sec_haloprop=mass + i, use_cache=True)
+        cached_nbytes = sum(entry[0].nbytes for entry in table_utils._conditional_percentiles_cache.values())
+        assert cached_nbytes <= table_utils._max_cached_percentiles_nbytes
+
+        default_bound = table_utils._max_cached_percentiles_nbytes
+        table_utils._max_cached_percentiles_nbytes = 5*mass.nbytes
+        try:
+            for i in range(20):
+                __ = compute_conditional_percentiles(prim_haloprop=mass,
+                    sec_haloprop=mass - i, use_cache=True)
+            assert len(table_utils._conditional_percentiles_cache) == 5
+        finally:
+            table_utils._max_cached_percentiles_nbytes = default_bound
@@ -164,9 +164,10 @@ if os.path.isfile(rejected_filename_log_fname):
 if old_cache_log_exists:
     os.rename(old_cache.cache_log_fname, corrupted_cache_log_fname)
 
-if len(new_cache.log) > 0:
-    new_cache._overwrite_log_ascii(new_cache.log)
+# The verified entries replace the entire log, including the SQLite copy
+new_cache._overwrite_log_ascii(new_cache.log)
 
+if len(new_cache.log) > 0:
     print("\n")
     print("The following log entries have been verified "
         "and added to your new cache log:\n")